@@ -0,0 +1,114 @@
+"""
+Benchmark exact MaxSim scoring: per-document thread pool vs blocked doc-contiguous engine.
+
+The thread-pool scorer is what ``LeannMultiVector.search_exact_all`` used to run: a
+float32 ``.npy`` of token rows, a dict from doc id to row indices, and one
+fancy-indexed matmul per document on a thread pool. The engine in ``maxsim.py``
+scores an fp16 doc-contiguous store in blocks of whole documents.
+
+Synthetic ColQwen2-like pages are used, so no model or GPU is needed:
+
+    python benchmark_maxsim.py --docs 2000 --tokens 750 --queries 20
+"""
+
+import argparse
+import concurrent.futures
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from maxsim import MultiVectorStore
+
+
+def make_corpus(num_docs: int, mean_tokens: int, dim: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(mean_tokens // 2, mean_tokens * 3 // 2, num_docs)
+    tokens = rng.standard_normal((int(lengths.sum()), dim)).astype(np.float32)
+    tokens /= np.linalg.norm(tokens, axis=1, keepdims=True)
+    row_doc_ids = np.repeat(np.arange(num_docs), lengths)
+    return tokens, row_doc_ids
+
+
+def thread_pool_scores(all_embeddings, docid_to_indices, query, max_workers=32):
+    """The previous per-document scorer."""
+
+    def _score_one(doc_id: int) -> tuple[float, int]:
+        token_indices = docid_to_indices.get(doc_id, [])
+        if not token_indices:
+            return (0.0, doc_id)
+        doc_vecs = np.asarray(all_embeddings[token_indices], dtype=np.float32)
+        sim = np.dot(query, doc_vecs.T)
+        sim = np.nan_to_num(sim, nan=-1e30, posinf=1e30, neginf=-1e30)
+        return (float(sim.max(axis=1).sum()), doc_id)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
+        return list(ex.map(_score_one, list(docid_to_indices)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--tokens", type=int, default=750, help="Mean tokens per page")
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--query-tokens", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--topk", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=1, help="Blocks scored concurrently")
+    args = parser.parse_args()
+
+    tokens, row_doc_ids = make_corpus(args.docs, args.tokens, args.dim)
+    rng = np.random.default_rng(1)
+    queries = rng.standard_normal((args.queries, args.query_tokens, args.dim)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prefix = Path(tmp) / "bench"
+        np.save(f"{prefix}.emb.npy", tokens)
+        for dtype in (np.float16, np.float32):
+            store_prefix = Path(tmp) / np.dtype(dtype).name
+            MultiVectorStore.from_token_rows(tokens, row_doc_ids, dtype=dtype).save(store_prefix)
+        del tokens
+
+        all_embeddings = np.load(f"{prefix}.emb.npy", mmap_mode="r")
+        docid_to_indices: dict[int, list[int]] = {}
+        for idx, doc_id in enumerate(row_doc_ids.tolist()):
+            docid_to_indices.setdefault(doc_id, []).append(idx)
+
+        thread_pool_scores(all_embeddings, docid_to_indices, queries[0])  # warm the page cache
+        start = time.perf_counter()
+        old = [thread_pool_scores(all_embeddings, docid_to_indices, q) for q in queries]
+        old_time = (time.perf_counter() - start) / args.queries
+        reference = np.zeros((args.queries, args.docs), dtype=np.float32)
+        for i, scores in enumerate(old):
+            for score, doc_id in scores:
+                reference[i, doc_id] = score
+
+        total_tokens = len(row_doc_ids)
+        print(f"{args.docs} docs, {total_tokens} tokens x {args.dim} dims")
+        print(
+            f"thread pool (float32, per doc): {old_time * 1000:8.1f} ms/query, "
+            f"{all_embeddings.nbytes / 2**20:.0f} MB"
+        )
+        for dtype in (np.float16, np.float32):
+            store = MultiVectorStore.load(Path(tmp) / np.dtype(dtype).name)
+            store.maxsim(queries[0])
+            start = time.perf_counter()
+            new = [store.maxsim(q, num_threads=args.threads) for q in queries]
+            new_time = (time.perf_counter() - start) / args.queries
+
+            max_diff, overlap = 0.0, 0.0
+            for expected, scores in zip(reference, new):
+                max_diff = max(max_diff, float(np.abs(expected - scores).max()))
+                top_old = set(np.argsort(-expected)[: args.topk].tolist())
+                top_new = set(np.argsort(-scores)[: args.topk].tolist())
+                overlap += len(top_old & top_new) / args.topk
+            print(
+                f"blocked MaxSim ({np.dtype(dtype).name}):  {new_time * 1000:8.1f} ms/query, "
+                f"{store.tokens.nbytes / 2**20:.0f} MB ({old_time / new_time:.1f}x, "
+                f"max |score diff| {max_diff:.4f}, "
+                f"top-{args.topk} overlap {overlap / args.queries:.3f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
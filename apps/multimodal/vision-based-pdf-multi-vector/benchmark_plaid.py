@@ -0,0 +1,86 @@
+"""
+Benchmark centroid-pruned (PLAID-style) search against exact MaxSim.
+
+Pages are synthetic mixtures of a few "topics" with noise, and queries are noisy
+tokens taken from a random page, so the token space has the cluster structure
+that centroid pruning relies on. Recall is measured against the exact top-k of
+the same store:
+
+    python benchmark_plaid.py --docs 4000 --tokens 100 --queries 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+from maxsim import MultiVectorStore
+from plaid import CentroidIndex
+
+
+def make_corpus(num_docs: int, mean_tokens: int, dim: int, topics: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, dim))
+    docs = []
+    for _ in range(num_docs):
+        mix = rng.choice(topics, 3)
+        n = int(rng.integers(mean_tokens // 2, mean_tokens * 3 // 2))
+        tokens = centers[rng.choice(mix, n)] + 0.5 * rng.standard_normal((n, dim))
+        tokens /= np.linalg.norm(tokens, axis=1, keepdims=True)
+        docs.append(tokens.astype(np.float32))
+    return docs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs", type=int, default=4000)
+    parser.add_argument("--tokens", type=int, default=100, help="Mean tokens per page")
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--query-tokens", type=int, default=16)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--topk", type=int, default=10)
+    parser.add_argument("--nbits", type=int, default=2)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--ncandidates", type=int, default=256)
+    args = parser.parse_args()
+
+    docs = make_corpus(args.docs, args.tokens, args.dim, args.topics)
+    store = MultiVectorStore.from_documents(list(range(args.docs)), docs, dtype=np.float32)
+    rng = np.random.default_rng(1)
+    queries = []
+    for _ in range(args.queries):
+        page = docs[rng.integers(args.docs)]
+        picked = page[rng.choice(len(page), args.query_tokens)]
+        queries.append(picked + 0.3 * rng.standard_normal(picked.shape).astype(np.float32))
+
+    start = time.perf_counter()
+    index = CentroidIndex.build(store, nbits=args.nbits)
+    build_time = time.perf_counter() - start
+    print(
+        f"{args.docs} docs, {len(store.tokens)} tokens x {args.dim} dims; "
+        f"{len(index.centroids)} centroids, {args.nbits}-bit residuals, "
+        f"built in {build_time:.1f} s"
+    )
+
+    start = time.perf_counter()
+    exact = [store.top_k(q, args.topk) for q in queries]
+    exact_time = (time.perf_counter() - start) / args.queries
+    print(f"exact MaxSim:        {exact_time * 1000:8.1f} ms/query")
+    for nprobe in args.nprobe:
+        start = time.perf_counter()
+        pruned = [
+            index.search(store, q, args.topk, nprobe=nprobe, ncandidates=args.ncandidates)
+            for q in queries
+        ]
+        pruned_time = (time.perf_counter() - start) / args.queries
+        recall = np.mean(
+            [len({d for _, d in a} & {d for _, d in b}) / args.topk for a, b in zip(exact, pruned)]
+        )
+        print(
+            f"PLAID nprobe={nprobe:<3d}     {pruned_time * 1000:8.1f} ms/query "
+            f"({exact_time / pruned_time:.1f}x, recall@{args.topk} {recall:.3f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
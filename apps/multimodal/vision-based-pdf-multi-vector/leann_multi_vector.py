@@ -1,4 +1,3 @@
-import concurrent.futures
 import json
 import os
 import re
@@ -20,6 +19,10 @@ def _ensure_repo_paths_importable(current_file: str) -> None:
         sys.path.append(str(_leann_core_src))
     if str(_leann_hnsw_pkg) not in sys.path:
         sys.path.append(str(_leann_hnsw_pkg))
+    # Sibling modules (maxsim, plaid), also when imported from outside this directory
+    _app_dir = Path(current_file).resolve().parent
+    if str(_app_dir) not in sys.path:
+        sys.path.append(str(_app_dir))
 
 
 def _find_backend_module_file() -> Optional[Path]:
@@ -398,6 +401,9 @@ class QwenVL:
 # Ensure repo paths are importable for dynamic backend loading
 _ensure_repo_paths_importable(__file__)
 
+from maxsim import MultiVectorStore  # noqa: E402
+from plaid import CentroidIndex  # noqa: E402
+
 from leann_backend_hnsw.hnsw_backend import HNSWBuilder, HNSWSearcher  # noqa: E402
 
 
@@ -412,10 +418,19 @@ class LeannMultiVector:
         is_compact: bool = False,
         is_recompute: bool = False,
         embedding_model_name: str = "colvision",
+        token_dtype: str = "float16",
+        num_centroids: Optional[int] = None,
+        centroid_nbits: int = 2,
     ) -> None:
         self.index_path = index_path
         self.dim = dim
         self.embedding_model_name = embedding_model_name
+        # Storage precision of the token embeddings used for exact MaxSim
+        self.token_dtype = np.dtype(token_dtype)
+        # Centroid index for search_plaid; None picks the size from the token count
+        self.num_centroids = num_centroids
+        self.centroid_nbits = centroid_nbits
+        self._centroid_index: Optional[CentroidIndex] = None
         self._pending_items: list[dict] = []
         self._backend_kwargs = {
             "distance_metric": distance_metric,
@@ -425,7 +440,9 @@ class LeannMultiVector:
             "is_recompute": is_recompute,
         }
         self._labels_meta: list[dict] = []
-        self._docid_to_indices: dict[int, list[int]] | None = None
+        self._store: Optional[MultiVectorStore] = None
+        # True when HNSW labels are row numbers of the store (indexes built with it)
+        self._store_rows_are_labels = False
 
     def _meta_dict(self) -> dict:
         return {
@@ -466,6 +483,10 @@ class LeannMultiVector:
         index_path_obj = Path(self.index_path)
         return index_path_obj.parent / f"{index_path_obj.name}.emb.npy"
 
+    def _store_prefix(self) -> Path:
+        index_path_obj = Path(self.index_path)
+        return index_path_obj.parent / index_path_obj.name
+
     def _images_dir_path(self) -> Path:
         """Directory where original images are stored."""
         index_path_obj = Path(self.index_path)
@@ -482,7 +503,13 @@ class LeannMultiVector:
         images_dir = self._images_dir_path()
         images_dir.mkdir(parents=True, exist_ok=True)
 
+        # Tokens of a document inserted in several pieces are kept together, so that
+        # HNSW labels double as rows of the doc-contiguous token store
+        items_by_doc: dict[int, list[dict]] = {}
         for item in self._pending_items:
+            items_by_doc.setdefault(int(item["doc_id"]), []).append(item)
+
+        for item in (item for items in items_by_doc.values() for item in items):
             doc_id = int(item["doc_id"])
             filepath = item.get("filepath", "")
             colbert_vecs = item["colbert_vecs"]
@@ -525,8 +552,19 @@ class LeannMultiVector:
         with open(self._labels_path(), "w", encoding="utf-8") as f:
             _json.dump(labels_meta, f)
 
-        # Persist embeddings for exact reranking
-        np.save(self._embeddings_path(), embeddings_np)
+        # Persist fp16 doc-contiguous token embeddings for exact MaxSim reranking
+        row_doc_ids = np.array([meta["doc_id"] for meta in labels_meta], dtype=np.int64)
+        self._store = MultiVectorStore.from_token_rows(
+            embeddings_np, row_doc_ids, dtype=self.token_dtype
+        )
+        self._store.save(self._store_prefix())
+        self._store_rows_are_labels = True
+
+        # Cluster the tokens for centroid-pruned search
+        self._centroid_index = CentroidIndex.build(
+            self._store, self.num_centroids, nbits=self.centroid_nbits
+        )
+        self._centroid_index.save(self._store_prefix())
 
         self._labels_meta = labels_meta
 
@@ -540,18 +578,35 @@ class LeannMultiVector:
             with open(labels_path, encoding="utf-8") as f:
                 self._labels_meta = _json.load(f)
 
-    def _build_docid_to_indices_if_needed(self) -> None:
-        if self._docid_to_indices is not None:
-            return
+    def _load_store_if_needed(self) -> Optional[MultiVectorStore]:
+        """Memory-map the doc-contiguous token store, converting a legacy ``.emb.npy``."""
+        if self._store is not None:
+            return self._store
+        if MultiVectorStore.exists(self._store_prefix()):
+            self._store = MultiVectorStore.load(self._store_prefix())
+            self._store_rows_are_labels = True
+            return self._store
+        emb_path = self._embeddings_path()
+        if not emb_path.exists():
+            return None
+        # Indexes built before the token store: group the float32 rows by document in memory
+        self._load_labels_meta_if_needed()
+        row_doc_ids = np.array([int(meta["doc_id"]) for meta in self._labels_meta])
+        self._store = MultiVectorStore.from_token_rows(np.load(emb_path), row_doc_ids)
+        self._store_rows_are_labels = False
+        return self._store
+
+    def _candidate_positions(self, labels: list[list[str]]) -> np.ndarray:
+        """Store positions of the documents owning the first-stage token labels."""
+        assert self._store is not None
+        rows = np.array([int(sid) for batch in labels for sid in batch], dtype=np.int64)
+        if self._store_rows_are_labels:
+            rows = rows[(rows >= 0) & (rows < len(self._store.tokens))]
+            return np.unique(self._store.doc_positions_of_rows(rows))
         self._load_labels_meta_if_needed()
-        mapping: dict[int, list[int]] = {}
-        for idx, meta in enumerate(self._labels_meta):
-            try:
-                doc_id = int(meta["doc_id"])  # type: ignore[index]
-            except Exception:
-                continue
-            mapping.setdefault(doc_id, []).append(idx)
-        self._docid_to_indices = mapping
+        rows = rows[(rows >= 0) & (rows < len(self._labels_meta))]
+        doc_ids = np.array([int(self._labels_meta[r]["doc_id"]) for r in rows], dtype=np.int64)
+        return np.unique(self._store.positions_of(doc_ids))
 
     def search(
         self, data: np.ndarray, topk: int, first_stage_k: int = 50
@@ -614,8 +669,10 @@ class LeannMultiVector:
 
         Steps:
         1) Run a first-stage ANN to collect candidate doc_ids (using seq-level neighbors).
-        2) For each candidate doc, load all its token embeddings and compute
-           MaxSim(query_tokens, doc_tokens) exactly: sum(max(dot(q_i, d_j))).
+        2) Score all candidates exactly with blocked MaxSim over the doc-contiguous
+           token store: sum(max(dot(q_i, d_j))).
+
+        ``max_workers`` is the number of token blocks scored concurrently.
 
         Returns top-k list of (score, doc_id).
         """
@@ -625,19 +682,11 @@ class LeannMultiVector:
         if data.dtype != np.float32:
             data = data.astype(np.float32)
 
-        self._load_labels_meta_if_needed()
-        self._build_docid_to_indices_if_needed()
-
-        emb_path = self._embeddings_path()
-        if not emb_path.exists():
+        store = self._load_store_if_needed()
+        if store is None:
             # Fallback to approximate if we don't have persisted embeddings
             return self.search(data, topk, first_stage_k=first_stage_k)
 
-        # Memory-map embeddings to avoid loading all into RAM
-        all_embeddings = np.load(emb_path, mmap_mode="r")
-        if all_embeddings.dtype != np.float32:
-            all_embeddings = all_embeddings.astype(np.float32)
-
         # First-stage ANN to collect candidate doc_ids
         searcher = HNSWSearcher(self.index_path, meta=self._meta_dict())
         raw = searcher.search(
@@ -652,39 +701,38 @@ class LeannMultiVector:
         labels = raw.get("labels")
         if labels is None:
             return []
-        candidate_doc_ids: set[int] = set()
-        for batch in labels:
-            for sid in batch:
-                try:
-                    idx = int(sid)
-                except Exception:
-                    continue
-                if 0 <= idx < len(self._labels_meta):
-                    candidate_doc_ids.add(int(self._labels_meta[idx]["doc_id"]))  # type: ignore[index]
-
-        # Exact scoring per doc (parallelized)
-        assert self._docid_to_indices is not None
-
-        def _score_one(doc_id: int) -> tuple[float, int]:
-            token_indices = self._docid_to_indices.get(doc_id, [])
-            if not token_indices:
-                return (0.0, doc_id)
-            doc_vecs = np.asarray(all_embeddings[token_indices], dtype=np.float32)
-            # (Q, D) x (P, D)^T -> (Q, P) then MaxSim over P, sum over Q
-            sim = np.dot(data, doc_vecs.T)
-            # nan-safe
-            sim = np.nan_to_num(sim, nan=-1e30, posinf=1e30, neginf=-1e30)
-            score = sim.max(axis=2).sum(axis=1) if sim.ndim == 3 else sim.max(axis=1).sum()
-            return (float(score), doc_id)
-
-        scores: list[tuple[float, int]] = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
-            futures = [ex.submit(_score_one, doc_id) for doc_id in candidate_doc_ids]
-            for fut in concurrent.futures.as_completed(futures):
-                scores.append(fut.result())
-
-        scores.sort(key=lambda x: x[0], reverse=True)
-        return scores[:topk] if len(scores) >= topk else scores
+        positions = self._candidate_positions(labels)
+        return store.top_k(data, topk, positions, num_threads=max_workers)
+
+    def search_plaid(
+        self,
+        data: np.ndarray,
+        topk: int,
+        *,
+        nprobe: int = 4,
+        ncandidates: int = 256,
+    ) -> list[tuple[float, int]]:
+        """
+        Centroid-pruned (PLAID-style) MaxSim search.
+
+        Each query token probes its ``nprobe`` closest token centroids to collect
+        candidate documents. Candidates are scored by query/centroid interactions and
+        then by decompressed residuals, and only the best ``ncandidates // 4`` are
+        scored with exact MaxSim. No HNSW search is involved.
+
+        Falls back to ``search_exact`` for indexes built without a centroid index.
+        """
+        if data.ndim == 1:
+            data = data.reshape(1, -1)
+        if data.dtype != np.float32:
+            data = data.astype(np.float32)
+
+        store = self._load_store_if_needed()
+        if self._centroid_index is None and CentroidIndex.exists(self._store_prefix()):
+            self._centroid_index = CentroidIndex.load(self._store_prefix())
+        if store is None or self._centroid_index is None:
+            return self.search_exact(data, topk)
+        return self._centroid_index.search(store, data, topk, nprobe, ncandidates)
 
     def search_exact_all(
         self,
@@ -696,46 +744,18 @@ class LeannMultiVector:
         """
         Exact MaxSim over ALL documents (no ANN pre-filtering).
 
-        This computes, for each document, sum_i max_j dot(q_i, d_j).
-        It memory-maps the persisted token-embedding matrix for scalability.
+        This computes, for each document, sum_i max_j dot(q_i, d_j), streaming the
+        memory-mapped fp16 token store in blocks of whole documents.
         """
         if data.ndim == 1:
             data = data.reshape(1, -1)
         if data.dtype != np.float32:
             data = data.astype(np.float32)
 
-        self._load_labels_meta_if_needed()
-        self._build_docid_to_indices_if_needed()
-
-        emb_path = self._embeddings_path()
-        if not emb_path.exists():
+        store = self._load_store_if_needed()
+        if store is None:
             return self.search(data, topk)
-
-        all_embeddings = np.load(emb_path, mmap_mode="r")
-        if all_embeddings.dtype != np.float32:
-            all_embeddings = all_embeddings.astype(np.float32)
-
-        assert self._docid_to_indices is not None
-        candidate_doc_ids = list(self._docid_to_indices.keys())
-
-        def _score_one(doc_id: int) -> tuple[float, int]:
-            token_indices = self._docid_to_indices.get(doc_id, [])
-            if not token_indices:
-                return (0.0, doc_id)
-            doc_vecs = np.asarray(all_embeddings[token_indices], dtype=np.float32)
-            sim = np.dot(data, doc_vecs.T)
-            sim = np.nan_to_num(sim, nan=-1e30, posinf=1e30, neginf=-1e30)
-            score = sim.max(axis=2).sum(axis=1) if sim.ndim == 3 else sim.max(axis=1).sum()
-            return (float(score), doc_id)
-
-        scores: list[tuple[float, int]] = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
-            futures = [ex.submit(_score_one, d) for d in candidate_doc_ids]
-            for fut in concurrent.futures.as_completed(futures):
-                scores.append(fut.result())
-
-        scores.sort(key=lambda x: x[0], reverse=True)
-        return scores[:topk] if len(scores) >= topk else scores
+        return store.top_k(data, topk, num_threads=max_workers)
 
     def get_image(self, doc_id: int) -> Optional[Image.Image]:
         """
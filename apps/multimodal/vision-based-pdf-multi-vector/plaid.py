@@ -0,0 +1,269 @@
+"""
+Centroid-pruned (PLAID-style) candidate generation for multi-vector retrieval.
+
+At build time the token embeddings of a ``MultiVectorStore`` are clustered with
+k-means. Every token is stored as its centroid id plus an ``nbits``-per-dimension
+code of its residual, as in ColBERTv2. An inverted file maps each centroid to
+the documents that have a token in it.
+
+A search runs in three stages, each scoring fewer documents than the last:
+
+1. Candidate generation: every query token probes its ``nprobe`` best
+   centroids, and the documents in those lists become candidates.
+2. Centroid interaction: a candidate's score is MaxSim with every token
+   replaced by its centroid. That is a gather from the ``(Q, K)`` query/centroid
+   score matrix, reduced per document with ``np.maximum.reduceat``. The best
+   ``ncandidates`` documents survive.
+3. Residual decompression: the survivors' tokens are rebuilt as centroid plus
+   decoded residual and scored again. The best ``ncandidates // 4`` survive.
+
+Exact MaxSim over the final candidates is left to ``MultiVectorStore``.
+
+Files written next to an index ``<name>``:
+
+* ``<name>.centroids.npy``: ``float32`` centroids, ``(K, D)``
+* ``<name>.codes.npy``: centroid id of every token row of the store
+* ``<name>.residuals.npy``: packed residual codes, ``(num_tokens, D * nbits / 8)``
+* ``<name>.buckets.npz``: residual bucket cutoffs and weights
+* ``<name>.ivf.npy`` and ``<name>.ivf_offsets.npy``: document positions per centroid
+"""
+
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+from maxsim import DEFAULT_BLOCK_TOKENS, MultiVectorStore
+
+# Tokens sampled to train the centroids
+KMEANS_SAMPLE = 1 << 16
+
+
+def default_num_centroids(num_tokens: int) -> int:
+    """PLAID's rule of thumb: a power of two near ``16 * sqrt(num_tokens)``."""
+    if num_tokens <= 0:
+        return 1
+    return int(min(2 ** np.floor(np.log2(16 * np.sqrt(num_tokens))), num_tokens))
+
+
+def _nearest_centroids(vectors: np.ndarray, centroids: np.ndarray, block: int) -> np.ndarray:
+    """Index of the L2-nearest centroid of every row, computed in blocks of rows."""
+    half_norms = 0.5 * (centroids * centroids).sum(axis=1)
+    codes = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), block):
+        rows = np.asarray(vectors[start : start + block], dtype=np.float32)
+        codes[start : start + len(rows)] = np.argmax(rows @ centroids.T - half_norms, axis=1)
+    return codes
+
+
+def kmeans(
+    vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0, block: int = 1 << 14
+) -> np.ndarray:
+    """Lloyd's k-means in NumPy. Empty clusters are re-seeded from random points."""
+    rng = np.random.default_rng(seed)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    k = min(k, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        codes = _nearest_centroids(vectors, centroids, block)
+        counts = np.bincount(codes, minlength=k)
+        order = np.argsort(codes, kind="stable")
+        present = np.flatnonzero(counts)
+        starts = (np.cumsum(counts) - counts)[present]
+        centroids[present] = np.add.reduceat(vectors[order], starts, axis=0) / counts[present, None]
+        empty = counts == 0
+        centroids[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+    return centroids
+
+
+class CentroidIndex:
+    """Centroid codes, residual codes and inverted lists over a ``MultiVectorStore``."""
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        codes: np.ndarray,
+        residuals: np.ndarray,
+        cutoffs: np.ndarray,
+        weights: np.ndarray,
+        ivf: np.ndarray,
+        ivf_offsets: np.ndarray,
+    ):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.codes = codes
+        self.residuals = residuals
+        self.cutoffs = cutoffs
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.nbits = int(np.log2(len(self.weights)))
+        # Residual weights of all 8 // nbits buckets packed in each possible byte
+        per_byte = 8 // self.nbits
+        self._byte_weights = self.weights[
+            _unpack(np.arange(256, dtype=np.uint8)[:, None], self.nbits, per_byte)
+        ]
+        self.ivf = ivf
+        self.ivf_offsets = np.asarray(ivf_offsets, dtype=np.int64)
+
+    @classmethod
+    def build(
+        cls,
+        store: MultiVectorStore,
+        num_centroids: Optional[int] = None,
+        nbits: int = 2,
+        sample: int = KMEANS_SAMPLE,
+        iterations: int = 4,
+        seed: int = 0,
+        block: int = DEFAULT_BLOCK_TOKENS,
+    ) -> "CentroidIndex":
+        """Cluster the store's tokens and encode every token against its centroid."""
+        if nbits not in (1, 2, 4, 8):
+            raise ValueError("nbits must be 1, 2, 4 or 8")
+        num_tokens = len(store.tokens)
+        k = num_centroids or default_num_centroids(num_tokens)
+        rng = np.random.default_rng(seed)
+        picked = np.sort(rng.choice(num_tokens, min(sample, num_tokens), replace=False))
+        centroids = kmeans(store.tokens[picked], k, iterations, seed, block)
+
+        codes = _nearest_centroids(store.tokens, centroids, block)
+        # Residual buckets from the quantiles of the sampled residuals, as in ColBERTv2
+        sampled = np.asarray(store.tokens[picked], dtype=np.float32) - centroids[codes[picked]]
+        levels = 1 << nbits
+        cutoffs = np.quantile(sampled, np.arange(1, levels) / levels).astype(np.float32)
+        weights = np.quantile(sampled, (np.arange(levels) + 0.5) / levels).astype(np.float32)
+
+        residuals = np.empty((num_tokens, -(-store.dim * nbits // 8)), dtype=np.uint8)
+        for start in range(0, num_tokens, block):
+            rows = np.asarray(store.tokens[start : start + block], dtype=np.float32)
+            bucket = np.searchsorted(cutoffs, rows - centroids[codes[start : start + len(rows)]])
+            residuals[start : start + len(rows)] = _pack(bucket.astype(np.uint8), nbits)
+
+        # Inverted file: documents (store positions) with at least one token per centroid
+        doc_of_row = np.repeat(np.arange(len(store)), np.diff(store.offsets))
+        pairs = np.unique(codes * len(store) + doc_of_row)
+        pair_codes, pair_docs = pairs // len(store), pairs % len(store)
+        ivf_offsets = np.concatenate(([0], np.cumsum(np.bincount(pair_codes, minlength=k))))
+        code_dtype = np.uint16 if k <= np.iinfo(np.uint16).max + 1 else np.uint32
+        return cls(
+            centroids,
+            codes.astype(code_dtype),
+            residuals,
+            cutoffs,
+            weights,
+            pair_docs.astype(np.int64),
+            ivf_offsets,
+        )
+
+    @staticmethod
+    def paths(prefix: Union[str, Path]) -> dict[str, Path]:
+        names = ("centroids", "codes", "residuals", "ivf", "ivf_offsets")
+        paths = {name: Path(f"{prefix}.{name}.npy") for name in names}
+        paths["buckets"] = Path(f"{prefix}.buckets.npz")
+        return paths
+
+    @classmethod
+    def exists(cls, prefix: Union[str, Path]) -> bool:
+        return all(path.exists() for path in cls.paths(prefix).values())
+
+    def save(self, prefix: Union[str, Path]) -> None:
+        paths = self.paths(prefix)
+        np.save(paths["centroids"], self.centroids)
+        np.save(paths["codes"], self.codes)
+        np.save(paths["residuals"], self.residuals)
+        np.save(paths["ivf"], self.ivf)
+        np.save(paths["ivf_offsets"], self.ivf_offsets)
+        np.savez(paths["buckets"], cutoffs=self.cutoffs, weights=self.weights)
+
+    @classmethod
+    def load(cls, prefix: Union[str, Path], mmap: bool = True) -> "CentroidIndex":
+        paths = cls.paths(prefix)
+        mode = "r" if mmap else None
+        with np.load(paths["buckets"]) as buckets:
+            cutoffs, weights = buckets["cutoffs"], buckets["weights"]
+        return cls(
+            np.load(paths["centroids"]),
+            np.load(paths["codes"], mmap_mode=mode),
+            np.load(paths["residuals"], mmap_mode=mode),
+            cutoffs,
+            weights,
+            np.load(paths["ivf"]),
+            np.load(paths["ivf_offsets"]),
+        )
+
+    def decompress(self, rows: np.ndarray) -> np.ndarray:
+        """Approximate embeddings of the given token rows: centroid plus decoded residual."""
+        dim = self.centroids.shape[1]
+        residuals = self._byte_weights[self.residuals[rows]].reshape(len(rows), -1)[:, :dim]
+        return self.centroids[self.codes[rows].astype(np.int64)] + residuals
+
+    def candidates(self, query_scores: np.ndarray, nprobe: int) -> np.ndarray:
+        """Positions of the documents in the ``nprobe`` best centroids of any query token."""
+        nprobe = min(nprobe, query_scores.shape[1])
+        probed = np.unique(np.argpartition(-query_scores, nprobe - 1, axis=1)[:, :nprobe].ravel())
+        starts, ends = self.ivf_offsets[probed], self.ivf_offsets[probed + 1]
+        lengths = ends - starts
+        local = np.cumsum(lengths) - lengths
+        entries = np.arange(int(lengths.sum())) + np.repeat(starts - local, lengths)
+        return np.unique(self.ivf[entries])
+
+    def search(
+        self,
+        store: MultiVectorStore,
+        query: np.ndarray,
+        topk: int,
+        nprobe: int = 4,
+        ncandidates: int = 256,
+        block: int = DEFAULT_BLOCK_TOKENS,
+    ) -> list[tuple[float, int]]:
+        """Top-``topk`` ``(score, doc_id)`` by exact MaxSim over centroid-pruned candidates."""
+        query = np.atleast_2d(np.asarray(query, dtype=np.float32))
+        query_scores = query @ self.centroids.T  # (Q, K)
+        positions = self.candidates(query_scores, nprobe)
+
+        # Stage 2: centroid interaction, every token scored by its centroid
+        approx = self._segment_maxsim(
+            store, positions, block, lambda rows: query_scores[:, self.codes[rows].astype(np.int64)]
+        )
+        positions = _best(positions, approx, ncandidates)
+
+        # Stage 3: residual decompression on the survivors
+        approx = self._segment_maxsim(
+            store, positions, block, lambda rows: query @ self.decompress(rows).T
+        )
+        positions = _best(positions, approx, max(ncandidates // 4, topk))
+        return store.top_k(query, topk, positions)
+
+    def _segment_maxsim(self, store: MultiVectorStore, positions, block: int, score_rows):
+        """Per-document sums of per-query-token maxima of ``score_rows(rows)`` (Q, rows).
+
+        ``positions`` must be sorted, so that each block reads ascending token rows.
+        """
+        lengths = store.offsets[positions + 1] - store.offsets[positions]
+        scores = np.zeros(len(positions), dtype=np.float32)
+        block_of = np.cumsum(lengths) // max(block, 1)
+        for chunk in np.split(np.arange(len(positions)), np.flatnonzero(np.diff(block_of)) + 1):
+            chunk = chunk[lengths[chunk] > 0]
+            if not len(chunk):
+                continue
+            starts, sizes = store.offsets[positions[chunk]], lengths[chunk]
+            local = np.cumsum(sizes) - sizes
+            rows = np.arange(int(sizes.sum())) + np.repeat(starts - local, sizes)
+            per_doc = np.maximum.reduceat(score_rows(rows), local, axis=1)  # (Q, docs)
+            scores[chunk] = per_doc.sum(axis=0)
+        return scores
+
+
+def _best(positions: np.ndarray, scores: np.ndarray, keep: int) -> np.ndarray:
+    """The ``keep`` best-scoring positions, in ascending order."""
+    if len(positions) <= keep:
+        return positions
+    return np.sort(positions[np.argpartition(-scores, keep - 1)[:keep]])
+
+
+def _pack(buckets: np.ndarray, nbits: int) -> np.ndarray:
+    """Pack ``(n, D)`` bucket ids of ``nbits`` bits each into ``(n, D * nbits / 8)`` bytes."""
+    bits = np.unpackbits(buckets[..., None], axis=-1)[..., 8 - nbits :]
+    return np.packbits(bits.reshape(len(buckets), -1), axis=1)
+
+
+def _unpack(packed: np.ndarray, nbits: int, dim: int) -> np.ndarray:
+    bits = np.unpackbits(packed, axis=1)[:, : dim * nbits].reshape(len(packed), dim, nbits)
+    weights = (1 << np.arange(nbits - 1, -1, -1)).astype(np.uint8)
+    return (bits * weights).sum(axis=-1)
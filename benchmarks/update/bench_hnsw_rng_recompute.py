@@ -21,7 +21,6 @@ import argparse
 import json
 import logging
 import os
-import pickle
 import re
 import sys
 import time
@@ -38,6 +37,7 @@ if os.environ.get("LEANN_FORCE_CPU", "").lower() in ("1", "true", "yes"):
 
 from leann.embedding_compute import compute_embeddings
 from leann.embedding_server_manager import EmbeddingServerManager
+from leann.id_map import load_passage_offsets, save_passage_offsets
 from leann.registry import register_project_directory
 from leann_backend_hnsw import faiss  # type: ignore
 from leann_backend_hnsw.convert_to_csr import prune_hnsw_embeddings_inplace
@@ -167,8 +167,7 @@ def benchmark_update_with_mode(
     with open(meta_path, encoding="utf-8") as f:
         meta = json.load(f)
 
-    with open(offset_file, "rb") as f:
-        offset_map: dict[str, int] = pickle.load(f)
+    offset_map: dict[str, int] = dict(load_passage_offsets(offset_file, mmap=False))
     existing_ids = set(offset_map.keys())
 
     valid_chunks: list[dict[str, Any]] = []
@@ -256,8 +255,7 @@ def benchmark_update_with_mode(
                 f.write("\n")
                 offset_map[chunk["id"]] = offset
 
-        with open(offset_file, "wb") as f:
-            pickle.dump(offset_map, f)
+        save_passage_offsets(offset_file, offset_map)
 
         server_manager = EmbeddingServerManager(
             backend_module_name="leann_backend_hnsw.hnsw_embedding_server"
@@ -308,8 +306,7 @@ def benchmark_update_with_mode(
         if passages_file.exists():
             with open(passages_file, "rb+") as f:
                 f.truncate(rollback_size)
-        with open(offset_file, "wb") as f:
-            pickle.dump(offset_map_backup, f)
+        save_passage_offsets(offset_file, offset_map_backup)
         raise
 
     prune_hnsw_embeddings_inplace(str(index_file))
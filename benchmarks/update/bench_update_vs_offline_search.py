@@ -31,7 +31,6 @@ import csv
 import json
 import logging
 import os
-import pickle
 import sys
 import threading
 import time
@@ -48,6 +47,7 @@ if os.environ.get("LEANN_FORCE_CPU", "").lower() in ("1", "true", "yes"):
 
 from leann.embedding_compute import compute_embeddings
 from leann.embedding_server_manager import EmbeddingServerManager
+from leann.id_map import load_passage_offsets, save_passage_offsets
 from leann.registry import register_project_directory
 from leann_backend_hnsw import faiss  # type: ignore
 
@@ -220,8 +220,7 @@ def _append_passages_for_updates(
             "Passage store missing; cannot register update passages for recompute mode."
         )
 
-    with open(offsets_file, "rb") as f:
-        offset_map: dict[str, int] = pickle.load(f)
+    offset_map: dict[str, int] = dict(load_passage_offsets(offsets_file, mmap=False))
 
     assigned_ids: list[str] = []
     with open(passages_file, "a", encoding="utf-8") as f:
@@ -233,8 +232,7 @@ def _append_passages_for_updates(
             offset_map[passage_id] = offset
             assigned_ids.append(passage_id)
 
-    with open(offsets_file, "wb") as f:
-        pickle.dump(offset_map, f)
+    save_passage_offsets(offsets_file, offset_map)
 
     try:
         with open(meta_path, encoding="utf-8") as f:
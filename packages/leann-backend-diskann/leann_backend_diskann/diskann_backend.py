@@ -18,6 +18,9 @@ from leann.searcher_base import BaseSearcher
 
 logger = logging.getLogger(__name__)
 
+# Recorded node visits are written to the profile file every this many queries
+PROFILE_FLUSH_QUERIES = 1024
+
 
 @contextlib.contextmanager
 def suppress_cpp_output_if_needed():
@@ -280,6 +283,7 @@ class DiskannBuilder(LeannBackendBuilderInterface):
                     index_prefix_path=absolute_index_prefix_path,
                     output_dir=str(absolute_index_dir),
                     partition_prefix=index_prefix,
+                    thread_nums=build_kwargs.get("num_threads", 8),
                 )
 
                 # Safe cleanup: In partition mode, C++ doesn't read _disk.index content
@@ -316,8 +320,7 @@ class DiskannSearcher(BaseSearcher):
 
             self.num_threads = kwargs.get("num_threads", 8)
 
-            # For DiskANN, we need to reinitialize the index when zmq_port changes
-            # Store the initialization parameters for later use
+            # The index is loaded lazily on the first search, once the zmq_port is known
             # Note: C++ load method expects the BASE path (without _disk.index suffix)
             # C++ internally constructs: index_prefix + "_disk.index"
             index_name = self.index_path.stem  # "simple_test.leann" -> "simple_test"
@@ -355,31 +358,115 @@ class DiskannSearcher(BaseSearcher):
                     f"✅ Detected partition files, using partition_prefix='{partition_prefix}'"
                 )
             self._diskannpy = diskannpy
-            self._current_zmq_port = None
+            self._current_zmq_port: Optional[int] = None
             self._index = None
+            # Number of times the index was read from disk, for diagnostics
+            self.index_loads = 0
+
+            # Warm the node cache with the nodes real queries visit most (see node_profile)
+            from .node_profile import NodeAccessProfile, profile_path, warmup_profile_path
+
+            self._hot_nodes: Optional[np.ndarray] = None
+            cache_budget_mb = kwargs.get("cache_budget_mb", 0.0)
+            warmup_profile = warmup_profile_path(self.index_path)
+            if cache_budget_mb and warmup_profile is not None:
+                self._plan_cache_warmup(diskann_index_prefix, cache_budget_mb, warmup_profile)
+            # Returned labels, not expanded nodes: kept apart from the replay profile
+            self._profile_file = profile_path(self.index_path, results=True)
+            self._node_profile: Optional[NodeAccessProfile] = None
+            if kwargs.get("record_node_profile", False):
+                self._node_profile = (
+                    NodeAccessProfile.load(self._profile_file)
+                    if self._profile_file.exists()
+                    else NodeAccessProfile()
+                )
+                self._profile_flushed_at = self._node_profile.queries
             logger.debug("DiskANN searcher initialized (index will be loaded on first search)")
 
+    def _plan_cache_warmup(self, index_prefix: str, budget_mb: float, profile_file: Path) -> None:
+        """Size the node cache to ``budget_mb`` and pick its nodes from the query profile."""
+        from .graph_partition import read_disk_index_layout
+        from .node_profile import NodeAccessProfile, cache_capacity
+
+        for disk_file in (f"{index_prefix}_disk.index", f"{index_prefix}_disk_graph.index"):
+            if os.path.exists(disk_file):
+                node_bytes = read_disk_index_layout(disk_file).max_node_len
+                break
+        else:
+            logger.warning("No disk index found to size the node cache, skipping warmup")
+            return
+
+        profile = NodeAccessProfile.load(profile_file)
+        self._hot_nodes = profile.hottest(cache_capacity(budget_mb, node_bytes))
+        self._init_params["num_nodes_to_cache"] = len(self._hot_nodes)
+        if hasattr(self._diskannpy.StaticDiskFloatIndex, "load_cache_list"):
+            # Ready the cache without sample queries; it is filled from the profile on load
+            self._init_params["cache_mechanism"] = 2
+        else:
+            logger.info(
+                "This DiskANN extension cannot load a cache list; the profile only sizes "
+                "the sample-based node cache"
+            )
+        logger.info(
+            f"Caching {len(self._hot_nodes)} hottest nodes ({budget_mb} MB), covering "
+            f"{profile.coverage(len(self._hot_nodes)):.1%} of visits in {profile_file.name}"
+        )
+
+    def _record_node_profile(self, labels, num_queries: int) -> None:
+        self._node_profile.record(np.asarray(labels, dtype=np.int64), queries=num_queries)
+        if self._node_profile.queries - self._profile_flushed_at >= PROFILE_FLUSH_QUERIES:
+            self.flush_node_profile()
+
+    def flush_node_profile(self) -> None:
+        """Write the visits recorded by ``record_node_profile=True`` to the profile file."""
+        if self._node_profile is None:
+            return
+        self._node_profile.save(self._profile_file)
+        self._profile_flushed_at = self._node_profile.queries
+
     def _ensure_index_loaded(self, zmq_port: int):
-        """Ensure the index is loaded with the correct zmq_port."""
-        if self._index is None or self._current_zmq_port != zmq_port:
-            # Need to (re)load the index with the correct zmq_port
-            with suppress_cpp_output_if_needed():
-                if self._index is not None:
-                    logger.debug(f"Reloading DiskANN index with new zmq_port: {zmq_port}")
-                else:
-                    logger.debug(f"Loading DiskANN index with zmq_port: {zmq_port}")
-
-                self._index = self._diskannpy.StaticDiskFloatIndex(
-                    self._init_params["metric_enum"],
-                    self._init_params["full_index_prefix"],
-                    self._init_params["num_threads"],
-                    self._init_params["num_nodes_to_cache"],
-                    self._init_params["cache_mechanism"],
-                    zmq_port,
-                    self._init_params["pq_prefix"],
-                    self._init_params["partition_prefix"],
-                )
+        """Load the index once and point it at the embedding server on ``zmq_port``.
+
+        Loading reads the PQ tables and disk index headers and rebuilds the node cache,
+        so a loaded index only follows a new port through ``set_zmq_port``. It is
+        reloaded only when the extension cannot change the port of a loaded index.
+        """
+        if self._index is not None:
+            if zmq_port == self._current_zmq_port:
+                return
+            if hasattr(self._index, "set_zmq_port"):
+                logger.debug(f"Pointing loaded DiskANN index at zmq_port: {zmq_port}")
+                self._index.set_zmq_port(zmq_port)
                 self._current_zmq_port = zmq_port
+                return
+            logger.warning(
+                f"Reloading DiskANN index to switch zmq_port {self._current_zmq_port} -> "
+                f"{zmq_port}; this extension cannot change the port of a loaded index"
+            )
+
+        with suppress_cpp_output_if_needed():
+            logger.debug(f"Loading DiskANN index with zmq_port: {zmq_port}")
+            self._index = self._diskannpy.StaticDiskFloatIndex(
+                self._init_params["metric_enum"],
+                self._init_params["full_index_prefix"],
+                self._init_params["num_threads"],
+                self._init_params["num_nodes_to_cache"],
+                self._init_params["cache_mechanism"],
+                zmq_port,
+                self._init_params["pq_prefix"],
+                self._init_params["partition_prefix"],
+            )
+            if self._hot_nodes is not None and self._init_params["cache_mechanism"] == 2:
+                self._index.load_cache_list(self._hot_nodes.tolist())
+        self._current_zmq_port = zmq_port
+        self.index_loads += 1
+
+    def _ensure_server_running(self, passages_source_file: str, port: int, **kwargs) -> int:
+        # An index that cannot follow a new port keeps talking to the port it was loaded
+        # with, so a restarted embedding server asks for that port first
+        if self._index is not None and not hasattr(self._index, "set_zmq_port"):
+            port = self._current_zmq_port
+        return super()._ensure_server_running(passages_source_file, port, **kwargs)
 
     def search(
         self,
@@ -417,7 +504,7 @@ class DiskannSearcher(BaseSearcher):
         Returns:
             Dict with 'labels' (list of lists) and 'distances' (ndarray)
         """
-        # Handle zmq_port compatibility: Ensure index is loaded with correct port
+        # Load the index once; later searches only move it to the current server port
         if recompute_embeddings:
             if zmq_port is None:
                 raise ValueError("zmq_port must be provided if recompute_embeddings is True")
@@ -467,6 +554,14 @@ class DiskannSearcher(BaseSearcher):
                 use_global_pruning,
             )
 
+        if self._node_profile is not None:
+            self._record_node_profile(labels, query.shape[0])
+
         string_labels = [[str(int_label) for int_label in batch_labels] for batch_labels in labels]
 
         return {"labels": string_labels, "distances": distances}
+
+    def __del__(self):
+        if getattr(self, "_node_profile", None) is not None:
+            self.flush_node_profile()
+        super().__del__()
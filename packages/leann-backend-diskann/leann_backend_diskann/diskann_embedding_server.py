@@ -48,10 +48,14 @@ def create_diskann_embedding_server(
     model_name: str = "sentence-transformers/all-mpnet-base-v2",
     embedding_mode: str = "sentence-transformers",
     distance_metric: str = "l2",
+    metrics_file: Optional[str] = None,
 ):
     """
     Create and start a ZMQ-based embedding server for DiskANN backend.
     Uses ROUTER socket and protobuf communication as required by DiskANN C++ implementation.
+
+    Counters are answered to a msgpack ``["__STATS__"]`` request and, with
+    ``metrics_file``, written there in the Prometheus text format.
     """
     logger.info(f"Starting DiskANN server on port {zmq_port} with model {model_name}")
     logger.info(f"Using embedding mode: {embedding_mode}")
@@ -64,6 +68,7 @@ def create_diskann_embedding_server(
     try:
         from leann.api import PassageManager
         from leann.embedding_compute import compute_embeddings
+        from leann.metrics import STATS_MESSAGE, EmbeddingServerMetrics
 
         logger.info("Successfully imported unified embedding computation module")
     except ImportError as e:
@@ -102,6 +107,8 @@ def create_diskann_embedding_server(
         logger.error(f"Failed to import protobuf module: {e}")
         return
 
+    metrics = EmbeddingServerMetrics("diskann", zmq_port, model_name, metrics_file)
+
     def zmq_server_thread():
         """ZMQ server thread using REP socket for universal compatibility"""
         context = zmq.Context()
@@ -241,6 +248,8 @@ def create_diskann_embedding_server(
         This creates its own REP socket, binds to zmq_port, and periodically
         checks shutdown_event using recv timeouts to exit cleanly.
         """
+        import msgpack
+
         logger.info("DiskANN ZMQ server thread started with shutdown support")
 
         context = zmq.Context()
@@ -253,6 +262,17 @@ def create_diskann_embedding_server(
         rep_socket.setsockopt(zmq.SNDTIMEO, 1000)
         rep_socket.setsockopt(zmq.LINGER, 0)
 
+        # Matched on the raw bytes, before protobuf parsing can misread it
+        stats_request = msgpack.packb([STATS_MESSAGE])
+
+        def _finish_request(kind: str, seconds: float) -> None:
+            metrics.in_flight = 0
+            metrics.record_request(kind, seconds)
+            # A request already waiting once this reply is out had to queue behind it
+            if rep_socket.getsockopt(zmq.EVENTS) & zmq.POLLIN:
+                metrics.count("queued_requests")
+            metrics.write_prometheus()
+
         try:
             while not shutdown_event.is_set():
                 try:
@@ -266,9 +286,16 @@ def create_diskann_embedding_server(
                         rep_socket.send(b"")
                         continue
 
+                    if message == stats_request:
+                        metrics.record_request("stats", time.time() - e2e_start)
+                        rep_socket.send(msgpack.packb(metrics.snapshot()))
+                        continue
+
+                    metrics.in_flight = 1
                     # Try protobuf first (same logic as original)
                     texts = []
                     is_text_request = False
+                    lookup_start = time.time()
 
                     try:
                         req_proto = embedding_pb2.NodeEmbeddingRequest()
@@ -284,14 +311,13 @@ def create_diskann_embedding_server(
                                     raise RuntimeError(f"FATAL: Empty text for passage ID {nid}")
                                 texts.append(txt)
                             except KeyError:
+                                metrics.count("passages_missing")
                                 raise RuntimeError(f"FATAL: Passage with ID {nid} not found")
 
                         logger.info(f"ZMQ received protobuf request for {len(node_ids)} node IDs")
                     except Exception:
                         # Fallback to msgpack for text requests
                         try:
-                            import msgpack
-
                             request = msgpack.unpackb(message)
                             if isinstance(request, list) and all(
                                 isinstance(item, str) for item in request
@@ -308,15 +334,22 @@ def create_diskann_embedding_server(
                             # Send error response
                             resp_proto = embedding_pb2.NodeEmbeddingResponse()
                             rep_socket.send(resp_proto.SerializeToString())
+                            metrics.count("errors")
+                            metrics.count("fallback_responses")
+                            _finish_request("invalid", time.time() - e2e_start)
                             continue
+                    kind = "text" if is_text_request else "embedding"
+                    lookup_time = 0.0 if is_text_request else time.time() - lookup_start
 
                     # Process the request
+                    model_start = time.time()
                     embeddings = compute_embeddings(
                         texts,
                         model_name,
                         mode=embedding_mode,
                         provider_options=PROVIDER_OPTIONS,
                     )
+                    metrics.record_embedding(len(texts), lookup_time, time.time() - model_start)
                     logger.info(f"Computed embeddings shape: {embeddings.shape}")
 
                     # Validation
@@ -324,20 +357,18 @@ def create_diskann_embedding_server(
                         logger.error("NaN or Inf detected in embeddings!")
                         # Send error response
                         if is_text_request:
-                            import msgpack
-
                             response_data = msgpack.packb([])
                         else:
                             resp_proto = embedding_pb2.NodeEmbeddingResponse()
                             response_data = resp_proto.SerializeToString()
                         rep_socket.send(response_data)
+                        metrics.count("fallback_responses")
+                        _finish_request(kind, time.time() - e2e_start)
                         continue
 
                     # Prepare response based on request type
                     if is_text_request:
                         # For direct text requests, return msgpack
-                        import msgpack
-
                         response_data = msgpack.packb(embeddings.tolist())
                     else:
                         # For protobuf requests, return protobuf
@@ -355,6 +386,7 @@ def create_diskann_embedding_server(
 
                     e2e_end = time.time()
                     logger.info(f"⏱️  ZMQ E2E time: {e2e_end - e2e_start:.6f}s")
+                    _finish_request(kind, e2e_end - e2e_start)
 
                 except zmq.Again:
                     # Timeout - check shutdown_event and continue
@@ -362,16 +394,20 @@ def create_diskann_embedding_server(
                 except Exception as e:
                     if not shutdown_event.is_set():
                         logger.error(f"Error in ZMQ server loop: {e}")
+                        metrics.count("errors")
+                        metrics.in_flight = 0
                         try:
                             # Send error response for REP socket
                             resp_proto = embedding_pb2.NodeEmbeddingResponse()
                             rep_socket.send(resp_proto.SerializeToString())
+                            metrics.count("fallback_responses")
                         except Exception:
                             pass
                     else:
                         logger.info("Shutdown in progress, ignoring ZMQ error")
                         break
         finally:
+            metrics.write_prometheus(force=True)
             try:
                 rep_socket.close(0)
             except Exception:
@@ -479,6 +515,12 @@ if __name__ == "__main__":
         choices=["l2", "mips", "cosine"],
         help="Distance metric for similarity computation",
     )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default=os.getenv("LEANN_METRICS_FILE"),
+        help="Write Prometheus metrics to this file; '{port}' is replaced by the ZMQ port",
+    )
 
     args = parser.parse_args()
 
@@ -489,4 +531,5 @@ if __name__ == "__main__":
         model_name=args.model_name,
         embedding_mode=args.embedding_mode,
         distance_metric=args.distance_metric,
+        metrics_file=args.metrics_file,
     )
@@ -2,17 +2,366 @@
 """
 Graph Partition Module for LEANN DiskANN Backend
 
-This module provides Python bindings for the graph partition functionality
-of DiskANN, allowing users to partition disk-based indices for better
-performance.
+This module partitions disk-based DiskANN indices for better performance: nodes
+that are connected in the graph are packed into the same 4 KB sector, so one
+sector read serves several hops of a beam search.
+
+Graphs of up to ``IN_PROCESS_MAX_NODES`` nodes are partitioned in-process with
+NumPy: the disk index is memory-mapped and streamed in chunks, and no
+intermediate files are written. Larger graphs go to the original
+``partitioner``/``index_relayout`` executables from
+``third_party/DiskANN/graph_partition``, whose memory use does not grow with the
+in-memory adjacency arrays. ``use_executables=True``/``False`` forces either path.
+
+Both paths produce the same two files:
+
+* ``<prefix>_partition.bin``: ``uint64`` sector capacity, partition count and
+  node count, then per partition a ``uint32`` size followed by its node ids,
+  then one ``uint32`` partition (sector) id per node.
+* ``<prefix>_disk_graph.index``: the metadata sector of the original index
+  followed by one sector per partition holding its node records.
 """
 
+import logging
 import os
 import shutil
+import struct
 import subprocess
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SECTOR_LEN = 4096
+# Bytes per coordinate for the DiskANN data types
+DATA_TYPE_SIZES = {"float": 4, "int8": 1, "uint8": 1}
+# Nodes read (or sectors written) per step of the in-process path
+PARTITION_CHUNK_NODES = 1 << 16
+# Largest graph partitioned in-process by default; the NumPy path keeps the adjacency
+# and its undirected copy in memory (roughly 0.5 GB at this size and degree 32)
+IN_PROCESS_MAX_NODES = 1_000_000
+
+
+@dataclass
+class DiskIndexLayout:
+    """Geometry of a DiskANN ``_disk.index`` file, read from its metadata sector."""
+
+    num_nodes: int
+    dims: int
+    medoid: int
+    max_node_len: int
+    nnodes_per_sector: int
+    coord_bytes: int
+
+    @property
+    def max_degree(self) -> int:
+        return (self.max_node_len - self.coord_bytes - 4) // 4
+
+    @property
+    def num_sectors(self) -> int:
+        return -(-self.num_nodes // self.nnodes_per_sector)
+
+
+def read_disk_index_layout(index_file: str, data_type: str = "float") -> DiskIndexLayout:
+    """Parse the metadata sector of a DiskANN disk index.
+
+    The sector starts with ``int32`` count and ``int32`` 1, followed by ``count``
+    ``uint64`` values: node count, dimensions, medoid, max node length and nodes
+    per sector (and further fields that are not needed here).
+    """
+    if data_type not in DATA_TYPE_SIZES:
+        raise ValueError(f"Unsupported data_type '{data_type}'. Use one of {list(DATA_TYPE_SIZES)}")
+    with open(index_file, "rb") as f:
+        header = f.read(SECTOR_LEN)
+    if len(header) < 8:
+        raise ValueError(f"{index_file} is too small to be a DiskANN disk index")
+    count, _ = struct.unpack_from("<ii", header, 0)
+    if count < 5:
+        raise ValueError(f"Unexpected DiskANN metadata size {count} in {index_file}")
+    num_nodes, dims, medoid, max_node_len, nnodes_per_sector = struct.unpack_from("<5Q", header, 8)
+    layout = DiskIndexLayout(
+        num_nodes=num_nodes,
+        dims=dims,
+        medoid=medoid,
+        max_node_len=max_node_len,
+        nnodes_per_sector=nnodes_per_sector,
+        coord_bytes=dims * DATA_TYPE_SIZES[data_type],
+    )
+    if nnodes_per_sector == 0:
+        raise ValueError("Nodes larger than one sector cannot be partitioned by sector")
+    if layout.max_degree < 0:
+        raise ValueError(
+            f"max_node_len={max_node_len} is smaller than {dims} coordinates of type {data_type}"
+        )
+    return layout
+
+
+def _node_records(
+    index_file: str, layout: DiskIndexLayout, num_sectors: Optional[int] = None
+) -> np.ndarray:
+    """Memory-mapped ``(sectors, nodes_per_sector, max_node_len)`` view of all node records.
+
+    ``num_sectors`` defaults to the id-ordered layout; a relaid-out graph has one
+    sector per partition instead.
+    """
+    if num_sectors is None:
+        num_sectors = layout.num_sectors
+    size = SECTOR_LEN * (1 + num_sectors)
+    if os.path.getsize(index_file) < size:
+        raise ValueError(f"{index_file} is shorter than its metadata implies ({size} bytes)")
+    data = np.memmap(
+        index_file, dtype=np.uint8, mode="r", offset=SECTOR_LEN, shape=(size - SECTOR_LEN,)
+    )
+    sectors = data.reshape(num_sectors, SECTOR_LEN)
+    used = layout.nnodes_per_sector * layout.max_node_len
+    return sectors[:, :used].reshape(num_sectors, layout.nnodes_per_sector, layout.max_node_len)
+
+
+def _gather_records(records: np.ndarray, layout: DiskIndexLayout, ids: np.ndarray) -> np.ndarray:
+    return records[ids // layout.nnodes_per_sector, ids % layout.nnodes_per_sector]
+
+
+def read_disk_graph(
+    index_file: str,
+    data_type: str = "float",
+    num_threads: int = 1,
+    chunk_nodes: int = PARTITION_CHUNK_NODES,
+) -> tuple[DiskIndexLayout, np.ndarray, np.ndarray]:
+    """Read the adjacency lists of a disk index as CSR arrays.
+
+    Returns:
+        Tuple of (layout, indptr, indices), with ``indices[indptr[i]:indptr[i + 1]]``
+        the neighbors of node ``i``.
+    """
+    layout = read_disk_index_layout(index_file, data_type)
+    records = _node_records(index_file, layout)
+    degree_at = layout.coord_bytes
+    max_degree = layout.max_degree
+
+    def read_chunk(start: int) -> tuple[np.ndarray, np.ndarray]:
+        ids = np.arange(start, min(start + chunk_nodes, layout.num_nodes))
+        rows = _gather_records(records, layout, ids)
+        degrees = np.ascontiguousarray(rows[:, degree_at : degree_at + 4]).view("<u4").ravel()
+        degrees = np.minimum(degrees, max_degree).astype(np.int64)
+        nbrs = np.ascontiguousarray(rows[:, degree_at + 4 : degree_at + 4 + 4 * max_degree])
+        nbrs = nbrs.view("<u4").reshape(len(ids), max_degree)
+        return degrees, nbrs[np.arange(max_degree) < degrees[:, None]]
+
+    with ThreadPoolExecutor(max_workers=max(1, num_threads)) as executor:
+        chunks = list(executor.map(read_chunk, range(0, layout.num_nodes, chunk_nodes)))
+    degrees = np.concatenate([c[0] for c in chunks]) if chunks else np.zeros(0, np.int64)
+    indices = np.concatenate([c[1] for c in chunks]) if chunks else np.zeros(0, np.uint32)
+    indptr = np.zeros(layout.num_nodes + 1, dtype=np.int64)
+    np.cumsum(degrees, out=indptr[1:])
+    if len(indices) and int(indices.max()) >= layout.num_nodes:
+        raise ValueError(f"{index_file} has neighbor ids beyond its {layout.num_nodes} nodes")
+    return layout, indptr, indices.astype(np.int64)
+
+
+def _bfs_order(indptr: np.ndarray, indices: np.ndarray, start: int) -> np.ndarray:
+    """Level-synchronous BFS order over out-edges; unreachable nodes follow in id order."""
+    n = len(indptr) - 1
+    degree = np.diff(indptr)
+    order = np.empty(n, dtype=np.int64)
+    visited = np.zeros(n, dtype=bool)
+    filled = 0
+    next_seed = 0
+    seed = start if 0 <= start < n else 0
+    while filled < n:
+        if visited[seed]:
+            while visited[next_seed]:
+                next_seed += 1
+            seed = next_seed
+        frontier = np.array([seed], dtype=np.int64)
+        visited[seed] = True
+        order[filled] = seed
+        filled += 1
+        while len(frontier):
+            lengths = degree[frontier]
+            first = np.cumsum(lengths) - lengths
+            slots = np.arange(int(lengths.sum())) + np.repeat(indptr[frontier] - first, lengths)
+            children = indices[slots]
+            children = children[~visited[children]]
+            children, pos = np.unique(children, return_index=True)
+            frontier = children[np.argsort(pos, kind="stable")]
+            visited[frontier] = True
+            order[filled : filled + len(frontier)] = frontier
+            filled += len(frontier)
+    return order
+
+
+def _undirected_edges(indptr: np.ndarray, indices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    src = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    keep = src != indices
+    src, dst = src[keep], indices[keep]
+    return np.concatenate([src, dst]), np.concatenate([dst, src])
+
+
+def partition_quality(
+    indptr: np.ndarray, indices: np.ndarray, assignment: np.ndarray, capacity: int
+) -> dict[str, float]:
+    """Quality of a node -> sector assignment.
+
+    ``edge_locality`` is the fraction of edges whose endpoints share a sector and
+    ``sectors_per_expansion`` the mean number of distinct sectors holding the
+    neighbors of a node, i.e. the sector reads needed to expand it.
+    """
+    num_partitions = int(assignment.max()) + 1 if len(assignment) else 0
+    src = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    same = assignment[src] == assignment[indices]
+    distinct = np.unique(src * num_partitions + assignment[indices])
+    sectors = np.bincount(distinct // max(num_partitions, 1), minlength=len(assignment))
+    has_edges = np.diff(indptr) > 0
+    return {
+        "partitions": num_partitions,
+        "capacity": capacity,
+        "fill": len(assignment) / max(num_partitions * capacity, 1),
+        "edge_locality": float(same.mean()) if len(same) else 0.0,
+        "sectors_per_expansion": float(sectors[has_edges].mean()) if has_edges.any() else 0.0,
+    }
+
+
+def partition_nodes(
+    indptr: np.ndarray,
+    indices: np.ndarray,
+    capacity: int,
+    start: int = 0,
+    rounds: int = 10,
+) -> np.ndarray:
+    """Assign nodes to sectors of ``capacity`` nodes so that neighbors share sectors.
+
+    Nodes are first packed in BFS order from ``start``. Each of up to ``rounds``
+    refinement rounds then computes, for every node, the sector holding most of
+    its (undirected) neighbors and swaps pairs of nodes that want to move into
+    each other's sector. Swaps keep every sector within capacity. A round that
+    does not improve edge locality is undone and ends the refinement.
+
+    Returns:
+        Partition (sector) id of every node.
+    """
+    n = len(indptr) - 1
+    assignment = np.empty(n, dtype=np.int64)
+    assignment[_bfs_order(indptr, indices, start)] = np.arange(n) // capacity
+    if n == 0:
+        return assignment
+    num_partitions = int(assignment.max()) + 1
+    u, v = _undirected_edges(indptr, indices)
+
+    def locality(a: np.ndarray) -> float:
+        return float((a[u] == a[v]).mean()) if len(u) else 0.0
+
+    best = locality(assignment)
+    for _ in range(rounds):
+        keys, counts = np.unique(u * num_partitions + assignment[v], return_counts=True)
+        nodes, parts = keys // num_partitions, keys % num_partitions
+        own = np.zeros(n, dtype=np.int64)
+        is_own = parts == assignment[nodes]
+        own[nodes[is_own]] = counts[is_own]
+        # Most connected sector per node: sort by node, then by count descending
+        by_count = np.lexsort((-counts, nodes))
+        first = by_count[np.r_[True, nodes[by_count][1:] != nodes[by_count][:-1]]]
+        cand_nodes, cand_parts = nodes[first], parts[first]
+        gain = counts[first] - own[cand_nodes]
+        wants = (gain > 0) & (cand_parts != assignment[cand_nodes])
+        cand_nodes, cand_parts, gain = cand_nodes[wants], cand_parts[wants], gain[wants]
+        if not len(cand_nodes):
+            break
+
+        # Pair moves A -> B with moves B -> A, best gains first
+        src_parts = assignment[cand_nodes]
+        group = src_parts * num_partitions + cand_parts
+        order = np.lexsort((-gain, group))
+        group, cand_nodes, cand_parts = group[order], cand_nodes[order], cand_parts[order]
+        group_keys, group_start, group_size = np.unique(
+            group, return_index=True, return_counts=True
+        )
+        rank = np.arange(len(group)) - np.repeat(group_start, group_size)
+        reverse = (group_keys % num_partitions) * num_partitions + group_keys // num_partitions
+        pos = np.clip(np.searchsorted(group_keys, reverse), 0, len(group_keys) - 1)
+        reverse_size = np.where(group_keys[pos] == reverse, group_size[pos], 0)
+        allowed = np.repeat(np.minimum(group_size, reverse_size), group_size)
+        move = rank < allowed
+        if not move.any():
+            break
+
+        trial = assignment.copy()
+        trial[cand_nodes[move]] = cand_parts[move]
+        score = locality(trial)
+        if score <= best:
+            break
+        assignment, best = trial, score
+    return assignment
+
+
+def write_partition_file(path: str, assignment: np.ndarray, capacity: int) -> np.ndarray:
+    """Write ``_partition.bin`` and return the node ids grouped by partition."""
+    num_partitions = int(assignment.max()) + 1 if len(assignment) else 0
+    grouped = np.argsort(assignment, kind="stable")
+    sizes = np.bincount(assignment, minlength=num_partitions)
+    with open(path, "wb") as f:
+        f.write(struct.pack("<QQQ", capacity, num_partitions, len(assignment)))
+        start = 0
+        for size in sizes.tolist():
+            f.write(struct.pack("<I", size))
+            f.write(grouped[start : start + size].astype("<u4").tobytes())
+            start += size
+        f.write(assignment.astype("<u4").tobytes())
+    return grouped
+
+
+def read_partition_file(path: str) -> tuple[int, list[np.ndarray], np.ndarray]:
+    """Read ``_partition.bin`` as (capacity, node ids per partition, partition per node)."""
+    with open(path, "rb") as f:
+        capacity, num_partitions, num_nodes = struct.unpack("<QQQ", f.read(24))
+        layout = []
+        for _ in range(num_partitions):
+            (size,) = struct.unpack("<I", f.read(4))
+            layout.append(np.frombuffer(f.read(4 * size), dtype="<u4"))
+        id2page = np.frombuffer(f.read(4 * num_nodes), dtype="<u4")
+    return capacity, layout, id2page
+
+
+def relayout_disk_graph(
+    index_file: str,
+    output_file: str,
+    layout: DiskIndexLayout,
+    assignment: np.ndarray,
+    grouped: np.ndarray,
+    num_threads: int = 1,
+    chunk_sectors: int = PARTITION_CHUNK_NODES // 8,
+) -> None:
+    """Write ``output_file`` with partition ``p`` in sector ``p + 1``."""
+    records = _node_records(index_file, layout)
+    num_partitions = int(assignment.max()) + 1 if len(assignment) else 0
+    sizes = np.bincount(assignment, minlength=num_partitions)
+    part_start = np.concatenate(([0], np.cumsum(sizes)))
+    mnl = layout.max_node_len
+
+    def build_sectors(first: int) -> bytes:
+        last = min(first + chunk_sectors, num_partitions)
+        buf = np.zeros((last - first, SECTOR_LEN), dtype=np.uint8)
+        nodes = grouped[part_start[first] : part_start[last]]
+        parts = assignment[nodes]
+        slot = np.arange(len(nodes)) - (part_start[parts] - part_start[first])
+        rows = _gather_records(records, layout, nodes)
+        slots = buf[:, : layout.nnodes_per_sector * mnl].reshape(
+            last - first, layout.nnodes_per_sector, mnl
+        )
+        slots[parts - first, slot] = rows
+        return buf.tobytes()
+
+    with open(index_file, "rb") as f:
+        metadata = f.read(SECTOR_LEN)
+    with open(output_file, "wb") as out, ThreadPoolExecutor(max_workers=max(1, num_threads)) as ex:
+        out.write(metadata.ljust(SECTOR_LEN, b"\0"))
+        for block in ex.map(build_sectors, range(0, num_partitions, chunk_sectors)):
+            out.write(block)
 
 
 class GraphPartitioner:
@@ -23,15 +372,21 @@ class GraphPartitioner:
     search performance and memory efficiency.
     """
 
-    def __init__(self, build_type: str = "release"):
+    def __init__(self, build_type: str = "release", use_executables: Optional[bool] = None):
         """
         Initialize the GraphPartitioner.
 
         Args:
             build_type: Build type for the executables ("debug" or "release")
+            use_executables: Run the external partitioner/relayout executables (True)
+                or the in-process implementation (False). ``None`` picks by graph size:
+                in-process up to ``IN_PROCESS_MAX_NODES`` nodes, executables above.
         """
         self.build_type = build_type
-        self._ensure_executables()
+        self.use_executables = use_executables
+        self.last_metrics: Optional[dict[str, Any]] = None
+        if use_executables:
+            self._ensure_executables()
 
     def _get_executable_path(self, name: str) -> str:
         """Get the path to a graph partition executable."""
@@ -101,10 +456,10 @@ class GraphPartitioner:
             output_dir: Output directory for results (defaults to parent of index_prefix_path)
             partition_prefix: Prefix for output files (defaults to basename of index_prefix_path)
             **kwargs: Additional parameters for graph partitioning:
-                - gp_times: Number of LDG partition iterations (default: 10)
-                - lock_nums: Number of lock nodes (default: 10)
-                - cut: Cut adjacency list degree (default: 100)
-                - scale_factor: Scale factor (default: 1)
+                - gp_times: Number of partition refinement iterations (default: 10)
+                - lock_nums: Number of lock nodes (default: 10, executables only)
+                - cut: Cut adjacency list degree (default: 100, executables only)
+                - scale_factor: Scale factor (default: 1, executables only)
                 - data_type: Data type (default: "float")
                 - thread_nums: Number of threads (default: 10)
 
@@ -136,6 +491,97 @@ class GraphPartitioner:
         if partition_prefix is None:
             partition_prefix = Path(index_prefix_path).name
 
+        # Find input index file
+        old_index_file = f"{index_prefix_path}_disk_beam_search.index"
+        if not os.path.exists(old_index_file):
+            old_index_file = f"{index_prefix_path}_disk.index"
+
+        if not os.path.exists(old_index_file):
+            raise RuntimeError(f"Index file not found: {old_index_file}")
+
+        disk_graph_path = Path(output_dir) / f"{partition_prefix}_disk_graph.index"
+        partition_bin_path = Path(output_dir) / f"{partition_prefix}_partition.bin"
+
+        if self._use_executables_for(old_index_file, params["data_type"]):
+            self._partition_with_executables(
+                old_index_file, disk_graph_path, partition_bin_path, params
+            )
+        else:
+            self.last_metrics = self._partition_in_process(
+                old_index_file, disk_graph_path, partition_bin_path, params
+            )
+        return str(disk_graph_path), str(partition_bin_path)
+
+    def _use_executables_for(self, index_file: str, data_type: str) -> bool:
+        """Resolve ``use_executables=None`` from the node count in the index header."""
+        if self.use_executables is not None:
+            return self.use_executables
+        num_nodes = read_disk_index_layout(index_file, data_type).num_nodes
+        if num_nodes <= IN_PROCESS_MAX_NODES:
+            return False
+        try:
+            self._ensure_executables()
+        except RuntimeError as e:
+            logger.warning(
+                f"Graph has {num_nodes} nodes (> {IN_PROCESS_MAX_NODES}) but the partition "
+                f"executables are unavailable ({e}); partitioning in-process instead"
+            )
+            return False
+        return True
+
+    def _partition_in_process(
+        self,
+        old_index_file: str,
+        disk_graph_path: Path,
+        partition_bin_path: Path,
+        params: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Partition with NumPy and return quality metrics of the default and new layouts."""
+        start_time = time.time()
+        threads = int(params["thread_nums"])
+        layout, indptr, indices = read_disk_graph(old_index_file, params["data_type"], threads)
+        read_time = time.time() - start_time
+
+        capacity = layout.nnodes_per_sector
+        baseline = partition_quality(
+            indptr, indices, np.arange(layout.num_nodes) // capacity, capacity
+        )
+        assignment = partition_nodes(
+            indptr, indices, capacity, start=layout.medoid, rounds=int(params["gp_times"])
+        )
+        partitioned = partition_quality(indptr, indices, assignment, capacity)
+        partition_time = time.time() - start_time - read_time
+
+        grouped = write_partition_file(str(partition_bin_path), assignment, capacity)
+        relayout_disk_graph(
+            old_index_file, str(disk_graph_path), layout, assignment, grouped, threads
+        )
+        metrics = {
+            "nodes": layout.num_nodes,
+            "edges": len(indices),
+            "baseline": baseline,
+            "partitioned": partitioned,
+            "read_seconds": read_time,
+            "partition_seconds": partition_time,
+            "total_seconds": time.time() - start_time,
+        }
+        logger.info(
+            f"Partitioned {layout.num_nodes} nodes into {partitioned['partitions']} sectors in "
+            f"{metrics['total_seconds']:.2f}s: edge locality "
+            f"{baseline['edge_locality']:.3f} -> {partitioned['edge_locality']:.3f}, "
+            f"sectors per expansion {baseline['sectors_per_expansion']:.2f} -> "
+            f"{partitioned['sectors_per_expansion']:.2f}"
+        )
+        return metrics
+
+    def _partition_with_executables(
+        self,
+        old_index_file: str,
+        disk_graph_path: Path,
+        partition_bin_path: Path,
+        params: dict[str, Any],
+    ) -> None:
+        """Run the external partitioner and index_relayout executables."""
         # Get executable paths
         partitioner_path = self._get_executable_path("partitioner")
         relayout_path = self._get_executable_path("index_relayout")
@@ -163,14 +609,6 @@ class GraphPartitioner:
                 )
                 graph_gp_path.mkdir(parents=True, exist_ok=True)
 
-                # Find input index file
-                old_index_file = f"{index_prefix_path}_disk_beam_search.index"
-                if not os.path.exists(old_index_file):
-                    old_index_file = f"{index_prefix_path}_disk.index"
-
-                if not os.path.exists(old_index_file):
-                    raise RuntimeError(f"Index file not found: {old_index_file}")
-
                 # Run partitioner
                 gp_file_path = graph_gp_path / "_part.bin"
                 partitioner_cmd = [
@@ -226,14 +664,10 @@ class GraphPartitioner:
                     )
 
                 # Copy results to output directory
-                disk_graph_path = Path(output_dir) / f"{partition_prefix}_disk_graph.index"
-                partition_bin_path = Path(output_dir) / f"{partition_prefix}_partition.bin"
-
                 shutil.copy2(part_tmp_index, disk_graph_path)
                 shutil.copy2(gp_file_path, partition_bin_path)
 
-                print(f"Results copied to: {output_dir}")
-                return str(disk_graph_path), str(partition_bin_path)
+                print(f"Results copied to: {disk_graph_path.parent}")
 
             finally:
                 os.chdir(original_dir)
@@ -251,13 +685,17 @@ class GraphPartitioner:
         if not os.path.exists(partition_bin_path):
             raise FileNotFoundError(f"Partition file not found: {partition_bin_path}")
 
-        # For now, return basic file information
-        # In the future, this could parse the binary file for detailed info
         stat = os.stat(partition_bin_path)
+        capacity, layout, id2page = read_partition_file(partition_bin_path)
+        sizes = np.array([len(p) for p in layout])
         return {
             "file_size": stat.st_size,
             "file_path": partition_bin_path,
             "modified_time": stat.st_mtime,
+            "capacity": capacity,
+            "partitions": len(layout),
+            "nodes": len(id2page),
+            "fill": float(sizes.sum() / max(len(layout) * capacity, 1)),
         }
 
 
@@ -266,6 +704,7 @@ def partition_graph(
     output_dir: Optional[str] = None,
     partition_prefix: Optional[str] = None,
     build_type: str = "release",
+    use_executables: Optional[bool] = None,
     **kwargs,
 ) -> tuple[str, str]:
     """
@@ -276,12 +715,14 @@ def partition_graph(
         output_dir: Output directory (defaults to parent of index_prefix_path)
         partition_prefix: Prefix for output files (defaults to basename of index_prefix_path)
         build_type: Build type for executables ("debug" or "release")
+        use_executables: Force the external executables (True) or the in-process path
+            (False); by default the path is picked by graph size
         **kwargs: Additional parameters for graph partitioning
 
     Returns:
         Tuple of (disk_graph_index_path, partition_bin_path)
     """
-    partitioner = GraphPartitioner(build_type=build_type)
+    partitioner = GraphPartitioner(build_type=build_type, use_executables=use_executables)
     return partitioner.partition_graph(index_prefix_path, output_dir, partition_prefix, **kwargs)
 
 
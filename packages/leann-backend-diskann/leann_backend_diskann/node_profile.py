@@ -0,0 +1,324 @@
+"""
+Node access profiles for warming the DiskANN node cache.
+
+DiskANN keeps a cache of whole node records (coordinates and adjacency list) in
+memory so that beam searches do not read those sectors from disk. By default the
+cache is seeded from sample data. Real query traffic is usually much more skewed
+than the sample data, so a profile records how often each node was visited by
+real queries and the searcher caches the hottest nodes within a memory budget.
+
+A profile holds the visited node ids and their visit counts as two ``uint32``
+arrays sorted by id, plus the number of queries recorded. Profiles come from two
+sources, which count different things and are therefore kept in separate files:
+
+* ``python -m leann_backend_diskann.node_profile build`` replays logged query
+  embeddings through a best-first search over the disk graph and counts every
+  node a search expands, in ``<name>.leann.node_profile.npz``.
+* ``DiskannSearcher(record_node_profile=True)`` counts the nodes returned by
+  every search, in ``<name>.leann.node_results.npz``. The native search does not
+  report the nodes it expands, so this is only a proxy for the expanded nodes.
+
+Cache warmup uses the replay profile when there is one, else the results profile.
+
+``python -m leann_backend_diskann.node_profile inspect`` reports how skewed a
+profile is and how much of the traffic a cache budget covers.
+"""
+
+import argparse
+import heapq
+import json
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from .graph_partition import _node_records, read_disk_index_layout, read_partition_file
+
+PROFILE_SUFFIX = ".node_profile.npz"
+RESULTS_PROFILE_SUFFIX = ".node_results.npz"
+# Recorded ids are folded into the histogram once this many are pending
+_PENDING_LIMIT = 1 << 16
+_COORD_DTYPES = {"float": "<f4", "int8": "i1", "uint8": "u1"}
+
+
+def profile_path(index_path: Union[str, Path], results: bool = False) -> Path:
+    """Replay profile of ``index_path`` (e.g. ``indexes/docs.leann``), or its results one."""
+    return Path(f"{index_path}{RESULTS_PROFILE_SUFFIX if results else PROFILE_SUFFIX}")
+
+
+def warmup_profile_path(index_path: Union[str, Path]) -> Optional[Path]:
+    """The profile cache warmup should use: the replay profile, else the results one."""
+    for path in (profile_path(index_path), profile_path(index_path, results=True)):
+        if path.exists():
+            return path
+    return None
+
+
+class NodeAccessProfile:
+    """Histogram of node visits, kept sparse so that it stays small for large graphs."""
+
+    def __init__(
+        self,
+        ids: Optional[np.ndarray] = None,
+        counts: Optional[np.ndarray] = None,
+        queries: int = 0,
+    ):
+        self._ids = np.zeros(0, dtype=np.uint32) if ids is None else ids.astype(np.uint32)
+        self._counts = np.zeros(0, dtype=np.uint64) if counts is None else counts.astype(np.uint64)
+        self._pending: list[np.ndarray] = []
+        self._pending_size = 0
+        self.queries = queries
+
+    def record(self, node_ids: np.ndarray, queries: int = 1) -> None:
+        """Count one visit of every id in ``node_ids``; negative ids are ignored."""
+        node_ids = np.asarray(node_ids, dtype=np.int64).ravel()
+        self._pending.append(node_ids[node_ids >= 0])
+        self._pending_size += len(node_ids)
+        self.queries += queries
+        if self._pending_size >= _PENDING_LIMIT:
+            self._fold()
+
+    def merge(self, other: "NodeAccessProfile") -> None:
+        """Add the visits recorded by ``other``."""
+        ids, counts = other.histogram()
+        self._fold(ids, counts)
+        self.queries += other.queries
+
+    def _fold(self, ids: Optional[np.ndarray] = None, counts: Optional[np.ndarray] = None):
+        parts, weights = [self._ids], [self._counts]
+        for pending in self._pending:
+            parts.append(pending)
+            weights.append(np.ones(len(pending), dtype=np.uint64))
+        if ids is not None:
+            parts.append(ids)
+            weights.append(counts.astype(np.uint64))
+        unique, inverse = np.unique(np.concatenate(parts).astype(np.int64), return_inverse=True)
+        self._ids = unique.astype(np.uint32)
+        self._counts = np.bincount(
+            inverse, weights=np.concatenate(weights), minlength=len(unique)
+        ).astype(np.uint64)
+        self._pending, self._pending_size = [], 0
+
+    def histogram(self) -> tuple[np.ndarray, np.ndarray]:
+        """Visited node ids (ascending) and their visit counts."""
+        if self._pending:
+            self._fold()
+        return self._ids, self._counts
+
+    def hottest(self, limit: Optional[int] = None) -> np.ndarray:
+        """Node ids by descending visit count (ties by id), at most ``limit`` of them."""
+        ids, counts = self.histogram()
+        order = np.lexsort((ids, -counts.astype(np.int64)))
+        return ids[order[:limit]]
+
+    def coverage(self, num_nodes: int) -> float:
+        """Fraction of all recorded visits that hit the ``num_nodes`` hottest nodes."""
+        _, counts = self.histogram()
+        total = counts.sum()
+        if total == 0:
+            return 0.0
+        top = np.sort(counts)[::-1][:num_nodes]
+        return float(top.sum() / total)
+
+    def summary(self, node_bytes: Optional[int] = None, budget_mb: float = 0.0) -> dict:
+        """Skew statistics of the profile, and the traffic a cache of ``budget_mb`` covers."""
+        ids, counts = self.histogram()
+        total = int(counts.sum())
+        ranked = np.sort(counts)[::-1].cumsum()
+        nodes_for = {
+            f"nodes_for_{int(share * 100)}pct": int(np.searchsorted(ranked, share * total) + 1)
+            for share in (0.5, 0.9, 0.99)
+            if total
+        }
+        result = {
+            "queries": self.queries,
+            "visits": total,
+            "unique_nodes": len(ids),
+            **nodes_for,
+        }
+        if node_bytes:
+            result["node_bytes"] = node_bytes
+            if budget_mb:
+                cached = cache_capacity(budget_mb, node_bytes)
+                result["budget_nodes"] = cached
+                result["budget_coverage"] = self.coverage(cached)
+        return result
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the profile atomically, so a concurrent load never sees a partial file."""
+        ids, counts = self.histogram()
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                ids=ids,
+                counts=np.minimum(counts, np.iinfo(np.uint32).max).astype(np.uint32),
+                queries=np.array(self.queries, dtype=np.int64),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "NodeAccessProfile":
+        with np.load(path) as data:
+            return cls(data["ids"], data["counts"], int(data["queries"]))
+
+
+def cache_capacity(budget_mb: float, node_bytes: int) -> int:
+    """Number of node records of ``node_bytes`` that fit in ``budget_mb`` megabytes."""
+    return max(int(budget_mb * (1 << 20)) // max(node_bytes, 1), 0)
+
+
+class DiskGraphReader:
+    """Random access to the node records of a DiskANN index, partitioned or not."""
+
+    def __init__(self, index_prefix: Union[str, Path], data_type: str = "float"):
+        prefix = str(index_prefix)
+        plain = Path(f"{prefix}_disk.index")
+        graph, partition = Path(f"{prefix}_disk_graph.index"), Path(f"{prefix}_partition.bin")
+        if plain.exists():
+            self.layout = read_disk_index_layout(str(plain), data_type)
+            self._records = _node_records(str(plain), self.layout)
+            ids = np.arange(self.layout.num_nodes)
+            self._sector = ids // self.layout.nnodes_per_sector
+            self._slot = ids % self.layout.nnodes_per_sector
+        elif graph.exists() and partition.exists():
+            self.layout = read_disk_index_layout(str(graph), data_type)
+            _, parts, id2page = read_partition_file(str(partition))
+            self._records = _node_records(str(graph), self.layout, len(parts))
+            grouped = np.concatenate(parts).astype(np.int64) if parts else np.zeros(0, np.int64)
+            sizes = np.array([len(p) for p in parts], dtype=np.int64)
+            self._sector = id2page.astype(np.int64)
+            self._slot = np.empty(len(id2page), dtype=np.int64)
+            self._slot[grouped] = np.arange(len(grouped)) - np.repeat(
+                np.cumsum(sizes) - sizes, sizes
+            )
+        else:
+            raise FileNotFoundError(f"No DiskANN disk index found for prefix {prefix}")
+        self._coord_dtype = np.dtype(_COORD_DTYPES[data_type])
+
+    @property
+    def medoid(self) -> int:
+        return self.layout.medoid
+
+    def _rows(self, ids: np.ndarray) -> np.ndarray:
+        return self._records[self._sector[ids], self._slot[ids]]
+
+    def coords(self, ids: np.ndarray) -> np.ndarray:
+        rows = np.ascontiguousarray(self._rows(ids)[:, : self.layout.coord_bytes])
+        return rows.view(self._coord_dtype).astype(np.float32)
+
+    def neighbors(self, node: int) -> np.ndarray:
+        row = self._rows(np.array([node]))[0]
+        at = self.layout.coord_bytes
+        count = min(int(row[at : at + 4].view("<u4")[0]), self.layout.max_degree)
+        return row[at + 4 : at + 4 + 4 * count].view("<u4").astype(np.int64)
+
+
+def _distances(vectors: np.ndarray, query: np.ndarray, metric: str) -> np.ndarray:
+    if metric == "l2":
+        return ((vectors - query) ** 2).sum(axis=1)
+    scores = vectors @ query
+    if metric == "cosine":
+        scores = scores / np.maximum(np.linalg.norm(vectors, axis=1), 1e-12)
+    return -scores
+
+
+def replay_queries(
+    reader: DiskGraphReader,
+    queries: np.ndarray,
+    metric: str = "mips",
+    complexity: int = 64,
+    profile: Optional[NodeAccessProfile] = None,
+) -> NodeAccessProfile:
+    """Record the nodes a best-first search with list size ``complexity`` expands per query."""
+    profile = profile if profile is not None else NodeAccessProfile()
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    for query in queries:
+        start = reader.medoid
+        seen = {start}
+        frontier = [(float(_distances(reader.coords(np.array([start])), query, metric)[0]), start)]
+        best: list[tuple[float, int]] = []  # max-heap of the closest `complexity` nodes
+        expanded = []
+        while frontier:
+            dist, node = heapq.heappop(frontier)
+            if len(best) >= complexity and dist > -best[0][0]:
+                break
+            expanded.append(node)
+            heapq.heappush(best, (-dist, node))
+            if len(best) > complexity:
+                heapq.heappop(best)
+            nbrs = [n for n in reader.neighbors(node).tolist() if n not in seen]
+            if nbrs:
+                seen.update(nbrs)
+                dists = _distances(reader.coords(np.array(nbrs)), query, metric)
+                for d, n in zip(dists.tolist(), nbrs):
+                    heapq.heappush(frontier, (d, n))
+        profile.record(np.array(expanded), queries=1)
+    return profile
+
+
+def _index_prefix(index_path: Path) -> Path:
+    return index_path.parent / index_path.name.removesuffix(".leann")
+
+
+def _node_bytes(index_path: Path) -> Optional[int]:
+    prefix = _index_prefix(index_path)
+    for name in (f"{prefix}_disk.index", f"{prefix}_disk_graph.index"):
+        if os.path.exists(name):
+            return read_disk_index_layout(name).max_node_len
+    return None
+
+
+def _metric(index_path: Path) -> str:
+    meta_file = Path(f"{index_path}.meta.json")
+    if meta_file.exists():
+        with open(meta_file, encoding="utf-8") as f:
+            backend_kwargs = json.load(f).get("backend_kwargs", {})
+        return backend_kwargs.get("distance_metric", "mips").lower()
+    return "mips"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build and inspect DiskANN node access profiles for cache warmup."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Replay logged query embeddings into the profile")
+    build.add_argument("index_path", help="Path of the .leann index (e.g. indexes/docs.leann)")
+    build.add_argument("--queries", required=True, help=".npy file of query embeddings (B, D)")
+    build.add_argument("--complexity", type=int, default=64, help="Search list size to replay")
+    build.add_argument("--metric", choices=["mips", "l2", "cosine"], help="Default: from meta")
+    build.add_argument("--replace", action="store_true", help="Discard the existing profile")
+    inspect = commands.add_parser("inspect", help="Summarize the profile of an index")
+    inspect.add_argument("index_path", help="Path of the .leann index (e.g. indexes/docs.leann)")
+    inspect.add_argument("--budget-mb", type=float, default=0.0, help="Cache budget to evaluate")
+    inspect.add_argument("--top", type=int, default=0, help="Also list the N hottest node ids")
+    inspect.add_argument(
+        "--results", action="store_true", help="Inspect the profile recorded from search results"
+    )
+    args = parser.parse_args()
+
+    index_path = Path(args.index_path)
+    path = profile_path(index_path, results=args.command == "inspect" and args.results)
+    if args.command == "build":
+        existing = path.exists() and not args.replace
+        result = NodeAccessProfile.load(path) if existing else NodeAccessProfile()
+        replay_queries(
+            DiskGraphReader(_index_prefix(index_path)),
+            np.load(args.queries),
+            metric=args.metric or _metric(index_path),
+            complexity=args.complexity,
+            profile=result,
+        )
+        result.save(path)
+        print(json.dumps({"profile": str(path), **result.summary(_node_bytes(index_path))}))
+    else:
+        if not path.exists():
+            parser.error(f"No profile at {path}")
+        result = NodeAccessProfile.load(path)
+        summary = result.summary(_node_bytes(index_path), args.budget_mb)
+        if args.top:
+            summary["hottest"] = result.hottest(args.top).tolist()
+        print(json.dumps(summary, indent=2))
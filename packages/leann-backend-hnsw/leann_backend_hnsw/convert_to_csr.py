@@ -1,12 +1,11 @@
 import argparse
-import gc  # Import garbage collector interface
 import logging
 import os
 import struct
 import sys
 import time
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
 import numpy as np
 
@@ -26,6 +25,11 @@ INDEX_HNSW_FLAT_FOURCC = int.from_bytes(b"IHNf", "little")
 EXPECTED_HNSW_FOURCCS = {INDEX_HNSW_FLAT_FOURCC}  # Modify if needed
 NULL_INDEX_FOURCC = int.from_bytes(b"null", "little")
 
+# Nodes converted per vectorized step; bounds the temporary arrays of a conversion
+CONVERT_CHUNK_NODES = 1 << 17
+# Largest single write when copying big (possibly memory-mapped) sections
+_WRITE_CHUNK_BYTES = 64 << 20
+
 # --- Helper functions for reading/writing binary data ---
 
 
@@ -116,23 +120,32 @@ def read_numpy_vector(f, np_dtype, struct_fmt_char):
 
 
 def write_numpy_vector(f, arr, struct_fmt_char):
-    """Writes a NumPy array as a vector (size followed by data)."""
+    """Writes a NumPy array as a vector (size followed by data).
+
+    The data is written in chunks so memory-mapped inputs are never copied whole.
+    """
     count = arr.size
     f.write(struct.pack("<Q", count))
-    try:
-        expected_dtype = np.dtype(struct_fmt_char)
-        if arr.dtype != expected_dtype:
-            data_to_write = arr.astype(expected_dtype).tobytes()
-        else:
-            data_to_write = arr.tobytes()
-        f.write(data_to_write)
-        del data_to_write  # Hint GC
-    except MemoryError as e:
-        print(
-            f"\nMemoryError converting NumPy array to bytes for writing (size={count}, dtype={arr.dtype}). {e}",
-            file=sys.stderr,
-        )
-        raise e
+    expected_dtype = np.dtype(struct_fmt_char)
+    flat = arr.reshape(-1)
+    chunk_elems = max(1, _WRITE_CHUNK_BYTES // expected_dtype.itemsize)
+    for start in range(0, count, chunk_elems):
+        chunk = flat[start : start + chunk_elems]
+        try:
+            f.write(np.ascontiguousarray(chunk, dtype=expected_dtype).tobytes())
+        except MemoryError as e:
+            print(
+                f"\nMemoryError converting NumPy array to bytes for writing (size={count}, dtype={arr.dtype}). {e}",
+                file=sys.stderr,
+            )
+            raise e
+
+
+def write_raw_bytes(f, data):
+    """Writes a bytes-like section (e.g. a memory-mapped storage tail) in chunks."""
+    view = memoryview(data).cast("B")
+    for start in range(0, len(view), _WRITE_CHUNK_BYTES):
+        f.write(view[start : start + _WRITE_CHUNK_BYTES])
 
 
 def write_list_vector(f, lst, struct_fmt_char):
@@ -181,20 +194,10 @@ def get_cum_neighbors(cum_nneighbor_per_level_np, level):
         return cum_nneighbor_per_level_np[-1] if len(cum_nneighbor_per_level_np) > 0 else 0
 
 
-def write_compact_format(
-    f_out,
-    original_hnsw_data,
-    assign_probas_np,
-    cum_nneighbor_per_level_np,
-    levels_np,
-    compact_level_ptr,
-    compact_node_offsets_np,
-    compact_neighbors_data,
-    storage_fourcc,
-    storage_data,
+def _write_index_header(
+    f_out, original_hnsw_data, assign_probas_np, cum_nneighbor_per_level_np, levels_np
 ):
-    """Write HNSW data in compact format following C++ read order exactly."""
-    # Write IndexHNSW Header
+    """Write the IndexHNSW header and the HNSW struct vectors shared by both layouts."""
     f_out.write(struct.pack("<I", original_hnsw_data["index_fourcc"]))
     f_out.write(struct.pack("<i", original_hnsw_data["d"]))
     f_out.write(struct.pack("<q", original_hnsw_data["ntotal"]))
@@ -210,6 +213,32 @@ def write_compact_format(
     write_numpy_vector(f_out, cum_nneighbor_per_level_np, "i")
     write_numpy_vector(f_out, levels_np, "i")
 
+
+def _write_scalar_params(f_out, original_hnsw_data):
+    f_out.write(struct.pack("<i", original_hnsw_data["entry_point"]))
+    f_out.write(struct.pack("<i", original_hnsw_data["max_level"]))
+    f_out.write(struct.pack("<i", original_hnsw_data["efConstruction"]))
+    f_out.write(struct.pack("<i", original_hnsw_data["efSearch"]))
+    f_out.write(struct.pack("<i", original_hnsw_data["dummy_upper_beam"]))
+
+
+def write_compact_format(
+    f_out,
+    original_hnsw_data,
+    assign_probas_np,
+    cum_nneighbor_per_level_np,
+    levels_np,
+    compact_level_ptr,
+    compact_node_offsets_np,
+    compact_neighbors_data,
+    storage_fourcc,
+    storage_data,
+):
+    """Write HNSW data in compact format following C++ read order exactly."""
+    _write_index_header(
+        f_out, original_hnsw_data, assign_probas_np, cum_nneighbor_per_level_np, levels_np
+    )
+
     # Write compact format flag
     f_out.write(struct.pack("<?", True))  # storage_is_compact = True
 
@@ -222,21 +251,20 @@ def write_compact_format(
     write_numpy_vector(f_out, compact_node_offsets_np, "Q")
 
     # Write HNSW scalar parameters
-    f_out.write(struct.pack("<i", original_hnsw_data["entry_point"]))
-    f_out.write(struct.pack("<i", original_hnsw_data["max_level"]))
-    f_out.write(struct.pack("<i", original_hnsw_data["efConstruction"]))
-    f_out.write(struct.pack("<i", original_hnsw_data["efSearch"]))
-    f_out.write(struct.pack("<i", original_hnsw_data["dummy_upper_beam"]))
+    _write_scalar_params(f_out, original_hnsw_data)
 
     # Write storage fourcc (this determines how to read what follows)
     f_out.write(struct.pack("<I", storage_fourcc))
 
     # Write compact neighbors data AFTER storage fourcc
-    write_list_vector(f_out, compact_neighbors_data, "i")
+    if isinstance(compact_neighbors_data, np.ndarray):
+        write_numpy_vector(f_out, compact_neighbors_data, "i")
+    else:
+        write_list_vector(f_out, compact_neighbors_data, "i")
 
     # Write storage data if not NULL (only after neighbors)
-    if storage_fourcc != NULL_INDEX_FOURCC and storage_data:
-        f_out.write(storage_data)
+    if storage_fourcc != NULL_INDEX_FOURCC and len(storage_data) > 0:
+        write_raw_bytes(f_out, storage_data)
 
 
 @dataclass
@@ -248,62 +276,114 @@ class HNSWComponents:
     is_compact: bool
     compact_level_ptr: Optional[np.ndarray] = None
     compact_node_offsets_np: Optional[np.ndarray] = None
-    compact_neighbors_data: Optional[list[int]] = None
+    compact_neighbors_data: Optional[np.ndarray] = None
     offsets_np: Optional[np.ndarray] = None
     neighbors_np: Optional[np.ndarray] = None
     storage_fourcc: int = NULL_INDEX_FOURCC
-    storage_data: bytes = b""
+    # Everything after the storage fourcc; a view into the memory-mapped input
+    storage_data: Union[bytes, np.ndarray] = b""
+
+
+class MappedIndexReader:
+    """Sequential reader over a memory-mapped index file.
+
+    Vectors are returned as zero-copy ``np.frombuffer`` views of the mapping, so
+    parsing a multi-gigabyte graph costs page cache instead of Python objects.
+    """
+
+    def __init__(self, path: str):
+        if os.path.getsize(path) > 0:
+            self.buf = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            # Empty files cannot be memory-mapped
+            self.buf = np.empty(0, dtype=np.uint8)
+        self.pos = 0
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, pos: int) -> None:
+        self.pos = pos
+
+    def read_struct(self, fmt: str):
+        size = struct.calcsize(fmt)
+        if self.pos + size > len(self.buf):
+            raise EOFError(
+                f"File ended unexpectedly reading struct fmt '{fmt}'. Expected {size} bytes, got {len(self.buf) - self.pos}."
+            )
+        value = struct.unpack_from(fmt, self.buf, self.pos)[0]
+        self.pos += size
+        return value
+
+    def read_vector(self, np_dtype) -> np.ndarray:
+        count = self.read_struct("<Q")
+        dtype = np.dtype(np_dtype)
+        total_bytes = count * dtype.itemsize
+        if self.pos + total_bytes > len(self.buf):
+            raise EOFError(
+                f"File ended unexpectedly reading vector data. Expected {total_bytes} bytes, got {len(self.buf) - self.pos}."
+            )
+        arr = np.frombuffer(self.buf, dtype=dtype, count=count, offset=self.pos)
+        self.pos += total_bytes
+        return arr
+
+    def read_rest(self) -> np.ndarray:
+        rest = self.buf[self.pos :]
+        self.pos = len(self.buf)
+        return rest
 
 
-def _read_hnsw_structure(f) -> HNSWComponents:
+def _read_hnsw_structure(reader: MappedIndexReader) -> HNSWComponents:
     original_hnsw_data: dict[str, Any] = {}
 
-    hnsw_index_fourcc = read_struct(f, "<I")
+    hnsw_index_fourcc = reader.read_struct("<I")
     if hnsw_index_fourcc not in EXPECTED_HNSW_FOURCCS:
         raise ValueError(
             f"Unexpected HNSW FourCC: {hnsw_index_fourcc:08x}. Expected one of {EXPECTED_HNSW_FOURCCS}."
         )
 
     original_hnsw_data["index_fourcc"] = hnsw_index_fourcc
-    original_hnsw_data["d"] = read_struct(f, "<i")
-    original_hnsw_data["ntotal"] = read_struct(f, "<q")
-    original_hnsw_data["dummy1"] = read_struct(f, "<q")
-    original_hnsw_data["dummy2"] = read_struct(f, "<q")
-    original_hnsw_data["is_trained"] = read_struct(f, "?")
-    original_hnsw_data["metric_type"] = read_struct(f, "<i")
+    original_hnsw_data["d"] = reader.read_struct("<i")
+    original_hnsw_data["ntotal"] = reader.read_struct("<q")
+    original_hnsw_data["dummy1"] = reader.read_struct("<q")
+    original_hnsw_data["dummy2"] = reader.read_struct("<q")
+    original_hnsw_data["is_trained"] = reader.read_struct("?")
+    original_hnsw_data["metric_type"] = reader.read_struct("<i")
     original_hnsw_data["metric_arg"] = 0.0
     if original_hnsw_data["metric_type"] > 1:
-        original_hnsw_data["metric_arg"] = read_struct(f, "<f")
+        original_hnsw_data["metric_arg"] = reader.read_struct("<f")
 
-    assign_probas_np = read_numpy_vector(f, np.float64, "d")
-    cum_nneighbor_per_level_np = read_numpy_vector(f, np.int32, "i")
-    levels_np = read_numpy_vector(f, np.int32, "i")
+    assign_probas_np = reader.read_vector(np.float64)
+    cum_nneighbor_per_level_np = reader.read_vector(np.int32)
+    levels_np = reader.read_vector(np.int32)
 
     ntotal = len(levels_np)
     if ntotal != original_hnsw_data["ntotal"]:
+        logger.warning(
+            f"ntotal mismatch: header says {original_hnsw_data['ntotal']}, levels vector size is {ntotal}. Using levels vector size."
+        )
         original_hnsw_data["ntotal"] = ntotal
 
-    pos_before_compact = f.tell()
+    pos_before_compact = reader.tell()
     is_compact_flag = None
     try:
-        is_compact_flag = read_struct(f, "<?")
+        is_compact_flag = reader.read_struct("<?")
     except EOFError:
         is_compact_flag = None
 
     if is_compact_flag:
-        compact_level_ptr = read_numpy_vector(f, np.uint64, "Q")
-        compact_node_offsets_np = read_numpy_vector(f, np.uint64, "Q")
+        compact_level_ptr = reader.read_vector(np.uint64)
+        compact_node_offsets_np = reader.read_vector(np.uint64)
 
-        original_hnsw_data["entry_point"] = read_struct(f, "<i")
-        original_hnsw_data["max_level"] = read_struct(f, "<i")
-        original_hnsw_data["efConstruction"] = read_struct(f, "<i")
-        original_hnsw_data["efSearch"] = read_struct(f, "<i")
-        original_hnsw_data["dummy_upper_beam"] = read_struct(f, "<i")
+        original_hnsw_data["entry_point"] = reader.read_struct("<i")
+        original_hnsw_data["max_level"] = reader.read_struct("<i")
+        original_hnsw_data["efConstruction"] = reader.read_struct("<i")
+        original_hnsw_data["efSearch"] = reader.read_struct("<i")
+        original_hnsw_data["dummy_upper_beam"] = reader.read_struct("<i")
 
-        storage_fourcc = read_struct(f, "<I")
-        compact_neighbors_data_np = read_numpy_vector(f, np.int32, "i")
-        compact_neighbors_data = compact_neighbors_data_np.tolist()
-        storage_data = f.read()
+        storage_fourcc = reader.read_struct("<I")
+        compact_neighbors_data = reader.read_vector(np.int32)
+        storage_data = reader.read_rest()
 
         return HNSWComponents(
             original_hnsw_data=original_hnsw_data,
@@ -319,30 +399,31 @@ def _read_hnsw_structure(f) -> HNSWComponents:
         )
 
     # Non-compact case
-    f.seek(pos_before_compact)
+    reader.seek(pos_before_compact)
 
-    pos_before_probe = f.tell()
+    # Handle the extra 0x00 byte some writers emit before the non-compact offsets
+    pos_before_probe = reader.tell()
     try:
-        suspected_flag = read_struct(f, "<B")
+        suspected_flag = reader.read_struct("<B")
         if suspected_flag != 0x00:
-            f.seek(pos_before_probe)
+            reader.seek(pos_before_probe)
     except EOFError:
-        f.seek(pos_before_probe)
+        reader.seek(pos_before_probe)
 
-    offsets_np = read_numpy_vector(f, np.uint64, "Q")
-    neighbors_np = read_numpy_vector(f, np.int32, "i")
+    offsets_np = reader.read_vector(np.uint64)
+    neighbors_np = reader.read_vector(np.int32)
 
-    original_hnsw_data["entry_point"] = read_struct(f, "<i")
-    original_hnsw_data["max_level"] = read_struct(f, "<i")
-    original_hnsw_data["efConstruction"] = read_struct(f, "<i")
-    original_hnsw_data["efSearch"] = read_struct(f, "<i")
-    original_hnsw_data["dummy_upper_beam"] = read_struct(f, "<i")
+    original_hnsw_data["entry_point"] = reader.read_struct("<i")
+    original_hnsw_data["max_level"] = reader.read_struct("<i")
+    original_hnsw_data["efConstruction"] = reader.read_struct("<i")
+    original_hnsw_data["efSearch"] = reader.read_struct("<i")
+    original_hnsw_data["dummy_upper_beam"] = reader.read_struct("<i")
 
     storage_fourcc = NULL_INDEX_FOURCC
-    storage_data = b""
+    storage_data: Union[bytes, np.ndarray] = b""
     try:
-        storage_fourcc = read_struct(f, "<I")
-        storage_data = f.read()
+        storage_fourcc = reader.read_struct("<I")
+        storage_data = reader.read_rest()
     except EOFError:
         storage_fourcc = NULL_INDEX_FOURCC
 
@@ -360,8 +441,7 @@ def _read_hnsw_structure(f) -> HNSWComponents:
 
 
 def _read_hnsw_structure_from_file(path: str) -> HNSWComponents:
-    with open(path, "rb") as f:
-        return _read_hnsw_structure(f)
+    return _read_hnsw_structure(MappedIndexReader(path))
 
 
 def write_original_format(
@@ -376,33 +456,18 @@ def write_original_format(
     storage_data,
 ):
     """Write non-compact HNSW data in original FAISS order."""
-
-    f_out.write(struct.pack("<I", original_hnsw_data["index_fourcc"]))
-    f_out.write(struct.pack("<i", original_hnsw_data["d"]))
-    f_out.write(struct.pack("<q", original_hnsw_data["ntotal"]))
-    f_out.write(struct.pack("<q", original_hnsw_data["dummy1"]))
-    f_out.write(struct.pack("<q", original_hnsw_data["dummy2"]))
-    f_out.write(struct.pack("<?", original_hnsw_data["is_trained"]))
-    f_out.write(struct.pack("<i", original_hnsw_data["metric_type"]))
-    if original_hnsw_data["metric_type"] > 1:
-        f_out.write(struct.pack("<f", original_hnsw_data["metric_arg"]))
-
-    write_numpy_vector(f_out, assign_probas_np, "d")
-    write_numpy_vector(f_out, cum_nneighbor_per_level_np, "i")
-    write_numpy_vector(f_out, levels_np, "i")
+    _write_index_header(
+        f_out, original_hnsw_data, assign_probas_np, cum_nneighbor_per_level_np, levels_np
+    )
 
     write_numpy_vector(f_out, offsets_np, "Q")
     write_numpy_vector(f_out, neighbors_np, "i")
 
-    f_out.write(struct.pack("<i", original_hnsw_data["entry_point"]))
-    f_out.write(struct.pack("<i", original_hnsw_data["max_level"]))
-    f_out.write(struct.pack("<i", original_hnsw_data["efConstruction"]))
-    f_out.write(struct.pack("<i", original_hnsw_data["efSearch"]))
-    f_out.write(struct.pack("<i", original_hnsw_data["dummy_upper_beam"]))
+    _write_scalar_params(f_out, original_hnsw_data)
 
     f_out.write(struct.pack("<I", storage_fourcc))
-    if storage_fourcc != NULL_INDEX_FOURCC and storage_data:
-        f_out.write(storage_data)
+    if storage_fourcc != NULL_INDEX_FOURCC and len(storage_data) > 0:
+        write_raw_bytes(f_out, storage_data)
 
 
 def prune_hnsw_embeddings(input_filename: str, output_filename: str) -> bool:
@@ -410,106 +475,30 @@ def prune_hnsw_embeddings(input_filename: str, output_filename: str) -> bool:
 
     start_time = time.time()
     try:
-        with open(input_filename, "rb") as f_in, open(output_filename, "wb") as f_out:
-            original_hnsw_data: dict[str, Any] = {}
-
-            hnsw_index_fourcc = read_struct(f_in, "<I")
-            if hnsw_index_fourcc not in EXPECTED_HNSW_FOURCCS:
-                print(
-                    f"Error: Expected HNSW Index FourCC ({list(EXPECTED_HNSW_FOURCCS)}), got {hnsw_index_fourcc:08x}.",
-                    file=sys.stderr,
-                )
-                return False
-
-            original_hnsw_data["index_fourcc"] = hnsw_index_fourcc
-            original_hnsw_data["d"] = read_struct(f_in, "<i")
-            original_hnsw_data["ntotal"] = read_struct(f_in, "<q")
-            original_hnsw_data["dummy1"] = read_struct(f_in, "<q")
-            original_hnsw_data["dummy2"] = read_struct(f_in, "<q")
-            original_hnsw_data["is_trained"] = read_struct(f_in, "?")
-            original_hnsw_data["metric_type"] = read_struct(f_in, "<i")
-            original_hnsw_data["metric_arg"] = 0.0
-            if original_hnsw_data["metric_type"] > 1:
-                original_hnsw_data["metric_arg"] = read_struct(f_in, "<f")
-
-            assign_probas_np = read_numpy_vector(f_in, np.float64, "d")
-            cum_nneighbor_per_level_np = read_numpy_vector(f_in, np.int32, "i")
-            levels_np = read_numpy_vector(f_in, np.int32, "i")
-
-            ntotal = len(levels_np)
-            if ntotal != original_hnsw_data["ntotal"]:
-                original_hnsw_data["ntotal"] = ntotal
-
-            pos_before_compact = f_in.tell()
-            is_compact_flag = None
-            try:
-                is_compact_flag = read_struct(f_in, "<?")
-            except EOFError:
-                is_compact_flag = None
-
-            if is_compact_flag:
-                compact_level_ptr = read_numpy_vector(f_in, np.uint64, "Q")
-                compact_node_offsets_np = read_numpy_vector(f_in, np.uint64, "Q")
-
-                original_hnsw_data["entry_point"] = read_struct(f_in, "<i")
-                original_hnsw_data["max_level"] = read_struct(f_in, "<i")
-                original_hnsw_data["efConstruction"] = read_struct(f_in, "<i")
-                original_hnsw_data["efSearch"] = read_struct(f_in, "<i")
-                original_hnsw_data["dummy_upper_beam"] = read_struct(f_in, "<i")
-
-                _storage_fourcc = read_struct(f_in, "<I")
-                compact_neighbors_data_np = read_numpy_vector(f_in, np.int32, "i")
-                compact_neighbors_data = compact_neighbors_data_np.tolist()
-                _storage_data = f_in.read()
-
+        components = _read_hnsw_structure_from_file(input_filename)
+        with open(output_filename, "wb") as f_out:
+            if components.is_compact:
                 write_compact_format(
                     f_out,
-                    original_hnsw_data,
-                    assign_probas_np,
-                    cum_nneighbor_per_level_np,
-                    levels_np,
-                    compact_level_ptr,
-                    compact_node_offsets_np,
-                    compact_neighbors_data,
+                    components.original_hnsw_data,
+                    components.assign_probas_np,
+                    components.cum_nneighbor_per_level_np,
+                    components.levels_np,
+                    components.compact_level_ptr,
+                    components.compact_node_offsets_np,
+                    components.compact_neighbors_data,
                     NULL_INDEX_FOURCC,
                     b"",
                 )
             else:
-                f_in.seek(pos_before_compact)
-
-                pos_before_probe = f_in.tell()
-                try:
-                    suspected_flag = read_struct(f_in, "<B")
-                    if suspected_flag != 0x00:
-                        f_in.seek(pos_before_probe)
-                except EOFError:
-                    f_in.seek(pos_before_probe)
-
-                offsets_np = read_numpy_vector(f_in, np.uint64, "Q")
-                neighbors_np = read_numpy_vector(f_in, np.int32, "i")
-
-                original_hnsw_data["entry_point"] = read_struct(f_in, "<i")
-                original_hnsw_data["max_level"] = read_struct(f_in, "<i")
-                original_hnsw_data["efConstruction"] = read_struct(f_in, "<i")
-                original_hnsw_data["efSearch"] = read_struct(f_in, "<i")
-                original_hnsw_data["dummy_upper_beam"] = read_struct(f_in, "<i")
-
-                _storage_fourcc = None
-                _storage_data = b""
-                try:
-                    _storage_fourcc = read_struct(f_in, "<I")
-                    _storage_data = f_in.read()
-                except EOFError:
-                    _storage_fourcc = NULL_INDEX_FOURCC
-
                 write_original_format(
                     f_out,
-                    original_hnsw_data,
-                    assign_probas_np,
-                    cum_nneighbor_per_level_np,
-                    levels_np,
-                    offsets_np,
-                    neighbors_np,
+                    components.original_hnsw_data,
+                    components.assign_probas_np,
+                    components.cum_nneighbor_per_level_np,
+                    components.levels_np,
+                    components.offsets_np,
+                    components.neighbors_np,
                     NULL_INDEX_FOURCC,
                     b"",
                 )
@@ -524,421 +513,196 @@ def prune_hnsw_embeddings(input_filename: str, output_filename: str) -> bool:
 # --- Main Conversion Logic ---
 
 
-def convert_hnsw_graph_to_csr(input_filename, output_filename, prune_embeddings=True):
+def _level_segments(levels_np, offsets_np, cum_per_level, num_neighbors):
+    """[begin, end) of every (node, level) neighbor block in the original neighbors array.
+
+    Segments are ordered node-major, level-minor, and clamped exactly like the
+    per-node loop of the original converter (``-1`` entries are not dropped yet).
     """
-    Converts an HNSW graph file to the CSR format.
-    Supports both original and already-compact formats (backward compatibility).
+    num_levels = np.maximum(levels_np.astype(np.int64), 0)
+    seg_node = np.repeat(np.arange(len(num_levels)), num_levels)
+    first_seg = np.cumsum(num_levels) - num_levels
+    seg_level = np.arange(len(seg_node)) - np.repeat(first_seg, num_levels)
+    base = offsets_np[: len(num_levels)].astype(np.int64)[seg_node]
+    begin = np.clip(base + cum_per_level[seg_level], 0, num_neighbors)
+    end = np.minimum(np.maximum(begin, base + cum_per_level[seg_level + 1]), num_neighbors)
+    return begin, end
+
+
+def _gather_valid_neighbors(neighbors_np, begin, end):
+    """Valid (``>= 0``) neighbors of all segments, concatenated, plus per-segment counts."""
+    lengths = end - begin
+    seg_start = np.cumsum(lengths) - lengths
+    if len(begin) == 0:
+        values = neighbors_np[:0]
+    elif np.array_equal(begin[1:], end[:-1]):
+        # FAISS lays out a node's levels, and consecutive nodes, back to back
+        values = neighbors_np[begin[0] : end[-1]]
+    else:
+        slots = np.arange(int(lengths.sum()), dtype=np.int64)
+        values = neighbors_np[slots + np.repeat(begin - seg_start, lengths)]
+    valid = values >= 0
+    valid_before = np.concatenate(([0], np.cumsum(valid, dtype=np.int64)))
+    counts = valid_before[seg_start + lengths] - valid_before[seg_start]
+    return values[valid], counts
+
+
+def _level_pointers(num_levels, counts, data_base):
+    """Compact ``level_ptr`` entries for a run of nodes (``num_levels + 1`` per node)."""
+    ptrs_per_node = num_levels + 1
+    first_ptr = np.cumsum(ptrs_per_node) - ptrs_per_node
+    increments = np.zeros(int(ptrs_per_node.sum()), dtype=np.int64)
+    is_level_end = np.ones(len(increments), dtype=bool)
+    is_level_end[first_ptr] = False
+    increments[is_level_end] = counts
+    return (data_base + np.cumsum(increments)).astype(np.uint64)
+
+
+def _write_csr_from_original(
+    f_out, output_filename, components, storage_fourcc, storage_data, chunk_nodes, start_time
+):
+    """Stream the CSR form of a non-compact graph, ``chunk_nodes`` nodes at a time.
 
-    Args:
-        input_filename: Input HNSW index file
-        output_filename: Output CSR index file
-        prune_embeddings: Whether to prune embedding storage (write NULL storage marker)
+    The sizes of ``level_ptr`` and ``node_offsets`` only depend on the node
+    levels, so the file position of the neighbors section is known up front and
+    both sections are written in a single pass through a second file handle.
+
+    Returns:
+        Number of valid neighbors written.
     """
-    # Keep prints simple; rely on CI runner to flush output as needed
+    data = components.original_hnsw_data
+    levels_np = components.levels_np
+    offsets_np = components.offsets_np
+    neighbors_np = components.neighbors_np
+    cum_nneighbor_per_level_np = components.cum_nneighbor_per_level_np
+    ntotal = len(levels_np)
 
-    print(f"Starting conversion: {input_filename} -> {output_filename}")
-    start_time = time.time()
-    original_hnsw_data = {}
-    neighbors_np = None  # Initialize to allow check in finally block
-    try:
-        with open(input_filename, "rb") as f_in, open(output_filename, "wb") as f_out:
-            # --- Read IndexHNSW FourCC and Header ---
-            print(f"[{time.time() - start_time:.2f}s] Reading Index HNSW header...")
-            # ... (Keep the header reading logic as before) ...
-            hnsw_index_fourcc = read_struct(f_in, "<I")
-            if hnsw_index_fourcc not in EXPECTED_HNSW_FOURCCS:
-                print(
-                    f"Error: Expected HNSW Index FourCC ({list(EXPECTED_HNSW_FOURCCS)}), got {hnsw_index_fourcc:08x}.",
-                    file=sys.stderr,
-                )
-                return False
-            original_hnsw_data["index_fourcc"] = hnsw_index_fourcc
-            original_hnsw_data["d"] = read_struct(f_in, "<i")
-            original_hnsw_data["ntotal"] = read_struct(f_in, "<q")
-            original_hnsw_data["dummy1"] = read_struct(f_in, "<q")
-            original_hnsw_data["dummy2"] = read_struct(f_in, "<q")
-            original_hnsw_data["is_trained"] = read_struct(f_in, "?")
-            original_hnsw_data["metric_type"] = read_struct(f_in, "<i")
-            original_hnsw_data["metric_arg"] = 0.0
-            if original_hnsw_data["metric_type"] > 1:
-                original_hnsw_data["metric_arg"] = read_struct(f_in, "<f")
-            print(
-                f"[{time.time() - start_time:.2f}s]   Header read: d={original_hnsw_data['d']}, ntotal={original_hnsw_data['ntotal']}"
-            )
+    num_levels = np.maximum(levels_np.astype(np.int64), 0)
+    compact_node_offsets_np = np.zeros(ntotal + 1, dtype=np.uint64)
+    compact_node_offsets_np[1:] = np.cumsum(num_levels + 1)
+    num_level_ptrs = int(compact_node_offsets_np[-1])
+    max_levels = int(num_levels.max()) if ntotal else 0
+    cum_per_level = np.array(
+        [get_cum_neighbors(cum_nneighbor_per_level_np, level) for level in range(max_levels + 2)],
+        dtype=np.int64,
+    )
 
-            # --- Read original HNSW struct data ---
-            print(f"[{time.time() - start_time:.2f}s] Reading HNSW struct vectors...")
-            assign_probas_np = read_numpy_vector(f_in, np.float64, "d")
-            print(
-                f"[{time.time() - start_time:.2f}s]   Read assign_probas ({assign_probas_np.size})"
+    _write_index_header(
+        f_out, data, components.assign_probas_np, cum_nneighbor_per_level_np, levels_np
+    )
+    f_out.write(struct.pack("<?", True))  # storage_is_compact = True
+    f_out.write(struct.pack("<Q", num_level_ptrs))
+    level_ptr_pos = f_out.tell()
+    # level_ptr data, node_offsets vector, 5 scalar params, storage fourcc
+    neighbors_count_pos = level_ptr_pos + 8 * num_level_ptrs + 8 * (ntotal + 2) + 4 * 5 + 4
+
+    num_valid = 0
+    with open(output_filename, "r+b") as f_neighbors:
+        f_neighbors.seek(neighbors_count_pos + 8)
+        for start in range(0, ntotal, chunk_nodes):
+            stop = min(start + chunk_nodes, ntotal)
+            begin, end = _level_segments(
+                levels_np[start:stop], offsets_np[start:stop], cum_per_level, len(neighbors_np)
             )
-            gc.collect()
-
-            cum_nneighbor_per_level_np = read_numpy_vector(f_in, np.int32, "i")
+            valid_neighbors, counts = _gather_valid_neighbors(neighbors_np, begin, end)
+            f_out.write(_level_pointers(num_levels[start:stop], counts, num_valid).tobytes())
+            f_neighbors.write(valid_neighbors.astype(np.int32).tobytes())
+            num_valid += len(valid_neighbors)
             print(
-                f"[{time.time() - start_time:.2f}s]   Read cum_nneighbor_per_level ({cum_nneighbor_per_level_np.size})"
+                f"\r[{time.time() - start_time:.2f}s]   Converted {stop}/{ntotal} nodes...",
+                end="",
             )
-            gc.collect()
+        print()
+        f_neighbors.seek(neighbors_count_pos)
+        f_neighbors.write(struct.pack("<Q", num_valid))
 
-            levels_np = read_numpy_vector(f_in, np.int32, "i")
-            print(f"[{time.time() - start_time:.2f}s]   Read levels ({levels_np.size})")
-            gc.collect()
+    write_numpy_vector(f_out, compact_node_offsets_np, "Q")
+    _write_scalar_params(f_out, data)
+    f_out.write(struct.pack("<I", storage_fourcc))
+    if f_out.tell() != neighbors_count_pos:
+        raise RuntimeError(
+            f"CSR layout mismatch: neighbors expected at {neighbors_count_pos}, header ended at {f_out.tell()}"
+        )
+    f_out.seek(neighbors_count_pos + 8 + 4 * num_valid)
+    if storage_fourcc != NULL_INDEX_FOURCC and len(storage_data) > 0:
+        write_raw_bytes(f_out, storage_data)
+    f_out.truncate()
+    return num_valid
 
-            ntotal = len(levels_np)
-            if ntotal != original_hnsw_data["ntotal"]:
-                print(
-                    f"Warning: ntotal mismatch! Header says {original_hnsw_data['ntotal']}, levels vector size is {ntotal}. Using levels vector size.",
-                    file=sys.stderr,
-                )
-                original_hnsw_data["ntotal"] = ntotal
 
-            # --- Check for compact format flag ---
-            print(f"[{time.time() - start_time:.2f}s]   Probing for compact storage flag...")
-            pos_before_compact = f_in.tell()
-            try:
-                is_compact_flag = read_struct(f_in, "<?")
-                print(f"[{time.time() - start_time:.2f}s]   Found compact flag: {is_compact_flag}")
-
-                if is_compact_flag:
-                    # Input is already in compact format - read compact data
-                    print(
-                        f"[{time.time() - start_time:.2f}s]   Input is already in compact format, reading compact data..."
-                    )
-
-                    compact_level_ptr = read_numpy_vector(f_in, np.uint64, "Q")
-                    print(
-                        f"[{time.time() - start_time:.2f}s]   Read compact_level_ptr ({compact_level_ptr.size})"
-                    )
-
-                    compact_node_offsets_np = read_numpy_vector(f_in, np.uint64, "Q")
-                    print(
-                        f"[{time.time() - start_time:.2f}s]   Read compact_node_offsets ({compact_node_offsets_np.size})"
-                    )
-
-                    # Read scalar parameters
-                    original_hnsw_data["entry_point"] = read_struct(f_in, "<i")
-                    original_hnsw_data["max_level"] = read_struct(f_in, "<i")
-                    original_hnsw_data["efConstruction"] = read_struct(f_in, "<i")
-                    original_hnsw_data["efSearch"] = read_struct(f_in, "<i")
-                    original_hnsw_data["dummy_upper_beam"] = read_struct(f_in, "<i")
-                    print(
-                        f"[{time.time() - start_time:.2f}s]   Read scalar params (ep={original_hnsw_data['entry_point']}, max_lvl={original_hnsw_data['max_level']})"
-                    )
-
-                    # Read storage fourcc
-                    storage_fourcc = read_struct(f_in, "<I")
-                    print(
-                        f"[{time.time() - start_time:.2f}s]   Found storage fourcc: {storage_fourcc:08x}"
-                    )
-
-                    if prune_embeddings and storage_fourcc != NULL_INDEX_FOURCC:
-                        # Read compact neighbors data
-                        compact_neighbors_data_np = read_numpy_vector(f_in, np.int32, "i")
-                        print(
-                            f"[{time.time() - start_time:.2f}s]   Read compact neighbors data ({compact_neighbors_data_np.size})"
-                        )
-                        compact_neighbors_data = compact_neighbors_data_np.tolist()
-                        del compact_neighbors_data_np
-
-                        # Skip storage data and write with NULL marker
-                        print(
-                            f"[{time.time() - start_time:.2f}s]   Pruning embeddings: Writing NULL storage marker."
-                        )
-                        storage_fourcc = NULL_INDEX_FOURCC
-                    elif not prune_embeddings:
-                        # Read and preserve compact neighbors and storage
-                        compact_neighbors_data_np = read_numpy_vector(f_in, np.int32, "i")
-                        compact_neighbors_data = compact_neighbors_data_np.tolist()
-                        del compact_neighbors_data_np
-
-                        # Read remaining storage data
-                        storage_data = f_in.read()
-                    else:
-                        # Already pruned (NULL storage)
-                        compact_neighbors_data_np = read_numpy_vector(f_in, np.int32, "i")
-                        compact_neighbors_data = compact_neighbors_data_np.tolist()
-                        del compact_neighbors_data_np
-                        storage_data = b""
-
-                    # Write the updated compact format
-                    print(f"[{time.time() - start_time:.2f}s] Writing updated compact format...")
-                    write_compact_format(
-                        f_out,
-                        original_hnsw_data,
-                        assign_probas_np,
-                        cum_nneighbor_per_level_np,
-                        levels_np,
-                        compact_level_ptr,
-                        compact_node_offsets_np,
-                        compact_neighbors_data,
-                        storage_fourcc,
-                        storage_data if not prune_embeddings else b"",
-                    )
-
-                    print(f"[{time.time() - start_time:.2f}s] Conversion complete.")
-                    return True
-
-                else:
-                    # is_compact=False, rewind and read original format
-                    f_in.seek(pos_before_compact)
-                    print(
-                        f"[{time.time() - start_time:.2f}s]   Compact flag is False, reading original format..."
-                    )
-
-            except EOFError:
-                # No compact flag found, assume original format
-                f_in.seek(pos_before_compact)
-                print(
-                    f"[{time.time() - start_time:.2f}s]   No compact flag found, assuming original format..."
-                )
+def convert_hnsw_graph_to_csr(
+    input_filename, output_filename, prune_embeddings=True, chunk_nodes=CONVERT_CHUNK_NODES
+):
+    """
+    Converts an HNSW graph file to the CSR format.
+    Supports both original and already-compact formats (backward compatibility).
 
-            # --- Handle potential extra byte in original format (like C++ code) ---
-            print(
-                f"[{time.time() - start_time:.2f}s]   Probing for potential extra byte before non-compact offsets..."
-            )
-            pos_before_probe = f_in.tell()
-            try:
-                suspected_flag = read_struct(f_in, "<B")  # Read 1 byte
-                if suspected_flag == 0x00:
-                    print(
-                        f"[{time.time() - start_time:.2f}s]   Found and consumed an unexpected 0x00 byte."
-                    )
-                elif suspected_flag == 0x01:
-                    print(
-                        f"[{time.time() - start_time:.2f}s]   ERROR: Found 0x01 but is_compact should be False"
-                    )
-                    raise ValueError("Inconsistent compact flag state")
-                else:
-                    # Rewind - this byte is part of offsets data
-                    f_in.seek(pos_before_probe)
-                    print(
-                        f"[{time.time() - start_time:.2f}s]   Rewound to original position (byte was 0x{suspected_flag:02x})"
-                    )
-            except EOFError:
-                f_in.seek(pos_before_probe)
-                print(
-                    f"[{time.time() - start_time:.2f}s]   No extra byte found (EOF), proceeding with offsets read"
-                )
+    The input is memory-mapped and converted ``chunk_nodes`` nodes at a time with
+    NumPy, so peak memory is bounded by the chunk size rather than the graph size.
 
-            # --- Read original format data ---
-            offsets_np = read_numpy_vector(f_in, np.uint64, "Q")
-            print(f"[{time.time() - start_time:.2f}s]   Read offsets ({offsets_np.size})")
-            if len(offsets_np) != ntotal + 1:
-                raise ValueError(
-                    f"Inconsistent offsets size: len(levels)={ntotal} but len(offsets)={len(offsets_np)}"
-                )
-            gc.collect()
-
-            print(f"[{time.time() - start_time:.2f}s]   Attempting to read neighbors vector...")
-            neighbors_np = read_numpy_vector(f_in, np.int32, "i")
-            print(f"[{time.time() - start_time:.2f}s]   Read neighbors ({neighbors_np.size})")
-            expected_neighbors_size = offsets_np[-1] if ntotal > 0 else 0
-            if neighbors_np.size != expected_neighbors_size:
-                print(
-                    f"Warning: neighbors vector size mismatch. Expected {expected_neighbors_size} based on offsets, got {neighbors_np.size}."
-                )
-            gc.collect()
+    Args:
+        input_filename: Input HNSW index file
+        output_filename: Output CSR index file
+        prune_embeddings: Whether to prune embedding storage (write NULL storage marker)
+        chunk_nodes: Nodes converted per vectorized step
+    """
+    print(f"Starting conversion: {input_filename} -> {output_filename}")
+    start_time = time.time()
+    try:
+        components = _read_hnsw_structure_from_file(input_filename)
+        data = components.original_hnsw_data
+        ntotal = len(components.levels_np)
+        print(
+            f"[{time.time() - start_time:.2f}s]   Header read: d={data['d']}, ntotal={ntotal}, compact={components.is_compact}"
+        )
 
-            original_hnsw_data["entry_point"] = read_struct(f_in, "<i")
-            original_hnsw_data["max_level"] = read_struct(f_in, "<i")
-            original_hnsw_data["efConstruction"] = read_struct(f_in, "<i")
-            original_hnsw_data["efSearch"] = read_struct(f_in, "<i")
-            original_hnsw_data["dummy_upper_beam"] = read_struct(f_in, "<i")
-            print(
-                f"[{time.time() - start_time:.2f}s]   Read scalar params (ep={original_hnsw_data['entry_point']}, max_lvl={original_hnsw_data['max_level']})"
+        if components.is_compact:
+            # Input is already in compact format: copy the sections straight from the map
+            output_storage_fourcc = (
+                NULL_INDEX_FOURCC if prune_embeddings else components.storage_fourcc
             )
-
-            print(f"[{time.time() - start_time:.2f}s] Checking for storage data...")
-            storage_fourcc = None
-            try:
-                storage_fourcc = read_struct(f_in, "<I")
-                print(
-                    f"[{time.time() - start_time:.2f}s]   Found storage fourcc: {storage_fourcc:08x}."
-                )
-            except EOFError:
-                print(f"[{time.time() - start_time:.2f}s]   No storage data found (EOF).")
-            except Exception as e:
-                print(
-                    f"[{time.time() - start_time:.2f}s]   Error reading potential storage data: {e}"
-                )
-
-            # --- Perform Conversion ---
-            print(f"[{time.time() - start_time:.2f}s] Converting to CSR format...")
-
-            # Use lists for potentially huge data, np for offsets
-            compact_neighbors_data = []
-            compact_level_ptr = []
-            compact_node_offsets_np = np.zeros(ntotal + 1, dtype=np.uint64)
-
-            current_level_ptr_idx = 0
-            current_data_idx = 0
-            total_valid_neighbors_counted = 0  # For validation
-
-            # Optimize calculation by getting slices once per node if possible
-            for i in range(ntotal):
-                if i > 0 and i % (ntotal // 100 or 1) == 0:  # Log progress roughly every 1%
-                    progress = (i / ntotal) * 100
-                    elapsed = time.time() - start_time
-                    print(
-                        f"\r[{elapsed:.2f}s]   Converting node {i}/{ntotal} ({progress:.1f}%)...",
-                        end="",
-                    )
-
-                node_max_level = levels_np[i] - 1
-                if node_max_level < -1:
-                    node_max_level = -1
-
-                node_ptr_start_index = current_level_ptr_idx
-                compact_node_offsets_np[i] = node_ptr_start_index
-
-                original_offset_start = offsets_np[i]
-                num_pointers_expected = (node_max_level + 1) + 1
-
-                for level in range(node_max_level + 1):
-                    compact_level_ptr.append(current_data_idx)
-
-                    begin_orig_np = original_offset_start + get_cum_neighbors(
-                        cum_nneighbor_per_level_np, level
-                    )
-                    end_orig_np = original_offset_start + get_cum_neighbors(
-                        cum_nneighbor_per_level_np, level + 1
-                    )
-
-                    begin_orig = int(begin_orig_np)
-                    end_orig = int(end_orig_np)
-
-                    neighbors_len = len(neighbors_np)  # Cache length
-                    begin_orig = min(max(0, begin_orig), neighbors_len)
-                    end_orig = min(max(begin_orig, end_orig), neighbors_len)
-
-                    if begin_orig < end_orig:
-                        # Slicing creates a copy, could be memory intensive for large M
-                        # Consider iterating if memory becomes an issue here
-                        level_neighbors_slice = neighbors_np[begin_orig:end_orig]
-                        valid_neighbors_mask = level_neighbors_slice >= 0
-                        num_valid = np.count_nonzero(valid_neighbors_mask)
-
-                        if num_valid > 0:
-                            # Append valid neighbors
-                            compact_neighbors_data.extend(
-                                level_neighbors_slice[valid_neighbors_mask]
-                            )
-                            current_data_idx += num_valid
-                            total_valid_neighbors_counted += num_valid
-
-                compact_level_ptr.append(current_data_idx)
-                current_level_ptr_idx += num_pointers_expected
-
-            compact_node_offsets_np[ntotal] = current_level_ptr_idx
-            print(
-                f"\r[{time.time() - start_time:.2f}s]   Conversion loop finished.                        "
-            )  # Clear progress line
-
-            # --- Validation Checks ---
-            print(f"[{time.time() - start_time:.2f}s] Running validation checks...")
-            valid_check_passed = True
-            # Check 1: Total valid neighbors count
-            print("    Checking total valid neighbor count...")
-            expected_valid_count = np.sum(neighbors_np >= 0)
-            if total_valid_neighbors_counted != len(compact_neighbors_data):
-                print(
-                    f"Error: Mismatch between counted valid neighbors ({total_valid_neighbors_counted}) and final compact_data size ({len(compact_neighbors_data)})!",
-                    file=sys.stderr,
-                )
-                valid_check_passed = False
-            if expected_valid_count != len(compact_neighbors_data):
-                print(
-                    f"Error: Mismatch between NumPy count of valid neighbors ({expected_valid_count}) and final compact_data size ({len(compact_neighbors_data)})!",
-                    file=sys.stderr,
-                )
-                valid_check_passed = False
-            else:
-                print(f"    OK: Total valid neighbors = {len(compact_neighbors_data)}")
-
-            # Check 2: Final pointer indices consistency
-            print("    Checking final pointer indices...")
-            if compact_node_offsets_np[ntotal] != len(compact_level_ptr):
-                print(
-                    f"Error: Final node offset ({compact_node_offsets_np[ntotal]}) doesn't match level_ptr size ({len(compact_level_ptr)})!",
-                    file=sys.stderr,
+            with open(output_filename, "wb") as f_out:
+                write_compact_format(
+                    f_out,
+                    data,
+                    components.assign_probas_np,
+                    components.cum_nneighbor_per_level_np,
+                    components.levels_np,
+                    components.compact_level_ptr,
+                    components.compact_node_offsets_np,
+                    components.compact_neighbors_data,
+                    output_storage_fourcc,
+                    b"" if prune_embeddings else components.storage_data,
                 )
-                valid_check_passed = False
-            if (
-                len(compact_level_ptr) > 0 and compact_level_ptr[-1] != len(compact_neighbors_data)
-            ) or (len(compact_level_ptr) == 0 and len(compact_neighbors_data) != 0):
-                last_ptr = compact_level_ptr[-1] if len(compact_level_ptr) > 0 else -1
-                print(
-                    f"Error: Last level pointer ({last_ptr}) doesn't match compact_data size ({len(compact_neighbors_data)})!",
-                    file=sys.stderr,
+            num_valid = len(components.compact_neighbors_data)
+        else:
+            if len(components.offsets_np) != ntotal + 1:
+                raise ValueError(
+                    f"Inconsistent offsets size: len(levels)={ntotal} but len(offsets)={len(components.offsets_np)}"
                 )
-                valid_check_passed = False
+            if prune_embeddings or components.storage_fourcc in (0, NULL_INDEX_FOURCC):
+                output_storage_fourcc, storage_data = NULL_INDEX_FOURCC, b""
             else:
-                print("    OK: Final pointers match data size.")
-
-            if not valid_check_passed:
-                print(
-                    "Error: Validation checks failed. Output file might be incorrect.",
-                    file=sys.stderr,
+                output_storage_fourcc = components.storage_fourcc
+                storage_data = components.storage_data
+            with open(output_filename, "wb") as f_out:
+                num_valid = _write_csr_from_original(
+                    f_out,
+                    output_filename,
+                    components,
+                    output_storage_fourcc,
+                    storage_data,
+                    max(1, int(chunk_nodes)),
+                    start_time,
                 )
-                # Optional: Exit here if validation fails
-                # return False
-
-            # --- Explicitly delete large intermediate arrays ---
-            print(
-                f"[{time.time() - start_time:.2f}s] Deleting original neighbors and offsets arrays..."
-            )
-            del neighbors_np
-            del offsets_np
-            gc.collect()
-
-            print(
-                f"    CSR Stats: |data|={len(compact_neighbors_data)}, |level_ptr|={len(compact_level_ptr)}"
-            )
-
-            # --- Write CSR HNSW graph data using unified function ---
-            print(
-                f"[{time.time() - start_time:.2f}s] Writing CSR HNSW graph data in FAISS-compatible order..."
-            )
-
-            # Determine storage fourcc and data based on prune_embeddings
-            if prune_embeddings:
-                print("   Pruning embeddings: Writing NULL storage marker.")
-                output_storage_fourcc = NULL_INDEX_FOURCC
-                storage_data = b""
-            else:
-                # Keep embeddings - read and preserve original storage data
-                if storage_fourcc and storage_fourcc != NULL_INDEX_FOURCC:
-                    print("   Preserving embeddings: Reading original storage data...")
-                    storage_data = f_in.read()  # Read remaining storage data
-                    output_storage_fourcc = storage_fourcc
-                    print(f"   Read {len(storage_data)} bytes of storage data")
-                else:
-                    print("   No embeddings found in original file (NULL storage)")
-                    output_storage_fourcc = NULL_INDEX_FOURCC
-                    storage_data = b""
-
-            # Use the unified write function
-            write_compact_format(
-                f_out,
-                original_hnsw_data,
-                assign_probas_np,
-                cum_nneighbor_per_level_np,
-                levels_np,
-                compact_level_ptr,
-                compact_node_offsets_np,
-                compact_neighbors_data,
-                output_storage_fourcc,
-                storage_data,
-            )
-
-            # Clean up memory
-            del assign_probas_np, cum_nneighbor_per_level_np, levels_np
-            del compact_neighbors_data, compact_level_ptr, compact_node_offsets_np
-            gc.collect()
 
-            end_time = time.time()
-            print(f"[{end_time - start_time:.2f}s] Conversion complete.")
-            return True
+        elapsed = max(time.time() - start_time, 1e-9)
+        output_mb = os.path.getsize(output_filename) / (1024 * 1024)
+        print(
+            f"[{elapsed:.2f}s] Conversion complete: {ntotal} nodes, {num_valid} edges, "
+            f"{output_mb:.1f} MB written ({ntotal / elapsed:,.0f} nodes/s, {output_mb / elapsed:.1f} MB/s)."
+        )
+        return True
 
     except FileNotFoundError:
         print(f"Error: Input file not found: {input_filename}", file=sys.stderr)
@@ -948,7 +712,6 @@ def convert_hnsw_graph_to_csr(input_filename, output_filename, prune_embeddings=
             f"\nFatal MemoryError during conversion: {e}. Insufficient RAM.",
             file=sys.stderr,
         )
-        # Clean up potentially partially written output file?
         try:
             os.remove(output_filename)
         except OSError:
@@ -974,14 +737,6 @@ def convert_hnsw_graph_to_csr(input_filename, output_filename, prune_embeddings=
         except OSError:
             pass
         return False
-    # Ensure neighbors_np is deleted even if an error occurs after its allocation
-    finally:
-        try:
-            if "neighbors_np" in locals() and neighbors_np is not None:
-                del neighbors_np
-                gc.collect()
-        except NameError:
-            pass
 
 
 def prune_hnsw_embeddings_inplace(index_filename: str) -> bool:
@@ -2,10 +2,12 @@ import logging
 import os
 import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Literal, Optional
 
 import numpy as np
+from leann.id_map import IdMap
 from leann.interface import (
     LeannBackendBuilderInterface,
     LeannBackendFactoryInterface,
@@ -13,11 +15,24 @@ from leann.interface import (
 )
 from leann.registry import register_backend
 from leann.searcher_base import BaseSearcher
+from leann.zmq_client import EmbeddingServerClient
 
 from .convert_to_csr import convert_hnsw_graph_to_csr, prune_hnsw_embeddings_inplace
+from .prefetch import PrefetchingDistances, search_with_prefetch
+from .reorder import REORDER_METHODS, reorder_index
+from .two_stage import CODE_KINDS, CompactCodes, HNSWGraph, search_codes
 
 logger = logging.getLogger(__name__)
 
+# Defaults of the options that only the FAISS traversal implements; the Python walks
+# behind two-stage and prefetch search ignore them
+NATIVE_SEARCH_DEFAULTS = {
+    "beam_width": 1,
+    "prune_ratio": 0.0,
+    "pruning_strategy": "global",
+    "batch_size": 0,
+}
+
 
 def get_metric_map():
     from . import faiss  # type: ignore
@@ -35,6 +50,12 @@ def normalize_l2(data: np.ndarray) -> np.ndarray:
     return data / norms
 
 
+def _distance_fetcher(client: EmbeddingServerClient, query: np.ndarray):
+    """Distances from ``query`` to node ids, computed by the embedding server."""
+    payload = query.tolist()
+    return lambda ids: client.request([ids.tolist(), payload])[0]
+
+
 @register_backend("hnsw")
 class HNSWBackend(LeannBackendFactoryInterface):
     @staticmethod
@@ -55,6 +76,11 @@ class HNSWBuilder(LeannBackendBuilderInterface):
         self.efConstruction = self.build_params.setdefault("efConstruction", 200)
         self.distance_metric = self.build_params.setdefault("distance_metric", "mips")
         self.dimensions = self.build_params.get("dimensions")
+        self.compact_codes = self.build_params.get("compact_codes")
+        if self.compact_codes is not None and self.compact_codes not in CODE_KINDS:
+            raise ValueError(
+                f"Unsupported compact_codes '{self.compact_codes}'. Use one of {CODE_KINDS}."
+            )
         if not self.is_recompute and self.is_compact:
             # Auto-correct: non-recompute requires non-compact storage for HNSW
             logger.warning(
@@ -62,6 +88,12 @@ class HNSWBuilder(LeannBackendBuilderInterface):
             )
             self.is_compact = False
             self.build_params["is_compact"] = False
+        self.reorder = self.build_params.get("reorder")
+        if self.reorder is not None and self.reorder not in REORDER_METHODS:
+            raise ValueError(f"Unsupported reorder '{self.reorder}'. Use one of {REORDER_METHODS}.")
+        if self.reorder and not self.is_compact:
+            logger.warning("Node reordering needs a compact HNSW index. Skipping reorder.")
+            self.reorder = None
 
     def build(self, data: np.ndarray, ids: list[str], index_path: str, **kwargs):
         from . import faiss  # type: ignore
@@ -92,15 +124,28 @@ class HNSWBuilder(LeannBackendBuilderInterface):
 
         # Persist ID map so searcher can map FAISS integer labels back to passage IDs
         try:
-            idmap_file = index_dir / f"{index_prefix}.ids.txt"
-            with open(idmap_file, "w", encoding="utf-8") as f:
-                for id_str in ids:
-                    f.write(str(id_str) + "\n")
+            IdMap.from_ids(ids).save(index_dir / index_prefix)
         except Exception as e:
             logger.warning(f"Failed to write ID map: {e}")
 
+        if self.compact_codes:
+            codes = CompactCodes.train(data, self.compact_codes)
+            codes.save(index_file)
+            logger.info(
+                f"Stored {self.compact_codes} codes for two-stage search ({codes.nbytes} bytes)"
+            )
+
         if self.is_compact:
             self._convert_to_csr(index_file)
+            if self.reorder:
+                reorder_index(
+                    index_file,
+                    self.reorder,
+                    id_map_prefix=index_dir / index_prefix,
+                    passages_file=Path(f"{index_path}.passages.jsonl"),
+                    offsets_file=Path(f"{index_path}.passages.idx"),
+                    compact_codes=self.compact_codes,
+                )
         elif self.is_recompute:
             prune_hnsw_embeddings_inplace(str(index_file))
 
@@ -162,15 +207,143 @@ class HNSWSearcher(BaseSearcher):
         self._index = faiss.read_index(str(index_file), faiss.IO_FLAG_MMAP, hnsw_config)
 
         # Load ID map if available
-        self._id_map: list[str] = []
+        self._id_map: Optional[IdMap] = None
         try:
-            idmap_file = self.index_dir / f"{self.index_path.stem}.ids.txt"
-            if idmap_file.exists():
-                with open(idmap_file, encoding="utf-8") as f:
-                    self._id_map = [line.rstrip("\n") for line in f]
+            self._id_map = IdMap.load(self.index_dir / self.index_path.stem)
         except Exception as e:
             logger.warning(f"Failed to load ID map: {e}")
 
+        self.compact_codes = backend_meta_kwargs.get("compact_codes")
+        self._index_file = index_file
+        self._graph: Optional[HNSWGraph] = None
+        self._codes: Optional[CompactCodes] = None
+        self._prefetch_clients: dict[int, EmbeddingServerClient] = {}
+        self._prefetch_executor: Optional[ThreadPoolExecutor] = None
+
+    def _load_graph(self) -> HNSWGraph:
+        if self._graph is None:
+            self._graph = HNSWGraph(self._index_file)
+        return self._graph
+
+    def _load_codes(self) -> CompactCodes:
+        if self._codes is None:
+            if not self.compact_codes:
+                raise ValueError(
+                    "two_stage search needs compact codes. Rebuild the index with "
+                    "compact_codes='sq8' or 'binary' (CLI: --compact-codes)."
+                )
+            self._codes = CompactCodes.load(self._index_file, self.compact_codes)
+        return self._codes
+
+    def _map_labels(self, labels) -> list[list[str]]:
+        if self._id_map is not None:
+            return [self._id_map.lookup(batch_labels) for batch_labels in labels]
+        return [[str(int(int_label)) for int_label in batch_labels] for batch_labels in labels]
+
+    def _walk_results(
+        self,
+        per_query: list[tuple[np.ndarray, np.ndarray]],
+        top_k: int,
+        stats: dict[str, int],
+    ) -> dict[str, Any]:
+        """Pack ``(ids, lower-is-better distances)`` per query like the FAISS search output."""
+        labels = np.full((len(per_query), top_k), -1, dtype=np.int64)
+        distances = np.full((len(per_query), top_k), np.inf, dtype=np.float32)
+        for row, (ids, dists) in enumerate(per_query):
+            order = np.argsort(dists, kind="stable")[:top_k]
+            labels[row, : len(order)] = ids[order]
+            distances[row, : len(order)] = dists[order]
+        if self.distance_metric != "l2":
+            # Match FAISS inner-product output: similarities, higher is better
+            distances = -distances
+        return {"labels": self._map_labels(labels), "distances": distances, "stats": stats}
+
+    def _two_stage_search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        complexity: int,
+        rerank_k: Optional[int],
+        recompute_embeddings: bool,
+        zmq_port: Optional[int],
+    ) -> dict[str, Any]:
+        """Traverse on compact codes, then rerank the best ``rerank_k`` with one recompute."""
+        graph, codes = self._load_graph(), self._load_codes()
+        rerank_k = max(rerank_k or complexity, top_k)
+        ef = max(complexity, rerank_k)
+        metric = "l2" if self.distance_metric == "l2" else "ip"
+        stats: dict[str, int] = {"recompute_requests": 0}
+
+        per_query = []
+        for vector in query:
+            ids, approx = search_codes(graph, codes, vector, ef, metric, stats)
+            ids, approx = ids[:rerank_k], approx[:rerank_k]
+            if recompute_embeddings and len(ids):
+                # Server replies with lower-is-better distances (negated dot for mips/cosine)
+                response = self._embedding_client(zmq_port).request([ids.tolist(), vector.tolist()])
+                stats["recompute_requests"] += 1
+                stats["nodes_recomputed"] = stats.get("nodes_recomputed", 0) + len(ids)
+                approx = np.asarray(response[0], dtype=np.float32)
+            per_query.append((ids, approx))
+
+        logger.info(
+            f"  Two-stage search: {stats.get('hops', 0)} hops, "
+            f"{stats.get('distances', 0)} code distances, "
+            f"{stats['recompute_requests']} recompute request(s)"
+        )
+        stats["zmq_requests"] = stats["recompute_requests"]
+        return self._walk_results(per_query, top_k, stats)
+
+    def _prefetch_search(
+        self, query: np.ndarray, top_k: int, complexity: int, prefetch_depth: int, zmq_port: int
+    ) -> dict[str, Any]:
+        """Recompute search that prefetches the next frontier while expanding the current one."""
+        graph = self._load_graph()
+        client = self._embedding_client(zmq_port)
+        prefetch_client = self._prefetch_clients.get(zmq_port)
+        if prefetch_client is None:
+            # Own socket: a REQ socket cannot have two requests in flight
+            prefetch_client = self._prefetch_clients[zmq_port] = EmbeddingServerClient(zmq_port)
+        if self._prefetch_executor is None:
+            self._prefetch_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="leann-prefetch"
+            )
+
+        stats: dict[str, int] = {}
+        per_query = []
+        for vector in query:
+            distances = PrefetchingDistances(
+                _distance_fetcher(client, vector),
+                _distance_fetcher(prefetch_client, vector),
+                self._prefetch_executor,
+            )
+            per_query.append(
+                search_with_prefetch(
+                    graph, distances, max(complexity, top_k), prefetch_depth, stats
+                )
+            )
+
+        logger.info(
+            f"  Prefetch search: {stats['hops']} hops, {stats['requests']} blocking + "
+            f"{stats['prefetch_requests']} prefetch request(s), "
+            f"{stats['prefetch_hits']}/{stats['prefetched']} prefetched nodes used, "
+            f"{stats['prefetch_wasted']} wasted"
+        )
+        stats["zmq_requests"] = stats["requests"] + stats["prefetch_requests"]
+        stats["nodes_recomputed"] = stats["fetched"] + stats["prefetched"]
+        stats["cache_hits"] = stats["prefetch_hits"]
+        return self._walk_results(per_query, top_k, stats)
+
+    def close_embedding_clients(self) -> None:
+        super().close_embedding_clients()
+        clients = getattr(self, "_prefetch_clients", {})
+        while clients:
+            clients.popitem()[1].close()
+        executor = getattr(self, "_prefetch_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+            self._prefetch_executor = None
+
     def search(
         self,
         query: np.ndarray,
@@ -182,6 +355,9 @@ class HNSWSearcher(BaseSearcher):
         recompute_embeddings: bool = True,
         pruning_strategy: Literal["global", "local", "proportional"] = "global",
         batch_size: int = 0,
+        two_stage: bool = False,
+        rerank_k: Optional[int] = None,
+        prefetch_depth: int = 0,
         **kwargs,
     ) -> dict[str, Any]:
         """
@@ -200,11 +376,39 @@ class HNSWSearcher(BaseSearcher):
                 - "proportional": Base selection on new neighbor count ratio
             zmq_port: ZMQ port for embedding server communication. Must be provided if recompute_embeddings is True.
             batch_size: Neighbor processing batch size, 0=disabled (HNSW-specific)
+            two_stage: Traverse on the compact codes stored at build time and recompute only
+                the final candidates in a single batched request (needs ``compact_codes``)
+            rerank_k: Candidates recomputed by ``two_stage`` search (default: complexity)
+            prefetch_depth: With recompute, speculatively fetch distances for the neighbors
+                of this many best candidates in the background, 0=disabled
             **kwargs: Additional HNSW-specific parameters (for legacy compatibility)
 
         Returns:
             Dict with 'labels' (list of lists) and 'distances' (ndarray)
         """
+        if two_stage or (prefetch_depth > 0 and recompute_embeddings):
+            options = {
+                "beam_width": beam_width,
+                "prune_ratio": prune_ratio,
+                "pruning_strategy": pruning_strategy,
+                "batch_size": batch_size,
+            }
+            ignored = [f"{k}={v!r}" for k, v in options.items() if v != NATIVE_SEARCH_DEFAULTS[k]]
+            if ignored:
+                mode = "Two-stage" if two_stage else "Prefetch"
+                logger.warning(f"{mode} search does not support {', '.join(ignored)}; ignoring")
+            if recompute_embeddings and zmq_port is None:
+                raise ValueError("zmq_port must be provided if recompute_embeddings is True")
+            if query.dtype != np.float32:
+                query = query.astype(np.float32)
+            if self.distance_metric == "cosine":
+                query = normalize_l2(query)
+            if two_stage:
+                return self._two_stage_search(
+                    query, top_k, complexity, rerank_k, recompute_embeddings, zmq_port
+                )
+            return self._prefetch_search(query, top_k, complexity, prefetch_depth, zmq_port)
+
         from . import faiss  # type: ignore
 
         if not recompute_embeddings and self.is_pruned:
@@ -260,6 +464,11 @@ class HNSWSearcher(BaseSearcher):
         distances = np.empty((batch_size_query, top_k), dtype=np.float32)
         labels = np.empty((batch_size_query, top_k), dtype=np.int64)
 
+        # Process-wide FAISS counters: exact for one search at a time, approximate when
+        # several searches in this process overlap
+        hnsw_stats = getattr(getattr(faiss, "cvar", None), "hnsw_stats", None)
+        if hnsw_stats is not None:
+            hnsw_stats.reset()
         search_time = time.time()
         self._index.search(
             query.shape[0],
@@ -271,19 +480,11 @@ class HNSWSearcher(BaseSearcher):
         )
         search_time = time.time() - search_time
         logger.info(f"  Search time in HNSWSearcher.search() backend: {search_time} seconds")
-        if self._id_map:
-
-            def map_label(x: int) -> str:
-                if 0 <= x < len(self._id_map):
-                    return self._id_map[x]
-                return str(x)
-
-            string_labels = [
-                [map_label(int(label)) for label in batch_labels] for batch_labels in labels
-            ]
-        else:
-            string_labels = [
-                [str(int_label) for int_label in batch_labels] for batch_labels in labels
-            ]
-
-        return {"labels": string_labels, "distances": distances}
+        result: dict[str, Any] = {"labels": self._map_labels(labels), "distances": distances}
+        if hnsw_stats is not None:
+            stats = {"hops": int(hnsw_stats.nhops), "distances": int(hnsw_stats.ndis)}
+            if recompute_embeddings:
+                # Every distance of a recompute search is computed by the embedding server
+                stats["nodes_recomputed"] = stats["distances"]
+            result["stats"] = stats
+        return result
@@ -61,10 +61,14 @@ def create_hnsw_embedding_server(
     model_name: str = "sentence-transformers/all-mpnet-base-v2",
     distance_metric: str = "mips",
     embedding_mode: str = "sentence-transformers",
+    metrics_file: Optional[str] = None,
 ):
     """
     Create and start a ZMQ-based embedding server for HNSW backend.
     Simplified version using unified embedding computation module.
+
+    Counters are answered to a ``["__STATS__"]`` request and, with ``metrics_file``,
+    written there in the Prometheus text format.
     """
     logger.info(f"Starting HNSW server on port {zmq_port} with model {model_name}")
     logger.info(f"Using embedding mode: {embedding_mode}")
@@ -77,6 +81,8 @@ def create_hnsw_embedding_server(
     try:
         from leann.api import PassageManager
         from leann.embedding_compute import compute_embeddings
+        from leann.id_map import IdMap
+        from leann.metrics import STATS_MESSAGE, EmbeddingServerMetrics
 
         logger.info("Successfully imported unified embedding computation module")
     except ImportError as e:
@@ -115,7 +121,7 @@ def create_hnsw_embedding_server(
     logger.info(f"Loaded PassageManager with {len(passages)} passages from metadata")
 
     # Attempt to load ID map (maps FAISS integer labels -> passage IDs)
-    id_map: list[str] = []
+    id_map: Optional[IdMap] = None
     try:
         meta_path = Path(passages_file)
         base = meta_path.name
@@ -123,19 +129,17 @@ def create_hnsw_embedding_server(
             base = base[: -len(".meta.json")]  # e.g., laion_index.leann
         if base.endswith(".leann"):
             base = base[: -len(".leann")]  # e.g., laion_index
-        idmap_file = meta_path.parent / f"{base}.ids.txt"
-        if idmap_file.exists():
-            with open(idmap_file, encoding="utf-8") as f:
-                id_map = [line.rstrip("\n") for line in f]
-            logger.info(f"Loaded ID map with {len(id_map)} entries from {idmap_file}")
+        id_map = IdMap.load(meta_path.parent / base)
+        if id_map is not None:
+            logger.info(f"Loaded ID map with {len(id_map)} entries for {meta_path.parent / base}")
         else:
-            logger.warning(f"ID map file not found at {idmap_file}; will use raw labels")
+            logger.warning(f"ID map not found for {meta_path.parent / base}; will use raw labels")
     except Exception as e:
         logger.warning(f"Failed to load ID map: {e}")
 
     def _map_node_id(nid) -> str:
         try:
-            if id_map is not None and len(id_map) > 0 and isinstance(nid, (int, np.integer)):
+            if id_map is not None and isinstance(nid, (int, np.integer)):
                 idx = int(nid)
                 if 0 <= idx < len(id_map):
                     return id_map[idx]
@@ -143,6 +147,41 @@ def create_hnsw_embedding_server(
             pass
         return str(nid)
 
+    metrics = EmbeddingServerMetrics("hnsw", zmq_port, model_name, metrics_file)
+
+    def _lookup_texts(node_ids) -> tuple[list[str], list[int]]:
+        """Texts of the passages behind ``node_ids`` and their positions in the request."""
+        texts: list[str] = []
+        found_indices: list[int] = []
+        for idx, nid in enumerate(node_ids):
+            try:
+                passage_id = _map_node_id(nid)
+                passage_data = passages.get_passage(passage_id)
+                txt = passage_data.get("text", "")
+                if isinstance(txt, str) and len(txt) > 0:
+                    texts.append(txt)
+                    found_indices.append(idx)
+                else:
+                    logger.error(f"Empty text for passage ID {passage_id}")
+            except KeyError:
+                logger.error(f"Passage ID {nid} not found")
+            except Exception as e:
+                logger.error(f"Exception looking up passage ID {nid}: {e}")
+        if len(texts) < len(node_ids):
+            metrics.count("passages_missing", len(node_ids) - len(texts))
+        return texts, found_indices
+
+    def _embed(texts: list[str], lookup_seconds: float = 0.0) -> np.ndarray:
+        start = time.time()
+        embeddings = compute_embeddings(
+            texts,
+            model_name,
+            mode=embedding_mode,
+            provider_options=PROVIDER_OPTIONS,
+        )
+        metrics.record_embedding(len(texts), lookup_seconds, time.time() - start)
+        return embeddings
+
     # (legacy ZMQ thread removed; using shutdown-capable server only)
 
     def zmq_server_thread_with_shutdown(shutdown_event):
@@ -166,6 +205,14 @@ def create_hnsw_embedding_server(
         last_request_type = "unknown"  # 'text' | 'distance' | 'embedding' | 'unknown'
         last_request_length = 0
 
+        def _finish_request(kind: str, seconds: float) -> None:
+            metrics.in_flight = 0
+            metrics.record_request(kind, seconds)
+            # A request already waiting once this reply is out had to queue behind it
+            if rep_socket.getsockopt(zmq.EVENTS) & zmq.POLLIN:
+                metrics.count("queued_requests")
+            metrics.write_prometheus()
+
         try:
             while not shutdown_event.is_set():
                 try:
@@ -179,8 +226,16 @@ def create_hnsw_embedding_server(
                     if len(request) == 1 and request[0] == "__QUERY_MODEL__":
                         response_bytes = msgpack.packb([model_name])
                         rep_socket.send(response_bytes)
+                        metrics.record_request("query_model", time.time() - e2e_start)
+                        continue
+
+                    if len(request) == 1 and request[0] == STATS_MESSAGE:
+                        metrics.record_request("stats", time.time() - e2e_start)
+                        rep_socket.send(msgpack.packb(metrics.snapshot()))
                         continue
 
+                    metrics.in_flight = 1
+
                     # Handle direct text embedding request
                     if (
                         isinstance(request, list)
@@ -189,15 +244,11 @@ def create_hnsw_embedding_server(
                     ):
                         last_request_type = "text"
                         last_request_length = len(request)
-                        embeddings = compute_embeddings(
-                            request,
-                            model_name,
-                            mode=embedding_mode,
-                            provider_options=PROVIDER_OPTIONS,
-                        )
+                        embeddings = _embed(request)
                         rep_socket.send(msgpack.packb(embeddings.tolist()))
                         e2e_end = time.time()
                         logger.info(f"⏱️  Text embedding E2E time: {e2e_end - e2e_start:.6f}s")
+                        _finish_request("text", e2e_end - e2e_start)
                         continue
 
                     # Handle distance calculation request: [[ids], [query_vector]]
@@ -220,35 +271,18 @@ def create_hnsw_embedding_server(
                         logger.debug(f"    Query vector dim: {len(query_vector)}")
 
                         # Gather texts for found ids
-                        texts: list[str] = []
-                        found_indices: list[int] = []
-                        for idx, nid in enumerate(node_ids):
-                            try:
-                                passage_id = _map_node_id(nid)
-                                passage_data = passages.get_passage(passage_id)
-                                txt = passage_data.get("text", "")
-                                if isinstance(txt, str) and len(txt) > 0:
-                                    texts.append(txt)
-                                    found_indices.append(idx)
-                                else:
-                                    logger.error(f"Empty text for passage ID {passage_id}")
-                            except KeyError:
-                                logger.error(f"Passage ID {nid} not found")
-                            except Exception as e:
-                                logger.error(f"Exception looking up passage ID {nid}: {e}")
+                        lookup_start = time.time()
+                        texts, found_indices = _lookup_texts(node_ids)
+                        lookup_time = time.time() - lookup_start
 
                         # Prepare full-length response with large sentinel values
                         large_distance = 1e9
                         response_distances = [large_distance] * len(node_ids)
+                        computed = False
 
                         if texts:
                             try:
-                                embeddings = compute_embeddings(
-                                    texts,
-                                    model_name,
-                                    mode=embedding_mode,
-                                    provider_options=PROVIDER_OPTIONS,
-                                )
+                                embeddings = _embed(texts, lookup_time)
                                 logger.info(
                                     f"Computed embeddings for {len(texts)} texts, shape: {embeddings.shape}"
                                 )
@@ -261,13 +295,17 @@ def create_hnsw_embedding_server(
 
                                 for pos, dval in zip(found_indices, partial.flatten().tolist()):
                                     response_distances[pos] = float(dval)
+                                computed = True
                             except Exception as e:
                                 logger.error(f"Distance computation error, using sentinels: {e}")
+                        if not computed or len(texts) < len(node_ids):
+                            metrics.count("fallback_responses")
 
                         # Send response in expected shape [[distances]]
                         rep_socket.send(msgpack.packb([response_distances], use_single_float=True))
                         e2e_end = time.time()
                         logger.info(f"⏱️  Distance calculation E2E time: {e2e_end - e2e_start:.6f}s")
+                        _finish_request("distance", e2e_end - e2e_start)
                         continue
 
                     # Fallback: treat as embedding-by-id request
@@ -294,31 +332,14 @@ def create_hnsw_embedding_server(
                         flat_data = [0.0] * (dims[0] * dims[1])
 
                     # Collect texts for found ids
-                    texts: list[str] = []
-                    found_indices: list[int] = []
-                    for idx, nid in enumerate(node_ids):
-                        try:
-                            passage_id = _map_node_id(nid)
-                            passage_data = passages.get_passage(passage_id)
-                            txt = passage_data.get("text", "")
-                            if isinstance(txt, str) and len(txt) > 0:
-                                texts.append(txt)
-                                found_indices.append(idx)
-                            else:
-                                logger.error(f"Empty text for passage ID {passage_id}")
-                        except KeyError:
-                            logger.error(f"Passage with ID {nid} not found")
-                        except Exception as e:
-                            logger.error(f"Exception looking up passage ID {nid}: {e}")
+                    lookup_start = time.time()
+                    texts, found_indices = _lookup_texts(node_ids)
+                    lookup_time = time.time() - lookup_start
+                    computed = False
 
                     if texts:
                         try:
-                            embeddings = compute_embeddings(
-                                texts,
-                                model_name,
-                                mode=embedding_mode,
-                                provider_options=PROVIDER_OPTIONS,
-                            )
+                            embeddings = _embed(texts, lookup_time)
                             logger.info(
                                 f"Computed embeddings for {len(texts)} texts, shape: {embeddings.shape}"
                             )
@@ -339,8 +360,11 @@ def create_hnsw_embedding_server(
                                         flat_data[start:end] = flat[
                                             j * embedding_dim : (j + 1) * embedding_dim
                                         ]
+                                computed = True
                         except Exception as e:
                             logger.error(f"Embedding computation error, returning zeros: {e}")
+                    if not computed or len(texts) < len(node_ids):
+                        metrics.count("fallback_responses")
 
                     response_payload = [dims, flat_data]
                     response_bytes = msgpack.packb(response_payload, use_single_float=True)
@@ -348,6 +372,7 @@ def create_hnsw_embedding_server(
                     rep_socket.send(response_bytes)
                     e2e_end = time.time()
                     logger.info(f"⏱️  ZMQ E2E time: {e2e_end - e2e_start:.6f}s")
+                    _finish_request("embedding", e2e_end - e2e_start)
 
                 except zmq.Again:
                     # Timeout - check shutdown_event and continue
@@ -355,6 +380,8 @@ def create_hnsw_embedding_server(
                 except Exception as e:
                     if not shutdown_event.is_set():
                         logger.error(f"Error in ZMQ server loop: {e}")
+                        metrics.count("errors")
+                        metrics.in_flight = 0
                         # Shape-correct fallback
                         try:
                             if last_request_type == "distance":
@@ -372,12 +399,14 @@ def create_hnsw_embedding_server(
                             else:
                                 safe = [[0, int(embedding_dim) if embedding_dim > 0 else 0], []]
                             rep_socket.send(msgpack.packb(safe, use_single_float=True))
+                            metrics.count("fallback_responses")
                         except Exception:
                             pass
                     else:
                         logger.info("Shutdown in progress, ignoring ZMQ error")
                         break
         finally:
+            metrics.write_prometheus(force=True)
             try:
                 rep_socket.close(0)
             except Exception:
@@ -481,6 +510,12 @@ if __name__ == "__main__":
         choices=["sentence-transformers", "openai", "mlx", "ollama"],
         help="Embedding backend mode",
     )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default=os.getenv("LEANN_METRICS_FILE"),
+        help="Write Prometheus metrics to this file; '{port}' is replaced by the ZMQ port",
+    )
 
     args = parser.parse_args()
 
@@ -491,4 +526,5 @@ if __name__ == "__main__":
         model_name=args.model_name,
         distance_metric=args.distance_metric,
         embedding_mode=args.embedding_mode,
+        metrics_file=args.metrics_file,
     )
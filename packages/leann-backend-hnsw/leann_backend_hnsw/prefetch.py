@@ -0,0 +1,132 @@
+"""
+Pipelined recompute traversal with speculative neighbor prefetch.
+
+A recompute search normally blocks on the embedding server for every node it
+expands, so the graph walk and the embedding model never run at the same time.
+:class:`PrefetchingDistances` lets the walk request distances for the likely
+next frontier (the unvisited neighbors of the best ``depth`` candidates) on a
+background thread while the current expansion is processed. Prefetched nodes
+that the walk never asks for are counted as wasted work.
+"""
+
+import heapq
+import logging
+from concurrent.futures import Executor, Future
+from typing import Callable
+
+import numpy as np
+
+from .two_stage import HNSWGraph, hnsw_search
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchingDistances:
+    """Distance cache for one query that is filled by synchronous and speculative fetches.
+
+    Args:
+        fetch: Returns exact distances (lower is closer) for an array of node ids
+        prefetch_fetch: Same as ``fetch``, run on ``executor``; it must use its own
+            connection because the synchronous path may be requesting at the same time
+        executor: Runs prefetch requests in the background
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[np.ndarray], np.ndarray],
+        prefetch_fetch: Callable[[np.ndarray], np.ndarray],
+        executor: Executor,
+    ):
+        self._fetch = fetch
+        self._prefetch_fetch = prefetch_fetch
+        self._executor = executor
+        self._cache: dict[int, float] = {}
+        self._in_flight: dict[int, Future] = {}
+        self._futures: dict[Future, np.ndarray] = {}
+        self._prefetched: set[int] = set()
+        self._used: set[int] = set()
+        self.stats = {
+            "requests": 0,
+            "fetched": 0,
+            "prefetch_requests": 0,
+            "prefetched": 0,
+            "prefetch_hits": 0,
+            "prefetch_wasted": 0,
+        }
+
+    def prefetch(self, ids: np.ndarray) -> None:
+        """Request distances for ``ids`` in the background unless already known."""
+        new = [i for i in dict.fromkeys(ids.tolist()) if i not in self._cache]
+        new = [i for i in new if i not in self._in_flight]
+        if not new:
+            return
+        batch = np.array(new, dtype=np.int64)
+        future = self._executor.submit(self._prefetch_fetch, batch)
+        self._futures[future] = batch
+        for i in new:
+            self._in_flight[i] = future
+        self._prefetched.update(new)
+        self.stats["prefetch_requests"] += 1
+        self.stats["prefetched"] += len(new)
+
+    def _absorb(self, future: Future) -> None:
+        batch = self._futures.pop(future)
+        try:
+            values = np.asarray(future.result(), dtype=np.float32)
+        except Exception as e:
+            # A failed prefetch is only lost work; the ids fall back to a synchronous fetch
+            logger.warning(f"Prefetch request failed: {e}")
+            values = None
+        for pos, i in enumerate(batch.tolist()):
+            self._in_flight.pop(i, None)
+            if values is not None:
+                self._cache[i] = float(values[pos])
+
+    def __call__(self, ids: np.ndarray) -> np.ndarray:
+        wanted = ids.tolist()
+        for future in {self._in_flight[i] for i in wanted if i in self._in_flight}:
+            self._absorb(future)
+        missing = [i for i in wanted if i not in self._cache]
+        if missing:
+            values = np.asarray(self._fetch(np.array(missing, dtype=np.int64)), dtype=np.float32)
+            self.stats["requests"] += 1
+            self.stats["fetched"] += len(missing)
+            for i, value in zip(missing, values.tolist()):
+                self._cache[i] = value
+        fresh = set(wanted) - self._used
+        self.stats["prefetch_hits"] += len(fresh & self._prefetched)
+        self._used.update(fresh)
+        return np.array([self._cache[i] for i in wanted], dtype=np.float32)
+
+    def finish(self) -> dict[str, int]:
+        """Wait for outstanding prefetches and return the final counters."""
+        for future in list(self._futures):
+            self._absorb(future)
+        self.stats["prefetch_wasted"] = len(self._prefetched - self._used)
+        return self.stats
+
+
+def search_with_prefetch(
+    graph: HNSWGraph,
+    distances: PrefetchingDistances,
+    ef: int,
+    depth: int,
+    stats: dict[str, int],
+) -> tuple[np.ndarray, np.ndarray]:
+    """:func:`hnsw_search` that prefetches the neighbors of the best ``depth`` candidates.
+
+    Prefetching several candidates at once also batches their neighbor lists into
+    one request instead of one round trip per expansion.
+    """
+
+    def lookahead(candidates: list[tuple[float, int]], visited: np.ndarray) -> None:
+        frontier = [node for _, node in heapq.nsmallest(depth, candidates)]
+        if not frontier:
+            return
+        nbrs = np.concatenate([graph.neighbors(node, 0) for node in frontier])
+        distances.prefetch(nbrs[~visited[nbrs]])
+
+    result = hnsw_search(graph, distances, ef, stats, lookahead=lookahead)
+    for key, value in distances.finish().items():
+        stats[key] = stats.get(key, 0) + value
+    return result
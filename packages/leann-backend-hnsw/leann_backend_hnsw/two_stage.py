@@ -0,0 +1,243 @@
+"""
+Two-stage HNSW search: approximate traversal on compact codes, exact rerank.
+
+Recompute search asks the embedding server for every neighbor it expands,
+which costs one ZMQ round trip per hop. With compact codes stored at build
+time the whole graph walk runs locally on dequantized codes, and only the
+final ``rerank_k`` candidates are sent to the embedding server in one batched
+distance request (the same "deferred fetch" strategy DiskANN uses).
+
+Codes live next to the index as ``<prefix>.codes.npy`` (one row per node) and
+``<prefix>.codes.params.npy`` (a ``(2, D)`` array of quantizer parameters).
+"""
+
+import heapq
+import logging
+from pathlib import Path
+from typing import Callable, Literal, Optional
+
+import numpy as np
+
+from .convert_to_csr import _read_hnsw_structure_from_file
+
+logger = logging.getLogger(__name__)
+
+CodeKind = Literal["sq8", "binary"]
+CODE_KINDS = ("sq8", "binary")
+
+
+def codes_paths(index_file: Path) -> tuple[Path, Path]:
+    """Paths of the code and quantizer-parameter files for ``<prefix>.index``."""
+    stem = index_file.with_suffix("")
+    return stem.with_suffix(".codes.npy"), stem.with_suffix(".codes.params.npy")
+
+
+class CompactCodes:
+    """Per-node scalar (8-bit) or binary (1-bit) codes with asymmetric distances.
+
+    ``sq8`` stores each dimension as ``round((x - vmin) / scale)``; ``binary``
+    stores the sign of ``x - mean`` and reconstructs ``mean +/- mean_abs_dev``.
+    In both cases ``params`` is a ``(2, D)`` float32 array (offset, scale).
+    """
+
+    def __init__(self, kind: CodeKind, codes: np.ndarray, params: np.ndarray):
+        if kind not in CODE_KINDS:
+            raise ValueError(f"Unknown compact code kind '{kind}'. Use one of {CODE_KINDS}.")
+        self.kind = kind
+        self.codes = codes
+        self.params = params.astype(np.float32, copy=False)
+        self.dim = self.params.shape[1]
+
+    def __len__(self) -> int:
+        return int(self.codes.shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes + self.params.nbytes)
+
+    @classmethod
+    def train(cls, data: np.ndarray, kind: CodeKind) -> "CompactCodes":
+        """Fit the quantizer on ``data`` and encode it."""
+        data = np.asarray(data, dtype=np.float32)
+        if kind == "sq8":
+            vmin = data.min(axis=0)
+            scale = (data.max(axis=0) - vmin) / 255.0
+            scale[scale == 0] = 1.0
+            params = np.stack([vmin, scale])
+        elif kind == "binary":
+            mean = data.mean(axis=0)
+            spread = np.abs(data - mean).mean(axis=0)
+            params = np.stack([mean, spread])
+        else:
+            raise ValueError(f"Unknown compact code kind '{kind}'. Use one of {CODE_KINDS}.")
+        empty = np.empty((0, 0), dtype=np.uint8)
+        quantizer = cls(kind, empty, params)
+        quantizer.codes = quantizer.encode(data)
+        return quantizer
+
+    def encode(self, data: np.ndarray) -> np.ndarray:
+        data = np.asarray(data, dtype=np.float32)
+        offset, scale = self.params
+        if self.kind == "sq8":
+            return np.clip(np.rint((data - offset) / scale), 0, 255).astype(np.uint8)
+        return np.packbits(data > offset, axis=1)
+
+    def decode(self, ids: np.ndarray) -> np.ndarray:
+        """Reconstruct float32 vectors for the given node ids."""
+        rows = self.codes[ids]
+        offset, scale = self.params
+        if self.kind == "sq8":
+            return rows.astype(np.float32) * scale + offset
+        signs = np.unpackbits(rows, axis=1, count=self.dim).astype(np.float32) * 2.0 - 1.0
+        return signs * scale + offset
+
+    def distances(self, query: np.ndarray, ids: np.ndarray, metric: str) -> np.ndarray:
+        """Approximate distances from ``query`` to ``ids`` (lower is closer)."""
+        vectors = self.decode(ids)
+        if metric == "l2":
+            diff = vectors - query
+            return np.einsum("ij,ij->i", diff, diff)
+        return -(vectors @ query)
+
+    def append(self, data: np.ndarray) -> None:
+        """Encode new vectors with the existing quantizer parameters."""
+        self.codes = np.concatenate([np.asarray(self.codes), self.encode(data)])
+
+    def save(self, index_file: Path) -> None:
+        codes_file, params_file = codes_paths(index_file)
+        np.save(codes_file, np.ascontiguousarray(self.codes))
+        np.save(params_file, self.params)
+
+    @classmethod
+    def load(cls, index_file: Path, kind: CodeKind, mmap: bool = True) -> "CompactCodes":
+        codes_file, params_file = codes_paths(index_file)
+        if not codes_file.exists() or not params_file.exists():
+            raise FileNotFoundError(
+                f"Compact codes not found next to {index_file}. "
+                "Rebuild the index with compact_codes='sq8' or 'binary'."
+            )
+        codes = np.load(codes_file, mmap_mode="r" if mmap else None)
+        return cls(kind, codes, np.load(params_file))
+
+
+class HNSWGraph:
+    """Read-only HNSW adjacency loaded from a compact (CSR) or original index file."""
+
+    def __init__(self, index_file: Path):
+        components = _read_hnsw_structure_from_file(str(index_file))
+        data = components.original_hnsw_data
+        self.entry_point = int(data["entry_point"])
+        self.max_level = int(data["max_level"])
+        self.levels = components.levels_np
+        self.is_compact = components.is_compact
+        if components.is_compact:
+            self._level_ptr = components.compact_level_ptr.astype(np.int64)
+            self._node_offsets = components.compact_node_offsets_np.astype(np.int64)
+            self._neighbors = np.asarray(components.compact_neighbors_data, dtype=np.int32)
+        else:
+            self._offsets = components.offsets_np.astype(np.int64)
+            self._cum = components.cum_nneighbor_per_level_np.astype(np.int64)
+            self._neighbors = components.neighbors_np
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def neighbors(self, node: int, level: int) -> np.ndarray:
+        if level >= self.levels[node]:
+            return self._neighbors[:0]
+        if self.is_compact:
+            ptr = self._node_offsets[node] + level
+            return self._neighbors[self._level_ptr[ptr] : self._level_ptr[ptr + 1]]
+        base = self._offsets[node]
+        block = self._neighbors[base + self._cum[level] : base + self._cum[level + 1]]
+        return block[block >= 0]
+
+
+def hnsw_search(
+    graph: HNSWGraph,
+    distances: Callable[[np.ndarray], np.ndarray],
+    ef: int,
+    stats: Optional[dict[str, int]] = None,
+    lookahead: Optional[Callable[[list[tuple[float, int]], np.ndarray], None]] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Standard HNSW search: greedy descent, then an ``ef`` beam on level 0.
+
+    Args:
+        graph: Graph to walk
+        distances: Maps an array of node ids to distances from the query (lower is closer)
+        ef: Beam width on level 0, and the number of results returned
+        stats: Optional dict that accumulates ``hops`` and ``distances`` counters
+        lookahead: Called with the candidate heap and visited mask after each level-0
+            expansion, e.g. to prefetch distances for the likely-next frontier
+
+    Returns:
+        ``(ids, distances)`` of up to ``ef`` nodes, closest first.
+    """
+    if len(graph) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+    hops = 0
+    evaluated = 1
+    entry = graph.entry_point
+    entry_dist = float(distances(np.array([entry]))[0])
+
+    for level in range(graph.max_level, 0, -1):
+        improved = True
+        while improved:
+            improved = False
+            nbrs = graph.neighbors(entry, level)
+            if len(nbrs) == 0:
+                break
+            hops += 1
+            evaluated += len(nbrs)
+            dists = distances(nbrs)
+            best = int(np.argmin(dists))
+            if dists[best] < entry_dist:
+                entry, entry_dist = int(nbrs[best]), float(dists[best])
+                improved = True
+
+    visited = np.zeros(len(graph), dtype=bool)
+    visited[entry] = True
+    candidates = [(entry_dist, entry)]
+    # Max-heap (negated distances) of the best ``ef`` nodes found so far
+    best_heap = [(-entry_dist, entry)]
+    while candidates:
+        dist, node = heapq.heappop(candidates)
+        if len(best_heap) >= ef and dist > -best_heap[0][0]:
+            break
+        nbrs = graph.neighbors(node, 0)
+        nbrs = nbrs[~visited[nbrs]]
+        if len(nbrs) == 0:
+            continue
+        visited[nbrs] = True
+        hops += 1
+        evaluated += len(nbrs)
+        for d, n in zip(distances(nbrs).tolist(), nbrs.tolist()):
+            if len(best_heap) < ef or d < -best_heap[0][0]:
+                heapq.heappush(candidates, (d, n))
+                heapq.heappush(best_heap, (-d, n))
+                if len(best_heap) > ef:
+                    heapq.heappop(best_heap)
+        if lookahead is not None:
+            lookahead(candidates, visited)
+
+    if stats is not None:
+        stats["hops"] = stats.get("hops", 0) + hops
+        stats["distances"] = stats.get("distances", 0) + evaluated
+
+    ordered = sorted((-d, n) for d, n in best_heap)
+    ids = np.array([n for _, n in ordered], dtype=np.int64)
+    dists = np.array([d for d, _ in ordered], dtype=np.float32)
+    return ids, dists
+
+
+def search_codes(
+    graph: HNSWGraph,
+    codes: CompactCodes,
+    query: np.ndarray,
+    ef: int,
+    metric: str,
+    stats: Optional[dict[str, int]] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """:func:`hnsw_search` with approximate distances computed from ``codes``."""
+    return hnsw_search(graph, lambda ids: codes.distances(query, ids, metric), ef, stats)
@@ -1,4 +1,5 @@
 # packages/leann-core/src/leann/__init__.py
+import importlib
 import os
 import platform
 
@@ -13,9 +14,33 @@ if platform.system() == "Darwin":
         os.environ["PYTORCH_ENABLE_MPS_FALLBACK"] = "0"
         os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-from .api import LeannBuilder, LeannChat, LeannSearcher
-from .registry import BACKEND_REGISTRY, autodiscover_backends
+from .registry import BACKEND_REGISTRY
 
-autodiscover_backends()
+# Resolved on first access so `import leann` (and the CLI) does not pay for the
+# embedding, LLM and backend stacks up front
+_LAZY_EXPORTS = {
+    "AsyncLeannSearcher": ".api",
+    "LeannBuilder": ".api",
+    "LeannChat": ".api",
+    "LeannSearcher": ".api",
+    "SearchStats": ".tracing",
+}
 
-__all__ = ["BACKEND_REGISTRY", "LeannBuilder", "LeannChat", "LeannSearcher"]
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = [
+    "BACKEND_REGISTRY",
+    "AsyncLeannSearcher",
+    "LeannBuilder",
+    "LeannChat",
+    "LeannSearcher",
+    "SearchStats",
+]
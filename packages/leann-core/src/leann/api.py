@@ -3,35 +3,66 @@ This file contains the core API for the LEANN project, now definitively updated
 with the correct, original embedding logic from the user's reference code.
 """
 
+import asyncio
+import contextvars
+import functools
 import json
 import logging
 import os
 import pickle
 import re
-import subprocess
+import threading
 import time
 import warnings
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Literal, Optional, Union
+from typing import TYPE_CHECKING, Any, Literal, Optional, Union
 
 import numpy as np
-from leann_backend_hnsw.convert_to_csr import prune_hnsw_embeddings_inplace
 
 from leann.interactive_utils import create_api_session
 from leann.interface import LeannBackendSearcherInterface
 
-from .chat import get_llm
 from .embedding_server_manager import EmbeddingServerManager
+from .exact import EXACT_SEARCH_THRESHOLD, ExactIndex
+from .hybrid import HYBRID_CANDIDATE_FACTOR, FusionMethod, fuse_results
+from .id_map import IdMap, id_map_prefix, load_passage_offsets, save_passage_offsets
 from .interface import LeannBackendFactoryInterface
+from .keyword_index import KeywordIndex, keyword_index_dir, source_signature, tokenize
 from .metadata_filter import MetadataFilterEngine
-from .registry import BACKEND_REGISTRY
+from .registry import BACKEND_REGISTRY, autodiscover_backends, get_backend
+from .rerank import RERANK_CANDIDATE_FACTOR, get_reranker
+from .sharding import (
+    DEFAULT_MAX_SHARD_SERVERS,
+    SHARD_STRATEGIES,
+    ShardStrategy,
+    build_sharded_index,
+    open_shards,
+    search_shards,
+    warm_shards,
+)
+from .tracing import (
+    SearchStats,
+    Tracer,
+    active_stats,
+    search_phase,
+    traced_async_search,
+    traced_search,
+)
+from .zmq_client import AsyncEmbeddingServerClient
+
+if TYPE_CHECKING:
+    # Imported on first use: the LLM stack is heavy and only LeannChat needs it
+    from .chat import LLMInterface
 
 logger = logging.getLogger(__name__)
 
 
 def get_registered_backends() -> list[str]:
-    """Get list of registered backend names."""
+    """Get list of registered backend names, importing installed backends first."""
+    autodiscover_backends()
     return list(BACKEND_REGISTRY.keys())
 
 
@@ -124,11 +155,27 @@ class SearchResult:
     metadata: dict[str, Any] = field(default_factory=dict)
 
 
+SEARCH_MODES = ("vector", "keyword", "hybrid")
+
+
+@dataclass
+class _SearchRoute:
+    """Where one search call goes, decided by :meth:`LeannSearcher._route_search`.
+
+    ``path`` is "rerank", "grep", "keyword", "hybrid", "exact", "shards" or "graph";
+    ``top_k`` is what that path should fetch and ``plan`` is set for "exact".
+    """
+
+    path: str
+    top_k: int
+    plan: Optional[tuple[ExactIndex, Optional[np.ndarray]]] = None
+
+
 class PassageManager:
     def __init__(
         self, passage_sources: list[dict[str, Any]], metadata_file_path: Optional[str] = None
     ):
-        self.offset_maps: dict[str, dict[str, int]] = {}
+        self.offset_maps: dict[str, Mapping[str, int]] = {}
         self.passage_files: dict[str, str] = {}
         # Avoid materializing a single gigantic global map to reduce memory
         # footprint on very large corpora (e.g., 60M+ passages). Instead, keep
@@ -202,11 +249,10 @@ class PassageManager:
             if not Path(index_file).exists():
                 raise FileNotFoundError(f"Passage index file not found: {index_file}")
 
-            with open(index_file, "rb") as f:
-                offset_map: dict[str, int] = pickle.load(f)
-                self.offset_maps[passage_file] = offset_map
-                self.passage_files[passage_file] = passage_file
-                self._total_count += len(offset_map)
+            offset_map = load_passage_offsets(index_file)
+            self.offset_maps[passage_file] = offset_map
+            self.passage_files[passage_file] = passage_file
+            self._total_count += len(offset_map)
 
     def get_passage(self, passage_id: str) -> dict[str, Any]:
         # Fast path: check each shard map (there are typically few shards).
@@ -284,9 +330,26 @@ class LeannBuilder:
         dimensions: Optional[int] = None,
         embedding_mode: str = "sentence-transformers",
         embedding_options: Optional[dict[str, Any]] = None,
+        keyword_index: bool = False,
+        exact_embeddings: Optional[bool] = None,
+        num_shards: int = 1,
+        shard_by: ShardStrategy = "hash",
+        shard_workers: Optional[int] = None,
         **backend_kwargs,
     ):
         self.backend_name = backend_name
+        # Split the corpus into this many independently built graphs (see leann.sharding)
+        if num_shards < 1:
+            raise ValueError(f"num_shards must be at least 1, got {num_shards}")
+        if shard_by not in SHARD_STRATEGIES:
+            raise ValueError(f"shard_by must be one of {SHARD_STRATEGIES}, got '{shard_by}'")
+        self.num_shards = num_shards
+        self.shard_by = shard_by
+        self.shard_workers = shard_workers
+        # Also build the inverted index used by keyword search (otherwise built on first use)
+        self.keyword_index = keyword_index
+        # Keep fp16 embeddings for exact search; None = only for small indexes
+        self.exact_embeddings = exact_embeddings
         # Normalize incompatible combinations early (for consistent metadata)
         if backend_name == "hnsw":
             is_recompute = backend_kwargs.get("is_recompute", True)
@@ -299,7 +362,7 @@ class LeannBuilder:
                 )
                 backend_kwargs["is_compact"] = False
 
-        backend_factory: Optional[LeannBackendFactoryInterface] = BACKEND_REGISTRY.get(backend_name)
+        backend_factory: Optional[LeannBackendFactoryInterface] = get_backend(backend_name)
         if backend_factory is None:
             raise ValueError(f"Backend '{backend_name}' not found or not registered.")
         self.backend_factory = backend_factory
@@ -387,6 +450,86 @@ class LeannBuilder:
         chunk_data = {"id": passage_id, "text": text, "metadata": metadata}
         self.chunks.append(chunk_data)
 
+    def _build_keyword_index(self, index_path: str, passages_file: Path):
+        start = time.time()
+        KeywordIndex.build(
+            keyword_index_dir(index_path),
+            ((str(c["id"]), c["text"]) for c in self.chunks),
+            source_signature([str(passages_file)]),
+        )
+        logger.info(f"Built keyword index in {time.time() - start:.2f}s")
+
+    def _write_exact_index(self, index_path: str, embeddings: np.ndarray, ids: list[str]):
+        if self.exact_embeddings is False:
+            return
+        if self.exact_embeddings is None and len(ids) > EXACT_SEARCH_THRESHOLD:
+            return
+        ExactIndex.write(
+            index_path, embeddings, ids, self.backend_kwargs.get("distance_metric", "mips")
+        )
+        logger.info(f"Stored fp16 embeddings of {len(ids)} passages for exact search")
+
+    def _write_passages(
+        self, passages_file: Path, offset_file: Path, chunks: list[dict[str, Any]]
+    ) -> None:
+        offset_map = {}
+        with open(passages_file, "w", encoding="utf-8") as f:
+            try:
+                from tqdm import tqdm
+
+                chunk_iterator = tqdm(chunks, desc="Writing passages", unit="chunk")
+            except ImportError:
+                chunk_iterator = chunks
+
+            for chunk in chunk_iterator:
+                offset = f.tell()
+                json.dump(
+                    {
+                        "id": chunk["id"],
+                        "text": chunk["text"],
+                        "metadata": chunk["metadata"],
+                    },
+                    f,
+                    ensure_ascii=False,
+                )
+                f.write("\n")
+                offset_map[chunk["id"]] = offset
+        save_passage_offsets(offset_file, offset_map)
+
+    def _meta_data(self, passage_files: list[tuple[Path, Path]]) -> dict[str, Any]:
+        """meta.json contents for an index over ``(passages_file, offset_file)`` pairs."""
+        meta_data = {
+            "version": "1.0",
+            "backend_name": self.backend_name,
+            "embedding_model": self.embedding_model,
+            "dimensions": self.dimensions,
+            "backend_kwargs": self.backend_kwargs,
+            "embedding_mode": self.embedding_mode,
+            "passage_sources": [
+                {
+                    "type": "jsonl",
+                    # Preserve existing relative file names (backward-compatible)
+                    "path": passages_file.name,
+                    "index_path": offset_file.name,
+                    # Add optional redundant relative keys for remote build portability (non-breaking)
+                    "path_relative": passages_file.name,
+                    "index_path_relative": offset_file.name,
+                }
+                for passages_file, offset_file in passage_files
+            ],
+        }
+
+        if self.embedding_options:
+            meta_data["embedding_options"] = self.embedding_options
+
+        # Add storage status flags for HNSW backend
+        if self.backend_name == "hnsw":
+            is_compact = self.backend_kwargs.get("is_compact", True)
+            is_recompute = self.backend_kwargs.get("is_recompute", True)
+            meta_data["is_compact"] = is_compact
+            meta_data["is_pruned"] = bool(is_recompute)
+        return meta_data
+
     def build_index(self, index_path: str):
         if not self.chunks:
             raise ValueError("No chunks added.")
@@ -417,36 +560,18 @@ class LeannBuilder:
                     provider_options=self.embedding_options,
                 )[0]
             )
+        if self.num_shards > 1:
+            build_sharded_index(self, index_path)
+            return
         path = Path(index_path)
         index_dir = path.parent
         index_name = path.name
         index_dir.mkdir(parents=True, exist_ok=True)
         passages_file = index_dir / f"{index_name}.passages.jsonl"
         offset_file = index_dir / f"{index_name}.passages.idx"
-        offset_map = {}
-        with open(passages_file, "w", encoding="utf-8") as f:
-            try:
-                from tqdm import tqdm
-
-                chunk_iterator = tqdm(self.chunks, desc="Writing passages", unit="chunk")
-            except ImportError:
-                chunk_iterator = self.chunks
-
-            for chunk in chunk_iterator:
-                offset = f.tell()
-                json.dump(
-                    {
-                        "id": chunk["id"],
-                        "text": chunk["text"],
-                        "metadata": chunk["metadata"],
-                    },
-                    f,
-                    ensure_ascii=False,
-                )
-                f.write("\n")
-                offset_map[chunk["id"]] = offset
-        with open(offset_file, "wb") as f:
-            pickle.dump(offset_map, f)
+        self._write_passages(passages_file, offset_file, self.chunks)
+        if self.keyword_index:
+            self._build_keyword_index(index_path, passages_file)
         texts_to_embed = [c["text"] for c in self.chunks]
         embeddings = compute_embeddings(
             texts_to_embed,
@@ -458,49 +583,13 @@ class LeannBuilder:
         )
         string_ids = [chunk["id"] for chunk in self.chunks]
         # Persist ID map alongside index so backends that return integer labels can remap to passage IDs
-        try:
-            idmap_file = (
-                index_dir
-                / f"{index_name[: -len('.leann')] if index_name.endswith('.leann') else index_name}.ids.txt"
-            )
-            with open(idmap_file, "w", encoding="utf-8") as f:
-                for sid in string_ids:
-                    f.write(str(sid) + "\n")
-        except Exception:
-            pass
+        IdMap.from_ids(string_ids).save(id_map_prefix(index_path))
         current_backend_kwargs = {**self.backend_kwargs, "dimensions": self.dimensions}
         builder_instance = self.backend_factory.builder(**current_backend_kwargs)
         builder_instance.build(embeddings, string_ids, index_path, **current_backend_kwargs)
+        self._write_exact_index(index_path, embeddings, string_ids)
         leann_meta_path = index_dir / f"{index_name}.meta.json"
-        meta_data = {
-            "version": "1.0",
-            "backend_name": self.backend_name,
-            "embedding_model": self.embedding_model,
-            "dimensions": self.dimensions,
-            "backend_kwargs": self.backend_kwargs,
-            "embedding_mode": self.embedding_mode,
-            "passage_sources": [
-                {
-                    "type": "jsonl",
-                    # Preserve existing relative file names (backward-compatible)
-                    "path": passages_file.name,
-                    "index_path": offset_file.name,
-                    # Add optional redundant relative keys for remote build portability (non-breaking)
-                    "path_relative": passages_file.name,
-                    "index_path_relative": offset_file.name,
-                }
-            ],
-        }
-
-        if self.embedding_options:
-            meta_data["embedding_options"] = self.embedding_options
-
-        # Add storage status flags for HNSW backend
-        if self.backend_name == "hnsw":
-            is_compact = self.backend_kwargs.get("is_compact", True)
-            is_recompute = self.backend_kwargs.get("is_recompute", True)
-            meta_data["is_compact"] = is_compact
-            meta_data["is_pruned"] = bool(is_recompute)
+        meta_data = self._meta_data([(passages_file, offset_file)])
         with open(leann_meta_path, "w", encoding="utf-8") as f:
             json.dump(meta_data, f, indent=2)
 
@@ -582,25 +671,18 @@ class LeannBuilder:
                 f.write("\n")
                 offset_map[chunk["id"]] = offset
 
-        with open(offset_file, "wb") as f:
-            pickle.dump(offset_map, f)
+        save_passage_offsets(offset_file, offset_map)
+        if self.keyword_index:
+            self._build_keyword_index(index_path, passages_file)
 
         # Build the vector index using precomputed embeddings
         string_ids = [str(id_val) for id_val in ids]
         # Persist ID map (order == embeddings order)
-        try:
-            idmap_file = (
-                index_dir
-                / f"{index_name[: -len('.leann')] if index_name.endswith('.leann') else index_name}.ids.txt"
-            )
-            with open(idmap_file, "w", encoding="utf-8") as f:
-                for sid in string_ids:
-                    f.write(str(sid) + "\n")
-        except Exception:
-            pass
+        IdMap.from_ids(string_ids).save(id_map_prefix(index_path))
         current_backend_kwargs = {**self.backend_kwargs, "dimensions": self.dimensions}
         builder_instance = self.backend_factory.builder(**current_backend_kwargs)
         builder_instance.build(embeddings, string_ids, index_path)
+        self._write_exact_index(index_path, embeddings, string_ids)
 
         # Create metadata file
         leann_meta_path = index_dir / f"{index_name}.meta.json"
@@ -656,6 +738,8 @@ class LeannBuilder:
         offset_file = index_dir / f"{index_name}.passages.idx"
         index_file = index_dir / f"{index_prefix}.index"
 
+        if meta_path.exists() and "shards" in json.loads(meta_path.read_text(encoding="utf-8")):
+            raise ValueError("Sharded indexes cannot be updated in place; rebuild the index.")
         if not meta_path.exists() or not passages_file.exists() or not offset_file.exists():
             raise FileNotFoundError("Index metadata or passage files are missing; cannot update.")
         if not index_file.exists():
@@ -685,8 +769,7 @@ class LeannBuilder:
             or self.backend_kwargs.get("is_recompute")
         )
 
-        with open(offset_file, "rb") as f:
-            offset_map: dict[str, int] = pickle.load(f)
+        offset_map: dict[str, int] = dict(load_passage_offsets(offset_file, mmap=False))
         existing_ids = set(offset_map.keys())
 
         valid_chunks: list[dict[str, Any]] = []
@@ -789,8 +872,7 @@ class LeannBuilder:
                     f.write("\n")
                     offset_map[chunk["id"]] = offset
 
-            with open(offset_file, "wb") as f:
-                pickle.dump(offset_map, f)
+            save_passage_offsets(offset_file, offset_map)
 
             server_manager: Optional[EmbeddingServerManager] = None
             server_started = False
@@ -832,6 +914,27 @@ class LeannBuilder:
                 else:
                     index.add(embeddings.shape[0], faiss.swig_ptr(embeddings))
                 faiss.write_index(index, str(index_file))
+
+                code_kind = meta_backend_kwargs.get("compact_codes")
+                if code_kind:
+                    from leann_backend_hnsw.two_stage import CompactCodes  # type: ignore
+
+                    codes = CompactCodes.load(index_file, code_kind, mmap=False)
+                    codes.append(embeddings)
+                    codes.save(index_file)
+
+                new_ids = [chunk["id"] for chunk in valid_chunks]
+                id_map = IdMap.load(id_map_prefix(index_path), mmap=False)
+                if id_map is not None:
+                    IdMap.from_ids([*id_map, *new_ids]).save(id_map_prefix(index_path))
+
+                if ExactIndex.open(index_path) is not None:
+                    ExactIndex.append(
+                        index_path,
+                        embeddings,
+                        new_ids,
+                        distance_metric,
+                    )
             finally:
                 if server_started and server_manager is not None:
                     server_manager.stop_server()
@@ -842,14 +945,17 @@ class LeannBuilder:
                 with open(passages_file, "rb+") as f:
                     f.truncate(rollback_passages_size)
             offset_map = offset_map_backup
-            with open(offset_file, "wb") as f:
-                pickle.dump(offset_map, f)
+            save_passage_offsets(offset_file, offset_map)
             raise
 
         meta["total_passages"] = len(offset_map)
         with open(meta_path, "w", encoding="utf-8") as f:
             json.dump(meta, f, indent=2)
 
+        # Keep an existing keyword index in sync with the appended passages
+        if keyword_index_dir(index_path).exists() or self.keyword_index:
+            KeywordIndex.open_or_build(index_path, [str(passages_file)])
+
         logger.info(
             "Appended %d passages to index '%s'. New total: %d",
             len(valid_chunks),
@@ -860,15 +966,25 @@ class LeannBuilder:
         self.chunks.clear()
 
         if needs_recompute:
+            from leann_backend_hnsw.convert_to_csr import prune_hnsw_embeddings_inplace
+
             prune_hnsw_embeddings_inplace(str(index_file))
 
 
 class LeannSearcher:
-    def __init__(self, index_path: str, enable_warmup: bool = False, **backend_kwargs):
+    def __init__(
+        self,
+        index_path: str,
+        enable_warmup: bool = False,
+        tracer: Optional[Tracer] = None,
+        max_shard_servers: int = DEFAULT_MAX_SHARD_SERVERS,
+        **backend_kwargs,
+    ):
         # Fix path resolution for Colab and other environments
         if not Path(index_path).is_absolute():
             index_path = str(Path(index_path).resolve())
 
+        self.index_path = index_path
         self.meta_path_str = f"{index_path}.meta.json"
         if not Path(self.meta_path_str).exists():
             parent_dir = Path(index_path).parent
@@ -892,17 +1008,38 @@ class LeannSearcher:
         )
         # Preserve backend name for conditional parameter forwarding
         self.backend_name = backend_name
-        backend_factory = BACKEND_REGISTRY.get(backend_name)
+        backend_factory = get_backend(backend_name)
         if backend_factory is None:
             raise ValueError(f"Backend '{backend_name}' not found.")
-        final_kwargs = {**self.meta_data.get("backend_kwargs", {}), **backend_kwargs}
-        final_kwargs["enable_warmup"] = enable_warmup
-        if self.embedding_options:
-            final_kwargs.setdefault("embedding_options", self.embedding_options)
-        self.backend_impl: LeannBackendSearcherInterface = backend_factory.searcher(
-            index_path, **final_kwargs
+        # Searchers of the shards of a sharded index; vector searches fan out over them
+        if max_shard_servers < 1:
+            raise ValueError(f"max_shard_servers must be at least 1, got {max_shard_servers}")
+        self.max_shard_servers = max_shard_servers
+        self._shards: list[LeannSearcher] = []
+        if "shards" in self.meta_data:
+            self._shards = open_shards(self, enable_warmup=enable_warmup, **backend_kwargs)
+            # Each shard has its own embedding server; the first one also embeds queries
+            self.backend_impl: LeannBackendSearcherInterface = self._shards[0].backend_impl
+        else:
+            final_kwargs = {**self.meta_data.get("backend_kwargs", {}), **backend_kwargs}
+            final_kwargs["enable_warmup"] = enable_warmup
+            if self.embedding_options:
+                final_kwargs.setdefault("embedding_options", self.embedding_options)
+            self.backend_impl = backend_factory.searcher(index_path, **final_kwargs)
+        self._keyword_index: Optional[KeywordIndex] = None
+        self._keyword_index_lock = threading.Lock()
+        # Backend searchers are not thread-safe: one graph traversal at a time
+        self._backend_lock = threading.Lock()
+        self._exact_index: Optional[ExactIndex] = ExactIndex.open(
+            index_path, self.meta_data.get("backend_kwargs", {}).get("distance_metric", "mips")
         )
+        # Called with a leann.tracing.Span for every search and each of its phases
+        self.tracer = tracer
+        # Stats of the last search; last_search_stats is the same as a dict
+        self.last_stats: Optional[SearchStats] = None
+        self.last_search_stats: dict[str, Any] = {}
 
+    @traced_search
     def search(
         self,
         query: str,
@@ -917,8 +1054,17 @@ class LeannSearcher:
         batch_size: int = 0,
         use_grep: bool = False,
         provider_options: Optional[dict[str, Any]] = None,
+        search_mode: Literal["vector", "keyword", "hybrid"] = "vector",
+        hybrid_fusion: FusionMethod = "rrf",
+        hybrid_alpha: float = 0.5,
+        rerank: bool = False,
+        rerank_model: Optional[str] = None,
+        rerank_fetch_k: Optional[int] = None,
+        exact_threshold: Optional[int] = None,
+        query_embedding: Optional[np.ndarray] = None,
+        return_stats: bool = False,
         **kwargs,
-    ) -> list[SearchResult]:
+    ) -> Union[list[SearchResult], tuple[list[SearchResult], SearchStats]]:
         """
         Search for nearest neighbors with optional metadata filtering.
 
@@ -938,14 +1084,84 @@ class LeannSearcher:
                 - Membership: "in", "not_in"
                 - String: "contains", "starts_with", "ends_with"
                 Example: {"chapter": {"<=": 5}, "tags": {"in": ["fiction", "drama"]}}
+            use_grep: Exact (case-insensitive) text match, ranked by BM25
+            search_mode: "vector" (default) for graph search, "keyword" for BM25 over
+                the keyword index (quoted phrases must match verbatim), or "hybrid" to run
+                both concurrently and fuse the rankings
+            hybrid_fusion: "rrf" (reciprocal rank fusion) or "weighted" (min-max normalized
+                scores) when search_mode="hybrid"
+            hybrid_alpha: Weight of the vector ranking in hybrid fusion (keyword gets 1 - alpha)
+            rerank: Re-order candidates with a cross-encoder before returning top_k
+            rerank_model: Cross-encoder model name (default: ms-marco-MiniLM-L-6-v2)
+            rerank_fetch_k: Candidates fetched for reranking (default: 4 * top_k)
+            exact_threshold: Score every passage exactly instead of walking the graph when
+                the index, or the subset passing metadata_filters, has at most this many
+                passages and stored fp16 embeddings (default: 4096, 0 disables)
+            query_embedding: Precomputed ``(1, D)`` query embedding (see :meth:`embed_query`)
+                used instead of embedding ``query``; keyword search and reranking still
+                use the query text
+            return_stats: Also return the :class:`~leann.tracing.SearchStats` of this
+                search (always kept on ``self.last_stats``)
             **kwargs: Backend-specific parameters
 
         Returns:
-            List of SearchResult objects with text, metadata, and similarity scores
+            List of SearchResult objects with text, metadata, and similarity scores,
+            or ``(results, stats)`` when ``return_stats`` is set
         """
-        # Handle grep search
-        if use_grep:
-            return self._grep_search(query, top_k)
+        route = self._route_search(
+            top_k, use_grep, search_mode, rerank, rerank_fetch_k, metadata_filters, exact_threshold
+        )
+        if route.path == "rerank":
+            candidates = self.search(
+                query,
+                top_k=route.top_k,
+                complexity=complexity,
+                beam_width=beam_width,
+                prune_ratio=prune_ratio,
+                recompute_embeddings=recompute_embeddings,
+                pruning_strategy=pruning_strategy,
+                expected_zmq_port=expected_zmq_port,
+                metadata_filters=metadata_filters,
+                batch_size=batch_size,
+                use_grep=use_grep,
+                provider_options=provider_options,
+                search_mode=search_mode,
+                hybrid_fusion=hybrid_fusion,
+                hybrid_alpha=hybrid_alpha,
+                exact_threshold=exact_threshold,
+                query_embedding=query_embedding,
+                **kwargs,
+            )
+            with search_phase("leann.rerank", "rerank_time", candidates=len(candidates)):
+                return get_reranker(rerank_model).rerank(query, candidates, top_k)
+        if route.path == "grep":
+            return self._grep_search(query, top_k, metadata_filters)
+        if route.path == "keyword":
+            return self._keyword_search(query, top_k, metadata_filters)
+        if route.path == "hybrid":
+            # BM25 runs on a helper thread while this thread does the graph search
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                keyword_future = pool.submit(
+                    self._keyword_search, query, route.top_k, metadata_filters
+                )
+                vector_results = self.search(
+                    query,
+                    top_k=route.top_k,
+                    complexity=complexity,
+                    beam_width=beam_width,
+                    prune_ratio=prune_ratio,
+                    recompute_embeddings=recompute_embeddings,
+                    pruning_strategy=pruning_strategy,
+                    expected_zmq_port=expected_zmq_port,
+                    metadata_filters=metadata_filters,
+                    batch_size=batch_size,
+                    provider_options=provider_options,
+                    exact_threshold=exact_threshold,
+                    query_embedding=query_embedding,
+                    **kwargs,
+                )
+                keyword_results = keyword_future.result()
+            return fuse_results(vector_results, keyword_results, top_k, hybrid_fusion, hybrid_alpha)
 
         logger.info("🔍 LeannSearcher.search() called:")
         logger.info(f"  Query: '{query}'")
@@ -953,57 +1169,238 @@ class LeannSearcher:
         logger.info(f"  Metadata filters: {metadata_filters}")
         logger.info(f"  Additional kwargs: {kwargs}")
 
-        # Smart top_k detection and adjustment
-        # Use PassageManager length (sum of shard sizes) to avoid
-        # depending on a massive combined map
-        total_docs = len(self.passage_manager)
-        original_top_k = top_k
-        if top_k > total_docs:
-            top_k = total_docs
-            logger.warning(
-                f"  ⚠️  Requested top_k ({original_top_k}) exceeds total documents ({total_docs})"
+        top_k = route.top_k
+        if route.path == "exact":
+            return self._exact_search(
+                query,
+                top_k,
+                route.plan,
+                metadata_filters,
+                provider_options,
+                exact_threshold,
+                query_embedding,
+            )
+        if route.path == "shards":
+            return search_shards(
+                self,
+                query,
+                top_k,
+                recompute_embeddings=recompute_embeddings,
+                expected_zmq_port=expected_zmq_port,
+                provider_options=provider_options,
+                query_embedding=query_embedding,
+                complexity=complexity,
+                beam_width=beam_width,
+                prune_ratio=prune_ratio,
+                pruning_strategy=pruning_strategy,
+                metadata_filters=metadata_filters,
+                batch_size=batch_size,
+                exact_threshold=exact_threshold,
+                **kwargs,
             )
-            logger.warning(f"  ✅ Auto-adjusted top_k to {top_k} to match available documents")
 
+        stats = active_stats()
+        stats.path = "graph"
+        stats.exact_threshold = self._exact_threshold(exact_threshold)
         zmq_port = None
 
-        start_time = time.time()
         if recompute_embeddings:
-            zmq_port = self.backend_impl._ensure_server_running(
-                self.meta_path_str,
-                port=expected_zmq_port,
-                **kwargs,
-            )
+            with search_phase("leann.server_startup", "server_time"):
+                zmq_port = self.backend_impl._ensure_server_running(
+                    self.meta_path_str,
+                    port=expected_zmq_port,
+                    **kwargs,
+                )
             del expected_zmq_port
-        zmq_time = time.time() - start_time
-        logger.info(f"  Launching server time: {zmq_time} seconds")
+        logger.info(f"  Launching server time: {stats.server_time} seconds")
+
+        if query_embedding is None:
+            with search_phase("leann.embed_query", "embedding_time"):
+                query_embedding = self.backend_impl.compute_query_embedding(
+                    query,
+                    use_server_if_available=recompute_embeddings,
+                    zmq_port=zmq_port,
+                    query_template=self._query_template(provider_options),
+                )
+            if recompute_embeddings:
+                stats.count("zmq_round_trips")
+        else:
+            query_embedding = np.atleast_2d(np.asarray(query_embedding, dtype=np.float32))
+        logger.info(f"  Generated embedding shape: {query_embedding.shape}")
+        logger.info(f"  Embedding time: {stats.embedding_time} seconds")
+
+        with search_phase("leann.traversal", "search_time", backend=self.backend_name):
+            results = self._backend_search(
+                query_embedding,
+                top_k,
+                **self._backend_search_kwargs(
+                    complexity=complexity,
+                    beam_width=beam_width,
+                    prune_ratio=prune_ratio,
+                    recompute_embeddings=recompute_embeddings,
+                    pruning_strategy=pruning_strategy,
+                    zmq_port=zmq_port,
+                    batch_size=batch_size,
+                    **kwargs,
+                ),
+            )
+        logger.info(f"  Search time in search() LEANN searcher: {stats.search_time} seconds")
+        logger.info(f"  Backend returned: labels={len(results.get('labels', [[]])[0])} results")
+        stats.add_backend_counters(results.get("stats", {}))
+
+        return self._enrich_results(results, metadata_filters)
 
-        start_time = time.time()
+    def embed_query(
+        self,
+        query: str,
+        provider_options: Optional[dict[str, Any]] = None,
+        use_server: bool = True,
+        expected_zmq_port: int = 5557,
+    ) -> np.ndarray:
+        """Embed ``query`` the way :meth:`search` does.
+
+        The ``(1, D)`` result can be passed as ``search(query_embedding=...)`` to any
+        searcher whose index uses the same embedding model, so a query fanned out
+        over several indexes is embedded once.
+
+        Args:
+            use_server: Embed through this index's embedding server (starting it if
+                needed) instead of loading the model in-process.
+        """
+        if self._shards:
+            return self._shards[0].embed_query(
+                query, provider_options, use_server=use_server, expected_zmq_port=expected_zmq_port
+            )
+        template = self._query_template(provider_options)
+        if not use_server:
+            return self.backend_impl.compute_query_embedding(
+                query, use_server_if_available=False, query_template=template
+            )
+        zmq_port = self.backend_impl._ensure_server_running(
+            self.meta_path_str, port=expected_zmq_port
+        )
+        return self.backend_impl.compute_query_embedding(
+            query, use_server_if_available=True, zmq_port=zmq_port, query_template=template
+        )
+
+    def _route_search(
+        self,
+        top_k: int,
+        use_grep: bool,
+        search_mode: str,
+        rerank: bool,
+        rerank_fetch_k: Optional[int],
+        metadata_filters: Optional[dict[str, dict[str, Any]]],
+        exact_threshold: Optional[int],
+    ) -> _SearchRoute:
+        """Pick the path of one search; shared by :class:`AsyncLeannSearcher`."""
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search_mode '{search_mode}'")
+        active_stats().mode = "grep" if use_grep else search_mode
+        if rerank:
+            return _SearchRoute(
+                "rerank", max(rerank_fetch_k or top_k * RERANK_CANDIDATE_FACTOR, top_k)
+            )
+        if use_grep:
+            return _SearchRoute("grep", top_k)
+        if search_mode == "keyword":
+            return _SearchRoute("keyword", top_k)
+        if search_mode == "hybrid":
+            return _SearchRoute("hybrid", top_k * HYBRID_CANDIDATE_FACTOR)
+        top_k = self._clamp_top_k(top_k)
+        plan = self._exact_plan(metadata_filters, exact_threshold)
+        if plan is not None:
+            return _SearchRoute("exact", top_k, plan)
+        return _SearchRoute("shards" if self._shards else "graph", top_k)
+
+    def _exact_threshold(self, exact_threshold: Optional[int]) -> int:
+        return EXACT_SEARCH_THRESHOLD if exact_threshold is None else exact_threshold
+
+    def _exact_plan(
+        self,
+        metadata_filters: Optional[dict[str, dict[str, Any]]],
+        exact_threshold: Optional[int],
+    ) -> Optional[tuple[ExactIndex, Optional[np.ndarray]]]:
+        """Decide whether brute force beats the graph for this query.
 
-        # Extract query template from stored embedding_options with fallback chain:
+        Returns:
+            ``(exact_index, rows)`` to score (``rows=None`` means all), or ``None`` to
+            use the graph.
+        """
+        threshold = self._exact_threshold(exact_threshold)
+        exact = self._exact_index
+        if exact is None or threshold <= 0:
+            return None
+        if len(exact) <= threshold:
+            return exact, None
+        if metadata_filters and exact.should_scan_filters(threshold):
+            rows = exact.rows_matching(self.passage_manager, metadata_filters)
+            if len(rows) <= threshold:
+                return exact, rows
+        return None
+
+    def _exact_search(
+        self,
+        query: str,
+        top_k: int,
+        plan: tuple[ExactIndex, Optional[np.ndarray]],
+        metadata_filters: Optional[dict[str, dict[str, Any]]],
+        provider_options: Optional[dict[str, Any]],
+        exact_threshold: Optional[int] = None,
+        query_embedding: Optional[np.ndarray] = None,
+    ) -> list[SearchResult]:
+        """Brute-force search over stored fp16 embeddings; needs no embedding server."""
+        exact, rows = plan
+        stats = active_stats()
+        stats.path = "exact"
+        stats.exact_threshold = self._exact_threshold(exact_threshold)
+        if query_embedding is None:
+            with search_phase("leann.embed_query", "embedding_time"):
+                query_embedding = self.embed_query(query, provider_options, use_server=False)
+        scored = len(exact) if rows is None else len(rows)
+        with search_phase("leann.exact_scan", "search_time", passages=scored):
+            results = exact.search(query_embedding[0], top_k, rows)
+        stats.passages_scored = scored
+        logger.info(f"  Exact search over {scored} passages")
+        return self._enrich_results(results, metadata_filters)
+
+    def _clamp_top_k(self, top_k: int) -> int:
+        """Cap top_k at the number of stored passages."""
+        # Use PassageManager length (sum of shard sizes) to avoid
+        # depending on a massive combined map
+        total_docs = len(self.passage_manager)
+        if top_k > total_docs:
+            logger.warning(f"  ⚠️  Requested top_k ({top_k}) exceeds total documents ({total_docs})")
+            logger.warning(f"  ✅ Auto-adjusted top_k to {total_docs} to match available documents")
+            return total_docs
+        return top_k
+
+    def _query_template(self, provider_options: Optional[dict[str, Any]] = None) -> Optional[str]:
+        """Resolve the prompt template prepended to queries before embedding."""
+        # Fallback chain:
         # 1. Check provider_options override (highest priority)
         # 2. Check query_prompt_template (new format)
         # 3. Check prompt_template (old format for backward compat)
         # 4. None (no template)
-        query_template = None
         if provider_options and "prompt_template" in provider_options:
-            query_template = provider_options["prompt_template"]
-        elif "query_prompt_template" in self.embedding_options:
-            query_template = self.embedding_options["query_prompt_template"]
-        elif "prompt_template" in self.embedding_options:
-            query_template = self.embedding_options["prompt_template"]
-
-        query_embedding = self.backend_impl.compute_query_embedding(
-            query,
-            use_server_if_available=recompute_embeddings,
-            zmq_port=zmq_port,
-            query_template=query_template,
-        )
-        logger.info(f"  Generated embedding shape: {query_embedding.shape}")
-        embedding_time = time.time() - start_time
-        logger.info(f"  Embedding time: {embedding_time} seconds")
+            return provider_options["prompt_template"]
+        if "query_prompt_template" in self.embedding_options:
+            return self.embedding_options["query_prompt_template"]
+        if "prompt_template" in self.embedding_options:
+            return self.embedding_options["prompt_template"]
+        return None
 
-        start_time = time.time()
+    def _backend_search_kwargs(
+        self,
+        complexity: int,
+        beam_width: int,
+        prune_ratio: float,
+        recompute_embeddings: bool,
+        pruning_strategy: str,
+        zmq_port: Optional[int],
+        batch_size: int,
+        **kwargs,
+    ) -> dict[str, Any]:
         backend_search_kwargs: dict[str, Any] = {
             "complexity": complexity,
             "beam_width": beam_width,
@@ -1018,16 +1415,22 @@ class LeannSearcher:
 
         # Merge any extra kwargs last
         backend_search_kwargs.update(kwargs)
+        return backend_search_kwargs
 
-        results = self.backend_impl.search(
-            query_embedding,
-            top_k,
-            **backend_search_kwargs,
-        )
-        search_time = time.time() - start_time
-        logger.info(f"  Search time in search() LEANN searcher: {search_time} seconds")
-        logger.info(f"  Backend returned: labels={len(results.get('labels', [[]])[0])} results")
+    def _enrich_results(
+        self,
+        results: dict[str, Any],
+        metadata_filters: Optional[dict[str, dict[str, Any]]] = None,
+    ) -> list[SearchResult]:
+        """Turn backend labels/distances into SearchResults and apply metadata filters."""
+        with search_phase("leann.fetch_passages", "fetch_time"):
+            return self._fetch_passages(results, metadata_filters)
 
+    def _fetch_passages(
+        self,
+        results: dict[str, Any],
+        metadata_filters: Optional[dict[str, dict[str, Any]]] = None,
+    ) -> list[SearchResult]:
         enriched_results = []
         if "labels" in results and "distances" in results:
             logger.info(f"  Processing {len(results['labels'][0])} passage IDs:")
@@ -1064,12 +1467,16 @@ class LeannSearcher:
                         f"   {RED}✗{RESET} [{i + 1:2d}] ID: '{string_id}' -> {RED}ERROR: Passage not found!{RESET}"
                     )
 
+        stats = active_stats()
+        stats.passages_fetched += len(enriched_results)
         # Apply metadata filters if specified
         if metadata_filters:
             logger.info(f"  🔍 Applying metadata filters: {metadata_filters}")
+            fetched = len(enriched_results)
             enriched_results = self.passage_manager.filter_search_results(
                 enriched_results, metadata_filters
             )
+            stats.filtered_out += fetched - len(enriched_results)
 
         # Define color codes outside the loop for final message
         GREEN = "\033[92m"
@@ -1077,90 +1484,106 @@ class LeannSearcher:
         logger.info(f"  {GREEN}✓ Final enriched results: {len(enriched_results)} passages{RESET}")
         return enriched_results
 
-    def _find_jsonl_file(self) -> Optional[str]:
-        """Find the .jsonl file containing raw passages for grep search"""
-        index_path = Path(self.meta_path_str).parent
-        potential_files = [
-            index_path / "documents.leann.passages.jsonl",
-            index_path.parent / "documents.leann.passages.jsonl",
-        ]
-
-        for file_path in potential_files:
-            if file_path.exists():
-                return str(file_path)
-        return None
-
-    def _grep_search(self, query: str, top_k: int = 5) -> list[SearchResult]:
-        """Perform grep-based search on raw passages"""
-        jsonl_file = self._find_jsonl_file()
-        if not jsonl_file:
-            raise FileNotFoundError("No .jsonl passages file found for grep search")
+    def warmup(self, expected_zmq_port: int = 5557) -> int:
+        """Start the embedding server ahead of the first recompute search.
 
-        try:
-            cmd = ["grep", "-i", "-n", query, jsonl_file]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-
-            if result.returncode == 1:
-                return []
-            elif result.returncode != 0:
-                raise RuntimeError(f"Grep failed: {result.stderr}")
-
-            matches = []
-            for line in result.stdout.strip().split("\n"):
-                if not line:
-                    continue
-                parts = line.split(":", 1)
-                if len(parts) != 2:
-                    continue
+        Returns:
+            The port the embedding server is listening on (of the first shard, for a
+            sharded index, whose first ``max_shard_servers`` shards each start their own).
+        """
+        if self._shards:
+            return warm_shards(self._shards[: self.max_shard_servers], expected_zmq_port)[0]
+        return self.backend_impl._ensure_server_running(self.meta_path_str, port=expected_zmq_port)
+
+    def keyword_index(self) -> KeywordIndex:
+        """The inverted index over passage text, built on first use if missing or stale."""
+        with self._keyword_index_lock:
+            if self._keyword_index is None:
+                self._keyword_index = KeywordIndex.open_or_build(
+                    self.index_path, list(self.passage_manager.passage_files)
+                )
+            return self._keyword_index
 
-                try:
-                    data = json.loads(parts[1])
-                    text = data.get("text", "")
-                    score = text.lower().count(query.lower())
+    def _keyword_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        metadata_filters: Optional[dict[str, dict[str, Any]]] = None,
+        exact: bool = False,
+    ) -> list[SearchResult]:
+        """BM25 search over the keyword index.
 
-                    matches.append(
-                        SearchResult(
-                            id=data.get("id", parts[0]),
-                            text=text,
-                            metadata=data.get("metadata", {}),
-                            score=float(score),
-                        )
-                    )
-                except json.JSONDecodeError:
-                    continue
+        With ``exact=True`` the query must appear verbatim (case-insensitive) in the passage.
+        """
+        index = self.keyword_index()
+        docs, scores = index.substring_search(query) if exact else index.search(query)
+        needle = query.lower() if exact else None
+        results: list[SearchResult] = []
+        # Candidates are ranked, so passages are only read until top_k survive filtering
+        for doc, score in zip(docs, scores):
+            passage_id = index.passage_ids[doc]
+            try:
+                passage = self.passage_manager.get_passage(passage_id)
+            except KeyError:
+                continue
+            if needle is not None and needle not in passage["text"].lower():
+                continue
+            result = SearchResult(
+                id=passage_id,
+                score=float(score),
+                text=passage["text"],
+                metadata=passage.get("metadata", {}),
+            )
+            if metadata_filters and not self.passage_manager.filter_search_results(
+                [result], metadata_filters
+            ):
+                continue
+            results.append(result)
+            if len(results) >= top_k:
+                break
+        return results
 
-            matches.sort(key=lambda x: x.score, reverse=True)
-            return matches[:top_k]
+    def _backend_search(self, query_embedding: np.ndarray, top_k: int, **kwargs) -> dict[str, Any]:
+        """``backend_impl.search``, serialized per searcher."""
+        with self._backend_lock:
+            return self.backend_impl.search(query_embedding, top_k, **kwargs)
 
-        except FileNotFoundError:
-            raise RuntimeError(
-                "grep command not found. Please install grep or use semantic search."
-            )
+    def _grep_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        metadata_filters: Optional[dict[str, dict[str, Any]]] = None,
+    ) -> list[SearchResult]:
+        """Exact text search, answered from the keyword index."""
+        if not tokenize(query):
+            # Punctuation-only patterns have no postings to look up
+            return self._python_regex_search(query, top_k)
+        return self._keyword_search(query, top_k, metadata_filters, exact=True)
 
     def _python_regex_search(self, query: str, top_k: int = 5) -> list[SearchResult]:
-        """Fallback regex search"""
-        jsonl_file = self._find_jsonl_file()
-        if not jsonl_file:
-            raise FileNotFoundError("No .jsonl file found")
-
+        """Linear scan fallback for queries the keyword index cannot answer"""
         pattern = re.compile(re.escape(query), re.IGNORECASE)
         matches = []
 
-        with open(jsonl_file, encoding="utf-8") as f:
-            for line_num, line in enumerate(f, 1):
-                if pattern.search(line):
-                    try:
-                        data = json.loads(line.strip())
-                        matches.append(
-                            SearchResult(
-                                id=data.get("id", str(line_num)),
-                                text=data.get("text", ""),
-                                metadata=data.get("metadata", {}),
-                                score=float(len(pattern.findall(data.get("text", "")))),
+        for jsonl_file in self.passage_manager.passage_files:
+            with open(jsonl_file, encoding="utf-8") as f:
+                for line_num, line in enumerate(f, 1):
+                    if pattern.search(line):
+                        try:
+                            data = json.loads(line.strip())
+                        except json.JSONDecodeError:
+                            continue
+                        text = data.get("text", "")
+                        count = len(pattern.findall(text))
+                        if count:
+                            matches.append(
+                                SearchResult(
+                                    id=data.get("id", str(line_num)),
+                                    text=text,
+                                    metadata=data.get("metadata", {}),
+                                    score=float(count),
+                                )
                             )
-                        )
-                    except json.JSONDecodeError:
-                        continue
 
         matches.sort(key=lambda x: x.score, reverse=True)
         return matches[:top_k]
@@ -1170,6 +1593,8 @@ class LeannSearcher:
         This method should be called after you're done using the searcher,
         especially in test environments or batch processing scenarios.
         """
+        for shard in getattr(self, "_shards", []):
+            shard.cleanup()
         backend = getattr(self.backend_impl, "embedding_server_manager", None)
         if backend is not None:
             backend.stop_server()
@@ -1192,6 +1617,250 @@ class LeannSearcher:
             pass
 
 
+class AsyncLeannSearcher:
+    """Asyncio front-end for :class:`LeannSearcher`.
+
+    Query embeddings are requested over ``zmq.asyncio`` sockets pooled per
+    embedding server, so many searches can share one event loop. Graph traversal
+    and passage lookup are blocking native/file work and run on a small bounded
+    executor instead of a thread per request. Backend searchers are not
+    thread-safe, so traversals of one searcher still run one at a time while
+    embedding and passage lookup of other requests overlap with them.
+    """
+
+    def __init__(
+        self,
+        index_path: Optional[str] = None,
+        enable_warmup: bool = False,
+        searcher: Optional[LeannSearcher] = None,
+        max_concurrency: int = 4,
+        **backend_kwargs,
+    ):
+        if searcher is None:
+            if index_path is None:
+                raise ValueError("Either index_path or searcher must be provided")
+            self.searcher = LeannSearcher(index_path, enable_warmup=enable_warmup, **backend_kwargs)
+            self._owns_searcher = True
+        else:
+            self.searcher = searcher
+            self._owns_searcher = False
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="leann-async-search"
+        )
+        self._clients: dict[int, AsyncEmbeddingServerClient] = {}
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        # Run in a copy of this task's context so the worker records into its trace
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(context.run, fn, *args, **kwargs)
+        )
+
+    async def _embed_query(
+        self, query: str, zmq_port: Optional[int], query_template: Optional[str]
+    ) -> np.ndarray:
+        if zmq_port is not None:
+            client = self._clients.get(zmq_port)
+            if client is None:
+                client = self._clients[zmq_port] = AsyncEmbeddingServerClient(
+                    zmq_port, max_sockets=self.max_concurrency
+                )
+            text = f"{query_template}{query}" if query_template else query
+            try:
+                response = await client.request([text])
+                if isinstance(response, list) and len(response) > 0:
+                    return np.array(response, dtype=np.float32)[0:1]
+                raise RuntimeError("Invalid response from embedding server")
+            except Exception as e:
+                logger.warning(f"⚠️ Embedding server failed: {e}; falling back to direct model")
+
+        return await self._run(
+            self.searcher.backend_impl.compute_query_embedding,
+            query,
+            use_server_if_available=False,
+            query_template=query_template,
+        )
+
+    @traced_async_search
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        complexity: int = 64,
+        beam_width: int = 1,
+        prune_ratio: float = 0.0,
+        recompute_embeddings: bool = True,
+        pruning_strategy: Literal["global", "local", "proportional"] = "global",
+        expected_zmq_port: int = 5557,
+        metadata_filters: Optional[dict[str, dict[str, Union[str, int, float, bool, list]]]] = None,
+        batch_size: int = 0,
+        use_grep: bool = False,
+        provider_options: Optional[dict[str, Any]] = None,
+        search_mode: Literal["vector", "keyword", "hybrid"] = "vector",
+        hybrid_fusion: FusionMethod = "rrf",
+        hybrid_alpha: float = 0.5,
+        rerank: bool = False,
+        rerank_model: Optional[str] = None,
+        rerank_fetch_k: Optional[int] = None,
+        exact_threshold: Optional[int] = None,
+        query_embedding: Optional[np.ndarray] = None,
+        return_stats: bool = False,
+        **kwargs,
+    ) -> Union[list[SearchResult], tuple[list[SearchResult], SearchStats]]:
+        """Async counterpart of :meth:`LeannSearcher.search` (same arguments)."""
+        searcher = self.searcher
+        # Routing may scan metadata for the exact plan, so it runs off the event loop
+        route = await self._run(
+            searcher._route_search,
+            top_k,
+            use_grep,
+            search_mode,
+            rerank,
+            rerank_fetch_k,
+            metadata_filters,
+            exact_threshold,
+        )
+        if route.path == "rerank":
+            candidates = await self.search(
+                query,
+                top_k=route.top_k,
+                complexity=complexity,
+                beam_width=beam_width,
+                prune_ratio=prune_ratio,
+                recompute_embeddings=recompute_embeddings,
+                pruning_strategy=pruning_strategy,
+                expected_zmq_port=expected_zmq_port,
+                metadata_filters=metadata_filters,
+                batch_size=batch_size,
+                use_grep=use_grep,
+                provider_options=provider_options,
+                search_mode=search_mode,
+                hybrid_fusion=hybrid_fusion,
+                hybrid_alpha=hybrid_alpha,
+                exact_threshold=exact_threshold,
+                query_embedding=query_embedding,
+                **kwargs,
+            )
+            with search_phase("leann.rerank", "rerank_time", candidates=len(candidates)):
+                return await self._run(get_reranker(rerank_model).rerank, query, candidates, top_k)
+        if route.path == "grep":
+            return await self._run(searcher._grep_search, query, top_k, metadata_filters)
+        if route.path == "keyword":
+            return await self._run(searcher._keyword_search, query, top_k, metadata_filters)
+        if route.path == "hybrid":
+            vector_results, keyword_results = await asyncio.gather(
+                self.search(
+                    query,
+                    top_k=route.top_k,
+                    complexity=complexity,
+                    beam_width=beam_width,
+                    prune_ratio=prune_ratio,
+                    recompute_embeddings=recompute_embeddings,
+                    pruning_strategy=pruning_strategy,
+                    expected_zmq_port=expected_zmq_port,
+                    metadata_filters=metadata_filters,
+                    batch_size=batch_size,
+                    provider_options=provider_options,
+                    exact_threshold=exact_threshold,
+                    query_embedding=query_embedding,
+                    **kwargs,
+                ),
+                self._run(searcher._keyword_search, query, route.top_k, metadata_filters),
+            )
+            return fuse_results(vector_results, keyword_results, top_k, hybrid_fusion, hybrid_alpha)
+
+        top_k = route.top_k
+        if route.path == "exact":
+            return await self._run(
+                searcher._exact_search,
+                query,
+                top_k,
+                route.plan,
+                metadata_filters,
+                provider_options,
+                exact_threshold,
+                query_embedding,
+            )
+        if route.path == "shards":
+            return await self._run(
+                searcher.search,
+                query,
+                top_k=top_k,
+                complexity=complexity,
+                beam_width=beam_width,
+                prune_ratio=prune_ratio,
+                recompute_embeddings=recompute_embeddings,
+                pruning_strategy=pruning_strategy,
+                expected_zmq_port=expected_zmq_port,
+                metadata_filters=metadata_filters,
+                batch_size=batch_size,
+                provider_options=provider_options,
+                exact_threshold=exact_threshold,
+                query_embedding=query_embedding,
+                **kwargs,
+            )
+        stats = active_stats()
+        stats.path = "graph"
+        stats.exact_threshold = searcher._exact_threshold(exact_threshold)
+        zmq_port = None
+        if recompute_embeddings:
+            with search_phase("leann.server_startup", "server_time"):
+                zmq_port = await self._run(
+                    searcher.backend_impl._ensure_server_running,
+                    searcher.meta_path_str,
+                    port=expected_zmq_port,
+                    **kwargs,
+                )
+
+        if query_embedding is None:
+            with search_phase("leann.embed_query", "embedding_time"):
+                query_embedding = await self._embed_query(
+                    query, zmq_port, searcher._query_template(provider_options)
+                )
+            if zmq_port is not None:
+                stats.count("zmq_round_trips")
+        else:
+            query_embedding = np.atleast_2d(np.asarray(query_embedding, dtype=np.float32))
+        with search_phase("leann.traversal", "search_time", backend=searcher.backend_name):
+            results = await self._run(
+                searcher._backend_search,
+                query_embedding,
+                top_k,
+                **searcher._backend_search_kwargs(
+                    complexity=complexity,
+                    beam_width=beam_width,
+                    prune_ratio=prune_ratio,
+                    recompute_embeddings=recompute_embeddings,
+                    pruning_strategy=pruning_strategy,
+                    zmq_port=zmq_port,
+                    batch_size=batch_size,
+                    **kwargs,
+                ),
+            )
+        stats.add_backend_counters(results.get("stats", {}))
+        return await self._run(searcher._enrich_results, results, metadata_filters)
+
+    async def warmup(self, expected_zmq_port: int = 5557) -> int:
+        """Start the embedding server without blocking the event loop."""
+        return await self._run(self.searcher.warmup, expected_zmq_port)
+
+    def close(self):
+        """Close pooled sockets and the executor; stops the server if the searcher is owned."""
+        while self._clients:
+            self._clients.popitem()[1].close()
+        self._executor.shutdown(wait=False)
+        if self._owns_searcher:
+            self.searcher.cleanup()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+
 class LeannChat:
     def __init__(
         self,
@@ -1199,15 +1868,20 @@ class LeannChat:
         llm_config: Optional[dict[str, Any]] = None,
         enable_warmup: bool = False,
         searcher: Optional[LeannSearcher] = None,
+        llm: Optional["LLMInterface"] = None,
         **kwargs,
     ):
+        from .chat import get_llm
+
         if searcher is None:
             self.searcher = LeannSearcher(index_path, enable_warmup=enable_warmup, **kwargs)
             self._owns_searcher = True
         else:
             self.searcher = searcher
             self._owns_searcher = False
-        self.llm = get_llm(llm_config)
+        # A pre-built LLM can be shared across chats (e.g. by `leann serve`)
+        self.llm = llm if llm is not None else get_llm(llm_config)
+        self._async_searcher: Optional[AsyncLeannSearcher] = None
 
     def ask(
         self,
@@ -1243,6 +1917,35 @@ class LeannChat:
         )
         search_time = time.time() - search_time
         logger.info(f"  Search time: {search_time} seconds")
+        prompt = self._build_prompt(question, results)
+        ask_time = time.time()
+        ans = self.llm.ask(prompt, **llm_kwargs)
+        ask_time = time.time() - ask_time
+        logger.info(f"  Ask time: {ask_time} seconds")
+        return ans
+
+    async def aask(
+        self,
+        question: str,
+        top_k: int = 5,
+        llm_kwargs: Optional[dict[str, Any]] = None,
+        **search_kwargs,
+    ):
+        """Async variant of :meth:`ask`.
+
+        Retrieval goes through an :class:`AsyncLeannSearcher` sharing this chat's
+        searcher; the (blocking) LLM client call runs on the default executor.
+        """
+        if self._async_searcher is None:
+            self._async_searcher = AsyncLeannSearcher(searcher=self.searcher)
+        results = await self._async_searcher.search(question, top_k=top_k, **search_kwargs)
+        prompt = self._build_prompt(question, results)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.llm.ask, prompt, **(llm_kwargs or {}))
+        )
+
+    def _build_prompt(self, question: str, results: list[SearchResult]) -> str:
         context = "\n\n".join([r.text for r in results])
         prompt = (
             "Here is some retrieved context that might help answer your question:\n\n"
@@ -1262,11 +1965,7 @@ class LeannChat:
             print(
                 f"{chunk_relevance:<10} | {chunk_id:<10} | {chunk_content:<60} | {chunk_source:<80}"
             )
-        ask_time = time.time()
-        ans = self.llm.ask(prompt, **llm_kwargs)
-        ask_time = time.time() - ask_time
-        logger.info(f"  Ask time: {ask_time} seconds")
-        return ans
+        return prompt
 
     def start_interactive(self):
         """Start interactive chat session."""
@@ -1284,6 +1983,9 @@ class LeannChat:
         This method should be called after you're done using the chat interface,
         especially in test environments or batch processing scenarios.
         """
+        if getattr(self, "_async_searcher", None) is not None:
+            self._async_searcher.close()
+            self._async_searcher = None
         # Only stop the embedding server if this LeannChat instance created the searcher.
         # When a shared searcher is passed in, avoid shutting down the server to enable reuse.
         if getattr(self, "_owns_searcher", False) and hasattr(self.searcher, "cleanup"):
@@ -0,0 +1,358 @@
+"""
+Benchmark suite behind ``leann bench``.
+
+Builds one index per backend over a synthetic or user-supplied corpus and
+sweeps the search parameters (complexity, beam width, prune ratio) over it.
+Every run reports latency percentiles, QPS under concurrent clients, recall@k
+against a brute-force scan of the same embeddings and the recompute counters
+from :class:`~leann.tracing.SearchStats`. With ``startup_runs`` it also times
+how long a search waits for its embedding server, cold versus forked from a
+zygote. The report is a plain dict that ``leann bench --output`` writes as JSON
+for regression tracking.
+"""
+
+import asyncio
+import importlib.metadata
+import itertools
+import json
+import logging
+import os
+import platform
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the layout of the report changes
+REPORT_VERSION = 1
+# 22M parameters, 384 dimensions: small enough to embed a benchmark corpus on a laptop CPU
+DEFAULT_BENCH_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+_TOPICS = [
+    "machine learning",
+    "natural language processing",
+    "computer vision",
+    "database systems",
+    "distributed computing",
+    "network security",
+    "compiler design",
+    "operating systems",
+    "information retrieval",
+    "robotics",
+]
+_WORDS = (
+    "index graph vector query latency memory cache disk thread kernel model token "
+    "gradient tensor cluster shard replica schema transaction lock page buffer "
+    "packet router protocol cipher parser lexer scheduler process file storage "
+    "neighbor embedding recall precision benchmark throughput pipeline stream batch"
+).split()
+
+
+def synthetic_corpus(n_docs: int, seed: int = 42) -> list[str]:
+    """Deterministic passages spread over a handful of topics and a shared vocabulary."""
+    rng = np.random.default_rng(seed)
+    texts = []
+    for i in range(n_docs):
+        topic = _TOPICS[i % len(_TOPICS)]
+        words = " ".join(rng.choice(_WORDS, size=12))
+        texts.append(f"Document {i} about {topic}: {words}. Notes on {topic} and {words[:40]}.")
+    return texts
+
+
+def load_corpus(path: str, max_docs: Optional[int] = None) -> list[str]:
+    """
+    Read benchmark passages from ``path``.
+
+    A ``.jsonl`` file contributes the ``text`` field of each line, any other file
+    one passage per non-empty line, and a directory every such file under it.
+    """
+    root = Path(path)
+    files = sorted(p for p in root.rglob("*") if p.is_file()) if root.is_dir() else [root]
+    texts: list[str] = []
+    for file in files:
+        with open(file, encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                texts.append(json.loads(line)["text"] if file.suffix == ".jsonl" else line)
+                if max_docs is not None and len(texts) >= max_docs:
+                    return texts
+    if not texts:
+        raise ValueError(f"No passages found in {path}")
+    return texts
+
+
+def sample_queries(texts: Sequence[str], n_queries: int, seed: int = 42) -> list[str]:
+    """Queries made of the first words of randomly chosen passages."""
+    rng = np.random.default_rng(seed + 1)
+    picks = rng.choice(len(texts), size=min(n_queries, len(texts)), replace=False)
+    return [" ".join(texts[i].split()[:8]) for i in picks]
+
+
+def latency_summary(seconds: Sequence[float]) -> dict[str, float]:
+    """Mean and p50/p95/p99 of ``seconds``, in milliseconds."""
+    ms = np.asarray(seconds, dtype=np.float64) * 1000
+    return {
+        "mean": float(ms.mean()),
+        "p50": float(np.percentile(ms, 50)),
+        "p95": float(np.percentile(ms, 95)),
+        "p99": float(np.percentile(ms, 99)),
+    }
+
+
+def _index_size(index_path: str) -> tuple[int, int]:
+    """Bytes of the index files, and of the exact-search embeddings kept for recall."""
+    path = Path(index_path)
+    index_bytes = exact_bytes = 0
+    for file in path.parent.glob(f"{path.name}.*"):
+        if not file.is_file():
+            continue
+        if file.name.startswith(f"{path.name}.exact"):
+            exact_bytes += file.stat().st_size
+        else:
+            index_bytes += file.stat().st_size
+    return index_bytes, exact_bytes
+
+
+def _mean(values: list[Optional[int]]) -> Optional[float]:
+    observed = [v for v in values if v is not None]
+    return float(np.mean(observed)) if observed else None
+
+
+def _measure_qps(searcher, queries: list[str], clients: int, search_kwargs: dict) -> float:
+    """Queries per second with ``clients`` concurrent clients each working through ``queries``."""
+    from .api import AsyncLeannSearcher
+
+    async def run() -> float:
+        async with AsyncLeannSearcher(searcher=searcher, max_concurrency=clients) as front:
+
+            async def client(offset: int) -> None:
+                for i in range(len(queries)):
+                    await front.search(queries[(offset + i) % len(queries)], **search_kwargs)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(client(c) for c in range(clients)))
+            return clients * len(queries) / (time.perf_counter() - start)
+
+    return asyncio.run(run())
+
+
+def _search_run(
+    searcher,
+    queries: list[str],
+    ground_truth: list[set[str]],
+    clients: Sequence[int],
+    search_kwargs: dict[str, Any],
+) -> dict[str, Any]:
+    top_k = search_kwargs["top_k"]
+    # One untimed query so server start-up and lazy loading do not count as latency
+    searcher.search(queries[0], **search_kwargs)
+    latencies, recalls, stats = [], [], []
+    for query, truth in zip(queries, ground_truth):
+        start = time.perf_counter()
+        results, query_stats = searcher.search(query, return_stats=True, **search_kwargs)
+        latencies.append(time.perf_counter() - start)
+        recalls.append(len(truth & {r.id for r in results}) / max(len(truth), 1))
+        stats.append(query_stats)
+    return {
+        "complexity": search_kwargs["complexity"],
+        "beam_width": search_kwargs["beam_width"],
+        "prune_ratio": search_kwargs["prune_ratio"],
+        "latency_ms": latency_summary(latencies),
+        f"recall_at_{top_k}": float(np.mean(recalls)),
+        "qps": {str(n): _measure_qps(searcher, queries, n, search_kwargs) for n in clients},
+        "recompute": {
+            "nodes_recomputed": _mean([s.nodes_recomputed for s in stats]),
+            "nodes_visited": _mean([s.nodes_visited for s in stats]),
+            "zmq_round_trips": _mean([s.zmq_round_trips for s in stats]),
+        },
+    }
+
+
+def _time_to_first_embedding(index_path: str, meta: dict[str, Any], zygote) -> float:
+    """Seconds from asking for an embedding server until it returns its first embedding."""
+    from .embedding_server_manager import EmbeddingServerManager
+    from .zmq_client import EmbeddingServerClient
+
+    backend_name = meta["backend_name"]
+    manager = EmbeddingServerManager(
+        f"leann_backend_{backend_name}.{backend_name}_embedding_server", zygote=zygote
+    )
+    start = time.perf_counter()
+    try:
+        started, port = manager.start_server(
+            port=5557,
+            model_name=meta["embedding_model"],
+            embedding_mode=meta.get("embedding_mode", "sentence-transformers"),
+            passages_file=f"{index_path}.meta.json",
+            distance_metric=meta.get("backend_kwargs", {}).get("distance_metric", "mips"),
+        )
+        if not started:
+            raise RuntimeError(f"Embedding server for {index_path} did not start")
+        client = EmbeddingServerClient(port, timeout_ms=300_000)
+        try:
+            client.request(["embedding server start-up probe"])
+        finally:
+            client.close()
+        return time.perf_counter() - start
+    finally:
+        manager.stop_server()
+
+
+def bench_server_startup(index_path: str, runs: int = 3) -> dict[str, Any]:
+    """
+    Embedding server start-up latency for ``index_path``, until the first embedding.
+
+    ``cold_ms`` launches ``python -m <server>`` as searches without a zygote do;
+    ``zygote_ms`` forks it from a private zygote with the index's model preloaded
+    (None where forking is unsupported).
+    """
+    from .zygote import start_zygote, stop_zygote, zygote_supported
+
+    meta = json.loads(Path(f"{index_path}.meta.json").read_text(encoding="utf-8"))
+    cold = [_time_to_first_embedding(index_path, meta, zygote=False) for _ in range(runs)]
+    report: dict[str, Any] = {"runs": runs, "cold_ms": latency_summary(cold), "zygote_ms": None}
+    if not zygote_supported():
+        return report
+    with tempfile.TemporaryDirectory(prefix="leann-zygote-") as tmp:
+        socket_path = Path(tmp) / "zygote.ipc"
+        start_zygote(
+            [meta["embedding_model"]],
+            meta.get("embedding_mode", "sentence-transformers"),
+            socket_path=socket_path,
+        )
+        try:
+            forked = [
+                _time_to_first_embedding(index_path, meta, zygote=socket_path) for _ in range(runs)
+            ]
+        finally:
+            stop_zygote(socket_path)
+    report["zygote_ms"] = latency_summary(forked)
+    return report
+
+
+def bench_backend(
+    backend_name: str,
+    texts: list[str],
+    queries: list[str],
+    index_dir: str,
+    *,
+    complexities: Sequence[int] = (32, 64),
+    beam_widths: Sequence[int] = (1,),
+    prune_ratios: Sequence[float] = (0.0,),
+    top_k: int = 10,
+    clients: Sequence[int] = (1, 4),
+    embedding_model: str = DEFAULT_BENCH_MODEL,
+    embedding_mode: str = "sentence-transformers",
+    recompute: bool = True,
+    startup_runs: int = 0,
+    backend_kwargs: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    """
+    Build one ``backend_name`` index over ``texts`` and sweep the search grid on it.
+
+    ``startup_runs`` > 0 adds :func:`bench_server_startup` results (recompute only,
+    since other indexes never start an embedding server).
+    """
+    from .api import LeannBuilder, LeannSearcher
+
+    index_path = str(Path(index_dir) / f"bench-{backend_name}.leann")
+    builder = LeannBuilder(
+        backend_name,
+        embedding_model=embedding_model,
+        embedding_mode=embedding_mode,
+        # Brute-force ground truth for recall comes from the exact-search embeddings
+        exact_embeddings=True,
+        is_recompute=recompute,
+        **(backend_kwargs or {}),
+    )
+    for text in texts:
+        builder.add_text(text)
+    start = time.perf_counter()
+    builder.build_index(index_path)
+    build_seconds = time.perf_counter() - start
+    index_bytes, exact_bytes = _index_size(index_path)
+    report: dict[str, Any] = {
+        "backend": backend_name,
+        "build": {
+            "seconds": build_seconds,
+            "docs_per_second": len(texts) / build_seconds if build_seconds else None,
+            "index_bytes": index_bytes,
+            "exact_embeddings_bytes": exact_bytes,
+        },
+        "runs": [],
+    }
+
+    with LeannSearcher(index_path) as searcher:
+        ground_truth = []
+        for query in queries:
+            exact = searcher.search(query, top_k=top_k, exact_threshold=len(texts))
+            ground_truth.append({r.id for r in exact})
+        for complexity, beam_width, prune_ratio in itertools.product(
+            complexities, beam_widths, prune_ratios
+        ):
+            logger.info(
+                f"bench {backend_name}: complexity={complexity} beam_width={beam_width} "
+                f"prune_ratio={prune_ratio}"
+            )
+            search_kwargs = {
+                "top_k": top_k,
+                "complexity": complexity,
+                "beam_width": beam_width,
+                "prune_ratio": prune_ratio,
+                "recompute_embeddings": recompute,
+                # Always walk the graph; small benchmark corpora would otherwise be scanned
+                "exact_threshold": 0,
+            }
+            report["runs"].append(
+                _search_run(searcher, queries, ground_truth, clients, search_kwargs)
+            )
+    if startup_runs and recompute:
+        report["startup"] = bench_server_startup(index_path, startup_runs)
+    return report
+
+
+def run_benchmark(
+    texts: list[str],
+    queries: list[str],
+    backends: Sequence[str] = ("hnsw",),
+    work_dir: Optional[str] = None,
+    corpus_source: str = "synthetic",
+    **grid: Any,
+) -> dict[str, Any]:
+    """
+    Benchmark every backend in ``backends`` on the same corpus and queries.
+
+    Indexes are built under ``work_dir`` (a temporary directory by default, removed
+    afterwards). ``grid`` is passed through to :func:`bench_backend`.
+    """
+    try:
+        version = importlib.metadata.version("leann-core")
+    except importlib.metadata.PackageNotFoundError:
+        version = None
+    report: dict[str, Any] = {
+        "version": REPORT_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "leann": version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "corpus": {"source": corpus_source, "documents": len(texts), "queries": len(queries)},
+        "config": {"backends": list(backends), **grid},
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="leann-bench-") as tmp:
+        for backend_name in backends:
+            index_dir = Path(work_dir or tmp) / backend_name
+            report["results"].append(
+                bench_backend(backend_name, texts, queries, str(index_dir), **grid)
+            )
+    return report
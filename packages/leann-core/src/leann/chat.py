@@ -10,8 +10,6 @@ import os
 from abc import ABC, abstractmethod
 from typing import Any, Optional
 
-import torch
-
 from .settings import resolve_ollama_host, resolve_openai_api_key, resolve_openai_base_url
 
 # Configure logging
@@ -695,6 +693,8 @@ class HFChat(LLMInterface):
 
         logger.info(f"Generating with HuggingFace model, config: {generation_config}")
 
+        import torch
+
         # Generate
         with torch.no_grad():
             outputs = self.model.generate(**inputs, **generation_config)
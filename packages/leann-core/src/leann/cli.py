@@ -1,18 +1,84 @@
 import argparse
 import asyncio
 import time
+from functools import cached_property
 from pathlib import Path
 from typing import Any, Optional, Union
 
-from llama_index.core import SimpleDirectoryReader
-from llama_index.core.node_parser import SentenceSplitter
 from tqdm import tqdm
 
 from .api import LeannBuilder, LeannChat, LeannSearcher
+from .bench import DEFAULT_BENCH_MODEL
 from .interactive_utils import create_cli_session
-from .registry import register_project_directory
+from .registry import discover_indexes_in_project, register_project_directory
 from .settings import resolve_ollama_host, resolve_openai_api_key, resolve_openai_base_url
 
+# Ports `leann server-stats` probes by default: where EmbeddingServerManager picks ports
+SERVER_PORT_SCAN = range(5557, 5657)
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def format_server_stats(port: int, stats: dict[str, Any]) -> str:
+    """Human-readable summary of one embedding server's ``__STATS__`` reply."""
+    requests = ", ".join(f"{kind}={n}" for kind, n in sorted(stats["requests"].items()))
+    lines = [
+        f"🖥️  Port {port}: {stats['backend']} embedding server (pid {stats['pid']}, "
+        f"up {stats['uptime'] / 60:.1f} min)",
+        f"   Model: {stats['model']}",
+        f"   Requests: {requests or 'none'}",
+        f"   Texts embedded: {stats['texts_embedded']}   Missing passages: "
+        f"{stats['passages_missing']}   Errors: {stats['errors']}   Fallback responses: "
+        f"{stats['fallback_responses']}   Queued requests: {stats['queued_requests']}",
+        "   Latency p50/p95/p99 (ms):",
+    ]
+    timings = [(f"request[{kind}]", h) for kind, h in sorted(stats["request_latency"].items())]
+    timings += [("passage lookup", stats["lookup_latency"]), ("model", stats["model_latency"])]
+    for name, h in timings:
+        lines.append(f"     {name:<20} {_ms(h['p50'])} / {_ms(h['p95'])} / {_ms(h['p99'])}")
+    batch = stats["batch_size"]
+    if batch["count"]:
+        lines.append(
+            f"   Batch size: mean {batch['mean']:.1f}, p95 <= {batch['p95']:g}, max {batch['max']:g}"
+        )
+    return "\n".join(lines)
+
+
+def format_bench_report(report: dict[str, Any]) -> str:
+    """Table of one ``leann bench`` report: a build line and a row per grid point."""
+    top_k = report["config"].get("top_k", 10)
+    lines = []
+    for result in report["results"]:
+        build = result["build"]
+        lines.append(
+            f"\n🔧 {result['backend']}: built in {build['seconds']:.2f}s "
+            f"({build['docs_per_second'] or 0:.0f} docs/s), "
+            f"index {build['index_bytes'] / (1024 * 1024):.2f} MB"
+        )
+        header = f"   {'C':>5} {'BW':>3} {'prune':>5}  {'p50':>8} {'p95':>8} {'p99':>8}"
+        lines.append(f"{header}  {f'R@{top_k}':>6}  {'recomputed':>10}  QPS by clients")
+        for run in result["runs"]:
+            latency = run["latency_ms"]
+            recomputed = run["recompute"]["nodes_recomputed"]
+            qps = ", ".join(f"{n}:{value:.1f}" for n, value in run["qps"].items())
+            lines.append(
+                f"   {run['complexity']:>5} {run['beam_width']:>3} {run['prune_ratio']:>5.2f}  "
+                f"{latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f}  "
+                f"{run[f'recall_at_{top_k}']:>6.3f}  "
+                f"{'-' if recomputed is None else f'{recomputed:.0f}':>10}  {qps}"
+            )
+        startup = result.get("startup")
+        if startup:
+            zygote = startup["zygote_ms"]
+            lines.append(
+                f"   server start-up to first embedding: cold p50 {startup['cold_ms']['p50']:.1f}, "
+                f"zygote p50 {'-' if zygote is None else format(zygote['p50'], '.1f')}"
+            )
+    lines.append("   (latencies in ms)")
+    return "\n".join(lines)
+
 
 def extract_pdf_text_with_pymupdf(file_path: str) -> str:
     """Extract text from PDF using PyMuPDF for better quality."""
@@ -45,19 +111,58 @@ def extract_pdf_text_with_pdfplumber(file_path: str) -> str:
         return None
 
 
+def format_search_results(query: str, results: list, show_metadata: bool = False) -> str:
+    """Render search results the way `leann search` prints them."""
+    lines = [f"Search results for '{query}' (top {len(results)}):"]
+    for i, result in enumerate(results, 1):
+        lines.append(f"{i}. Score: {result.score:.3f}")
+        if "index_name" in result.metadata:
+            lines.append(f"   📚 Index: {result.metadata['index_name']}")
+
+        # Display metadata if flag is set
+        if show_metadata and result.metadata:
+            file_path = result.metadata.get("file_path", "")
+            if file_path:
+                lines.append(f"   📄 File: {file_path}")
+
+            file_name = result.metadata.get("file_name", "")
+            if file_name and file_name != file_path:
+                lines.append(f"   📝 Name: {file_name}")
+
+            # Show timestamps if available
+            if "creation_date" in result.metadata:
+                lines.append(f"   🕐 Created: {result.metadata['creation_date']}")
+            if "last_modified_date" in result.metadata:
+                lines.append(f"   🕑 Modified: {result.metadata['last_modified_date']}")
+
+        lines.append(f"   {result.text[:200]}...")
+        lines.append(f"   Source: {result.metadata.get('source', '')}")
+        lines.append("")
+    return "\n".join(lines)
+
+
 class LeannCLI:
     def __init__(self):
         # Always use project-local .leann directory (like .git)
         self.indexes_dir = Path.cwd() / ".leann" / "indexes"
         self.indexes_dir.mkdir(parents=True, exist_ok=True)
 
-        # Default parser for documents
-        self.node_parser = SentenceSplitter(
+    # The parsers pull in llama_index, so only commands that chunk documents build them
+    @cached_property
+    def node_parser(self):
+        """Default parser for documents."""
+        from llama_index.core.node_parser import SentenceSplitter
+
+        return SentenceSplitter(
             chunk_size=256, chunk_overlap=128, separator=" ", paragraph_separator="\n\n"
         )
 
-        # Code-optimized parser
-        self.code_parser = SentenceSplitter(
+    @cached_property
+    def code_parser(self):
+        """Code-optimized parser."""
+        from llama_index.core.node_parser import SentenceSplitter
+
+        return SentenceSplitter(
             chunk_size=512,  # Larger chunks for code context
             chunk_overlap=50,  # Less overlap to preserve function boundaries
             separator="\n",  # Split by lines for code
@@ -88,6 +193,10 @@ Examples:
   leann search my-docs "query"                                           # Search in my-docs index
   leann ask my-docs "question"                                           # Ask my-docs index
   leann list                                                             # List all stored indexes
+  leann serve --preload my-docs                                          # Serve search over HTTP on 127.0.0.1:8765
+  leann server-stats                                                     # Show counters of running embedding servers
+  leann zygote start --models facebook/contriever                        # Keep a warm process that forks embedding servers
+  leann bench --docs 2000 --output bench.json                            # Benchmark backends on a synthetic corpus
   leann remove my-docs                                                   # Remove an index (local first, then global)
             """,
         )
@@ -236,11 +345,54 @@ Examples:
             default=True,
             help="Fall back to traditional chunking if AST chunking fails (default: True)",
         )
+        build_parser.add_argument(
+            "--keyword-index",
+            action="store_true",
+            help="Also build the inverted index used by keyword search (otherwise built on first keyword search)",
+        )
+        build_parser.add_argument(
+            "--compact-codes",
+            choices=["sq8", "binary"],
+            default=None,
+            help="HNSW only: store 8-bit or 1-bit codes so --two-stage search can traverse without recompute",
+        )
+        build_parser.add_argument(
+            "--reorder",
+            choices=["bfs", "rcm"],
+            default=None,
+            help="HNSW only: renumber graph nodes (BFS or reverse Cuthill-McKee) so neighbors share disk pages",
+        )
+        build_parser.add_argument(
+            "--exact-embeddings",
+            action=argparse.BooleanOptionalAction,
+            default=None,
+            help="Keep fp16 embeddings for exact brute-force search (default: only for indexes of up to 4096 passages)",
+        )
+        build_parser.add_argument(
+            "--num-shards",
+            type=int,
+            default=1,
+            help="Split the index into this many shard graphs, built in parallel processes and searched concurrently (default: 1)",
+        )
+        build_parser.add_argument(
+            "--shard-by",
+            choices=["hash", "source"],
+            default="hash",
+            help="Assign passages to shards by a hash of their id, or of their source file to keep each document in one shard (default: hash)",
+        )
 
         # Search command
         search_parser = subparsers.add_parser("search", help="Search documents")
-        search_parser.add_argument("index_name", help="Index name")
-        search_parser.add_argument("query", help="Search query")
+        search_parser.add_argument(
+            "index_name", nargs="?", help="Index name (omit when using --indexes)"
+        )
+        search_parser.add_argument("query", nargs="?", help="Search query")
+        search_parser.add_argument(
+            "--indexes",
+            type=str,
+            default=None,
+            help='Comma-separated index names to search concurrently and merge into one ranking (e.g. --indexes docs,code,notes "query")',
+        )
         search_parser.add_argument(
             "--top-k", type=int, default=5, help="Number of results (default: 5)"
         )
@@ -272,6 +424,62 @@ Examples:
             action="store_true",
             help="Display file paths and metadata in search results",
         )
+        search_parser.add_argument(
+            "--keyword",
+            action="store_true",
+            help='BM25 keyword search instead of vector search; use "quotes" for exact phrases',
+        )
+        search_parser.add_argument(
+            "--hybrid",
+            action="store_true",
+            help="Run keyword and vector search concurrently and fuse the rankings",
+        )
+        search_parser.add_argument(
+            "--fusion",
+            choices=["rrf", "weighted"],
+            default="rrf",
+            help="How --hybrid combines rankings: reciprocal rank fusion or normalized scores (default: rrf)",
+        )
+        search_parser.add_argument(
+            "--hybrid-alpha",
+            type=float,
+            default=0.5,
+            help="Weight of the vector ranking in --hybrid fusion, 0-1 (default: 0.5)",
+        )
+        search_parser.add_argument(
+            "--rerank",
+            action="store_true",
+            help="Rerank results with a cross-encoder (over-fetches 4x candidates)",
+        )
+        search_parser.add_argument(
+            "--rerank-model",
+            type=str,
+            default=None,
+            help="Cross-encoder model for --rerank (default: cross-encoder/ms-marco-MiniLM-L-6-v2)",
+        )
+        search_parser.add_argument(
+            "--two-stage",
+            action="store_true",
+            help="HNSW only: traverse on compact codes, then recompute the final candidates in one batch (needs --compact-codes at build)",
+        )
+        search_parser.add_argument(
+            "--rerank-k",
+            type=int,
+            default=None,
+            help="Candidates recomputed by --two-stage search (default: complexity)",
+        )
+        search_parser.add_argument(
+            "--prefetch-depth",
+            type=int,
+            default=0,
+            help="HNSW only: prefetch neighbor distances of this many best candidates in the background during recompute search (default: 0, off)",
+        )
+        search_parser.add_argument(
+            "--exact-threshold",
+            type=int,
+            default=None,
+            help="Search exactly, without the graph or embedding server, when the index or filtered subset has at most this many passages (default: 4096, 0 disables)",
+        )
         search_parser.add_argument(
             "--embedding-prompt-template",
             type=str,
@@ -343,10 +551,220 @@ Examples:
             default=None,
             help="API key for OpenAI-compatible APIs (defaults to OPENAI_API_KEY)",
         )
+        ask_parser.add_argument(
+            "--rerank",
+            action="store_true",
+            help="Rerank retrieved context with a cross-encoder (over-fetches 4x candidates)",
+        )
+        ask_parser.add_argument(
+            "--rerank-model",
+            type=str,
+            default=None,
+            help="Cross-encoder model for --rerank (default: cross-encoder/ms-marco-MiniLM-L-6-v2)",
+        )
 
         # List command
         subparsers.add_parser("list", help="List all indexes")
 
+        # Serve command
+        serve_parser = subparsers.add_parser(
+            "serve", help="Run a local HTTP search service that keeps indexes warm"
+        )
+        serve_parser.add_argument(
+            "--host",
+            type=str,
+            default="127.0.0.1",
+            help="Interface to bind (default: 127.0.0.1, loopback only)",
+        )
+        serve_parser.add_argument(
+            "--port", type=int, default=8765, help="Port to listen on (default: 8765)"
+        )
+        serve_parser.add_argument(
+            "--pool-size",
+            type=int,
+            default=4,
+            help="Maximum indexes kept open with warm embedding servers (default: 4)",
+        )
+        serve_parser.add_argument(
+            "--max-concurrency",
+            type=int,
+            default=4,
+            help="Requests executed concurrently (default: 4)",
+        )
+        serve_parser.add_argument(
+            "--max-pending",
+            type=int,
+            default=64,
+            help="Requests allowed to queue before the service answers 503 (default: 64)",
+        )
+        serve_parser.add_argument(
+            "--preload",
+            type=str,
+            nargs="+",
+            default=[],
+            help="Index names to open and warm up at start-up",
+        )
+
+        # Server stats command
+        stats_parser = subparsers.add_parser(
+            "server-stats", help="Show request counters and latencies of running embedding servers"
+        )
+        stats_parser.add_argument(
+            "--ports",
+            type=int,
+            nargs="+",
+            default=None,
+            help=f"Embedding server ports to query (default: scan {SERVER_PORT_SCAN.start}-"
+            f"{SERVER_PORT_SCAN.stop - 1})",
+        )
+        stats_parser.add_argument(
+            "--json", action="store_true", help="Print the raw stats of each server as JSON"
+        )
+        stats_parser.add_argument(
+            "--timeout-ms",
+            type=int,
+            default=1000,
+            help="How long to wait for each server to answer (default: 1000)",
+        )
+
+        # Bench command
+        bench_parser = subparsers.add_parser(
+            "bench",
+            help="Benchmark build time, index size, latency, QPS and recall across backends",
+        )
+        bench_parser.add_argument(
+            "--corpus",
+            type=str,
+            default=None,
+            help="Text/JSONL file or directory of passages (default: synthetic corpus)",
+        )
+        bench_parser.add_argument(
+            "--docs", type=int, default=1000, help="Number of passages to index (default: 1000)"
+        )
+        bench_parser.add_argument(
+            "--queries", type=int, default=50, help="Number of queries to run (default: 50)"
+        )
+        bench_parser.add_argument(
+            "--backends",
+            type=str,
+            nargs="+",
+            default=["hnsw"],
+            choices=["hnsw", "diskann"],
+            help="Backends to benchmark (default: hnsw)",
+        )
+        bench_parser.add_argument(
+            "--complexity",
+            type=int,
+            nargs="+",
+            default=[32, 64],
+            help="Search complexities to sweep (default: 32 64)",
+        )
+        bench_parser.add_argument(
+            "--beam-width",
+            type=int,
+            nargs="+",
+            default=[1],
+            help="Beam widths to sweep (default: 1)",
+        )
+        bench_parser.add_argument(
+            "--prune-ratio",
+            type=float,
+            nargs="+",
+            default=[0.0],
+            help="Prune ratios to sweep (default: 0.0)",
+        )
+        bench_parser.add_argument(
+            "--top-k", type=int, default=10, help="Results per query, k of recall@k (default: 10)"
+        )
+        bench_parser.add_argument(
+            "--clients",
+            type=int,
+            nargs="+",
+            default=[1, 4],
+            help="Concurrent client counts to measure QPS with (default: 1 4)",
+        )
+        bench_parser.add_argument(
+            "--embedding-model",
+            type=str,
+            default=DEFAULT_BENCH_MODEL,
+            help=f"Embedding model (default: {DEFAULT_BENCH_MODEL})",
+        )
+        bench_parser.add_argument(
+            "--embedding-mode",
+            type=str,
+            default="sentence-transformers",
+            choices=["sentence-transformers", "openai", "mlx", "ollama"],
+            help="Embedding backend mode (default: sentence-transformers)",
+        )
+        bench_parser.add_argument(
+            "--no-recompute",
+            dest="recompute",
+            action="store_false",
+            help="Store embeddings in the index instead of recomputing them at search time",
+        )
+        bench_parser.add_argument(
+            "--device",
+            type=str,
+            default="cpu",
+            choices=["cpu", "auto"],
+            help="cpu hides CUDA GPUs from the model so runs are comparable (default: cpu)",
+        )
+        bench_parser.add_argument(
+            "--offline",
+            action="store_true",
+            help="Never download models; the embedding model must be cached or a local path",
+        )
+        bench_parser.add_argument(
+            "--seed", type=int, default=42, help="Seed of the synthetic corpus and queries"
+        )
+        bench_parser.add_argument(
+            "--work-dir",
+            type=str,
+            default=None,
+            help="Keep the benchmark indexes here (default: temporary directory)",
+        )
+        bench_parser.add_argument(
+            "--startup-runs",
+            type=int,
+            default=0,
+            help="Also time embedding server start-up, cold and via a zygote, this many times",
+        )
+        bench_parser.add_argument(
+            "--output", "-o", type=str, default=None, help="Write the JSON report to this file"
+        )
+
+        # Zygote command
+        zygote_parser = subparsers.add_parser(
+            "zygote",
+            help="Keep a warm process that forks ready embedding servers, skipping cold start",
+        )
+        zygote_parser.add_argument("action", choices=["start", "status", "stop"])
+        zygote_parser.add_argument(
+            "--models",
+            type=str,
+            nargs="+",
+            default=["facebook/contriever"],
+            help="Embedding models to preload (default: facebook/contriever)",
+        )
+        zygote_parser.add_argument(
+            "--embedding-mode",
+            type=str,
+            default="sentence-transformers",
+            choices=["sentence-transformers", "openai", "mlx", "ollama"],
+            help="Embedding backend mode of the preloaded models (default: sentence-transformers)",
+        )
+        zygote_parser.add_argument(
+            "--socket",
+            type=str,
+            default=None,
+            help="IPC socket path (default: $LEANN_ZYGOTE_SOCKET or ~/.leann/zygote.ipc)",
+        )
+        zygote_parser.add_argument(
+            "--foreground",
+            action="store_true",
+            help="Run the zygote in this terminal instead of detaching it",
+        )
+
         # Remove command
         remove_parser = subparsers.add_parser("remove", help="Remove an index")
         remove_parser.add_argument("index_name", help="Index name to remove")
@@ -537,96 +955,8 @@ Examples:
     def _discover_indexes_in_project(
         self, project_path: Path, exclude_dirs: Optional[list[Path]] = None
     ):
-        """Discover all indexes in a project directory (both CLI and apps formats)
-
-        exclude_dirs: when provided, skip any APP-format index files that are
-        located under these directories. This prevents duplicates when the
-        current project is a parent directory of other registered projects.
-        """
-        indexes = []
-        exclude_dirs = exclude_dirs or []
-        # normalize to resolved paths once for comparison
-        try:
-            exclude_dirs_resolved = [p.resolve() for p in exclude_dirs]
-        except Exception:
-            exclude_dirs_resolved = exclude_dirs
-
-        # 1. CLI format: .leann/indexes/index_name/
-        cli_indexes_dir = project_path / ".leann" / "indexes"
-        if cli_indexes_dir.exists():
-            for index_dir in cli_indexes_dir.iterdir():
-                if index_dir.is_dir():
-                    meta_file = index_dir / "documents.leann.meta.json"
-                    status = "✅" if meta_file.exists() else "❌"
-
-                    size_mb = 0
-                    if meta_file.exists():
-                        try:
-                            size_mb = sum(
-                                f.stat().st_size for f in index_dir.iterdir() if f.is_file()
-                            ) / (1024 * 1024)
-                        except (OSError, PermissionError):
-                            pass
-
-                    indexes.append(
-                        {
-                            "name": index_dir.name,
-                            "type": "cli",
-                            "status": status,
-                            "size_mb": size_mb,
-                            "path": index_dir,
-                        }
-                    )
-
-        # 2. Apps format: *.leann.meta.json files anywhere in the project
-        cli_indexes_dir = project_path / ".leann" / "indexes"
-        for meta_file in project_path.rglob("*.leann.meta.json"):
-            if meta_file.is_file():
-                # Skip CLI-built indexes (which store meta under .leann/indexes/<name>/)
-                try:
-                    if cli_indexes_dir.exists() and cli_indexes_dir in meta_file.parents:
-                        continue
-                except Exception:
-                    pass
-                # Skip meta files that live under excluded directories
-                try:
-                    meta_parent_resolved = meta_file.parent.resolve()
-                    if any(
-                        meta_parent_resolved.is_relative_to(ex_dir)
-                        for ex_dir in exclude_dirs_resolved
-                    ):
-                        continue
-                except Exception:
-                    # best effort; if resolve or comparison fails, do not exclude
-                    pass
-                # Use the parent directory name as the app index display name
-                display_name = meta_file.parent.name
-                # Extract file base used to store files
-                file_base = meta_file.name.replace(".leann.meta.json", "")
-
-                # Apps indexes are considered complete if the .leann.meta.json file exists
-                status = "✅"
-
-                # Calculate total size of all related files (use file base)
-                size_mb = 0
-                try:
-                    index_dir = meta_file.parent
-                    for related_file in index_dir.glob(f"{file_base}.leann*"):
-                        size_mb += related_file.stat().st_size / (1024 * 1024)
-                except (OSError, PermissionError):
-                    pass
-
-                indexes.append(
-                    {
-                        "name": display_name,
-                        "type": "app",
-                        "status": status,
-                        "size_mb": size_mb,
-                        "path": meta_file,
-                    }
-                )
-
-        return indexes
+        """Discover all indexes in a project directory (both CLI and apps formats)"""
+        return discover_indexes_in_project(project_path, exclude_dirs=exclude_dirs)
 
     def remove_index(self, index_name: str, force: bool = False):
         """Safely remove an index - always show all matches for transparency"""
@@ -963,6 +1293,8 @@ Examples:
         include_hidden: bool = False,
         args: Optional[dict[str, Any]] = None,
     ):
+        from llama_index.core import SimpleDirectoryReader
+
         # Handle both single path (string) and multiple paths (list) for backward compatibility
         if isinstance(docs_paths, str):
             docs_paths = [docs_paths]
@@ -1384,6 +1716,8 @@ Examples:
             )
             code_chunk_overlap = code_chunk_size - 1
 
+        from llama_index.core.node_parser import SentenceSplitter
+
         self.node_parser = SentenceSplitter(
             chunk_size=doc_chunk_size,
             chunk_overlap=doc_chunk_overlap,
@@ -1435,6 +1769,12 @@ Examples:
             is_compact=args.compact,
             is_recompute=args.recompute,
             num_threads=args.num_threads,
+            keyword_index=args.keyword_index,
+            exact_embeddings=args.exact_embeddings,
+            num_shards=args.num_shards,
+            shard_by=args.shard_by,
+            **({"compact_codes": args.compact_codes} if args.compact_codes else {}),
+            **({"reorder": args.reorder} if args.reorder else {}),
         )
 
         for chunk in all_texts:
@@ -1446,9 +1786,63 @@ Examples:
         # Register this project directory in global registry
         self.register_project_dir()
 
+    def _search_kwargs(self, args) -> dict:
+        """Keyword arguments for ``LeannSearcher.search`` from `leann search` flags."""
+        # Build provider_options for runtime override
+        provider_options = {}
+        if args.embedding_prompt_template:
+            provider_options["prompt_template"] = args.embedding_prompt_template
+
+        return {
+            "top_k": args.top_k,
+            "complexity": args.complexity,
+            "beam_width": args.beam_width,
+            "prune_ratio": args.prune_ratio,
+            "recompute_embeddings": args.recompute_embeddings,
+            "pruning_strategy": args.pruning_strategy,
+            "provider_options": provider_options if provider_options else None,
+            "search_mode": "hybrid" if args.hybrid else "keyword" if args.keyword else "vector",
+            "hybrid_fusion": args.fusion,
+            "hybrid_alpha": args.hybrid_alpha,
+            "rerank": args.rerank,
+            "rerank_model": args.rerank_model,
+            "exact_threshold": args.exact_threshold,
+            **({"two_stage": True, "rerank_k": args.rerank_k} if args.two_stage else {}),
+            **({"prefetch_depth": args.prefetch_depth} if args.prefetch_depth else {}),
+        }
+
+    def search_federated(self, args) -> None:
+        """Search every index in ``--indexes`` concurrently and print one merged ranking."""
+        from .federated import FederatedSearcher
+
+        index_names = [name.strip() for name in args.indexes.split(",") if name.strip()]
+        # With --indexes the only positional argument is the query
+        query = args.query if args.query is not None else args.index_name
+        if args.query is not None and args.index_name:
+            index_names.append(args.index_name)
+        if not index_names or not query:
+            print('Usage: leann search --indexes <name1>,<name2>,... "<query>"')
+            return
+
+        try:
+            searcher = FederatedSearcher(index_names)
+        except FileNotFoundError as e:
+            print(f"{e} Use 'leann list' to see available indexes.")
+            return
+        with searcher:
+            kwargs = self._search_kwargs(args)
+            results = searcher.search(query, **kwargs)
+        print(format_search_results(query, results, show_metadata=args.show_metadata))
+
     async def search_documents(self, args):
+        if args.indexes:
+            self.search_federated(args)
+            return
         index_name = args.index_name
         query = args.query
+        if not index_name or query is None:
+            print('Usage: leann search <index_name> "<query>"')
+            return
 
         # First try to find the index in current project
         index_path = self.get_index_path(index_name)
@@ -1545,46 +1939,10 @@ Examples:
                         print("Invalid input. Aborting search.")
                         return
 
-        # Build provider_options for runtime override
-        provider_options = {}
-        if args.embedding_prompt_template:
-            provider_options["prompt_template"] = args.embedding_prompt_template
-
         searcher = LeannSearcher(index_path=index_path)
-        results = searcher.search(
-            query,
-            top_k=args.top_k,
-            complexity=args.complexity,
-            beam_width=args.beam_width,
-            prune_ratio=args.prune_ratio,
-            recompute_embeddings=args.recompute_embeddings,
-            pruning_strategy=args.pruning_strategy,
-            provider_options=provider_options if provider_options else None,
-        )
-
-        print(f"Search results for '{query}' (top {len(results)}):")
-        for i, result in enumerate(results, 1):
-            print(f"{i}. Score: {result.score:.3f}")
-
-            # Display metadata if flag is set
-            if args.show_metadata and result.metadata:
-                file_path = result.metadata.get("file_path", "")
-                if file_path:
-                    print(f"   📄 File: {file_path}")
+        results = searcher.search(query, **self._search_kwargs(args))
 
-                file_name = result.metadata.get("file_name", "")
-                if file_name and file_name != file_path:
-                    print(f"   📝 Name: {file_name}")
-
-                # Show timestamps if available
-                if "creation_date" in result.metadata:
-                    print(f"   🕐 Created: {result.metadata['creation_date']}")
-                if "last_modified_date" in result.metadata:
-                    print(f"   🕑 Modified: {result.metadata['last_modified_date']}")
-
-            print(f"   {result.text[:200]}...")
-            print(f"   Source: {result.metadata.get('source', '')}")
-            print()
+        print(format_search_results(query, results, show_metadata=args.show_metadata))
 
     async def ask_questions(self, args):
         index_name = args.index_name
@@ -1625,6 +1983,8 @@ Examples:
                 recompute_embeddings=args.recompute_embeddings,
                 pruning_strategy=args.pruning_strategy,
                 llm_kwargs=llm_kwargs,
+                rerank=args.rerank,
+                rerank_model=args.rerank_model,
             )
             query_completion_time = time.time() - query_start_time
             print(f"LEANN: {response}")
@@ -1648,6 +2008,129 @@ Examples:
 
             _ask_once(query)
 
+    async def serve(self, args):
+        from .service import serve_forever
+
+        if args.host not in ("127.0.0.1", "localhost", "::1"):
+            print(f"⚠️  Binding to {args.host}: the search service has no authentication.")
+        await serve_forever(
+            host=args.host,
+            port=args.port,
+            pool_size=args.pool_size,
+            max_concurrency=args.max_concurrency,
+            max_pending=args.max_pending,
+            preload=args.preload,
+        )
+
+    def server_stats(self, args):
+        import json
+
+        from .embedding_server_manager import _check_port
+        from .zmq_client import fetch_server_stats
+
+        ports = args.ports or [port for port in SERVER_PORT_SCAN if _check_port(port)]
+        found = {}
+        for port in ports:
+            stats = fetch_server_stats(port, timeout_ms=args.timeout_ms)
+            if stats is None:
+                if args.ports:
+                    print(f"⚠️  No embedding server stats on port {port}")
+                continue
+            found[port] = stats
+
+        if args.json:
+            print(json.dumps(found, indent=2))
+            return
+        if not found:
+            print("No running embedding servers found.")
+            return
+        for port, stats in found.items():
+            print(format_server_stats(port, stats))
+
+    def bench(self, args):
+        import json
+        import os
+
+        from .bench import load_corpus, run_benchmark, sample_queries, synthetic_corpus
+
+        if args.device == "cpu":
+            # Inherited by the embedding servers the searches start
+            os.environ["CUDA_VISIBLE_DEVICES"] = ""
+        if args.offline:
+            os.environ["HF_HUB_OFFLINE"] = "1"
+            os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+        if args.corpus:
+            texts = load_corpus(args.corpus, max_docs=args.docs)
+        else:
+            texts = synthetic_corpus(args.docs, seed=args.seed)
+        queries = sample_queries(texts, args.queries, seed=args.seed)
+        print(
+            f"📊 Benchmarking {', '.join(args.backends)} on {len(texts)} passages, "
+            f"{len(queries)} queries"
+        )
+        report = run_benchmark(
+            texts,
+            queries,
+            backends=args.backends,
+            work_dir=args.work_dir,
+            corpus_source=args.corpus or "synthetic",
+            complexities=args.complexity,
+            beam_widths=args.beam_width,
+            prune_ratios=args.prune_ratio,
+            top_k=args.top_k,
+            clients=args.clients,
+            embedding_model=args.embedding_model,
+            embedding_mode=args.embedding_mode,
+            recompute=args.recompute,
+            startup_runs=args.startup_runs,
+        )
+        print(format_bench_report(report))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"📝 Report written to {args.output}")
+
+    def zygote(self, args):
+        from .zygote import main as zygote_main
+        from .zygote import start_zygote, stop_zygote, zygote_socket_path, zygote_status
+
+        socket_path = zygote_socket_path(args.socket)
+        if args.action == "status":
+            status = zygote_status(socket_path)
+            if status is None:
+                print(f"No zygote running on {socket_path}.")
+                return
+            print(
+                f"🧬 Zygote {status['pid']} on {status['socket']}: up "
+                f"{status['uptime_seconds']:.0f}s, {status['spawned']} servers forked, "
+                f"models: {', '.join(status['models']) or 'none'}"
+            )
+        elif args.action == "stop":
+            if stop_zygote(socket_path):
+                print(f"✅ Zygote on {socket_path} stopped")
+            else:
+                print(f"No zygote running on {socket_path}.")
+        elif args.foreground:
+            zygote_main(
+                [
+                    "--socket",
+                    str(socket_path),
+                    "--mode",
+                    args.embedding_mode,
+                    "--models",
+                    *args.models,
+                ]
+            )
+        else:
+            print(f"🧬 Starting zygote, preloading {', '.join(args.models)}...")
+            try:
+                status = start_zygote(args.models, args.embedding_mode, socket_path=socket_path)
+            except RuntimeError as e:
+                print(f"❌ {e}")
+                return
+            print(f"✅ Zygote {status['pid']} ready on {status['socket']}")
+
     async def run(self, args=None):
         parser = self.create_parser()
 
@@ -1668,6 +2151,14 @@ Examples:
             await self.search_documents(args)
         elif args.command == "ask":
             await self.ask_questions(args)
+        elif args.command == "serve":
+            await self.serve(args)
+        elif args.command == "server-stats":
+            self.server_stats(args)
+        elif args.command == "bench":
+            self.bench(args)
+        elif args.command == "zygote":
+            self.zygote(args)
         else:
             parser.print_help()
 
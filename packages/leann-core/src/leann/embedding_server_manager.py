@@ -7,9 +7,10 @@ import subprocess
 import sys
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
 from .settings import encode_provider_options
+from .zygote import ForkedServerProcess, gpu_visible, spawn_server, zygote_enabled
 
 # Lightweight, self-contained server manager with no cross-process inspection
 
@@ -21,6 +22,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Working directory of the embedding server processes
+_PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.parent
+
 
 def _is_colab_environment() -> bool:
     """Check if we're running in Google Colab environment."""
@@ -133,16 +137,20 @@ class EmbeddingServerManager:
     A simplified manager for embedding server processes that avoids complex update mechanisms.
     """
 
-    def __init__(self, backend_module_name: str):
+    def __init__(self, backend_module_name: str, zygote: Union[bool, str, Path, None] = None):
         """
         Initializes the manager for a specific backend.
 
         Args:
             backend_module_name (str): The full module name of the backend's server script.
                                        e.g., "leann_backend_diskann.embedding_server"
+            zygote: Whether to fork servers from a running ``leann zygote``. None follows
+                    LEANN_EMBEDDING_ZYGOTE, False never does, and a path selects the
+                    zygote socket to use.
         """
         self.backend_module_name = backend_module_name
-        self.server_process: Optional[subprocess.Popen] = None
+        self.zygote = zygote
+        self.server_process: Optional[Union[subprocess.Popen, ForkedServerProcess]] = None
         self.server_port: Optional[int] = None
         # Track last-started config for in-process reuse only
         self._server_config: Optional[dict] = None
@@ -296,12 +304,19 @@ class EmbeddingServerManager:
         command = self._build_server_command(port, model_name, embedding_mode, **kwargs)
 
         try:
-            self._launch_server_process(
+            if not self._launch_server_from_zygote(
                 command,
                 port,
+                embedding_mode=embedding_mode,
                 provider_options=provider_options,
                 config_signature=config_signature,
-            )
+            ):
+                self._launch_server_process(
+                    command,
+                    port,
+                    provider_options=provider_options,
+                    config_signature=config_signature,
+                )
             started, ready_port = self._wait_for_server_ready(port)
             if started:
                 self._server_config = config_signature or {
@@ -349,7 +364,6 @@ class EmbeddingServerManager:
         config_signature: Optional[dict] = None,
     ) -> None:
         """Launch the server process."""
-        project_root = Path(__file__).parent.parent.parent.parent.parent
         logger.info(f"Command: {' '.join(command)}")
 
         # In CI environment, redirect stdout to avoid buffer deadlock but keep stderr for debugging
@@ -367,18 +381,73 @@ class EmbeddingServerManager:
 
         # Start embedding server subprocess
         logger.info(f"Starting server process with command: {' '.join(command)}")
-        env = os.environ.copy()
-        encoded_options = encode_provider_options(provider_options)
-        if encoded_options:
-            env["LEANN_EMBEDDING_OPTIONS"] = encoded_options
-
         self.server_process = subprocess.Popen(
             command,
-            cwd=project_root,
+            cwd=_PROJECT_ROOT,
             stdout=stdout_target,
             stderr=stderr_target,
+            env=self._server_env(provider_options),
+        )
+        self._track_server_process(
+            command, port, provider_options=provider_options, config_signature=config_signature
+        )
+
+    def _launch_server_from_zygote(
+        self,
+        command: list,
+        port: int,
+        *,
+        embedding_mode: str = "sentence-transformers",
+        provider_options: Optional[dict] = None,
+        config_signature: Optional[dict] = None,
+    ) -> bool:
+        """Fork the server from a running zygote; False to start it the regular way."""
+        if self.zygote is False or not zygote_enabled():
+            return False
+        env = self._server_env(provider_options)
+        if embedding_mode == "sentence-transformers" and gpu_visible(env):
+            # Forked servers are CPU-only, so a local model that can use the GPU starts cold
+            logger.info("GPU visible; starting the embedding server without the zygote")
+            return False
+        socket_path = self.zygote if isinstance(self.zygote, (str, Path)) else None
+        # command is [python, -m, module, *argv]; the zygote already is the interpreter
+        pid = spawn_server(
+            self.backend_module_name,
+            command[3:],
             env=env,
+            cwd=str(_PROJECT_ROOT),
+            socket_path=socket_path,
+        )
+        if pid is None:
+            return False
+        try:
+            self.server_process = ForkedServerProcess(pid)
+        except Exception as e:  # psutil.NoSuchProcess: the server died straight away
+            logger.warning(f"Zygote-forked server {pid} is gone: {e}")
+            return False
+        logger.info(f"Forked embedding server from zygote: {' '.join(command[2:])}")
+        self._track_server_process(
+            command, port, provider_options=provider_options, config_signature=config_signature
         )
+        return True
+
+    @staticmethod
+    def _server_env(provider_options: Optional[dict]) -> dict:
+        env = os.environ.copy()
+        encoded_options = encode_provider_options(provider_options)
+        if encoded_options:
+            env["LEANN_EMBEDDING_OPTIONS"] = encoded_options
+        return env
+
+    def _track_server_process(
+        self,
+        command: list,
+        port: int,
+        *,
+        provider_options: Optional[dict] = None,
+        config_signature: Optional[dict] = None,
+    ) -> None:
+        """Record the freshly started server and make sure it is cleaned up at exit."""
         self.server_port = port
         # Record config for in-process reuse (best effort; refined later when ready)
         if config_signature is not None:
@@ -422,8 +491,11 @@ class EmbeddingServerManager:
 
     def _wait_for_server_ready(self, port: int) -> tuple[bool, int]:
         """Wait for the server to be ready."""
-        max_wait, wait_interval = 120, 0.5
-        for _ in range(int(max_wait / wait_interval)):
+        max_wait = 120
+        # Poll quickly at first: a server forked from the zygote binds within milliseconds
+        wait_interval = 0.01
+        deadline = time.monotonic() + max_wait
+        while time.monotonic() < deadline:
             if _check_port(port):
                 logger.info("Embedding server is ready!")
                 return True, port
@@ -433,6 +505,7 @@ class EmbeddingServerManager:
                 return False, port
 
             time.sleep(wait_interval)
+            wait_interval = min(wait_interval * 2, 0.5)
 
         logger.error(f"Server failed to start within {max_wait} seconds.")
         self.stop_server()
@@ -0,0 +1,162 @@
+"""
+Exact brute-force search for small indexes and small filtered subsets.
+
+Below a few thousand passages, scoring every passage with one matrix-vector
+product beats a graph walk that has to start an embedding server first. Small
+indexes therefore keep their embeddings as float16 in ``<index>.exact.npy``
+(memory-mapped at search time) next to an :class:`~leann.id_map.IdMap` of the
+passage ids in row order under the ``<index>.exact`` prefix.
+"""
+
+import logging
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from .id_map import IdMap
+
+logger = logging.getLogger(__name__)
+
+# Indexes (or filtered subsets) with at most this many passages are searched exactly
+EXACT_SEARCH_THRESHOLD = 4096
+# Filtered queries only scan metadata for the exact path when the index has at most this
+# many times the threshold in passages; above that the subset is rarely small enough
+EXACT_FILTER_SCAN_FACTOR = 16
+# Rows scored per matmul, so fp16 -> fp32 upcasts stay bounded for large opted-in indexes
+_CHUNK_ROWS = 65536
+
+
+def exact_paths(index_path: str) -> tuple[Path, Path]:
+    """Embeddings file and id map prefix of the exact index for ``index_path``."""
+    return Path(f"{index_path}.exact.npy"), Path(f"{index_path}.exact")
+
+
+def _prepare(embeddings: np.ndarray, distance_metric: str) -> np.ndarray:
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if distance_metric == "cosine":
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        embeddings = embeddings / norms
+    return embeddings.astype(np.float16)
+
+
+class ExactIndex:
+    """Float16 embedding matrix with passage ids, scored by brute force."""
+
+    def __init__(self, embeddings: np.ndarray, ids: Sequence[str], distance_metric: str = "mips"):
+        if len(ids) != embeddings.shape[0]:
+            raise ValueError(f"Exact index has {embeddings.shape[0]} embeddings but {len(ids)} ids")
+        self.embeddings = embeddings
+        self.ids = ids if isinstance(ids, IdMap) else IdMap.from_ids(ids)
+        self.distance_metric = distance_metric.lower()
+        # Ids and metadata only; text is read per query when a filter needs it
+        self._filter_rows: Optional[list[dict[str, Any]]] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def write(
+        index_path: str, embeddings: np.ndarray, ids: list[str], distance_metric: str = "mips"
+    ) -> None:
+        embeddings_file, id_map_prefix = exact_paths(index_path)
+        np.save(embeddings_file, _prepare(embeddings, distance_metric.lower()))
+        IdMap.from_ids(ids).save(id_map_prefix)
+
+    @staticmethod
+    def append(
+        index_path: str, embeddings: np.ndarray, ids: list[str], distance_metric: str = "mips"
+    ) -> None:
+        """Add rows to an existing exact index on disk."""
+        embeddings_file, id_map_prefix = exact_paths(index_path)
+        existing = np.load(embeddings_file)
+        np.save(
+            embeddings_file,
+            np.concatenate([existing, _prepare(embeddings, distance_metric.lower())]),
+        )
+        existing_ids = IdMap.load(id_map_prefix, mmap=False) or []
+        IdMap.from_ids([*existing_ids, *ids]).save(id_map_prefix)
+
+    @classmethod
+    def open(cls, index_path: str, distance_metric: str = "mips") -> Optional["ExactIndex"]:
+        """Load the exact index written at build time, or ``None`` if there is none."""
+        embeddings_file, id_map_prefix = exact_paths(index_path)
+        ids = IdMap.load(id_map_prefix) if embeddings_file.exists() else None
+        if ids is None:
+            return None
+        try:
+            return cls(np.load(embeddings_file, mmap_mode="r"), ids, distance_metric)
+        except ValueError as e:
+            logger.warning(f"Ignoring inconsistent exact index at {embeddings_file}: {e}")
+            return None
+
+    def should_scan_filters(self, threshold: int) -> bool:
+        """Whether a filtered subset of this index is worth checking against ``threshold``."""
+        return len(self) <= threshold * EXACT_FILTER_SCAN_FACTOR
+
+    def rows_matching(self, passage_manager, metadata_filters: dict[str, Any]) -> np.ndarray:
+        """Rows whose passage passes ``metadata_filters``.
+
+        Passage metadata is read once and cached; passage text is not kept and is only
+        read again when a filter is on ``text``.
+        """
+        if self._filter_rows is None:
+            self._filter_rows = [
+                {
+                    "id": passage_id,
+                    "metadata": passage_manager.get_passage(passage_id).get("metadata", {}),
+                    "row": row,
+                }
+                for row, passage_id in enumerate(self.ids)
+            ]
+        rows = self._filter_rows
+        if "text" in metadata_filters:
+            rows = [
+                {**r, "text": passage_manager.get_passage(r["id"]).get("text", "")} for r in rows
+            ]
+        matched = passage_manager.filter_engine.apply_filters(rows, metadata_filters)
+        return np.array([r["row"] for r in matched], dtype=np.int64)
+
+    def search(
+        self, query: np.ndarray, top_k: int, rows: Optional[np.ndarray] = None
+    ) -> dict[str, Any]:
+        """Score all rows (or only ``rows``) against ``query``.
+
+        Returns:
+            Dict with 'labels' and 'distances' shaped like a backend search result:
+            inner-product similarities (higher first) or squared L2 distances (lower first).
+        """
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if self.distance_metric == "cosine":
+            query = query / (np.linalg.norm(query) or 1.0)
+        candidates = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.int64)
+
+        scores = np.empty(len(candidates), dtype=np.float32)
+        for start in range(0, len(candidates), _CHUNK_ROWS):
+            chunk = candidates[start : start + _CHUNK_ROWS]
+            block = (
+                self.embeddings[chunk[0] : chunk[-1] + 1]
+                if rows is None
+                else self.embeddings[chunk]
+            ).astype(np.float32)
+            if self.distance_metric == "l2":
+                diff = block - query
+                # Negated so that higher is better for the selection below
+                scores[start : start + len(chunk)] = -np.einsum("ij,ij->i", diff, diff)
+            else:
+                scores[start : start + len(chunk)] = block @ query
+
+        top_k = min(top_k, len(candidates))
+        if top_k <= 0:
+            return {"labels": [[]], "distances": np.empty((1, 0), dtype=np.float32)}
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        distances = scores[best]
+        if self.distance_metric == "l2":
+            distances = -distances
+        return {
+            "labels": [self.ids.lookup(candidates[best])],
+            "distances": distances.reshape(1, -1),
+        }
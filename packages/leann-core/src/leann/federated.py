@@ -0,0 +1,239 @@
+"""
+Federated search over several LEANN indexes.
+
+Each index is searched on its own thread, under a single searcher lease, and
+the per-index rankings are merged into one top-k with a heap. Indexes that
+share an embedding model, mode and query template reuse a single query
+embedding: the first index of the group to get there computes it (through its
+embedding server if its search needs one anyway) and the others wait for it
+and skip the embedding round trip.
+
+Scores are made comparable before merging:
+
+* ``mips`` and ``cosine`` similarities are kept as they are;
+* squared ``l2`` distances ``d`` become ``1 - d / 2``, which equals the cosine
+  similarity for unit-norm embeddings and preserves the order otherwise;
+* scores that are only meaningful within one index (BM25, or vector scores
+  from different embedding models) are min-max normalized per index;
+* hybrid fusion and cross-encoder rerank scores are already on one scale.
+
+Merged results carry the index they came from in ``metadata["index_name"]``.
+"""
+
+import heapq
+import itertools
+import threading
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
+from typing import Any, Optional, Union
+
+from .hybrid import _normalize
+from .registry import resolve_index_path
+
+# Each index gets its own window of ports to start an embedding server in, so
+# concurrent server start-ups never race for the same free port
+PORT_STRIDE = 100
+
+
+def _embedding_key(searcher: Any, provider_options: Optional[dict[str, Any]]) -> tuple:
+    return (
+        searcher.embedding_model,
+        searcher.embedding_mode,
+        searcher._query_template(provider_options),
+    )
+
+
+def _distance_metric(searcher: Any) -> str:
+    return searcher.meta_data.get("backend_kwargs", {}).get("distance_metric", "mips").lower()
+
+
+def comparable_scores(
+    results: Sequence[Any], distance_metric: Optional[str] = None, per_index: bool = False
+) -> list[float]:
+    """Scores of one index's best-first ``results`` on a scale shared across indexes.
+
+    Args:
+        distance_metric: Metric of the index the results came from, or None if the
+            scores are not vector scores and are already comparable.
+        per_index: The scores cannot be compared across indexes (BM25, mixed
+            embedding models); min-max normalize them to [0, 1] instead.
+    """
+    if per_index:
+        return _normalize(results)
+    if distance_metric == "l2":
+        return [1.0 - float(r.score) / 2.0 for r in results]
+    return [float(r.score) for r in results]
+
+
+def merge_results(
+    rankings: Mapping[Any, Sequence[Any]],
+    top_k: int,
+    key: Optional[Callable[[Any], float]] = None,
+) -> list[Any]:
+    """Merge best-first rankings (already on a comparable scale) into one top-k.
+
+    Args:
+        key: Higher-is-better sort key of a result (default: its score).
+
+    Ties keep the order of ``rankings`` and, within an index, its own order.
+    """
+    key = key or (lambda r: float(r.score))
+    streams = [
+        [(-key(r), order, rank, r) for rank, r in enumerate(ranking)]
+        for order, ranking in enumerate(rankings.values())
+    ]
+    return [entry[-1] for entry in itertools.islice(heapq.merge(*streams), top_k)]
+
+
+def federated_search(
+    searchers: Union[Mapping[str, Any], Sequence[str]],
+    query: str,
+    top_k: int = 5,
+    pool: Optional[Any] = None,
+    max_workers: Optional[int] = None,
+    **search_kwargs,
+) -> list[Any]:
+    """Search several indexes for ``query`` and merge the results.
+
+    Args:
+        searchers: Open :class:`~leann.api.LeannSearcher` instances keyed by index
+            name, or index names to borrow from ``pool``.
+        top_k: Number of merged results; every index is asked for this many.
+        pool: A :class:`~leann.searcher_pool.SearcherPool`. Each searcher is borrowed
+            once for its whole search and a thread never holds two of them, so each
+            index is opened at most once even when the pool is smaller than the
+            number of indexes.
+        max_workers: Indexes searched concurrently (default: all of them).
+        **search_kwargs: Passed to every ``LeannSearcher.search`` call.
+
+    Returns:
+        Up to ``top_k`` :class:`~leann.api.SearchResult` objects, best first, whose
+        ``score`` is the comparable score and whose metadata names the source index.
+    """
+    from .api import SearchResult
+
+    if pool is not None:
+        names = list(dict.fromkeys(searchers))
+        acquire = pool.acquire
+    else:
+        names = list(searchers)
+        acquire = lambda name: nullcontext(searchers[name])  # noqa: E731
+    if not names:
+        return []
+    search_mode = search_kwargs.get("search_mode", "vector")
+    provider_options = search_kwargs.get("provider_options")
+    embeds = search_mode != "keyword" and not search_kwargs.get("use_grep")
+    recompute = search_kwargs.get("recompute_embeddings", True)
+    base_port = search_kwargs.pop("expected_zmq_port", 5557)
+    ports = {name: base_port + i * PORT_STRIDE for i, name in enumerate(names)}
+
+    # One future per embedding key; set by the first index of that group to embed
+    embeddings: dict[tuple, Future] = {}
+    embeddings_lock = threading.Lock()
+
+    def _shared_embedding(searcher: Any, key: tuple, name: str, use_server: bool) -> Any:
+        with embeddings_lock:
+            future = embeddings.get(key)
+            owner = future is None
+            if owner:
+                future = embeddings[key] = Future()
+        if owner:
+            try:
+                future.set_result(
+                    searcher.embed_query(
+                        query,
+                        provider_options,
+                        use_server=use_server,
+                        expected_zmq_port=ports[name],
+                    )
+                )
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+    def _search(name: str) -> tuple[tuple, str, list[Any]]:
+        kwargs = dict(search_kwargs)
+        # Describe, embed and search under one lease so a small pool is not churned
+        with acquire(name) as searcher:
+            key = _embedding_key(searcher, provider_options)
+            if embeds:
+                needs_server = (
+                    recompute
+                    and searcher._exact_plan(
+                        kwargs.get("metadata_filters"), kwargs.get("exact_threshold")
+                    )
+                    is None
+                )
+                kwargs["query_embedding"] = _shared_embedding(searcher, key, name, needs_server)
+            results = searcher.search(query, top_k=top_k, expected_zmq_port=ports[name], **kwargs)
+            return key, _distance_metric(searcher), results
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(names)) as executor:
+        searched = dict(zip(names, executor.map(_search, names)))
+
+    vector_scores = search_mode == "vector" and not search_kwargs.get("rerank")
+    groups = {key for key, _, _ in searched.values()}
+    per_index = search_mode == "keyword" or (vector_scores and len(groups) > 1)
+    rankings = {}
+    for name, (_, distance_metric, results) in searched.items():
+        metric = distance_metric if vector_scores else None
+        scores = comparable_scores(results, metric, per_index)
+        rankings[name] = [
+            SearchResult(
+                id=r.id,
+                score=score,
+                text=r.text,
+                metadata={**r.metadata, "index_name": name},
+            )
+            for r, score in zip(results, scores)
+        ]
+    return merge_results(rankings, top_k)
+
+
+class FederatedSearcher:
+    """Search several indexes as one.
+
+    Indexes are given by name (resolved like ``leann search``: the current project
+    first, then every registered project) or by ``.leann`` path.
+    """
+
+    def __init__(
+        self,
+        indexes: Sequence[str],
+        max_workers: Optional[int] = None,
+        enable_warmup: bool = False,
+        **backend_kwargs,
+    ):
+        from .api import LeannSearcher
+
+        if not indexes:
+            raise ValueError("At least one index is required")
+        self.max_workers = max_workers
+        self.searchers: dict[str, Any] = {}
+        with ExitStack() as stack:
+            for name in dict.fromkeys(indexes):
+                index_path = resolve_index_path(name)
+                if index_path is None:
+                    raise FileNotFoundError(f"Index '{name}' not found.")
+                searcher = LeannSearcher(index_path, enable_warmup=enable_warmup, **backend_kwargs)
+                stack.callback(searcher.cleanup)
+                self.searchers[name] = searcher
+            # Every index opened; keep them instead of cleaning up
+            stack.pop_all()
+
+    def search(self, query: str, top_k: int = 5, **search_kwargs) -> list[Any]:
+        """Federated search; see :func:`federated_search` for the arguments."""
+        return federated_search(
+            self.searchers, query, top_k, max_workers=self.max_workers, **search_kwargs
+        )
+
+    def cleanup(self) -> None:
+        for searcher in self.searchers.values():
+            searcher.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
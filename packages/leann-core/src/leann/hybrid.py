@@ -0,0 +1,104 @@
+"""
+Rank fusion for hybrid (keyword + vector) retrieval.
+
+Both fusers take rankings that are already ordered best-first and return one
+merged ranking of :class:`~leann.api.SearchResult` whose ``score`` is the fused
+score (higher is better).
+"""
+
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Literal, Optional
+
+if TYPE_CHECKING:
+    from .api import SearchResult
+
+FusionMethod = Literal["rrf", "weighted"]
+
+# Constant from the original RRF paper (Cormack et al., 2009)
+RRF_K = 60
+# Each side is asked for this many times top_k candidates before fusing
+HYBRID_CANDIDATE_FACTOR = 3
+
+
+def _merge(
+    rankings: Sequence[Sequence["SearchResult"]], contributions: Sequence[Sequence[float]]
+) -> list["SearchResult"]:
+    from .api import SearchResult
+
+    fused: dict[str, float] = {}
+    first_seen: dict[str, SearchResult] = {}
+    for ranking, scores in zip(rankings, contributions):
+        for result, score in zip(ranking, scores):
+            fused[result.id] = fused.get(result.id, 0.0) + score
+            first_seen.setdefault(result.id, result)
+    order = sorted(fused, key=lambda pid: fused[pid], reverse=True)
+    return [
+        SearchResult(
+            id=pid,
+            score=fused[pid],
+            text=first_seen[pid].text,
+            metadata=first_seen[pid].metadata,
+        )
+        for pid in order
+    ]
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence["SearchResult"]],
+    weights: Optional[Sequence[float]] = None,
+    k: int = RRF_K,
+) -> list["SearchResult"]:
+    """Score each result by ``sum(weight / (k + rank))`` over the rankings it appears in."""
+    weights = weights or [1.0] * len(rankings)
+    return _merge(
+        rankings,
+        [[w / (k + rank) for rank in range(1, len(r) + 1)] for r, w in zip(rankings, weights)],
+    )
+
+
+def _normalize(ranking: Sequence["SearchResult"]) -> list[float]:
+    scores = [float(r.score) for r in ranking]
+    if not scores:
+        return []
+    lo, hi = min(scores), max(scores)
+    if hi == lo:
+        return [1.0] * len(scores)
+    normalized = [(s - lo) / (hi - lo) for s in scores]
+    # Rankings are best-first; an ascending one holds distances, so flip it
+    if scores[0] < scores[-1]:
+        normalized = [1.0 - s for s in normalized]
+    return normalized
+
+
+def weighted_score_fusion(
+    rankings: Sequence[Sequence["SearchResult"]],
+    weights: Optional[Sequence[float]] = None,
+) -> list["SearchResult"]:
+    """Min-max normalize each ranking's scores to [0, 1] and add them up with ``weights``.
+
+    Whether a ranking holds similarities or distances is read from its order, so
+    L2 distances and BM25/inner-product scores can be combined.
+    """
+    weights = weights or [1.0] * len(rankings)
+    return _merge(rankings, [[w * s for s in _normalize(r)] for r, w in zip(rankings, weights)])
+
+
+def fuse_results(
+    vector_results: Sequence["SearchResult"],
+    keyword_results: Sequence["SearchResult"],
+    top_k: int,
+    method: FusionMethod = "rrf",
+    alpha: float = 0.5,
+) -> list["SearchResult"]:
+    """Fuse vector and keyword rankings; ``alpha`` is the weight of the vector side."""
+    if not 0.0 <= alpha <= 1.0:
+        raise ValueError(f"hybrid alpha must be within [0, 1], got {alpha}")
+    rankings = [vector_results, keyword_results]
+    weights = [alpha, 1.0 - alpha]
+    if method == "rrf":
+        fused = reciprocal_rank_fusion(rankings, weights)
+    elif method == "weighted":
+        fused = weighted_score_fusion(rankings, weights)
+    else:
+        raise ValueError(f"Unknown fusion method '{method}'")
+    return fused[:top_k]
@@ -0,0 +1,199 @@
+"""
+Compact mappings between integer labels and passage ids.
+
+Backends return integer labels that have to be turned back into passage ids, and
+passage ids have to be turned into byte offsets in the passages file. Both used
+to be Python containers of strings (``<index>.ids.txt`` loaded into a list, a
+pickled ``dict[str, int]``), which costs gigabytes on large corpora even though
+the ids from ``LeannBuilder.add_text`` are just ``"0", "1", ...``.
+
+* :class:`IdMap` stores nothing for sequential ids ("identity") and otherwise a
+  UTF-8 blob plus an int64 offsets array, both memory-mapped.
+* :func:`save_passage_offsets` writes the ``.passages.idx`` file as a plain
+  ``.npy`` offsets array when ids are sequential, and as the legacy pickled dict
+  otherwise; :func:`load_passage_offsets` reads either.
+"""
+
+import json
+import logging
+import pickle
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ID_MAP_VERSION = 1
+_NPY_MAGIC = b"\x93NUMPY"
+
+
+def id_map_prefix(index_path: Union[str, Path]) -> Path:
+    """``<dir>/<name>`` for an index at ``<dir>/<name>.leann`` (where ``ids.txt`` used to live)."""
+    path = Path(index_path)
+    name = path.name[: -len(".leann")] if path.name.endswith(".leann") else path.name
+    return path.parent / name
+
+
+def is_identity(ids: Sequence[str]) -> bool:
+    """True if ``ids`` is exactly ``"0", "1", ..., str(len(ids) - 1)``."""
+    return all(str(i) == passage_id for i, passage_id in enumerate(ids))
+
+
+def _load_array(path: Path, mmap: bool) -> np.ndarray:
+    if mmap:
+        try:
+            return np.load(path, mmap_mode="r")
+        except ValueError:
+            # Zero-length arrays cannot be memory-mapped
+            pass
+    return np.load(path)
+
+
+class IdMap(Sequence):
+    """Integer label -> passage id, for ``count`` labels.
+
+    Args:
+        count: Number of labels
+        blob: UTF-8 bytes of all ids concatenated, or ``None`` for the identity map
+        offsets: ``count + 1`` int64 offsets of each id in ``blob``
+    """
+
+    def __init__(
+        self,
+        count: int,
+        blob: Optional[np.ndarray] = None,
+        offsets: Optional[np.ndarray] = None,
+    ):
+        self.count = count
+        self._blob = blob
+        self._offsets = offsets
+
+    @property
+    def identity(self) -> bool:
+        return self._blob is None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, label):
+        if isinstance(label, slice):
+            return [self[i] for i in range(*label.indices(self.count))]
+        label = int(label)
+        if label < 0:
+            label += self.count
+        if not 0 <= label < self.count:
+            raise IndexError(f"label {label} out of range for {self.count} ids")
+        if self._blob is None:
+            return str(label)
+        start, end = self._offsets[label], self._offsets[label + 1]
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.lookup(np.arange(self.count)))
+
+    def lookup(self, labels: Union[Sequence[int], np.ndarray]) -> list[str]:
+        """Translate many labels at once; labels outside the map become ``str(label)``."""
+        labels = np.asarray(labels, dtype=np.int64).reshape(-1)
+        if self._blob is None:
+            return [str(label) for label in labels.tolist()]
+        valid = (labels >= 0) & (labels < self.count)
+        safe = np.where(valid, labels, 0)
+        starts = self._offsets[safe].tolist()
+        ends = self._offsets[safe + 1].tolist()
+        return [
+            self._blob[start:end].tobytes().decode("utf-8") if ok else str(label)
+            for label, ok, start, end in zip(labels.tolist(), valid.tolist(), starts, ends)
+        ]
+
+    @classmethod
+    def from_ids(cls, ids: Sequence[str]) -> "IdMap":
+        ids = [str(i) for i in ids]
+        if is_identity(ids):
+            return cls(len(ids))
+        encoded = [s.encode("utf-8") for s in ids]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return cls(len(ids), np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def save(self, prefix: Union[str, Path]) -> None:
+        """Write ``<prefix>.idmap.json`` (and the blob/offsets arrays unless identity)."""
+        prefix = Path(prefix)
+        if self._blob is not None:
+            np.save(f"{prefix}.idmap.blob.npy", np.asarray(self._blob))
+            np.save(f"{prefix}.idmap.offsets.npy", np.asarray(self._offsets))
+        header = {"version": ID_MAP_VERSION, "count": self.count, "identity": self.identity}
+        with open(f"{prefix}.idmap.json", "w", encoding="utf-8") as f:
+            json.dump(header, f)
+
+    @classmethod
+    def load(cls, prefix: Union[str, Path], mmap: bool = True) -> Optional["IdMap"]:
+        """Load the map saved at ``prefix``, falling back to a legacy ``<prefix>.ids.txt``."""
+        prefix = Path(prefix)
+        header_file = Path(f"{prefix}.idmap.json")
+        if header_file.exists():
+            with open(header_file, encoding="utf-8") as f:
+                header = json.load(f)
+            if header.get("identity"):
+                return cls(int(header["count"]))
+            return cls(
+                int(header["count"]),
+                _load_array(Path(f"{prefix}.idmap.blob.npy"), mmap),
+                _load_array(Path(f"{prefix}.idmap.offsets.npy"), mmap),
+            )
+        legacy = Path(f"{prefix}.ids.txt")
+        if legacy.exists():
+            with open(legacy, encoding="utf-8") as f:
+                return cls.from_ids([line.rstrip("\n") for line in f])
+        return None
+
+
+class SequentialOffsets(Mapping):
+    """Read-only ``{"0": offset0, "1": offset1, ...}`` backed by one int64 array."""
+
+    def __init__(self, offsets: np.ndarray):
+        self._offsets = offsets
+
+    def _label(self, passage_id) -> int:
+        if isinstance(passage_id, str) and passage_id.isascii() and passage_id.isdigit():
+            label = int(passage_id)
+            if label < len(self._offsets) and str(label) == passage_id:
+                return label
+        raise KeyError(passage_id)
+
+    def __getitem__(self, passage_id) -> int:
+        return int(self._offsets[self._label(passage_id)])
+
+    def __contains__(self, passage_id) -> bool:
+        try:
+            self._label(passage_id)
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __iter__(self) -> Iterator[str]:
+        return (str(i) for i in range(len(self._offsets)))
+
+
+def save_passage_offsets(path: Union[str, Path], offset_map: Mapping[str, int]) -> None:
+    """Write a ``.passages.idx`` file, as a ``.npy`` array when ids are sequential."""
+    ids = list(offset_map)
+    with open(path, "wb") as f:
+        if is_identity(ids):
+            np.save(f, np.fromiter(offset_map.values(), dtype=np.int64, count=len(ids)))
+        else:
+            pickle.dump(dict(offset_map), f)
+
+
+def load_passage_offsets(path: Union[str, Path], mmap: bool = True) -> Mapping[str, int]:
+    """Read a ``.passages.idx`` file written by :func:`save_passage_offsets` or older builds."""
+    with open(path, "rb") as f:
+        is_npy = f.read(len(_NPY_MAGIC)) == _NPY_MAGIC
+        if not is_npy:
+            f.seek(0)
+            return pickle.load(f)
+    return SequentialOffsets(_load_array(Path(path), mmap))
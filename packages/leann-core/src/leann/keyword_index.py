@@ -0,0 +1,405 @@
+"""
+On-disk inverted index over passage text for keyword (BM25) and phrase search.
+
+The index lives in a ``<index>.leann.keyword/`` directory next to the passages
+file. Postings are stored per term, sorted by document, as three varint-encoded
+streams (doc-id deltas, term frequencies, position deltas) and memory-mapped at
+query time, so a query only touches the postings of its own terms instead of
+scanning the whole corpus.
+"""
+
+import bisect
+import json
+import logging
+import math
+import re
+import shutil
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+KEYWORD_INDEX_SUFFIX = ".keyword"
+
+# Standard Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"\w+")
+_PHRASE_RE = re.compile(r'"([^"]*)"')
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased word tokens; the same tokenizer is used for passages and queries."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def parse_query(query: str) -> tuple[list[str], list[list[str]]]:
+    """Split a query into all of its terms and the token lists of its quoted phrases."""
+    phrases = [tokens for tokens in map(tokenize, _PHRASE_RE.findall(query)) if tokens]
+    return tokenize(query.replace('"', " ")), phrases
+
+
+def encode_varints(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """LEB128-encode non-negative integers.
+
+    Returns:
+        The encoded bytes and the number of bytes used by each value.
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    nbytes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        nbytes += rest > 0
+        rest >>= np.uint64(7)
+    starts = np.cumsum(nbytes) - nbytes
+    out = np.empty(int(nbytes.sum()), dtype=np.uint8)
+    for k in range(int(nbytes.max()) if len(values) else 0):
+        mask = nbytes > k
+        low = (values[mask] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (nbytes[mask] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[mask] + k] = (low | more).astype(np.uint8)
+    return out, nbytes
+
+
+def decode_varints(data: np.ndarray) -> np.ndarray:
+    """Decode a buffer produced by :func:`encode_varints`."""
+    data = np.asarray(data, dtype=np.uint8)
+    if len(data) == 0:
+        return np.empty(0, dtype=np.int64)
+    ends = np.flatnonzero((data & 0x80) == 0)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    shift = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    parts = (data & 0x7F).astype(np.int64) << (7 * shift)
+    return np.add.reduceat(parts, starts)
+
+
+def _segment_cumsum(deltas: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Prefix-sum ``deltas`` restarting at every segment boundary."""
+    totals = np.cumsum(deltas)
+    seg_starts = np.cumsum(lengths) - lengths
+    before = np.where(seg_starts > 0, totals[seg_starts - 1], 0)
+    return totals - np.repeat(before, lengths)
+
+
+class _StringTable(Sequence):
+    """Strings packed into one UTF-8 blob plus an offsets array."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        start, end = self._offsets[i], self._offsets[i + 1]
+        return bytes(self._blob[start:end]).decode("utf-8")
+
+    def find(self, needle: str, prefix: bool = False, suffix: bool = False) -> np.ndarray:
+        """Sorted numbers of the strings containing ``needle``.
+
+        With ``prefix``/``suffix`` the string must also start/end with it. The blob is
+        searched in one pass instead of decoding every string.
+        """
+        encoded = needle.encode("utf-8")
+        # A lookahead yields overlapping matches, so none hides behind one that spans two strings
+        pattern = re.compile(b"(?=" + re.escape(encoded) + b")")
+        found = np.fromiter(
+            (m.start() for m in pattern.finditer(np.asarray(self._blob).tobytes())), np.int64
+        )
+        strings = np.searchsorted(self._offsets, found, side="right") - 1
+        ends = found + len(encoded)
+        keep = ends <= self._offsets[strings + 1]
+        if prefix:
+            keep &= found == self._offsets[strings]
+        if suffix:
+            keep &= ends == self._offsets[strings + 1]
+        return np.unique(strings[keep])
+
+    @staticmethod
+    def pack(strings: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def keyword_index_dir(index_path: str) -> Path:
+    return Path(f"{index_path}{KEYWORD_INDEX_SUFFIX}")
+
+
+def source_signature(passage_files: Sequence[str]) -> list[dict]:
+    return [{"file": Path(p).name, "size": Path(p).stat().st_size} for p in passage_files]
+
+
+def _iter_passages(passage_files: Sequence[str]) -> Iterator[tuple[str, str]]:
+    for passage_file in passage_files:
+        with open(passage_file, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    data = json.loads(line)
+                    yield str(data["id"]), data.get("text", "")
+
+
+def _load_array(path: Path) -> np.ndarray:
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        # Zero-length arrays cannot be memory-mapped
+        return np.load(path)
+
+
+class KeywordIndex:
+    """Memory-mapped inverted index with BM25 ranking and phrase matching."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        with open(self.directory / "meta.json", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.num_docs: int = self.meta["num_docs"]
+        self.avg_doc_len: float = self.meta["avg_doc_len"]
+        self.vocab = _StringTable(
+            _load_array(self.directory / "vocab.npy"),
+            _load_array(self.directory / "vocab_offsets.npy"),
+        )
+        self.passage_ids = _StringTable(
+            _load_array(self.directory / "ids.npy"),
+            _load_array(self.directory / "ids_offsets.npy"),
+        )
+        # One row per term plus a sentinel: df, then byte starts of the doc/tf/position streams
+        self._postings = _load_array(self.directory / "postings.npy")
+        self._docs = _load_array(self.directory / "docs.npy")
+        self._tfs = _load_array(self.directory / "tfs.npy")
+        self._positions = _load_array(self.directory / "positions.npy")
+        self._doc_lengths = _load_array(self.directory / "doc_lengths.npy")
+
+    @classmethod
+    def build(
+        cls,
+        directory: Path,
+        passages: Iterable[tuple[str, str]],
+        signature: Optional[list[dict]] = None,
+    ) -> "KeywordIndex":
+        """Tokenize ``(passage_id, text)`` pairs and write the index to ``directory``.
+
+        Build memory is about 12 bytes per token plus the vocabulary.
+        """
+        directory = Path(directory)
+        if directory.exists():
+            shutil.rmtree(directory)
+        directory.mkdir(parents=True)
+
+        vocab: dict[str, int] = {}
+        term_buf, doc_buf, pos_buf = array("I"), array("I"), array("I")
+        ids: list[str] = []
+        doc_lengths = array("I")
+        for doc, (passage_id, text) in enumerate(passages):
+            tokens = tokenize(text)
+            ids.append(passage_id)
+            doc_lengths.append(len(tokens))
+            term_buf.extend(vocab.setdefault(t, len(vocab)) for t in tokens)
+            doc_buf.extend([doc] * len(tokens))
+            pos_buf.extend(range(len(tokens)))
+
+        sorted_terms = sorted(vocab)
+        rank = np.empty(len(vocab), dtype=np.int64)
+        rank[[vocab[t] for t in sorted_terms]] = np.arange(len(sorted_terms))
+        terms = rank[np.frombuffer(term_buf, dtype=np.uint32)] if term_buf else rank[:0]
+        docs = np.frombuffer(doc_buf, dtype=np.uint32).astype(np.int64)
+        positions = np.frombuffer(pos_buf, dtype=np.uint32).astype(np.int64)
+
+        # Input is already ordered by (doc, position); a stable sort by term gives
+        # (term, doc, position) order without a full lexsort.
+        order = np.argsort(terms, kind="stable")
+        terms, docs, positions = terms[order], docs[order], positions[order]
+        n_tokens = len(terms)
+
+        new_group = np.ones(n_tokens, dtype=bool)
+        new_group[1:] = (terms[1:] != terms[:-1]) | (docs[1:] != docs[:-1])
+        group_starts = np.flatnonzero(new_group)
+        group_terms = terms[group_starts]
+        group_docs = docs[group_starts]
+        group_tfs = np.diff(np.append(group_starts, n_tokens))
+
+        pos_deltas = positions.copy()
+        pos_deltas[1:] -= np.where(new_group[1:], 0, positions[:-1])
+        new_term = np.ones(len(group_starts), dtype=bool)
+        new_term[1:] = group_terms[1:] != group_terms[:-1]
+        doc_deltas = group_docs.copy()
+        doc_deltas[1:] -= np.where(new_term[1:], 0, group_docs[:-1])
+
+        n_terms = len(sorted_terms)
+        df = np.bincount(group_terms, minlength=n_terms)
+        tokens_per_term = np.bincount(terms, minlength=n_terms)
+        postings = np.zeros((n_terms + 1, 4), dtype=np.int64)
+        postings[:n_terms, 0] = df
+        for column, (values, per_term) in enumerate(
+            [(doc_deltas, df), (group_tfs, df), (pos_deltas, tokens_per_term)], start=1
+        ):
+            encoded, nbytes = encode_varints(values)
+            byte_ends = np.cumsum(nbytes)
+            value_ends = np.cumsum(per_term)
+            postings[1:, column] = np.where(value_ends > 0, byte_ends[value_ends - 1], 0)
+            name = ("docs", "tfs", "positions")[column - 1]
+            np.save(directory / f"{name}.npy", encoded)
+
+        blob, offsets = _StringTable.pack(sorted_terms)
+        np.save(directory / "vocab.npy", blob)
+        np.save(directory / "vocab_offsets.npy", offsets)
+        blob, offsets = _StringTable.pack(ids)
+        np.save(directory / "ids.npy", blob)
+        np.save(directory / "ids_offsets.npy", offsets)
+        np.save(directory / "postings.npy", postings)
+        lengths = np.frombuffer(doc_lengths, dtype=np.uint32) if doc_lengths else np.zeros(0)
+        np.save(directory / "doc_lengths.npy", lengths.astype(np.uint32))
+
+        meta = {
+            "version": FORMAT_VERSION,
+            "num_docs": len(ids),
+            "num_terms": n_terms,
+            "num_tokens": n_tokens,
+            "avg_doc_len": float(lengths.mean()) if len(ids) else 0.0,
+            "sources": signature or [],
+        }
+        # meta.json is written last and marks the index as complete
+        with open(directory / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        return cls(directory)
+
+    @classmethod
+    def open_or_build(cls, index_path: str, passage_files: Sequence[str]) -> "KeywordIndex":
+        """Open the keyword index of ``index_path``, (re)building it if missing or stale."""
+        directory = keyword_index_dir(index_path)
+        signature = source_signature(passage_files)
+        meta_file = directory / "meta.json"
+        if meta_file.exists():
+            with open(meta_file, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") == FORMAT_VERSION and meta.get("sources") == signature:
+                return cls(directory)
+            logger.info(f"Keyword index at {directory} is out of date; rebuilding")
+        else:
+            logger.info(f"Building keyword index at {directory}")
+        return cls.build(directory, _iter_passages(passage_files), signature)
+
+    def __len__(self) -> int:
+        return self.num_docs
+
+    def _term_index(self, term: str) -> Optional[int]:
+        i = bisect.bisect_left(self.vocab, term)
+        return i if i < len(self.vocab) and self.vocab[i] == term else None
+
+    def _postings_for(self, term_idx: int) -> tuple[np.ndarray, np.ndarray]:
+        row, nxt = self._postings[term_idx], self._postings[term_idx + 1]
+        docs = np.cumsum(decode_varints(self._docs[row[1] : nxt[1]]))
+        tfs = decode_varints(self._tfs[row[2] : nxt[2]])
+        return docs, tfs
+
+    def _positions_for(self, term_idx: int, tfs: np.ndarray) -> np.ndarray:
+        row, nxt = self._postings[term_idx], self._postings[term_idx + 1]
+        return _segment_cumsum(decode_varints(self._positions[row[3] : nxt[3]]), tfs)
+
+    def phrase_docs(self, tokens: Sequence[str]) -> np.ndarray:
+        """Sorted document numbers containing ``tokens`` as consecutive words."""
+        term_ids = [self._term_index(token) for token in tokens]
+        if None in term_ids:
+            return np.empty(0, dtype=np.int64)
+        return self._sequence_docs([[term_idx] for term_idx in term_ids])
+
+    def _sequence_docs(self, slots: Sequence[Sequence[int]]) -> np.ndarray:
+        """Sorted document numbers with, at consecutive positions, one term of each slot."""
+        if len(slots) == 1:
+            parts = [self._postings_for(term_idx)[0] for term_idx in slots[0]]
+            return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        keys = None
+        for offset, slot in enumerate(slots):
+            parts = []
+            for term_idx in slot:
+                docs, tfs = self._postings_for(term_idx)
+                starts = self._positions_for(term_idx, tfs) - offset
+                token_docs = np.repeat(docs, tfs)
+                valid = starts >= 0
+                # (doc, phrase start) packed into one integer so phrases intersect as sets
+                parts.append((token_docs[valid] << 32) | starts[valid])
+            slot_keys = np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+            keys = (
+                slot_keys if keys is None else np.intersect1d(keys, slot_keys, assume_unique=True)
+            )
+            if len(keys) == 0:
+                break
+        return np.unique(keys >> 32) if keys is not None else np.empty(0, dtype=np.int64)
+
+    def substring_search(self, query: str) -> tuple[np.ndarray, np.ndarray]:
+        """Rank documents that may contain ``query`` verbatim with BM25.
+
+        Like a phrase query, except that words only have to contain the query's edge
+        tokens: the first token may end a word and the last may start one (a single
+        token may sit anywhere inside a word). Candidates are a superset of the exact
+        matches; callers check the text itself.
+
+        Returns:
+            Document numbers and scores, best first.
+        """
+        tokens = tokenize(query)
+        last = len(tokens) - 1
+        slots = []
+        for k, token in enumerate(tokens):
+            if 0 < k < last:
+                term_idx = self._term_index(token)
+                slot = np.array([] if term_idx is None else [term_idx], dtype=np.int64)
+            else:
+                slot = self.vocab.find(token, prefix=k > 0, suffix=k < last)
+            if len(slot) == 0:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+            slots.append(slot.tolist())
+        if not slots:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        docs, scores = self._bm25(set().union(*slots))
+        keep = np.isin(docs, self._sequence_docs(slots), assume_unique=True)
+        docs, scores = docs[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        return docs[order], scores[order]
+
+    def search(self, query: str, phrase: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """Rank documents for ``query`` with BM25.
+
+        Unquoted terms are OR-ed; every quoted phrase must match. With ``phrase=True``
+        the whole query is treated as one phrase.
+
+        Returns:
+            Document numbers and scores, best first.
+        """
+        terms, phrases = parse_query(query)
+        if phrase and terms:
+            phrases = [terms]
+        term_ids = {self._term_index(term) for term in terms} - {None}
+        docs, scores = self._bm25(term_ids)
+        for tokens in phrases:
+            keep = np.isin(docs, self.phrase_docs(tokens), assume_unique=True)
+            docs, scores = docs[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        return docs[order], scores[order]
+
+    def _bm25(self, term_ids: Iterable[int]) -> tuple[np.ndarray, np.ndarray]:
+        """Sorted documents containing any of ``term_ids`` and their summed BM25 scores."""
+        doc_parts, score_parts = [], []
+        for term_idx in term_ids:
+            docs, tfs = self._postings_for(term_idx)
+            df = len(docs)
+            idf = math.log(1.0 + (self.num_docs - df + 0.5) / (df + 0.5))
+            norm = 1.0 - BM25_B + BM25_B * (self._doc_lengths[docs] / max(self.avg_doc_len, 1e-9))
+            doc_parts.append(docs)
+            score_parts.append(idf * tfs * (BM25_K1 + 1.0) / (tfs + BM25_K1 * norm))
+        if not doc_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        return docs, np.bincount(inverse, weights=np.concatenate(score_parts))
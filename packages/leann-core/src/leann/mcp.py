@@ -1,8 +1,59 @@
 #!/usr/bin/env python3
 
+import asyncio
 import json
+import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, TextIO
+
+from .searcher_pool import SearcherPool
+
+# Tool calls are served from one long-lived process: searchers (and their embedding
+# servers) stay warm in this pool instead of being reloaded by a `leann search`
+# subprocess on every call.
+MAX_CONCURRENT_CALLS = int(os.getenv("LEANN_MCP_MAX_CONCURRENCY", "4"))
+
+_searcher_pool: Optional[SearcherPool] = None
+
+
+def get_searcher_pool() -> SearcherPool:
+    global _searcher_pool
+    if _searcher_pool is None:
+        _searcher_pool = SearcherPool()
+    return _searcher_pool
+
+
+def _index_names(args: dict) -> list[str]:
+    names = list(args.get("index_names") or [])
+    if args.get("index_name"):
+        names.insert(0, args["index_name"])
+    return list(dict.fromkeys(names))
+
+
+def _run_search(args: dict) -> str:
+    from .cli import format_search_results
+
+    search_kwargs = {
+        "top_k": args.get("top_k", 5),
+        "complexity": args.get("complexity", 32),
+        "search_mode": args.get("search_mode", "vector"),
+        "rerank": args.get("rerank", False),
+    }
+    index_names = _index_names(args)
+    if len(index_names) > 1:
+        from .federated import federated_search
+
+        results = federated_search(
+            index_names, args["query"], pool=get_searcher_pool(), **search_kwargs
+        )
+    else:
+        with get_searcher_pool().acquire(index_names[0]) as searcher:
+            results = searcher.search(args["query"], **search_kwargs)
+    return format_search_results(
+        args["query"], results, show_metadata=args.get("show_metadata", False)
+    )
 
 
 def handle_request(request):
@@ -42,6 +93,11 @@ def handle_request(request):
                                     "type": "string",
                                     "description": "Name of the LEANN index to search. Use 'leann_list' first to see available indexes.",
                                 },
+                                "index_names": {
+                                    "type": "array",
+                                    "items": {"type": "string"},
+                                    "description": "Search several indexes in one call instead of index_name: they are searched concurrently and merged into one ranking, each result labelled with its index.",
+                                },
                                 "query": {
                                     "type": "string",
                                     "description": "Search query - can be natural language (e.g., 'how to handle errors') or technical terms (e.g., 'async function definition')",
@@ -60,13 +116,24 @@ def handle_request(request):
                                     "maximum": 128,
                                     "description": "Search complexity level. Use 16-32 for fast searches (recommended), 64+ for higher precision when needed.",
                                 },
+                                "search_mode": {
+                                    "type": "string",
+                                    "enum": ["vector", "keyword", "hybrid"],
+                                    "default": "vector",
+                                    "description": "'vector' for semantic search, 'keyword' for BM25 over exact words (quote phrases), 'hybrid' to combine both - best when the query mixes concepts with identifiers or error messages.",
+                                },
+                                "rerank": {
+                                    "type": "boolean",
+                                    "default": False,
+                                    "description": "Rerank candidates with a local cross-encoder for more precise top results (slower on the first call while the model loads).",
+                                },
                                 "show_metadata": {
                                     "type": "boolean",
                                     "default": False,
                                     "description": "Include file paths and metadata in search results. Useful for understanding which files contain the results.",
                                 },
                             },
-                            "required": ["index_name", "query"],
+                            "required": ["query"],
                         },
                     },
                     {
@@ -85,7 +152,7 @@ def handle_request(request):
         try:
             if tool_name == "leann_search":
                 # Validate required parameters
-                if not args.get("index_name") or not args.get("query"):
+                if not _index_names(args) or not args.get("query"):
                     return {
                         "jsonrpc": "2.0",
                         "id": request.get("id"),
@@ -93,42 +160,25 @@ def handle_request(request):
                             "content": [
                                 {
                                     "type": "text",
-                                    "text": "Error: Both index_name and query are required",
+                                    "text": "Error: query and index_name (or index_names) are required",
                                 }
                             ]
                         },
                     }
 
-                # Build simplified command with non-interactive flag for MCP compatibility
-                cmd = [
-                    "leann",
-                    "search",
-                    args["index_name"],
-                    args["query"],
-                    f"--top-k={args.get('top_k', 5)}",
-                    f"--complexity={args.get('complexity', 32)}",
-                    "--non-interactive",
-                ]
-                if args.get("show_metadata", False):
-                    cmd.append("--show-metadata")
-                result = subprocess.run(cmd, capture_output=True, text=True)
+                try:
+                    text = _run_search(args)
+                except FileNotFoundError as e:
+                    text = f"Error: {e} Use 'leann_list' to see available indexes."
 
             elif tool_name == "leann_list":
                 result = subprocess.run(["leann", "list"], capture_output=True, text=True)
+                text = result.stdout if result.returncode == 0 else f"Error: {result.stderr}"
 
             return {
                 "jsonrpc": "2.0",
                 "id": request.get("id"),
-                "result": {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": result.stdout
-                            if result.returncode == 0
-                            else f"Error: {result.stderr}",
-                        }
-                    ]
-                },
+                "result": {"content": [{"type": "text", "text": text}]},
             }
 
         except Exception as e:
@@ -139,22 +189,68 @@ def handle_request(request):
             }
 
 
+def _error_response(message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": None, "error": {"code": -1, "message": message}}
+
+
+async def _dispatch(line: str, out: TextIO, executor: ThreadPoolExecutor) -> None:
+    try:
+        request = json.loads(line.strip())
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(executor, handle_request, request)
+    except Exception as e:
+        response = _error_response(str(e))
+    if response:
+        # Writes happen on the event loop thread, so responses never interleave
+        out.write(json.dumps(response) + "\n")
+        out.flush()
+
+
+async def serve(stdin: TextIO, out: TextIO, max_concurrency: int = MAX_CONCURRENT_CALLS) -> None:
+    """Read JSON-RPC requests line by line and answer them concurrently.
+
+    Responses are written as they complete, so a slow search does not hold up
+    `tools/list` or searches against other indexes.
+    """
+    loop = asyncio.get_running_loop()
+    pending: set[asyncio.Task] = set()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        # stdin is read on a dedicated thread so the request workers stay free
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            while True:
+                line = await loop.run_in_executor(reader, stdin.readline)
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(_dispatch(line, out, executor))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+
+
+def _claim_stdout() -> TextIO:
+    """Reserve the real stdout for JSON-RPC and route everything else to stderr.
+
+    Searches now run in-process, so library prints and the embedding server
+    subprocess (which inherits fd 1) would otherwise corrupt the protocol stream.
+    """
+    sys.stdout.flush()
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+    return protocol_out
+
+
 def main():
-    for line in sys.stdin:
-        try:
-            request = json.loads(line.strip())
-            response = handle_request(request)
-            if response:
-                print(json.dumps(response))
-                sys.stdout.flush()
-        except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {"code": -1, "message": str(e)},
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+    protocol_out = _claim_stdout()
+    try:
+        asyncio.run(serve(sys.stdin, protocol_out))
+    finally:
+        if _searcher_pool is not None:
+            _searcher_pool.close()
+        protocol_out.close()
 
 
 if __name__ == "__main__":
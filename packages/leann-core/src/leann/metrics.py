@@ -0,0 +1,253 @@
+"""
+Lightweight in-process metrics used by LEANN's long-running services.
+
+No external metrics library is required: histograms use fixed buckets so they
+can be merged, serialized to JSON and rendered in Prometheus text format.
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, from sub-millisecond embedding calls to slow cold starts
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket histogram of durations in seconds."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[slot] += 1
+            self._sum += seconds
+            if seconds > self._max:
+                self._max = seconds
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the q-quantile (0-1) as the upper bound of the bucket containing it."""
+        with self._lock:
+            counts = list(self._counts)
+            max_seen = self._max
+        total = sum(counts)
+        if total == 0:
+            return None
+        rank = q * total
+        cumulative = 0
+        for i, c in enumerate(counts):
+            cumulative += c
+            if cumulative >= rank and c > 0:
+                return self.buckets[i] if i < len(self.buckets) else max_seen
+        return max_seen
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+            max_seen = self._max
+        total = sum(counts)
+        return {
+            "count": total,
+            "sum": total_sum,
+            "mean": total_sum / total if total else None,
+            "max": max_seen if total else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                **{str(b): c for b, c in zip(self.buckets, counts)},
+                "+Inf": counts[-1],
+            },
+        }
+
+    def prometheus_lines(self, name: str, labels: Optional[dict[str, str]] = None) -> list[str]:
+        """Render as a Prometheus histogram (cumulative ``le`` buckets)."""
+        with self._lock:
+            counts = list(self._counts)
+            total_sum = self._sum
+        label_str = ",".join(f'{k}="{v}"' for k, v in (labels or {}).items())
+        prefix = f"{label_str}," if label_str else ""
+        lines = []
+        cumulative = 0
+        for bound, c in zip(self.buckets, counts):
+            cumulative += c
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+        suffix = f"{{{label_str}}}" if label_str else ""
+        lines.append(f"{name}_sum{suffix} {total_sum}")
+        lines.append(f"{name}_count{suffix} {cumulative}")
+        return lines
+
+
+# Control message answered by embedding servers with EmbeddingServerMetrics.snapshot()
+STATS_MESSAGE = "__STATS__"
+# Upper bounds for texts per embedding request
+BATCH_SIZE_BUCKETS: tuple[float, ...] = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+SERVER_COUNTERS = (
+    "texts_embedded",
+    "passages_missing",
+    "errors",
+    "fallback_responses",
+    "queued_requests",
+)
+
+
+def _label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class EmbeddingServerMetrics:
+    """Counters and histograms kept by an embedding server.
+
+    Requests are counted by type (``text``, ``distance``, ``embedding``, ...) with an
+    end-to-end latency histogram each; every request that embeds passages also
+    records its passage-lookup time, model time and batch size. ``fallback_responses``
+    counts replies padded with sentinel values (missing passages, model failures)
+    and ``queued_requests`` counts replies after which the next request was already
+    waiting on the socket, i.e. requests that queued behind another one.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        port: int,
+        model_name: str,
+        metrics_file: Optional[str] = None,
+        write_interval: float = 1.0,
+    ):
+        self.labels = {"backend": backend, "port": str(port), "model": model_name}
+        self.started_at = time.time()
+        self.requests: dict[str, int] = {}
+        self.counters = dict.fromkeys(SERVER_COUNTERS, 0)
+        self.in_flight = 0
+        self.request_latency: dict[str, LatencyHistogram] = {}
+        self.lookup_latency = LatencyHistogram()
+        self.model_latency = LatencyHistogram()
+        self.batch_sizes = LatencyHistogram(BATCH_SIZE_BUCKETS)
+        # "{port}" lets servers launched with one environment write separate files
+        self.metrics_file = metrics_file.format(port=port) if metrics_file else None
+        self.write_interval = write_interval
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def record_request(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+            histogram = self.request_latency.setdefault(kind, LatencyHistogram())
+        histogram.observe(seconds)
+
+    def record_embedding(self, texts: int, lookup_seconds: float, model_seconds: float) -> None:
+        """One model call for ``texts`` texts; lookup time is 0 for text requests."""
+        self.count("texts_embedded", texts)
+        self.batch_sizes.observe(texts)
+        self.lookup_latency.observe(lookup_seconds)
+        self.model_latency.observe(model_seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            requests = dict(self.requests)
+            counters = dict(self.counters)
+            latency = dict(self.request_latency)
+        return {
+            **self.labels,
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started_at,
+            "requests": requests,
+            **counters,
+            "in_flight": self.in_flight,
+            "request_latency": {kind: h.snapshot() for kind, h in latency.items()},
+            "lookup_latency": self.lookup_latency.snapshot(),
+            "model_latency": self.model_latency.snapshot(),
+            "batch_size": self.batch_sizes.snapshot(),
+        }
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        prefix = "leann_embedding_server"
+        labels = {k: _label_value(v) for k, v in self.labels.items()}
+        label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+        with self._lock:
+            requests = dict(self.requests)
+            counters = dict(self.counters)
+            latency = dict(self.request_latency)
+        lines = [
+            f"# TYPE {prefix}_uptime_seconds gauge",
+            f"{prefix}_uptime_seconds{{{label_str}}} {time.time() - self.started_at}",
+            f"# TYPE {prefix}_in_flight gauge",
+            f"{prefix}_in_flight{{{label_str}}} {self.in_flight}",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        for kind, n in sorted(requests.items()):
+            lines.append(f'{prefix}_requests_total{{{label_str},type="{kind}"}} {n}')
+        for name, n in counters.items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total{{{label_str}}} {n}")
+        lines.append(f"# TYPE {prefix}_request_seconds histogram")
+        for kind, histogram in sorted(latency.items()):
+            lines.extend(
+                histogram.prometheus_lines(f"{prefix}_request_seconds", {**labels, "type": kind})
+            )
+        for name, histogram in (
+            ("passage_lookup_seconds", self.lookup_latency),
+            ("model_seconds", self.model_latency),
+            ("batch_size", self.batch_sizes),
+        ):
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            lines.extend(histogram.prometheus_lines(f"{prefix}_{name}", labels))
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, force: bool = False) -> None:
+        """Rewrite the metrics file, at most once per ``write_interval`` unless forced."""
+        if self.metrics_file is None:
+            return
+        now = time.time()
+        if not force and now - self._last_write < self.write_interval:
+            return
+        self._last_write = now
+        path = Path(self.metrics_file)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(self.prometheus_text(), encoding="utf-8")
+            # Atomic, so a scraper never reads a half-written file
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Failed to write metrics file {path}: {e}")
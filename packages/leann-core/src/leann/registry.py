@@ -1,5 +1,6 @@
 # packages/leann-core/src/leann/registry.py
 
+import functools
 import importlib
 import importlib.metadata
 import json
@@ -27,26 +28,197 @@ def register_backend(name: str):
     return decorator
 
 
-def autodiscover_backends():
-    """Automatically discovers and imports all 'leann-backend-*' packages."""
-    # print("INFO: Starting backend auto-discovery...")
-    discovered_backends = []
+# Entry point group under which backend packages name the module that registers them
+BACKEND_ENTRY_POINT_GROUP = "leann.backends"
+
+
+@functools.lru_cache(maxsize=1)
+def discover_backend_modules() -> dict[str, str]:
+    """
+    Installed backends as ``{backend name: module}``, read from package metadata.
+
+    Nothing is imported: backends declare a ``leann.backends`` entry point, and
+    older ``leann-backend-<name>`` distributions without one are matched by name.
+    """
+    modules = {
+        entry_point.name: entry_point.value
+        for entry_point in importlib.metadata.entry_points(group=BACKEND_ENTRY_POINT_GROUP)
+    }
     for dist in importlib.metadata.distributions():
         dist_name = dist.metadata["name"]
-        if dist_name is None:
-            continue
-        if dist_name.startswith("leann-backend-"):
-            backend_module_name = dist_name.replace("-", "_")
-            discovered_backends.append(backend_module_name)
+        if dist_name and dist_name.startswith("leann-backend-"):
+            modules.setdefault(dist_name[len("leann-backend-") :], dist_name.replace("-", "_"))
+    return modules
+
 
-    for backend_module_name in sorted(discovered_backends):  # sort for deterministic loading
+def get_backend(name: str) -> Optional["LeannBackendFactoryInterface"]:
+    """The factory registered as ``name``, importing its backend package on first use."""
+    if name not in BACKEND_REGISTRY:
+        module_name = discover_backend_modules().get(name, f"leann_backend_{name}")
         try:
-            importlib.import_module(backend_module_name)
-            # Registration message is printed by the decorator
-        except ImportError:
-            # print(f"WARN: Could not import backend module '{backend_module_name}': {e}")
-            pass
-    # print("INFO: Backend auto-discovery finished.")
+            importlib.import_module(module_name)
+        except ImportError as e:
+            logger.debug(f"Could not import backend module '{module_name}': {e}")
+    return BACKEND_REGISTRY.get(name)
+
+
+def autodiscover_backends():
+    """Import every installed backend package so all of them are in BACKEND_REGISTRY."""
+    for name in sorted(discover_backend_modules()):  # sort for deterministic loading
+        get_backend(name)
+
+
+def _load_registered_projects() -> list[str]:
+    """Return project directories recorded in the global registry (best effort)."""
+    global_registry = Path.home() / ".leann" / "projects.json"
+    if not global_registry.exists():
+        return []
+    try:
+        with open(global_registry) as f:
+            projects = json.load(f)
+    except Exception:
+        logger.debug("Could not load existing project registry")
+        return []
+    return [str(p) for p in projects] if isinstance(projects, list) else []
+
+
+def resolve_index_path(
+    index_name: str, project_dir: Optional[Union[str, Path]] = None
+) -> Optional[str]:
+    """
+    Resolve an index name to the ``.leann`` path accepted by ``LeannSearcher``.
+
+    Follows the same preference order as ``leann search --non-interactive``: the
+    current project first, then every registered project; within a project,
+    CLI-format indexes (``.leann/indexes/<name>``) win over app-format
+    ``<name>.leann.meta.json`` files. A direct index path is returned as-is.
+
+    Args:
+        index_name: Index name as shown by ``leann list``, or an index path.
+        project_dir: Project treated as "current". Defaults to the working directory.
+
+    Returns:
+        The index path, or None if no matching index was found.
+    """
+    direct = Path(index_name).expanduser()
+    if Path(f"{direct}.meta.json").exists():
+        return str(direct.resolve())
+
+    current = Path(project_dir) if project_dir is not None else Path.cwd()
+    projects = [current] + [
+        Path(p) for p in _load_registered_projects() if Path(p).resolve() != current.resolve()
+    ]
+
+    for project_path in projects:
+        if not project_path.exists():
+            continue
+        cli_indexes_dir = project_path / ".leann" / "indexes"
+        cli_meta = cli_indexes_dir / index_name / "documents.leann.meta.json"
+        if cli_meta.exists():
+            return str(cli_meta.parent / "documents.leann")
+
+        # App-format indexes are addressed by file base or by parent directory name
+        for meta_file in project_path.rglob("*.leann.meta.json"):
+            if not meta_file.is_file() or cli_indexes_dir in meta_file.parents:
+                continue
+            file_base = meta_file.name[: -len(".leann.meta.json")]
+            if index_name in (file_base, meta_file.parent.name):
+                return str(meta_file.parent / f"{file_base}.leann")
+    return None
+
+
+def discover_indexes_in_project(
+    project_path: Path, exclude_dirs: Optional[list[Path]] = None
+) -> list[dict]:
+    """Discover all indexes in a project directory (both CLI and apps formats)
+
+    exclude_dirs: when provided, skip any APP-format index files that are
+    located under these directories. This prevents duplicates when the
+    current project is a parent directory of other registered projects.
+    """
+    indexes = []
+    exclude_dirs = exclude_dirs or []
+    # normalize to resolved paths once for comparison
+    try:
+        exclude_dirs_resolved = [p.resolve() for p in exclude_dirs]
+    except Exception:
+        exclude_dirs_resolved = exclude_dirs
+
+    # 1. CLI format: .leann/indexes/index_name/
+    cli_indexes_dir = project_path / ".leann" / "indexes"
+    if cli_indexes_dir.exists():
+        for index_dir in cli_indexes_dir.iterdir():
+            if index_dir.is_dir():
+                meta_file = index_dir / "documents.leann.meta.json"
+                status = "✅" if meta_file.exists() else "❌"
+
+                size_mb = 0
+                if meta_file.exists():
+                    try:
+                        size_mb = sum(
+                            f.stat().st_size for f in index_dir.iterdir() if f.is_file()
+                        ) / (1024 * 1024)
+                    except (OSError, PermissionError):
+                        pass
+
+                indexes.append(
+                    {
+                        "name": index_dir.name,
+                        "type": "cli",
+                        "status": status,
+                        "size_mb": size_mb,
+                        "path": index_dir,
+                    }
+                )
+
+    # 2. Apps format: *.leann.meta.json files anywhere in the project
+    cli_indexes_dir = project_path / ".leann" / "indexes"
+    for meta_file in project_path.rglob("*.leann.meta.json"):
+        if meta_file.is_file():
+            # Skip CLI-built indexes (which store meta under .leann/indexes/<name>/)
+            try:
+                if cli_indexes_dir.exists() and cli_indexes_dir in meta_file.parents:
+                    continue
+            except Exception:
+                pass
+            # Skip meta files that live under excluded directories
+            try:
+                meta_parent_resolved = meta_file.parent.resolve()
+                if any(
+                    meta_parent_resolved.is_relative_to(ex_dir) for ex_dir in exclude_dirs_resolved
+                ):
+                    continue
+            except Exception:
+                # best effort; if resolve or comparison fails, do not exclude
+                pass
+            # Use the parent directory name as the app index display name
+            display_name = meta_file.parent.name
+            # Extract file base used to store files
+            file_base = meta_file.name.replace(".leann.meta.json", "")
+
+            # Apps indexes are considered complete if the .leann.meta.json file exists
+            status = "✅"
+
+            # Calculate total size of all related files (use file base)
+            size_mb = 0
+            try:
+                index_dir = meta_file.parent
+                for related_file in index_dir.glob(f"{file_base}.leann*"):
+                    size_mb += related_file.stat().st_size / (1024 * 1024)
+            except (OSError, PermissionError):
+                pass
+
+            indexes.append(
+                {
+                    "name": display_name,
+                    "type": "app",
+                    "status": status,
+                    "size_mb": size_mb,
+                    "path": meta_file,
+                }
+            )
+
+    return indexes
 
 
 def register_project_directory(project_dir: Optional[Union[str, Path]] = None):
@@ -0,0 +1,143 @@
+"""
+Cross-encoder reranking of search candidates.
+
+A cross-encoder reads the query and a passage together, which ranks far better
+than embedding distance but costs one model forward pass per pair. Rerankers
+are therefore applied to a small over-fetched candidate set. Pair scores are
+cached so repeated or overlapping queries skip inference.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from .api import SearchResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+# The first stage returns this many times top_k candidates for the reranker
+RERANK_CANDIDATE_FACTOR = 4
+
+
+class CrossEncoderReranker:
+    """Scores (query, passage) pairs with a sentence-transformers ``CrossEncoder``.
+
+    Pairs are sorted by passage length before batching so each batch pads to a
+    similar length, and scores are kept in an LRU cache.
+
+    Inference is serialized per instance by default because a fast (Rust) tokenizer
+    raises when two threads call it at once; requests answered from the cache never
+    wait for it. Pass ``concurrent=True`` to let predictions overlap.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_RERANK_MODEL,
+        device: Optional[str] = None,
+        batch_size: int = 32,
+        max_length: int = 512,
+        cache_size: int = 10000,
+        model: Optional[Any] = None,
+        concurrent: bool = False,
+    ):
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.cache_size = cache_size
+        self._model = model
+        self._cache: OrderedDict[tuple[str, bytes], float] = OrderedDict()
+        # Guards the cache and counters only; never held during inference
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._predict_lock = nullcontext() if concurrent else threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def model(self) -> Any:
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+
+                    logger.info(f"Loading cross-encoder reranker: {self.model_name}")
+                    self._model = CrossEncoder(
+                        self.model_name, device=self.device, max_length=self.max_length
+                    )
+        return self._model
+
+    def score(self, query: str, texts: Sequence[str]) -> list[float]:
+        """Relevance score of each text for ``query`` (higher is more relevant)."""
+        keys = [(query, hashlib.sha1(t.encode("utf-8")).digest()) for t in texts]
+        scores: list[Optional[float]] = [None] * len(texts)
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    scores[i] = cached
+            missing = [i for i, s in enumerate(scores) if s is None]
+            self.cache_hits += len(texts) - len(missing)
+            self.cache_misses += len(missing)
+        if not missing:
+            return scores  # type: ignore[return-value]
+
+        # Length-bucketed batches: neighbours in length order pad to similar sizes
+        missing.sort(key=lambda i: len(texts[i]))
+        model = self.model
+        with self._predict_lock:
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start : start + self.batch_size]
+                predicted = model.predict(
+                    [(query, texts[i]) for i in batch],
+                    batch_size=len(batch),
+                    show_progress_bar=False,
+                )
+                for i, value in zip(batch, predicted):
+                    scores[i] = float(value)
+        with self._lock:
+            for i in missing:
+                self._cache[keys[i]] = scores[i]  # type: ignore[assignment]
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return scores  # type: ignore[return-value]
+
+    def rerank(
+        self, query: str, results: Sequence["SearchResult"], top_k: int
+    ) -> list["SearchResult"]:
+        """Return the ``top_k`` results re-ordered (and re-scored) by the cross-encoder."""
+        from .api import SearchResult
+
+        if not results:
+            return []
+        scores = self.score(query, [r.text for r in results])
+        order = sorted(range(len(results)), key=lambda i: scores[i], reverse=True)
+        return [
+            SearchResult(
+                id=results[i].id,
+                score=scores[i],
+                text=results[i].text,
+                metadata=results[i].metadata,
+            )
+            for i in order[:top_k]
+        ]
+
+
+_rerankers: dict[str, CrossEncoderReranker] = {}
+_rerankers_lock = threading.Lock()
+
+
+def get_reranker(model_name: Optional[str] = None) -> CrossEncoderReranker:
+    """Process-wide reranker per model, so the model and score cache are shared."""
+    model_name = model_name or DEFAULT_RERANK_MODEL
+    with _rerankers_lock:
+        if model_name not in _rerankers:
+            _rerankers[model_name] = CrossEncoderReranker(model_name)
+        return _rerankers[model_name]
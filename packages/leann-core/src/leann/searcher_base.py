@@ -7,6 +7,7 @@ import numpy as np
 
 from .embedding_server_manager import EmbeddingServerManager
 from .interface import LeannBackendSearcherInterface
+from .zmq_client import EmbeddingServerClient
 
 
 class BaseSearcher(LeannBackendSearcherInterface, ABC):
@@ -46,6 +47,8 @@ class BaseSearcher(LeannBackendSearcherInterface, ABC):
         self.embedding_server_manager = EmbeddingServerManager(
             backend_module_name=backend_module_name,
         )
+        # One persistent socket per embedding server port, reused across queries
+        self._embedding_clients: dict[int, EmbeddingServerClient] = {}
 
     def _load_meta(self) -> dict[str, Any]:
         """Loads the metadata file associated with the index."""
@@ -150,38 +153,31 @@ class BaseSearcher(LeannBackendSearcherInterface, ABC):
             provider_options=self.embedding_options,
         )
 
+    def _embedding_client(self, zmq_port: int) -> EmbeddingServerClient:
+        """Return the persistent client for the embedding server on ``zmq_port``."""
+        client = self._embedding_clients.get(zmq_port)
+        if client is None:
+            client = self._embedding_clients[zmq_port] = EmbeddingServerClient(zmq_port)
+        return client
+
     def _compute_embedding_via_server(self, chunks: list, zmq_port: int) -> np.ndarray:
         """Compute embeddings using the ZMQ embedding server."""
-        import msgpack
-        import zmq
-
         try:
-            context = zmq.Context()
-            socket = context.socket(zmq.REQ)
-            socket.setsockopt(zmq.RCVTIMEO, 30000)  # 30 second timeout
-            socket.connect(f"tcp://localhost:{zmq_port}")
-
-            # Send embedding request
-            request = chunks
-            request_bytes = msgpack.packb(request)
-            socket.send(request_bytes)
-
-            # Wait for response
-            response_bytes = socket.recv()
-            response = msgpack.unpackb(response_bytes)
-
-            socket.close()
-            context.term()
-
-            # Convert response to numpy array
-            if isinstance(response, list) and len(response) > 0:
-                return np.array(response, dtype=np.float32)
-            else:
-                raise RuntimeError("Invalid response from embedding server")
-
+            response = self._embedding_client(zmq_port).request(chunks)
         except Exception as e:
             raise RuntimeError(f"Failed to compute embeddings via server: {e}")
 
+        # Convert response to numpy array
+        if isinstance(response, list) and len(response) > 0:
+            return np.array(response, dtype=np.float32)
+        raise RuntimeError("Failed to compute embeddings via server: invalid response")
+
+    def close_embedding_clients(self) -> None:
+        """Close persistent sockets to embedding servers."""
+        clients = getattr(self, "_embedding_clients", {})
+        while clients:
+            clients.popitem()[1].close()
+
     @abstractmethod
     def search(
         self,
@@ -216,5 +212,6 @@ class BaseSearcher(LeannBackendSearcherInterface, ABC):
 
     def __del__(self):
         """Ensures the embedding server is stopped when the searcher is destroyed."""
+        self.close_embedding_clients()
         if hasattr(self, "embedding_server_manager"):
             self.embedding_server_manager.stop_server()
@@ -0,0 +1,195 @@
+"""
+Keep-warm pool of ``LeannSearcher`` instances for long-running processes.
+
+Opening a searcher reads meta.json, the passage offset maps and the backend
+index, and the first recompute search additionally starts an embedding server.
+Long-lived hosts (the MCP server, ``leann serve``) keep recently used searchers
+open in an LRU pool so those costs are paid once per index instead of once per
+request.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from .registry import resolve_index_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = int(os.getenv("LEANN_SEARCHER_POOL_SIZE", "4"))
+
+
+class _PoolEntry:
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        # Serializes use of one searcher: the backend index and its ZMQ client are not
+        # safe for concurrent searches, but different indexes can be searched in parallel.
+        self.lock = threading.Lock()
+        self.searcher: Optional[Any] = None
+        self.closed = False
+
+
+def _default_searcher_factory(index_path: str, **kwargs) -> Any:
+    from .api import LeannSearcher
+
+    return LeannSearcher(index_path, **kwargs)
+
+
+class SearcherPool:
+    """
+    LRU pool of open searchers keyed by index name.
+
+    Each searcher keeps its embedding server alive between calls, so repeated
+    searches against the same index skip both the index load and the server
+    start-up. When the pool grows beyond ``max_size`` the least recently used
+    searcher is cleaned up, which also stops its embedding server.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_POOL_SIZE,
+        resolver: Callable[[str], Optional[str]] = resolve_index_path,
+        searcher_factory: Optional[Callable[[str], Any]] = None,
+        **searcher_kwargs,
+    ):
+        """
+        Args:
+            max_size: Maximum number of searchers kept open at once.
+            resolver: Maps an index name to an index path (None if unknown).
+            searcher_factory: Creates a searcher from an index path. Defaults to
+                ``LeannSearcher(index_path, **searcher_kwargs)``.
+            **searcher_kwargs: Extra arguments for the default searcher factory.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self._resolver = resolver
+        self._factory = searcher_factory or (
+            lambda path: _default_searcher_factory(path, **searcher_kwargs)
+        )
+        self._entries: OrderedDict[str, _PoolEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _checkout(self, index_name: str) -> tuple[_PoolEntry, list[_PoolEntry]]:
+        with self._lock:
+            entry = self._entries.get(index_name)
+            if entry is not None:
+                self._entries.move_to_end(index_name)
+                self.hits += 1
+                return entry, []
+
+        # Resolve outside the lock; it may walk registered project directories.
+        index_path = self._resolver(index_name)
+        if index_path is None:
+            raise FileNotFoundError(f"Index '{index_name}' not found.")
+
+        evicted: list[_PoolEntry] = []
+        with self._lock:
+            entry = self._entries.get(index_name)
+            if entry is not None:
+                self._entries.move_to_end(index_name)
+                self.hits += 1
+                return entry, []
+            entry = _PoolEntry(index_path)
+            self._entries[index_name] = entry
+            self.misses += 1
+            while len(self._entries) > self.max_size:
+                _, old = self._entries.popitem(last=False)
+                evicted.append(old)
+                self.evictions += 1
+        return entry, evicted
+
+    @contextmanager
+    def acquire(self, index_name: str) -> Iterator[Any]:
+        """
+        Borrow the searcher for ``index_name``, opening it on first use.
+
+        The searcher is held exclusively for the duration of the ``with`` block.
+
+        Raises:
+            FileNotFoundError: If the index name cannot be resolved.
+        """
+        while True:
+            entry, evicted = self._checkout(index_name)
+            for old in evicted:
+                self._close_entry(old)
+            with entry.lock:
+                if entry.closed:
+                    # Evicted between checkout and lock acquisition; check out again
+                    continue
+                if entry.searcher is None:
+                    logger.info(f"Opening searcher for '{index_name}' at {entry.index_path}")
+                    try:
+                        entry.searcher = self._factory(entry.index_path)
+                    except Exception:
+                        self._discard(index_name, entry)
+                        raise
+                yield entry.searcher
+                return
+
+    def _discard(self, index_name: str, entry: _PoolEntry) -> None:
+        with self._lock:
+            if self._entries.get(index_name) is entry:
+                del self._entries[index_name]
+        entry.closed = True
+
+    def _close_entry(self, entry: _PoolEntry) -> None:
+        with entry.lock:
+            entry.closed = True
+            searcher, entry.searcher = entry.searcher, None
+        if searcher is None:
+            return
+        logger.info(f"Closing pooled searcher for {entry.index_path}")
+        try:
+            searcher.cleanup()
+        except Exception as e:
+            logger.warning(f"Failed to clean up searcher for {entry.index_path}: {e}")
+
+    def evict(self, index_name: str) -> bool:
+        """Close the searcher for ``index_name`` if it is open. Returns True if it was."""
+        with self._lock:
+            entry = self._entries.pop(index_name, None)
+        if entry is None:
+            return False
+        self._close_entry(entry)
+        return True
+
+    def open_indexes(self) -> list[str]:
+        """Index names currently held, least recently used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "indexes": list(self._entries),
+            }
+
+    def close(self) -> None:
+        """Clean up every pooled searcher."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            self._close_entry(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,392 @@
+"""
+Local HTTP/JSON search service behind `leann serve`.
+
+One warm process per host: indexes and their embedding servers are held open in
+a ``SearcherPool`` and shared by every client, instead of each application
+paying the index load and model start-up on its own. The server is a small
+HTTP/1.1 implementation on ``asyncio`` so it has no dependencies beyond the
+standard library; blocking search work runs on a bounded thread pool.
+
+Endpoints:
+    GET  /health         liveness probe
+    GET  /indexes        indexes discoverable from the current and registered projects
+    GET  /stats          request latency histograms and searcher pool counters
+    POST /search         {"index", "query", ...search options}
+    POST /batch_search   {"index", "queries": [...], ...search options}
+    POST /ask            {"index", "question", "llm_config", ...search options}
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from .metrics import LatencyHistogram
+from .registry import _load_registered_projects, discover_indexes_in_project
+from .searcher_pool import SearcherPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 10 * 1024 * 1024
+# Routes with their own latency histogram; any other path is recorded under "other"
+ROUTES = ("/health", "/stats", "/indexes", "/search", "/batch_search", "/ask")
+
+# Request fields forwarded to LeannSearcher.search
+SEARCH_OPTIONS = (
+    "top_k",
+    "complexity",
+    "beam_width",
+    "prune_ratio",
+    "recompute_embeddings",
+    "pruning_strategy",
+    "metadata_filters",
+    "batch_size",
+    "use_grep",
+    "search_mode",
+    "hybrid_fusion",
+    "hybrid_alpha",
+    "rerank",
+    "rerank_model",
+    "rerank_fetch_k",
+)
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class ServiceError(Exception):
+    """Error carrying the HTTP status to report to the client."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _result_to_dict(result: Any) -> dict[str, Any]:
+    return {
+        "id": result.id,
+        "score": float(result.score),
+        "text": result.text,
+        "metadata": result.metadata,
+    }
+
+
+def _search_kwargs(body: dict[str, Any]) -> dict[str, Any]:
+    return {k: body[k] for k in SEARCH_OPTIONS if k in body}
+
+
+def _require(body: dict[str, Any], key: str, kind: type) -> Any:
+    value = body.get(key)
+    if not isinstance(value, kind) or (kind is str and not value.strip()):
+        raise ServiceError(400, f"'{key}' is required and must be a {kind.__name__}")
+    return value
+
+
+class SearchService:
+    """Routes HTTP/JSON requests to pooled searchers with bounded concurrency."""
+
+    def __init__(
+        self,
+        pool: Optional[SearcherPool] = None,
+        max_concurrency: int = 4,
+        max_pending: int = 64,
+    ):
+        """
+        Args:
+            pool: Searcher pool to serve from; a default-sized pool is created if omitted.
+            max_concurrency: Requests executing at once (size of the worker thread pool).
+            max_pending: Requests allowed to wait for a worker before new ones get 503.
+        """
+        self.pool = pool if pool is not None else SearcherPool()
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="leann-serve"
+        )
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._in_flight = 0
+        self._llms: dict[str, Any] = {}
+        self._llms_lock = threading.Lock()
+        self.latency: dict[str, LatencyHistogram] = {}
+        self.status_counts: dict[str, int] = {}
+        self.started_at = time.time()
+
+    # -- request execution -------------------------------------------------
+
+    async def _run_blocking(self, fn, *args) -> Any:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        if self._slots.locked() and self._waiting >= self.max_pending:
+            raise ServiceError(503, "Too many pending requests, retry later")
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    def _search(self, body: dict[str, Any]) -> dict[str, Any]:
+        index = _require(body, "index", str)
+        query = _require(body, "query", str)
+        with self.pool.acquire(index) as searcher:
+            results = searcher.search(query, **_search_kwargs(body))
+        return {"index": index, "results": [_result_to_dict(r) for r in results]}
+
+    def _batch_search(self, body: dict[str, Any]) -> dict[str, Any]:
+        index = _require(body, "index", str)
+        queries = _require(body, "queries", list)
+        if not all(isinstance(q, str) and q.strip() for q in queries):
+            raise ServiceError(400, "'queries' must be a list of non-empty strings")
+        kwargs = _search_kwargs(body)
+        # Hold the searcher once for the whole batch so its embedding server stays hot
+        with self.pool.acquire(index) as searcher:
+            batches = [searcher.search(q, **kwargs) for q in queries]
+        return {
+            "index": index,
+            "results": [[_result_to_dict(r) for r in batch] for batch in batches],
+        }
+
+    def _get_llm(self, llm_config: Optional[dict[str, Any]]) -> Any:
+        from .chat import get_llm
+
+        key = json.dumps(llm_config, sort_keys=True)
+        # Held while building so concurrent /ask requests create each LLM once
+        with self._llms_lock:
+            if key not in self._llms:
+                self._llms[key] = get_llm(llm_config)
+            return self._llms[key]
+
+    def _ask(self, body: dict[str, Any]) -> dict[str, Any]:
+        from .api import LeannChat
+
+        index = _require(body, "index", str)
+        question = _require(body, "question", str)
+        llm_config = body.get("llm_config")
+        if llm_config is not None and not isinstance(llm_config, dict):
+            raise ServiceError(400, "'llm_config' must be an object")
+        llm = self._get_llm(llm_config)
+        with self.pool.acquire(index) as searcher:
+            results = searcher.search(question, **_search_kwargs(body))
+            chat = LeannChat(index, searcher=searcher, llm=llm)
+        # Generate after releasing the lease so /search on this index is not held up
+        prompt = chat._build_prompt(question, results)
+        answer = llm.ask(prompt, **(body.get("llm_kwargs") or {}))
+        return {"index": index, "answer": answer}
+
+    def _list_indexes(self) -> dict[str, Any]:
+        current = Path.cwd()
+        projects = [current] + [Path(p) for p in _load_registered_projects() if Path(p) != current]
+        indexes = []
+        for project in projects:
+            if not project.exists():
+                continue
+            exclude = [p for p in projects if p != project] if project == current else None
+            for idx in discover_indexes_in_project(project, exclude_dirs=exclude):
+                indexes.append(
+                    {
+                        "name": idx["name"],
+                        "type": idx["type"],
+                        "project": str(project),
+                        "size_mb": round(idx["size_mb"], 3),
+                        "ready": idx["status"] == "✅",
+                    }
+                )
+        return {"indexes": indexes, "open": self.pool.open_indexes()}
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "uptime_s": time.time() - self.started_at,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "max_concurrency": self.max_concurrency,
+            "status_counts": dict(self.status_counts),
+            "latency": {route: h.snapshot() for route, h in self.latency.items()},
+            "pool": self.pool.stats(),
+        }
+
+    # -- routing -----------------------------------------------------------
+
+    async def handle(self, method: str, path: str, body: bytes) -> tuple[int, dict[str, Any]]:
+        """Dispatch one request and return ``(status, json_payload)``."""
+        route = path.split("?", 1)[0].rstrip("/") or "/"
+        start = time.perf_counter()
+        try:
+            status, payload = 200, await self._route(method, route, body)
+        except ServiceError as e:
+            status, payload = e.status, {"error": str(e)}
+        except FileNotFoundError as e:
+            status, payload = 404, {"error": str(e)}
+        except Exception as e:
+            logger.exception(f"Request {method} {route} failed")
+            status, payload = 500, {"error": str(e)}
+        elapsed = time.perf_counter() - start
+        bucket = route if route in ROUTES else "other"
+        self.latency.setdefault(bucket, LatencyHistogram()).observe(elapsed)
+        self.status_counts[str(status)] = self.status_counts.get(str(status), 0) + 1
+        payload.setdefault("took_ms", round(elapsed * 1000, 3))
+        return status, payload
+
+    async def _route(self, method: str, route: str, body: bytes) -> dict[str, Any]:
+        get_routes = {
+            "/health": lambda: {"status": "ok"},
+            "/stats": self.stats,
+        }
+        post_routes = {
+            "/search": self._search,
+            "/batch_search": self._batch_search,
+            "/ask": self._ask,
+        }
+        if route in get_routes:
+            if method != "GET":
+                raise ServiceError(405, f"{route} only supports GET")
+            return get_routes[route]()
+        if route == "/indexes":
+            if method != "GET":
+                raise ServiceError(405, f"{route} only supports GET")
+            return await self._run_blocking(self._list_indexes)
+        if route in post_routes:
+            if method != "POST":
+                raise ServiceError(405, f"{route} only supports POST")
+            try:
+                payload = json.loads(body or b"{}")
+            except json.JSONDecodeError as e:
+                raise ServiceError(400, f"Invalid JSON body: {e}")
+            if not isinstance(payload, dict):
+                raise ServiceError(400, "Request body must be a JSON object")
+            return await self._run_blocking(post_routes[route], payload)
+        raise ServiceError(404, f"Unknown endpoint {route}")
+
+    # -- HTTP plumbing -----------------------------------------------------
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._write(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+
+                headers: dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" or (
+                    version == "HTTP/1.1" and connection != "close"
+                )
+                raw_length = headers.get("content-length") or "0"
+                if not (raw_length.isascii() and raw_length.isdigit()):
+                    await self._write(writer, 400, {"error": "Invalid Content-Length"}, False)
+                    break
+                length = int(raw_length)
+                if length > MAX_BODY_BYTES:
+                    await self._write(writer, 413, {"error": "Request body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.handle(method.upper(), target, body)
+                await self._write(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _write(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: dict[str, Any],
+        keep_alive: bool,
+    ) -> None:
+        data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def start(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+    ) -> asyncio.AbstractServer:
+        """Bind the listening socket; use ``server.sockets`` to find an ephemeral port."""
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    async def preload(self, index_names: list[str]) -> None:
+        """Open indexes and start their embedding servers before the first request."""
+
+        def _warm(name: str) -> None:
+            with self.pool.acquire(name) as searcher:
+                searcher.warmup()
+
+        for name in index_names:
+            await self._run_blocking(_warm, name)
+            logger.info(f"Preloaded index '{name}'")
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.pool.close()
+
+
+async def serve_forever(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    pool_size: int = 4,
+    max_concurrency: int = 4,
+    max_pending: int = 64,
+    preload: Optional[list[str]] = None,
+) -> None:
+    """Run the search service until cancelled (Ctrl+C)."""
+    service = SearchService(
+        SearcherPool(max_size=pool_size),
+        max_concurrency=max_concurrency,
+        max_pending=max_pending,
+    )
+    server = await service.start(host, port)
+    try:
+        if preload:
+            await service.preload(preload)
+        bound = ", ".join(str(s.getsockname()[:2]) for s in server.sockets or [])
+        print(f"LEANN search service listening on {bound}")
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
@@ -0,0 +1,289 @@
+"""
+Sharded indexes: one corpus split over several independently built graphs.
+
+A sharded index ``<name>.leann`` is a parent meta.json plus one complete
+sub-index per shard (``<name>.leann-shard000.shard``, ...). The parent lists the
+passage files of every shard as its own passage sources, so passage lookup,
+keyword search and the embedding server see the whole corpus, and it records
+the layout under ``"shards"``::
+
+    "shards": {"strategy": "hash", "count": 4,
+               "indexes": ["docs.leann-shard000.shard", ...],
+               "passages": [2503, 2497, 2511, 2489]}
+
+Passages go to a shard by a stable hash of their id (``"hash"``) or of their
+source file (``"source"``), which keeps the chunks of one document together.
+Embeddings are computed in the building process one shard at a time and each
+shard's graph is built in a worker process, so the build uses several cores and
+holds at most a few shards in memory at once.
+
+At search time every shard is searched on its own thread with the same query
+embedding, and their rankings are merged with a heap. Graph labels are local to
+a shard, so each shard recomputes through its own embedding server, started from
+the shard's meta.json and id map. Every server loads its own copy of the model
+(unless ``leann zygote`` is running, which lets them share the weights), so at
+most ``max_shard_servers`` of them run at once: with more graph shards than that,
+a search goes through them in waves and stops one wave's servers before starting
+the next, trading server restarts for bounded memory.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import time
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+ShardStrategy = Literal["hash", "source"]
+SHARD_STRATEGIES = ("hash", "source")
+# Shard embedding servers allowed to run at once; each holds its own copy of the model
+DEFAULT_MAX_SHARD_SERVERS = 4
+
+
+def shard_index_path(index_path: str, shard: int) -> str:
+    """Index path of one shard.
+
+    The suffix keeps shard metadata out of ``*.leann.meta.json`` index discovery,
+    while ``<name>.leann*`` globs (index size, removal) still cover the shard files.
+    """
+    return f"{index_path}-shard{shard:03d}.shard"
+
+
+def shard_of(chunk: dict[str, Any], num_shards: int, strategy: ShardStrategy = "hash") -> int:
+    """Shard a passage belongs to; stable across processes and runs."""
+    key = str(chunk["id"])
+    if strategy == "source":
+        metadata = chunk.get("metadata") or {}
+        key = str(metadata.get("source") or metadata.get("file_path") or key)
+    return zlib.crc32(key.encode("utf-8")) % num_shards
+
+
+def _build_shard_graph(
+    backend_name: str, backend_kwargs: dict[str, Any], embeddings, ids: list[str], index_path: str
+) -> float:
+    """Build one shard's graph; runs in a worker process. Returns the build time."""
+    from .registry import get_backend
+
+    start = time.time()
+    builder = get_backend(backend_name).builder(**backend_kwargs)
+    builder.build(embeddings, ids, index_path, **backend_kwargs)
+    return time.time() - start
+
+
+def build_sharded_index(builder: Any, index_path: str) -> None:
+    """Build ``builder.chunks`` as a sharded index (see the module docstring)."""
+    from .api import compute_embeddings
+    from .id_map import IdMap, id_map_prefix
+    from .keyword_index import KeywordIndex
+
+    path = Path(index_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    members: list[list[dict[str, Any]]] = [[] for _ in range(builder.num_shards)]
+    for chunk in builder.chunks:
+        members[shard_of(chunk, builder.num_shards, builder.shard_by)].append(chunk)
+    shards = [chunks for chunks in members if chunks]
+    if len(shards) < builder.num_shards:
+        logger.warning(
+            f"Only {len(shards)} of {builder.num_shards} shards received passages; "
+            "building the non-empty ones"
+        )
+
+    workers = builder.shard_workers or min(len(shards), os.cpu_count() or 1)
+    backend_kwargs = {**builder.backend_kwargs, "dimensions": builder.dimensions}
+    # Spawned workers do not inherit the threads of an already loaded embedding model
+    executor = (
+        ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+        if workers > 1
+        else None
+    )
+    pending: list[Future] = []
+    passage_files: list[tuple[Path, Path]] = []
+    shard_paths: list[str] = []
+    try:
+        for shard, chunks in enumerate(shards):
+            shard_path = shard_index_path(index_path, shard)
+            passages_file = Path(f"{shard_path}.passages.jsonl")
+            offset_file = Path(f"{shard_path}.passages.idx")
+            builder._write_passages(passages_file, offset_file, chunks)
+            embeddings = compute_embeddings(
+                [c["text"] for c in chunks],
+                builder.embedding_model,
+                builder.embedding_mode,
+                use_server=False,
+                is_build=True,
+                provider_options=builder.embedding_options,
+            )
+            ids = [c["id"] for c in chunks]
+            IdMap.from_ids(ids).save(id_map_prefix(shard_path))
+            builder._write_exact_index(shard_path, embeddings, ids)
+            meta_data = builder._meta_data([(passages_file, offset_file)])
+            meta_data["shard_of"] = {"index": path.name, "shard": shard}
+            with open(f"{shard_path}.meta.json", "w", encoding="utf-8") as f:
+                json.dump(meta_data, f, indent=2)
+
+            args = (builder.backend_name, backend_kwargs, embeddings, ids, shard_path)
+            if executor is None:
+                _build_shard_graph(*args)
+            else:
+                # Bound the embeddings waiting to be pickled to the workers
+                if len(pending) >= workers:
+                    pending.pop(0).result()
+                pending.append(executor.submit(_build_shard_graph, *args))
+            passage_files.append((passages_file, offset_file))
+            shard_paths.append(shard_path)
+            logger.info(f"Shard {shard}: {len(chunks)} passages")
+        for future in pending:
+            future.result()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if builder.keyword_index:
+        KeywordIndex.open_or_build(index_path, [str(p) for p, _ in passage_files])
+    # Written last: a parent meta.json only exists once every shard is complete
+    meta_data = builder._meta_data(passage_files)
+    meta_data["shards"] = {
+        "strategy": builder.shard_by,
+        "count": len(shards),
+        "indexes": [Path(p).name for p in shard_paths],
+        "passages": [len(chunks) for chunks in shards],
+    }
+    with open(f"{index_path}.meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta_data, f, indent=2)
+
+
+def open_shards(searcher: Any, enable_warmup: bool = False, **backend_kwargs) -> list[Any]:
+    """Open a searcher per shard of the sharded index opened by ``searcher``.
+
+    With ``enable_warmup`` only the first ``searcher.max_shard_servers`` shards start
+    their embedding servers.
+    """
+    from .api import LeannSearcher
+
+    index_dir = Path(searcher.index_path).parent
+    return [
+        LeannSearcher(
+            str(index_dir / name),
+            enable_warmup=enable_warmup and i < searcher.max_shard_servers,
+            **backend_kwargs,
+        )
+        for i, name in enumerate(searcher.meta_data["shards"]["indexes"])
+    ]
+
+
+def warm_shards(shards: list[Any], expected_zmq_port: int = 5557) -> list[int]:
+    """Start the embedding server of every shard in ``shards``; returns their ports.
+
+    Started one after another so that concurrent shard searches never race for a port.
+    """
+    ports = []
+    port = expected_zmq_port
+    for shard in shards:
+        port = shard.warmup(port)
+        ports.append(port)
+        port += 1
+    return ports
+
+
+def stop_shard_servers(shards: list[Any]) -> None:
+    """Stop the embedding servers of ``shards`` (those not running are skipped)."""
+    for shard in shards:
+        manager = getattr(shard.backend_impl, "embedding_server_manager", None)
+        if manager is not None:
+            manager.stop_server()
+
+
+def search_shards(
+    searcher: Any,
+    query: str,
+    top_k: int,
+    recompute_embeddings: bool = True,
+    expected_zmq_port: int = 5557,
+    provider_options: Optional[dict[str, Any]] = None,
+    query_embedding: Optional[Any] = None,
+    **search_kwargs,
+) -> list[Any]:
+    """Vector search over every shard of ``searcher`` and merge the top-k."""
+    from .federated import merge_results
+    from .tracing import active_stats, search_phase
+
+    shards = searcher._shards
+    stats = active_stats()
+    stats.path = "sharded"
+    zmq_port = expected_zmq_port
+    filters = search_kwargs.get("metadata_filters")
+    threshold = search_kwargs.get("exact_threshold")
+    graph_shards = (
+        [shard for shard in shards if shard._exact_plan(filters, threshold) is None]
+        if recompute_embeddings
+        else []
+    )
+    # Graph shards run in waves of at most max_shard_servers live embedding servers;
+    # exact shards need no server and go with the first wave
+    limit = searcher.max_shard_servers
+    waves = [graph_shards[i : i + limit] for i in range(0, len(graph_shards), limit)] or [[]]
+    graph_ids = set(map(id, graph_shards))
+    exact_shards = [shard for shard in shards if id(shard) not in graph_ids]
+    position = {id(shard): i for i, shard in enumerate(shards)}
+    rankings: dict[int, list[Any]] = {}
+
+    def _search(shard: Any, port: int, query_embedding: Any) -> list[Any]:
+        return shard.search(
+            query,
+            top_k=top_k,
+            recompute_embeddings=recompute_embeddings,
+            expected_zmq_port=port,
+            provider_options=provider_options,
+            query_embedding=query_embedding,
+            **search_kwargs,
+        )
+
+    for wave_number, wave in enumerate(waves):
+        ports: dict[int, int] = {}
+        if wave:
+            # Started here, so the shard threads below only reuse their servers
+            with search_phase("leann.server_startup", "server_time"):
+                if len(waves) > 1:
+                    wave_ids = set(map(id, wave))
+                    stop_shard_servers([s for s in graph_shards if id(s) not in wave_ids])
+                ports = dict(zip(map(id, wave), warm_shards(wave, zmq_port)))
+        if query_embedding is None:
+            embedder = wave[0] if wave else shards[0]
+            with search_phase("leann.embed_query", "embedding_time"):
+                query_embedding = embedder.embed_query(
+                    query,
+                    provider_options,
+                    use_server=bool(wave),
+                    expected_zmq_port=ports.get(id(embedder), zmq_port),
+                )
+            if wave:
+                stats.count("zmq_round_trips")
+
+        members = wave + exact_shards if wave_number == 0 else wave
+        with search_phase("leann.shard_search", "search_time", shards=len(members)):
+            with ThreadPoolExecutor(max_workers=len(members)) as executor:
+                # Each shard traces its search as a child of this one; a context can only
+                # be entered by one thread at a time, hence one copy per shard
+                futures = {
+                    position[id(shard)]: executor.submit(
+                        contextvars.copy_context().run,
+                        _search,
+                        shard,
+                        ports.get(id(shard), zmq_port),
+                        query_embedding,
+                    )
+                    for shard in members
+                }
+                rankings.update({i: future.result() for i, future in futures.items()})
+    rankings = dict(sorted(rankings.items()))
+    stats.add_shards([shard.last_stats for shard in shards])
+    metric = searcher.meta_data.get("backend_kwargs", {}).get("distance_metric", "mips")
+    if metric.lower() == "l2":
+        return merge_results(rankings, top_k, key=lambda r: -float(r.score))
+    return merge_results(rankings, top_k)
@@ -0,0 +1,289 @@
+"""
+Per-query search statistics and tracing hooks.
+
+Every :meth:`LeannSearcher.search` records a :class:`SearchStats` on
+``searcher.last_stats`` (``last_search_stats`` keeps the same data as a dict);
+``search(..., return_stats=True)`` returns ``(results, stats)`` instead of just the
+results. It covers where the time went (embedding server startup, query
+embedding, traversal, passage fetch, rerank) and what the search did (ZMQ round
+trips, nodes visited and recomputed, passages fetched, results dropped by
+metadata filters, cache hits). Counters a backend cannot observe stay ``None``.
+
+A tracer is any callable taking a finished :class:`Span`. Spans carry the fields
+of an OpenTelemetry span (trace/span/parent ids as hex, start and end in
+nanoseconds since the epoch, attributes, status), so they can be forwarded to an
+OpenTelemetry SDK, written to a log or collected in a test; nothing here talks to
+the network. One search produces a ``leann.search`` span with a child span per
+phase; shards of a sharded index report child ``leann.search`` spans of their own.
+"""
+
+import contextvars
+import functools
+import logging
+import secrets
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """A finished span, shaped like an OpenTelemetry ``ReadableSpan``."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str]
+    start_time_unix_nano: int
+    end_time_unix_nano: int
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: Literal["OK", "ERROR"] = "OK"
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds."""
+        return (self.end_time_unix_nano - self.start_time_unix_nano) / 1e9
+
+
+Tracer = Callable[[Span], None]
+
+
+@dataclass
+class SearchStats:
+    """What one search did and where its time went; times are in seconds."""
+
+    # "vector", "keyword", "hybrid" or "grep"
+    mode: str = "vector"
+    # How the vector search was answered: "exact", "graph" or "sharded"
+    path: Optional[str] = None
+    exact_threshold: Optional[int] = None
+    server_time: float = 0.0
+    embedding_time: float = 0.0
+    search_time: float = 0.0
+    fetch_time: float = 0.0
+    rerank_time: float = 0.0
+    total_time: float = 0.0
+    zmq_round_trips: Optional[int] = None
+    nodes_visited: Optional[int] = None
+    nodes_recomputed: Optional[int] = None
+    passages_scored: Optional[int] = None
+    passages_fetched: int = 0
+    filtered_out: int = 0
+    cache_hits: Optional[int] = None
+    # Raw counters reported by the backend under "stats"
+    backend: dict[str, Any] = field(default_factory=dict)
+    shards: list["SearchStats"] = field(default_factory=list)
+
+    @property
+    def filter_drop_rate(self) -> float:
+        """Share of fetched passages removed by metadata filters."""
+        return self.filtered_out / self.passages_fetched if self.passages_fetched else 0.0
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Add ``n`` to an optional counter, turning ``None`` into a count."""
+        setattr(self, name, (getattr(self, name) or 0) + n)
+
+    def add_backend_counters(self, counters: Mapping[str, Any]) -> None:
+        """Keep a backend's ``"stats"`` and pick out the counters it shares with others.
+
+        Backends report ``hops``, ``zmq_requests``, ``nodes_recomputed`` and
+        ``cache_hits`` when they can observe them.
+        """
+        self.backend.update(counters)
+        for key, name in (
+            ("hops", "nodes_visited"),
+            ("zmq_requests", "zmq_round_trips"),
+            ("nodes_recomputed", "nodes_recomputed"),
+            ("cache_hits", "cache_hits"),
+        ):
+            if key in counters:
+                self.count(name, int(counters[key]))
+
+    def add_shards(self, shards: list["SearchStats"]) -> None:
+        """Record the stats of each shard and sum their counters into this search."""
+        self.shards = shards
+        for shard in shards:
+            self.passages_fetched += shard.passages_fetched
+            self.filtered_out += shard.filtered_out
+            for name in ("zmq_round_trips", "nodes_visited", "nodes_recomputed", "cache_hits"):
+                if getattr(shard, name) is not None:
+                    self.count(name, getattr(shard, name))
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        backend = data.pop("backend")
+        data["shards"] = [shard.to_dict() for shard in self.shards]
+        data["filter_drop_rate"] = self.filter_drop_rate
+        # Backend counters stay top-level keys, as before SearchStats existed
+        return {**backend, **data}
+
+
+class SearchTrace:
+    """Times the phases of one search into a :class:`SearchStats` and emits spans."""
+
+    def __init__(
+        self,
+        owner: Any,
+        tracer: Optional[Tracer] = None,
+        parent: Optional["SearchTrace"] = None,
+        attributes: Optional[dict[str, Any]] = None,
+    ):
+        self.owner = owner
+        self.tracer = tracer
+        self.stats = SearchStats()
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes = attributes or {}
+        self._start = time.time_ns()
+
+    def _emit(self, span: Span) -> None:
+        if self.tracer is None:
+            return
+        try:
+            self.tracer(span)
+        except Exception as e:
+            # A broken tracer must never fail the search it observes
+            logger.warning(f"Search tracer raised: {e}")
+
+    @contextmanager
+    def phase(self, name: str, stat: Optional[str] = None, **attributes) -> Iterator[None]:
+        """Time a phase, add it to ``stats.<stat>`` and report it as a child span."""
+        start = time.time_ns()
+        status: Literal["OK", "ERROR"] = "OK"
+        try:
+            yield
+        except BaseException:
+            status = "ERROR"
+            raise
+        finally:
+            end = time.time_ns()
+            if stat is not None:
+                setattr(self.stats, stat, getattr(self.stats, stat) + (end - start) / 1e9)
+            self._emit(
+                Span(
+                    name,
+                    self.trace_id,
+                    secrets.token_hex(8),
+                    self.span_id,
+                    start,
+                    end,
+                    attributes,
+                    status,
+                )
+            )
+
+    def finish(self, error: bool = False) -> SearchStats:
+        end = time.time_ns()
+        stats = self.stats
+        stats.total_time = (end - self._start) / 1e9
+        attributes = dict(self.attributes)
+        for key, value in stats.to_dict().items():
+            # OpenTelemetry attribute values are primitives
+            if isinstance(value, (str, bool, int, float)):
+                attributes[f"leann.{key}"] = value
+        self._emit(
+            Span(
+                "leann.search",
+                self.trace_id,
+                self.span_id,
+                self.parent_span_id,
+                self._start,
+                end,
+                attributes,
+                "ERROR" if error else "OK",
+            )
+        )
+        return stats
+
+
+_active_trace: contextvars.ContextVar[Optional[SearchTrace]] = contextvars.ContextVar(
+    "leann_search_trace", default=None
+)
+
+
+def active_stats() -> SearchStats:
+    """Stats of the search running in this context (a throwaway one outside searches)."""
+    trace = _active_trace.get()
+    return trace.stats if trace is not None else SearchStats()
+
+
+def search_phase(name: str, stat: Optional[str] = None, **attributes):
+    """:meth:`SearchTrace.phase` of the running search; a no-op outside searches."""
+    trace = _active_trace.get()
+    if trace is None:
+        return _no_phase()
+    return trace.phase(name, stat, **attributes)
+
+
+@contextmanager
+def _no_phase() -> Iterator[None]:
+    yield
+
+
+def _begin(searcher: Any) -> tuple[Optional[SearchTrace], Optional[contextvars.Token]]:
+    """Start a trace for ``searcher`` unless this is a nested call on the same searcher."""
+    parent = _active_trace.get()
+    if parent is not None and parent.owner is searcher:
+        return None, None
+    trace = SearchTrace(
+        searcher,
+        getattr(searcher, "tracer", None) or (parent.tracer if parent else None),
+        parent,
+        {"leann.index": str(getattr(searcher, "index_path", ""))},
+    )
+    return trace, _active_trace.set(trace)
+
+
+def _end(searcher: Any, trace: SearchTrace, token: contextvars.Token, error: bool) -> SearchStats:
+    _active_trace.reset(token)
+    stats = trace.finish(error)
+    searcher.last_stats = stats
+    searcher.last_search_stats = stats.to_dict()
+    return stats
+
+
+def traced_search(search: Callable) -> Callable:
+    """Run ``LeannSearcher.search`` inside a trace and honour ``return_stats``.
+
+    Nested calls on the same searcher (rerank and hybrid search recurse) add to the
+    running trace instead of starting a new one.
+    """
+
+    @functools.wraps(search)
+    def wrapper(self, *args, return_stats: bool = False, **kwargs):
+        trace, token = _begin(self)
+        if trace is None:
+            return search(self, *args, **kwargs)
+        try:
+            results = search(self, *args, **kwargs)
+        except BaseException:
+            _end(self, trace, token, error=True)
+            raise
+        stats = _end(self, trace, token, error=False)
+        return (results, stats) if return_stats else results
+
+    return wrapper
+
+
+def traced_async_search(search: Callable) -> Callable:
+    """:func:`traced_search` for ``AsyncLeannSearcher.search``; stats land on its searcher."""
+
+    @functools.wraps(search)
+    async def wrapper(self, *args, return_stats: bool = False, **kwargs):
+        trace, token = _begin(self.searcher)
+        if trace is None:
+            return await search(self, *args, **kwargs)
+        try:
+            results = await search(self, *args, **kwargs)
+        except BaseException:
+            _end(self.searcher, trace, token, error=True)
+            raise
+        stats = _end(self.searcher, trace, token, error=False)
+        return (results, stats) if return_stats else results
+
+    return wrapper
@@ -0,0 +1,135 @@
+"""
+Clients for the msgpack-over-ZMQ protocol spoken by LEANN embedding servers.
+
+Both clients keep their sockets open between requests and share the process-wide
+ZMQ context, so a search no longer pays for creating and tearing down a context
+per embedding call. A REQ socket that times out is stuck waiting for a reply it
+will never get; such sockets are discarded and the next request reconnects.
+"""
+
+import asyncio
+import threading
+from typing import Any, Optional
+
+import msgpack
+import zmq
+
+DEFAULT_TIMEOUT_MS = 30000
+
+
+def _endpoint(port: int) -> str:
+    return f"tcp://localhost:{port}"
+
+
+class EmbeddingServerClient:
+    """Blocking client holding one persistent REQ socket to an embedding server.
+
+    Calls are serialized with a lock, so one client can be shared between threads.
+    """
+
+    def __init__(self, port: int, timeout_ms: int = DEFAULT_TIMEOUT_MS):
+        self.port = port
+        self.timeout_ms = timeout_ms
+        self._socket: Optional[zmq.Socket] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> zmq.Socket:
+        socket = zmq.Context.instance().socket(zmq.REQ)
+        socket.setsockopt(zmq.RCVTIMEO, self.timeout_ms)
+        socket.setsockopt(zmq.SNDTIMEO, self.timeout_ms)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.connect(_endpoint(self.port))
+        return socket
+
+    def request(self, payload: Any) -> Any:
+        """Send one msgpack request and return the decoded reply."""
+        with self._lock:
+            if self._socket is None:
+                self._socket = self._connect()
+            try:
+                self._socket.send(msgpack.packb(payload))
+                return msgpack.unpackb(self._socket.recv())
+            except Exception:
+                self._discard()
+                raise
+
+    def _discard(self) -> None:
+        if self._socket is not None:
+            try:
+                self._socket.close(0)
+            except Exception:
+                pass
+            self._socket = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._discard()
+
+
+class AsyncEmbeddingServerClient:
+    """``zmq.asyncio`` client with a small pool of REQ sockets to one server.
+
+    A REQ socket carries one request at a time, so concurrent coroutines each
+    borrow their own socket; at most ``max_sockets`` requests are in flight and
+    the rest wait without blocking the event loop. Use from a single event loop.
+    """
+
+    def __init__(self, port: int, timeout_ms: int = DEFAULT_TIMEOUT_MS, max_sockets: int = 4):
+        self.port = port
+        self.timeout_ms = timeout_ms
+        self.max_sockets = max_sockets
+        self._idle: list[Any] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _connect(self) -> Any:
+        import zmq.asyncio
+
+        socket = zmq.asyncio.Context.instance().socket(zmq.REQ)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.connect(_endpoint(self.port))
+        return socket
+
+    async def request(self, payload: Any) -> Any:
+        """Send one msgpack request and await the decoded reply.
+
+        Raises:
+            TimeoutError: If the server does not answer within ``timeout_ms``.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_sockets)
+        async with self._slots:
+            socket = self._idle.pop() if self._idle else self._connect()
+            try:
+                await socket.send(msgpack.packb(payload))
+                if not await socket.poll(self.timeout_ms, zmq.POLLIN):
+                    raise TimeoutError(
+                        f"Embedding server on port {self.port} did not reply within "
+                        f"{self.timeout_ms} ms"
+                    )
+                reply = await socket.recv()
+            except BaseException:
+                socket.close(0)
+                raise
+            self._idle.append(socket)
+        return msgpack.unpackb(reply)
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop().close(0)
+
+
+def fetch_server_stats(port: int, timeout_ms: int = 1000) -> Optional[dict[str, Any]]:
+    """Metrics of the embedding server on ``port`` (see ``EmbeddingServerMetrics``).
+
+    Returns ``None`` if nothing answers in time or the server predates ``__STATS__``.
+    """
+    from .metrics import STATS_MESSAGE
+
+    client = EmbeddingServerClient(port, timeout_ms=timeout_ms)
+    try:
+        reply = client.request([STATS_MESSAGE])
+    except Exception:
+        return None
+    finally:
+        client.close()
+    return reply if isinstance(reply, dict) else None
@@ -0,0 +1,397 @@
+"""
+Pre-forked embedding servers ("zygote" mode).
+
+A cold embedding server pays for a new interpreter, the torch import and the
+model load before it binds its port, which dominates one-off CLI searches.
+``leann zygote start`` runs one long-lived process that pays those costs once:
+it imports the backend server modules, loads the requested models on the CPU
+and then waits on a user-private IPC socket. Every ``spawn`` request forks a
+child that runs the server's ``__main__`` with the usual command line, sharing
+the already loaded weights copy-on-write.
+
+:class:`~leann.embedding_server_manager.EmbeddingServerManager` asks the zygote
+first whenever one is running and falls back to ``python -m <server>``
+otherwise; ``LEANN_EMBEDDING_ZYGOTE=0`` turns that off. CUDA state cannot be
+carried across ``fork()``, so forked servers always embed on the CPU, and local
+models are not forked at all while a GPU is visible (see :func:`gpu_visible`).
+"""
+
+import argparse
+import logging
+import os
+import runpy
+import signal
+import subprocess
+import sys
+import time
+import traceback
+from collections.abc import Mapping, Sequence
+from contextlib import suppress
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import msgpack
+import psutil
+import zmq
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERVER_MODULES = (
+    "leann_backend_hnsw.hnsw_embedding_server",
+    "leann_backend_diskann.diskann_embedding_server",
+)
+# What the servers import lazily once they start; torch comes with embedding_compute
+RUNTIME_MODULES = ("leann.api", "leann.embedding_compute", "leann.id_map", "leann.metrics")
+# A fork answers in milliseconds; anything slower means the zygote is wedged
+SPAWN_TIMEOUT_MS = 2000
+
+SocketPath = Union[str, Path, None]
+
+
+def zygote_supported() -> bool:
+    """Forking a process that has loaded torch is only safe on Linux-like systems."""
+    return hasattr(os, "fork") and sys.platform != "darwin"
+
+
+def zygote_enabled() -> bool:
+    return zygote_supported() and os.getenv("LEANN_EMBEDDING_ZYGOTE", "1") != "0"
+
+
+def gpu_visible(env: Optional[Mapping[str, str]] = None) -> bool:
+    """Whether a server started with ``env`` would put a local model on a GPU.
+
+    Decided without importing torch: an empty ``CUDA_VISIBLE_DEVICES`` hides every
+    device, otherwise the NVIDIA driver has to be loaded. MPS needs macOS, where the
+    zygote is not supported in the first place.
+    """
+    env = os.environ if env is None else env
+    if env.get("CUDA_VISIBLE_DEVICES", "unset").strip() in ("", "-1"):
+        return False
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        return bool(torch.cuda.is_available())
+    return Path("/proc/driver/nvidia/version").exists()
+
+
+def zygote_socket_path(socket_path: SocketPath = None) -> Path:
+    """``socket_path``, else ``LEANN_ZYGOTE_SOCKET``, else ``~/.leann/zygote.ipc``."""
+    if socket_path:
+        return Path(socket_path)
+    return Path(os.getenv("LEANN_ZYGOTE_SOCKET") or Path.home() / ".leann" / "zygote.ipc")
+
+
+def _pid_file(path: Path) -> Path:
+    return path.with_name(f"{path.name}.pid")
+
+
+def _zygote_pid(path: Path) -> Optional[int]:
+    """PID of the zygote serving ``path``, or None when there is none (or a stale socket)."""
+    try:
+        pid = int(_pid_file(path).read_text().strip())
+    except (OSError, ValueError):
+        return None
+    return pid if path.exists() and psutil.pid_exists(pid) else None
+
+
+def _request(
+    message: dict[str, Any], socket_path: SocketPath = None, timeout_ms: int = SPAWN_TIMEOUT_MS
+) -> Optional[dict[str, Any]]:
+    path = zygote_socket_path(socket_path)
+    if _zygote_pid(path) is None:
+        return None
+    socket = zmq.Context.instance().socket(zmq.REQ)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.setsockopt(zmq.RCVTIMEO, timeout_ms)
+    socket.setsockopt(zmq.SNDTIMEO, timeout_ms)
+    try:
+        socket.connect(f"ipc://{path}")
+        socket.send(msgpack.packb(message, use_bin_type=True))
+        return msgpack.unpackb(socket.recv(), raw=False)
+    except zmq.ZMQError as e:
+        logger.debug(f"Zygote at {path} did not answer: {e}")
+        return None
+    finally:
+        socket.close()
+
+
+def spawn_server(
+    module: str,
+    argv: Sequence[str],
+    env: Optional[dict[str, str]] = None,
+    cwd: Optional[str] = None,
+    socket_path: SocketPath = None,
+) -> Optional[int]:
+    """Have the zygote fork ``python -m module *argv``; returns the server PID or None."""
+    reply = _request(
+        {"op": "spawn", "module": module, "argv": list(argv), "env": env, "cwd": cwd},
+        socket_path,
+    )
+    if reply is None:
+        return None
+    if "error" in reply:
+        logger.warning(f"Zygote could not start {module}: {reply['error']}")
+        return None
+    return reply["pid"]
+
+
+def zygote_status(socket_path: SocketPath = None) -> Optional[dict[str, Any]]:
+    return _request({"op": "status"}, socket_path, timeout_ms=1000)
+
+
+def stop_zygote(socket_path: SocketPath = None) -> bool:
+    return _request({"op": "shutdown"}, socket_path, timeout_ms=5000) is not None
+
+
+def start_zygote(
+    models: Sequence[str] = (),
+    embedding_mode: str = "sentence-transformers",
+    socket_path: SocketPath = None,
+    log_file: Optional[str] = None,
+    timeout: float = 600,
+) -> dict[str, Any]:
+    """
+    Start a detached zygote and wait until it answers (model loading can take a while).
+
+    Returns the zygote's status; raises RuntimeError if it exits or never answers.
+    """
+    if not zygote_supported():
+        raise RuntimeError("The embedding server zygote needs os.fork() on Linux")
+    path = zygote_socket_path(socket_path)
+    status = zygote_status(path)
+    if status is not None:
+        return status
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    log_path = Path(log_file) if log_file else path.with_suffix(".log")
+    command = [
+        sys.executable,
+        "-m",
+        "leann.zygote",
+        "--socket",
+        str(path),
+        "--mode",
+        embedding_mode,
+    ]
+    if models:
+        command += ["--models", *models]
+    with open(log_path, "ab") as log:
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = zygote_status(path)
+        if status is not None:
+            return status
+        if process.poll() is not None:
+            raise RuntimeError(f"Zygote exited during start-up; see {log_path}")
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"Zygote did not come up within {timeout:.0f}s; see {log_path}")
+
+
+class ForkedServerProcess:
+    """
+    ``subprocess.Popen``-like handle for a server forked by the zygote.
+
+    The server is the zygote's child, not ours, so it is watched through psutil
+    and its exit status is not visible (``returncode`` is 0 once it is gone).
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.returncode: Optional[int] = None
+        self._process = psutil.Process(pid)
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is None:
+            try:
+                running = (
+                    self._process.is_running() and self._process.status() != psutil.STATUS_ZOMBIE
+                )
+            except psutil.NoSuchProcess:
+                running = False
+            if not running:
+                self.returncode = 0
+        return self.returncode
+
+    def terminate(self) -> None:
+        with suppress(psutil.NoSuchProcess):
+            self._process.terminate()
+
+    def kill(self) -> None:
+        with suppress(psutil.NoSuchProcess):
+            self._process.kill()
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        try:
+            self._process.wait(timeout)
+        except psutil.TimeoutExpired:
+            raise subprocess.TimeoutExpired(f"pid {self.pid}", timeout) from None
+        except psutil.NoSuchProcess:
+            pass
+        self.returncode = 0
+        return self.returncode
+
+
+class Zygote:
+    """The long-lived parent: preloads, then forks one server per ``spawn`` request."""
+
+    def __init__(
+        self,
+        socket_path: SocketPath = None,
+        models: Sequence[str] = (),
+        embedding_mode: str = "sentence-transformers",
+        server_modules: Sequence[str] = DEFAULT_SERVER_MODULES,
+    ):
+        self.socket_path = zygote_socket_path(socket_path)
+        self.models = list(models)
+        self.embedding_mode = embedding_mode
+        self.server_modules = list(server_modules)
+        self.loaded_models: list[str] = []
+        self.spawned = 0
+        self.started = time.time()
+
+    def preload(self) -> None:
+        for module in [*RUNTIME_MODULES, *self.server_modules]:
+            try:
+                import_module(module)
+            except ImportError as e:
+                logger.info(f"Not preloading {module}: {e}")
+        for model in self.models:
+            self._preload_model(model)
+
+    def _preload_model(self, model_name: str) -> None:
+        if self.embedding_mode != "sentence-transformers":
+            # API and Ollama providers hold no local weights; MLX is macOS-only
+            logger.info(f"Nothing to preload for {self.embedding_mode} model {model_name}")
+            return
+        import torch
+
+        from .embedding_compute import compute_embeddings
+
+        # Warm up single-threaded: an OpenMP pool started here would not survive fork()
+        threads = torch.get_num_threads()
+        torch.set_num_threads(1)
+        try:
+            compute_embeddings(["warmup"], model_name, mode=self.embedding_mode)
+        finally:
+            torch.set_num_threads(threads)
+        self.loaded_models.append(model_name)
+        logger.info(f"Preloaded {model_name}")
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "socket": str(self.socket_path),
+            "embedding_mode": self.embedding_mode,
+            "models": self.loaded_models,
+            "spawned": self.spawned,
+            "uptime_seconds": time.time() - self.started,
+        }
+
+    def serve(self) -> None:
+        # Forked servers are reaped automatically instead of lingering as zombies
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        context = zmq.Context()
+        socket = context.socket(zmq.REP)
+        socket.setsockopt(zmq.LINGER, 0)
+        previous_umask = os.umask(0o077)
+        try:
+            socket.bind(f"ipc://{self.socket_path}")
+        finally:
+            os.umask(previous_umask)
+        _pid_file(self.socket_path).write_text(str(os.getpid()))
+        logger.info(f"Zygote {os.getpid()} listening on {self.socket_path}")
+        try:
+            while True:
+                request = msgpack.unpackb(socket.recv(), raw=False)
+                op = request.get("op")
+                if op == "shutdown":
+                    socket.send(msgpack.packb({"ok": True}))
+                    break
+                if op == "spawn":
+                    reply = self._spawn(request)
+                elif op == "status":
+                    reply = self.status()
+                else:
+                    reply = {"error": f"unknown op {op!r}"}
+                socket.send(msgpack.packb(reply, use_bin_type=True))
+        finally:
+            socket.close()
+            context.term()
+            with suppress(OSError):
+                self.socket_path.unlink()
+            with suppress(OSError):
+                _pid_file(self.socket_path).unlink()
+
+    def _spawn(self, request: dict[str, Any]) -> dict[str, Any]:
+        try:
+            pid = os.fork()
+        except OSError as e:
+            return {"error": str(e)}
+        if pid == 0:
+            _run_server(request)
+        self.spawned += 1
+        logger.info(f"Forked {request['module']} as {pid}")
+        return {"pid": pid}
+
+
+def _run_server(request: dict[str, Any]) -> None:
+    """Body of a forked child: become ``python -m module *argv``. Never returns."""
+    code = 1
+    try:
+        for signum in (signal.SIGCHLD, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, signal.SIG_DFL)
+        os.setsid()
+        if request.get("env") is not None:
+            os.environ.clear()
+            os.environ.update(request["env"])
+        os.environ["CUDA_VISIBLE_DEVICES"] = ""
+        if request.get("cwd"):
+            os.chdir(request["cwd"])
+        sys.argv = [request["module"], *request["argv"]]
+        runpy.run_module(request["module"], run_name="__main__", alter_sys=True)
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else int(e.code is not None)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        with suppress(Exception):
+            sys.stdout.flush()
+            sys.stderr.flush()
+        # Skip the zygote's atexit handlers and inherited sockets
+        os._exit(code)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="LEANN embedding server zygote")
+    parser.add_argument("--socket", default=None, help="IPC socket path")
+    parser.add_argument("--models", nargs="*", default=[], help="Embedding models to preload")
+    parser.add_argument("--mode", default="sentence-transformers", help="Embedding mode")
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=getattr(logging, os.getenv("LEANN_LOG_LEVEL", "INFO").upper(), logging.INFO),
+        format="%(asctime)s %(levelname)s - %(name)s - %(message)s",
+    )
+    if not zygote_supported():
+        parser.error("the embedding server zygote needs os.fork() on Linux")
+
+    # Set before torch is imported so neither the zygote nor its children touch CUDA
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    zygote = Zygote(args.socket, args.models, args.mode)
+    zygote.preload()
+    zygote.serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Shared fakes for tests that build and search indexes without a model or a compiled backend.
+"""
+
+import json
+import pickle
+import zlib
+
+import numpy as np
+import pytest
+from leann import api
+from leann.registry import BACKEND_REGISTRY
+
+
+def deterministic_embeddings(chunks, *args, **kwargs):
+    """Deterministic 8-d embedding per text, a drop-in for ``compute_embeddings``."""
+    rows = [np.random.default_rng(zlib.crc32(t.encode("utf-8"))).normal(size=8) for t in chunks]
+    return np.array(rows, dtype=np.float32)
+
+
+class FakeServerManager:
+    """Embedding server manager stand-in that records which meta.json each start was for."""
+
+    def __init__(self):
+        self.started: list[str] = []
+
+    def start_server(self, passages_file, port=5557, **kwargs):
+        if passages_file not in self.started:
+            self.started.append(passages_file)
+        return port
+
+    def stop_server(self):
+        pass
+
+
+class FakeBackend:
+    """
+    Graph backend stand-in, registered as both builder and searcher.
+
+    ``build`` keeps the vectors and ``search`` scores them exhaustively. Server
+    ports, query embeddings and searched queries are recorded on the class, which
+    the ``fake_backend`` fixture creates afresh for every registration.
+    """
+
+    built: dict[str, tuple[np.ndarray, list[str]]]
+    server_ports: list[int]
+    searched: list[np.ndarray]
+    query_embeddings: int
+    server_manager_class = FakeServerManager
+
+    def __init__(self, index_path=None, **kwargs):
+        self.index_path = index_path
+        self.embedding_server_manager = self.server_manager_class()
+
+    def build(self, data, ids, index_path, **kwargs):
+        type(self).built[index_path] = (data, list(ids))
+
+    def _ensure_server_running(self, passages_file, port=5557, **kwargs):
+        type(self).server_ports.append(port)
+        return self.embedding_server_manager.start_server(passages_file, port)
+
+    def _compute_embedding_via_server(self, texts, port):
+        return deterministic_embeddings(texts)
+
+    def compute_query_embedding(self, query, use_server_if_available=True, **kwargs):
+        assert not use_server_if_available or type(self).server_ports, "server not started"
+        type(self).query_embeddings += 1
+        return deterministic_embeddings([query])
+
+    def search(self, query, top_k, **kwargs):
+        type(self).searched.append(query)
+        vectors, ids = type(self).built[self.index_path]
+        scores = vectors @ query[0]
+        best = np.argsort(-scores)[:top_k]
+        return {"labels": [[ids[i] for i in best]], "distances": [scores[best].tolist()]}
+
+
+@pytest.fixture
+def fake_embeddings(monkeypatch):
+    """Replace the embedding model with ``deterministic_embeddings``; returns it."""
+    monkeypatch.setattr(api, "compute_embeddings", deterministic_embeddings)
+    return deterministic_embeddings
+
+
+@pytest.fixture
+def fake_backend(monkeypatch, fake_embeddings):
+    """
+    Register a fresh ``FakeBackend`` subclass under a backend name and return it.
+
+    Keyword arguments override class attributes, e.g. ``search=`` with a function
+    taking ``(self, query, top_k, **kwargs)``.
+    """
+
+    def _register(name, **overrides):
+        attrs = {"built": {}, "server_ports": [], "searched": [], "query_embeddings": 0}
+        backend = type("FakeBackend", (FakeBackend,), {**attrs, **overrides})
+
+        class Factory:
+            builder = backend
+            searcher = backend
+
+        monkeypatch.setitem(BACKEND_REGISTRY, name, Factory)
+        return backend
+
+    return _register
+
+
+@pytest.fixture
+def write_index(tmp_path, monkeypatch):
+    """
+    Write passages and meta.json for an index served by an existing searcher object.
+
+    For tests that need a fixed semantic ranking rather than a built graph: every
+    ``LeannSearcher`` opened on the returned path gets ``backend`` as its backend.
+    """
+
+    def _write(name, backend, passages, dimensions=4):
+        class Factory:
+            @staticmethod
+            def searcher(index_path, **kwargs):
+                return backend
+
+        monkeypatch.setitem(BACKEND_REGISTRY, f"fake-{name}", Factory)
+        offsets = {}
+        with open(tmp_path / f"{name}.leann.passages.jsonl", "w", encoding="utf-8") as f:
+            for pid, text, metadata in passages:
+                offsets[pid] = f.tell()
+                f.write(json.dumps({"id": pid, "text": text, "metadata": metadata}) + "\n")
+        with open(tmp_path / f"{name}.leann.passages.idx", "wb") as f:
+            pickle.dump(offsets, f)
+        meta = {
+            "backend_name": f"fake-{name}",
+            "embedding_model": "fake-model",
+            "dimensions": dimensions,
+            "passage_sources": [
+                {
+                    "type": "jsonl",
+                    "path": f"{name}.leann.passages.jsonl",
+                    "index_path": f"{name}.leann.passages.idx",
+                }
+            ],
+        }
+        (tmp_path / f"{name}.leann.meta.json").write_text(json.dumps(meta))
+        return str(tmp_path / f"{name}.leann")
+
+    return _write
@@ -0,0 +1,249 @@
+"""
+Tests for the persistent ZMQ embedding clients and AsyncLeannSearcher, using an
+in-process fake embedding server and a fake backend.
+"""
+
+import asyncio
+import threading
+import time
+
+import msgpack
+import numpy as np
+import pytest
+import zmq
+from leann.api import AsyncLeannSearcher, LeannSearcher
+from leann.zmq_client import AsyncEmbeddingServerClient, EmbeddingServerClient
+
+DIM = 4
+
+
+class FakeEmbeddingServer:
+    """REP server answering text batches with deterministic embeddings."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = 0
+        self.peers = set()
+        self._ctx = zmq.Context()
+        self._socket = self._ctx.socket(zmq.ROUTER)
+        self.port = self._socket.bind_to_random_port("tcp://127.0.0.1")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        poller = zmq.Poller()
+        poller.register(self._socket, zmq.POLLIN)
+        pending = []
+        while not self._stop.is_set():
+            if poller.poll(10):
+                identity, empty, body = self._socket.recv_multipart()
+                self.peers.add(identity)
+                pending.append((time.time() + self.delay, identity, empty, body))
+            now = time.time()
+            for item in [p for p in pending if p[0] <= now]:
+                pending.remove(item)
+                _, identity, empty, body = item
+                texts = msgpack.unpackb(body)
+                self.requests += 1
+                reply = [[float(len(t)), 1.0, 0.0, 0.0] for t in texts]
+                self._socket.send_multipart([identity, empty, msgpack.packb(reply)])
+        self._socket.close(0)
+        self._ctx.term()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+
+@pytest.fixture
+def server():
+    srv = FakeEmbeddingServer()
+    yield srv
+    srv.close()
+
+
+def test_sync_client_reuses_one_socket(server):
+    client = EmbeddingServerClient(server.port)
+    for text in ("a", "bb", "ccc"):
+        assert client.request([text]) == [[float(len(text)), 1.0, 0.0, 0.0]]
+    assert server.requests == 3
+    assert len(server.peers) == 1
+    client.close()
+
+
+def test_sync_client_reconnects_after_timeout():
+    srv = FakeEmbeddingServer(delay=0.5)
+    try:
+        client = EmbeddingServerClient(srv.port, timeout_ms=100)
+        with pytest.raises(zmq.Again):
+            client.request(["slow"])
+        # The stuck REQ socket was dropped, so a new request can be sent
+        srv.delay = 0.0
+        time.sleep(0.6)
+        assert client.request(["ok"]) == [[2.0, 1.0, 0.0, 0.0]]
+        client.close()
+    finally:
+        srv.close()
+
+
+def test_async_client_pools_sockets_for_concurrent_requests():
+    srv = FakeEmbeddingServer(delay=0.2)
+    try:
+        client = AsyncEmbeddingServerClient(srv.port, max_sockets=4)
+
+        async def burst():
+            return await asyncio.gather(*[client.request([f"q{i}"]) for i in range(8)])
+
+        start = time.time()
+        replies = asyncio.run(burst())
+        elapsed = time.time() - start
+        assert [r[0][0] for r in replies] == [2.0] * 8
+        # 8 requests over 4 sockets take about two server delays, not eight
+        assert elapsed < 1.2
+        assert len(srv.peers) == 4
+        client.close()
+    finally:
+        srv.close()
+
+
+def test_async_client_times_out():
+    srv = FakeEmbeddingServer(delay=1.0)
+    try:
+        client = AsyncEmbeddingServerClient(srv.port, timeout_ms=100)
+        with pytest.raises(TimeoutError):
+            asyncio.run(client.request(["slow"]))
+        client.close()
+    finally:
+        srv.close()
+
+
+class FakeBackendSearcher:
+    def __init__(self, port):
+        self.port = port
+        self.search_calls = []
+        self.direct_embeddings = 0
+
+    def _ensure_server_running(self, meta_path, port, **kwargs):
+        return self.port
+
+    def compute_query_embedding(self, query, use_server_if_available=True, **kwargs):
+        self.direct_embeddings += 1
+        return np.zeros((1, DIM), dtype=np.float32)
+
+    def search(self, query, top_k, **kwargs):
+        self.search_calls.append((query.copy(), kwargs))
+        labels = [str(i) for i in range(top_k)]
+        return {"labels": [labels], "distances": [[float(query[0, 0])] * top_k]}
+
+
+@pytest.fixture
+def fake_index(write_index, server):
+    backend = FakeBackendSearcher(server.port)
+
+    passages = [(str(i), f"passage {i}", {"n": i}) for i in range(5)]
+    index_path = write_index("async", backend, passages, dimensions=DIM)
+    return index_path, backend
+
+
+def test_async_searcher_matches_sync_results(fake_index, server):
+    index_path, backend = fake_index
+    searcher = LeannSearcher(index_path)
+
+    async def run():
+        async with AsyncLeannSearcher(searcher=searcher) as async_searcher:
+            return await asyncio.gather(
+                *[async_searcher.search("hello", top_k=3) for _ in range(5)]
+            )
+
+    batches = asyncio.run(run())
+    assert server.requests == 5
+    assert backend.direct_embeddings == 0
+    for results in batches:
+        assert [r.text for r in results] == ["passage 0", "passage 1", "passage 2"]
+        # The fake server embeds "hello" as [5, 1, 0, 0]; the fake backend echoes dim 0
+        assert results[0].score == 5.0
+    assert backend.search_calls[0][1]["zmq_port"] == server.port
+
+
+def test_async_searcher_applies_filters_and_template(fake_index):
+    index_path, backend = fake_index
+
+    async def run():
+        async with AsyncLeannSearcher(index_path) as async_searcher:
+            return await async_searcher.search(
+                "hi",
+                top_k=10,
+                metadata_filters={"n": {">=": 3}},
+                provider_options={"prompt_template": "query: "},
+            )
+
+    results = asyncio.run(run())
+    assert [r.id for r in results] == ["3", "4"]
+    assert results[0].score == float(len("query: hi"))
+
+
+def test_async_searcher_falls_back_without_server(fake_index):
+    index_path, backend = fake_index
+
+    async def run():
+        async with AsyncLeannSearcher(index_path) as async_searcher:
+            return await async_searcher.search("hi", top_k=2, recompute_embeddings=False)
+
+    results = asyncio.run(run())
+    assert backend.direct_embeddings == 1
+    assert len(results) == 2
+
+
+def test_async_searcher_serializes_backend_searches(fake_index):
+    index_path, backend = fake_index
+    active, peak = 0, 0
+    plain_search = backend.search
+
+    def slow_search(query, top_k, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        time.sleep(0.05)
+        active -= 1
+        return plain_search(query, top_k, **kwargs)
+
+    backend.search = slow_search
+
+    async def run():
+        async with AsyncLeannSearcher(index_path, max_concurrency=4) as async_searcher:
+            return await asyncio.gather(
+                *[async_searcher.search(f"q{i}", top_k=2) for i in range(6)]
+            )
+
+    assert all(len(results) == 2 for results in asyncio.run(run()))
+    assert len(backend.search_calls) == 6
+    assert peak == 1
+
+
+def test_async_searcher_rejects_unknown_search_mode(fake_index):
+    index_path, backend = fake_index
+    searcher = LeannSearcher(index_path)
+
+    async def run():
+        async with AsyncLeannSearcher(searcher=searcher) as async_searcher:
+            return await async_searcher.search("hi", search_mode="semantic")
+
+    with pytest.raises(ValueError, match="Unknown search_mode 'semantic'"):
+        searcher.search("hi", search_mode="semantic")
+    with pytest.raises(ValueError, match="Unknown search_mode 'semantic'"):
+        asyncio.run(run())
+    assert backend.search_calls == []
+
+
+def test_async_searcher_uses_precomputed_query_embedding(fake_index, server):
+    index_path, backend = fake_index
+    embedding = np.array([[7.0, 0.0, 0.0, 0.0]], dtype=np.float32)
+
+    async def run():
+        async with AsyncLeannSearcher(index_path) as async_searcher:
+            return await async_searcher.search("hi", top_k=2, query_embedding=embedding)
+
+    results = asyncio.run(run())
+    assert server.requests == 0 and backend.direct_embeddings == 0
+    assert [r.score for r in results] == [7.0, 7.0]
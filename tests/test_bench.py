@@ -0,0 +1,84 @@
+"""
+Tests for the `leann bench` benchmark suite.
+"""
+
+import json
+
+import numpy as np
+import pytest
+from leann.bench import latency_summary, load_corpus, run_benchmark, synthetic_corpus
+from leann.cli import LeannCLI, format_bench_report
+
+TOP_K = 5
+
+
+def lossy_search(self, query, top_k, **kwargs):
+    """Scores every passage like the exact path, then drops the best hit so recall is known."""
+    data, ids = type(self).built[self.index_path]
+    data = data.astype(np.float16).astype(np.float32)
+    order = np.argsort(-(data @ query[0]))[1 : top_k + 1]
+    return {
+        "labels": [[ids[i] for i in order]],
+        "distances": [[float(data[i] @ query[0]) for i in order]],
+        "stats": {"hops": kwargs["complexity"], "nodes_recomputed": 2 * kwargs["complexity"]},
+    }
+
+
+@pytest.fixture
+def bench_backend(fake_backend):
+    fake_backend("fake-bench", search=lossy_search)
+
+
+def test_run_benchmark_reports_grid(bench_backend, tmp_path):
+    texts = synthetic_corpus(60)
+    queries = texts[:6]
+    report = run_benchmark(
+        texts,
+        queries,
+        backends=["fake-bench"],
+        work_dir=str(tmp_path),
+        complexities=[16, 32],
+        prune_ratios=[0.0, 0.5],
+        top_k=TOP_K,
+        clients=[1, 2],
+        embedding_model="fake",
+        # The fake backend has no embedding server to recompute through
+        recompute=False,
+    )
+    json.dumps(report)
+    assert report["corpus"] == {"source": "synthetic", "documents": 60, "queries": 6}
+
+    (result,) = report["results"]
+    assert result["backend"] == "fake-bench"
+    assert result["build"]["index_bytes"] > 0 and result["build"]["exact_embeddings_bytes"] > 0
+    grid = [(run["complexity"], run["prune_ratio"]) for run in result["runs"]]
+    assert grid == [(16, 0.0), (16, 0.5), (32, 0.0), (32, 0.5)]
+    for run in result["runs"]:
+        assert run[f"recall_at_{TOP_K}"] == pytest.approx((TOP_K - 1) / TOP_K)
+        assert run["latency_ms"]["p50"] <= run["latency_ms"]["p99"]
+        assert set(run["qps"]) == {"1", "2"} and all(q > 0 for q in run["qps"].values())
+        assert run["recompute"]["nodes_recomputed"] == 2 * run["complexity"]
+        assert run["recompute"]["zmq_round_trips"] is None
+
+    table = format_bench_report(report)
+    assert "fake-bench: built in" in table and f"R@{TOP_K}" in table
+
+
+def test_latency_summary_and_corpus_loading(tmp_path):
+    summary = latency_summary([i / 1000 for i in range(1, 101)])
+    assert summary["p50"] == pytest.approx(50.5) and summary["p99"] == pytest.approx(99.01)
+
+    (tmp_path / "a.jsonl").write_text('{"text": "first"}\n{"text": "second"}\n')
+    (tmp_path / "b.txt").write_text("third\n\nfourth\n")
+    assert load_corpus(str(tmp_path)) == ["first", "second", "third", "fourth"]
+    assert load_corpus(str(tmp_path), max_docs=3) == ["first", "second", "third"]
+    assert synthetic_corpus(5) == synthetic_corpus(5)
+
+
+def test_bench_cli_arguments():
+    parser = LeannCLI().create_parser()
+    args = parser.parse_args(
+        ["bench", "--docs", "200", "--complexity", "16", "64", "--clients", "8", "-o", "r.json"]
+    )
+    assert args.docs == 200 and args.complexity == [16, 64] and args.clients == [8]
+    assert args.backends == ["hnsw"] and args.recompute and args.output == "r.json"
@@ -59,6 +59,22 @@ class TestGetRegisteredBackends:
             result = api.get_registered_backends()
             assert set(result) == {"backend1", "backend2"}
 
+    def test_discovers_installed_backends(self, tmp_path, monkeypatch):
+        """Installed backends are listed without importing them first."""
+        (tmp_path / "leann_backend_discovered.py").write_text(
+            "from leann.registry import register_backend\n"
+            "@register_backend('discovered')\n"
+            "class DiscoveredFactory:\n"
+            "    pass\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.setattr(
+            registry, "discover_backend_modules", lambda: {"discovered": "leann_backend_discovered"}
+        )
+        with patch.dict(registry.BACKEND_REGISTRY, {}, clear=True):
+            assert api.get_registered_backends() == ["discovered"]
+        monkeypatch.delitem(sys.modules, "leann_backend_discovered")
+
 
 class TestComputeEmbeddings:
     """Test the compute_embeddings function."""
@@ -0,0 +1,124 @@
+"""
+Byte-for-byte compatibility of the vectorized HNSW -> CSR converter.
+
+The reference below is the per-node loop the converter used to run, writing
+through ``write_compact_format`` with Python lists. Like the two-stage tests,
+this needs the real ``leann_backend_hnsw`` package rather than the test mock.
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+convert_to_csr = pytest.importorskip("leann_backend_hnsw.convert_to_csr")
+pytest.importorskip("leann_backend_hnsw.two_stage")
+
+STORAGE_FOURCC = int.from_bytes(b"IxF2", "little")
+HEADER = {
+    "index_fourcc": convert_to_csr.INDEX_HNSW_FLAT_FOURCC,
+    "d": 8,
+    "dummy1": 0,
+    "dummy2": 0,
+    "is_trained": True,
+    "metric_type": 1,
+    "metric_arg": 0.0,
+    "entry_point": 0,
+    "max_level": 2,
+    "efConstruction": 40,
+    "efSearch": 16,
+    "dummy_upper_beam": 1,
+}
+
+
+def write_original_index(path, n, seed, gaps=False):
+    """Non-compact HNSW file with -1 padding, empty nodes and an embeddings section.
+
+    With ``gaps`` the nodes are not packed back to back, which forces the gather path.
+    """
+    rng = np.random.default_rng(seed)
+    cum = np.array([0, 8, 12, 16], dtype=np.int32)
+    levels = np.minimum(rng.geometric(0.7, n), 3).astype(np.int32)
+    levels[rng.integers(0, n, n // 10)] = 0
+    slots = cum[levels].astype(np.int64) + (rng.integers(0, 3, n) if gaps else 0)
+    offsets = np.zeros(n + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum(slots)
+    neighbors = rng.integers(0, n, int(offsets[-1])).astype(np.int32)
+    neighbors[rng.random(len(neighbors)) < 0.3] = -1
+
+    storage = rng.bytes(n * 32)
+
+    with open(path, "wb") as f:
+        convert_to_csr._write_index_header(
+            f, {**HEADER, "ntotal": n}, np.array([0.7, 0.2, 0.1]), cum, levels
+        )
+        f.write(b"\x00")  # The original layout is preceded by a "not compact" byte
+        convert_to_csr.write_numpy_vector(f, offsets, "Q")
+        convert_to_csr.write_numpy_vector(f, neighbors, "i")
+        convert_to_csr._write_scalar_params(f, HEADER)
+        f.write(struct.pack("<I", STORAGE_FOURCC))
+        f.write(storage)
+    return levels, cum, offsets, neighbors, storage
+
+
+def write_reference_csr(path, levels, cum, offsets, neighbors, storage, prune):
+    """The original per-node conversion loop."""
+    level_ptr, node_offsets, data = [], [], []
+    for i in range(len(levels)):
+        node_offsets.append(len(level_ptr))
+        for level in range(max(int(levels[i]), 0)):
+            level_ptr.append(len(data))
+            begin = int(offsets[i]) + convert_to_csr.get_cum_neighbors(cum, level)
+            end = int(offsets[i]) + convert_to_csr.get_cum_neighbors(cum, level + 1)
+            block = neighbors[min(max(begin, 0), len(neighbors)) : min(end, len(neighbors))]
+            data.extend(int(x) for x in block if x >= 0)
+        level_ptr.append(len(data))
+    node_offsets.append(len(level_ptr))
+
+    with open(path, "wb") as f:
+        convert_to_csr.write_compact_format(
+            f,
+            {**HEADER, "ntotal": len(levels)},
+            np.array([0.7, 0.2, 0.1]),
+            cum,
+            levels,
+            level_ptr,
+            np.array(node_offsets, dtype=np.uint64),
+            data,
+            convert_to_csr.NULL_INDEX_FOURCC if prune else STORAGE_FOURCC,
+            b"" if prune else storage,
+        )
+
+
+@pytest.mark.parametrize("prune", [True, False])
+@pytest.mark.parametrize("gaps", [False, True])
+@pytest.mark.parametrize("chunk_nodes", [1, 7, convert_to_csr.CONVERT_CHUNK_NODES])
+def test_vectorized_conversion_matches_reference(tmp_path, prune, gaps, chunk_nodes):
+    source = tmp_path / "input.index"
+    graph = write_original_index(source, 300, seed=3, gaps=gaps)
+    write_reference_csr(tmp_path / "expected.index", *graph, prune=prune)
+
+    output = tmp_path / "output.index"
+    assert convert_to_csr.convert_hnsw_graph_to_csr(
+        str(source), str(output), prune_embeddings=prune, chunk_nodes=chunk_nodes
+    )
+    assert output.read_bytes() == (tmp_path / "expected.index").read_bytes()
+
+    # Converting an already-compact file is a no-op
+    again = tmp_path / "again.index"
+    assert convert_to_csr.convert_hnsw_graph_to_csr(str(output), str(again), prune)
+    assert again.read_bytes() == output.read_bytes()
+
+
+def test_reader_returns_views_of_the_mapped_file(tmp_path):
+    source = tmp_path / "input.index"
+    write_original_index(source, 50, seed=1)
+    components = convert_to_csr._read_hnsw_structure_from_file(str(source))
+    assert not components.is_compact
+    assert not components.neighbors_np.flags.owndata
+    assert components.storage_fourcc == STORAGE_FOURCC
+    assert len(components.storage_data) == 50 * 32
+
+    truncated = tmp_path / "truncated.index"
+    truncated.write_bytes(source.read_bytes()[:200])
+    assert not convert_to_csr.convert_hnsw_graph_to_csr(str(truncated), str(tmp_path / "x"))
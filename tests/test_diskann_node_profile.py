@@ -0,0 +1,143 @@
+"""
+Tests for query-profile-driven DiskANN node cache warmup.
+
+These need the real ``leann_backend_diskann`` package. The searcher test replaces
+the compiled ``_diskannpy`` extension with a fake that records the cache list.
+"""
+
+import json
+import struct
+import types
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+node_profile = pytest.importorskip("leann_backend_diskann.node_profile")
+graph_partition = pytest.importorskip("leann_backend_diskann.graph_partition")
+diskann_backend = pytest.importorskip("leann_backend_diskann.diskann_backend")
+
+SECTOR = graph_partition.SECTOR_LEN
+
+
+def write_disk_index(prefix, n=300, degree=6, seed=0):
+    """kNN graph over 2-d points stored as float coordinates, medoid at node 0."""
+    rng = np.random.default_rng(seed)
+    points = rng.random((n, 2)).astype(np.float32)
+    dist = ((points[:, None] - points[None]) ** 2).sum(-1)
+    np.fill_diagonal(dist, np.inf)
+    knn = np.argsort(dist, axis=1)[:, :degree]
+
+    max_node_len = 2 * 4 + 4 + degree * 4
+    nps = SECTOR // max_node_len
+    meta = [n, 2, 0, max_node_len, nps, 0, 0, 0, 0]
+    data = bytearray(SECTOR * (1 + -(-n // nps)))
+    data[: 8 + 8 * len(meta)] = struct.pack("<ii", len(meta), 1) + struct.pack(
+        f"<{len(meta)}Q", *meta
+    )
+    for i in range(n):
+        rec = points[i].tobytes() + struct.pack("<I", degree) + knn[i].astype("<u4").tobytes()
+        at = SECTOR * (1 + i // nps) + (i % nps) * max_node_len
+        data[at : at + len(rec)] = rec
+    with open(f"{prefix}_disk.index", "wb") as f:
+        f.write(bytes(data))
+    return points, max_node_len
+
+
+def test_profile_histogram_roundtrip(tmp_path):
+    profile = node_profile.NodeAccessProfile()
+    profile.record(np.array([[5, 3], [5, -1]]), queries=2)
+    profile.record(np.array([7, 5, 3]))
+    other = node_profile.NodeAccessProfile()
+    other.record(np.array([7, 7, 9]))
+    profile.merge(other)
+
+    ids, counts = profile.histogram()
+    assert dict(zip(ids.tolist(), counts.tolist())) == {3: 2, 5: 3, 7: 3, 9: 1}
+    assert profile.queries == 4
+    assert profile.hottest(3).tolist() == [5, 7, 3]
+    assert profile.coverage(2) == pytest.approx(6 / 9)
+
+    path = node_profile.profile_path(tmp_path / "demo.leann")
+    profile.save(path)
+    loaded = node_profile.NodeAccessProfile.load(path)
+    assert loaded.hottest().tolist() == [5, 7, 3, 9]
+    summary = loaded.summary(node_bytes=1 << 19, budget_mb=1)
+    assert summary["budget_nodes"] == 2
+    assert summary["nodes_for_50pct"] == 2 and summary["unique_nodes"] == 4
+
+
+def test_replay_matches_on_plain_and_partitioned_graphs(tmp_path):
+    prefix = tmp_path / "demo"
+    points, _ = write_disk_index(prefix)
+    queries = points[[10, 150, 299]] + 0.001
+
+    plain = node_profile.replay_queries(
+        node_profile.DiskGraphReader(prefix), queries, metric="l2", complexity=8
+    )
+    assert plain.queries == 3
+    ids, counts = plain.histogram()
+    assert counts[ids.tolist().index(0)] == 3  # every search starts at the medoid
+    assert {10, 150, 299} <= set(ids.tolist())
+
+    graph_partition.partition_graph(str(prefix))
+    (tmp_path / "demo_disk.index").unlink()
+    partitioned = node_profile.replay_queries(
+        node_profile.DiskGraphReader(prefix), queries, metric="l2", complexity=8
+    )
+    np.testing.assert_array_equal(partitioned.histogram()[0], ids)
+    np.testing.assert_array_equal(partitioned.histogram()[1], counts)
+
+
+def test_searcher_records_profile_and_warms_cache_from_it(tmp_path):
+    prefix = tmp_path / "demo"
+    _, max_node_len = write_disk_index(prefix)
+    meta = {"dimensions": 2, "embedding_model": "fake-model", "backend_kwargs": {}}
+    (tmp_path / "demo.leann.meta.json").write_text(json.dumps(meta))
+    results = iter([[[4, 8]], [[4, 9]], [[4, 8]]])
+    cache_lists = []
+
+    class StaticDiskFloatIndex:
+        def __init__(self, metric, prefix, threads, num_nodes, mechanism, port, pq, partition):
+            self.num_nodes, self.mechanism = num_nodes, mechanism
+
+        def load_cache_list(self, node_ids):
+            cache_lists.append((self.num_nodes, self.mechanism, node_ids))
+
+        def batch_search(self, query, n, top_k, *args):
+            return next(results), np.zeros((n, top_k), dtype=np.float32)
+
+    module = types.SimpleNamespace(
+        Metric=types.SimpleNamespace(INNER_PRODUCT=0, L2=1, COSINE=2),
+        StaticDiskFloatIndex=StaticDiskFloatIndex,
+    )
+    with patch.dict("sys.modules", {"leann_backend_diskann._diskannpy": module}):
+        recorder = diskann_backend.DiskannSearcher(
+            str(tmp_path / "demo.leann"), record_node_profile=True
+        )
+        for _ in range(3):
+            recorder.search(np.zeros((1, 2), dtype=np.float32), 2)
+        recorder.flush_node_profile()
+        assert cache_lists == []
+        # Returned labels are not expanded nodes, so they stay out of the replay profile
+        assert node_profile.profile_path(tmp_path / "demo.leann", results=True).exists()
+        assert not node_profile.profile_path(tmp_path / "demo.leann").exists()
+
+        budget_mb = 2 * max_node_len / (1 << 20)
+        warmed = diskann_backend.DiskannSearcher(
+            str(tmp_path / "demo.leann"), cache_budget_mb=budget_mb
+        )
+        warmed._ensure_index_loaded(5557)
+    assert cache_lists == [(2, 2, [4, 8])]
+
+
+def test_warmup_prefers_replay_profile(tmp_path):
+    index_path = tmp_path / "demo.leann"
+    assert node_profile.warmup_profile_path(index_path) is None
+    results = node_profile.NodeAccessProfile()
+    results.record(np.array([4, 8]))
+    results.save(node_profile.profile_path(index_path, results=True))
+    assert node_profile.warmup_profile_path(index_path).name == "demo.leann.node_results.npz"
+
+    node_profile.NodeAccessProfile().save(node_profile.profile_path(index_path))
+    assert node_profile.warmup_profile_path(index_path).name == "demo.leann.node_profile.npz"
@@ -4,14 +4,32 @@ Test DiskANN graph partitioning functionality.
 Tests the automatic graph partitioning feature that was implemented to save
 storage space by partitioning large DiskANN indices and safely deleting
 redundant files while maintaining search functionality.
+
+The in-process partitioner tests need the real ``leann_backend_diskann``
+package rather than the test mock. They build a small synthetic ``_disk.index``
+and check the partition file and the relaid-out disk graph against it.
 """
 
+import logging
 import os
+import struct
 import tempfile
 from pathlib import Path
 
+import numpy as np
 import pytest
 
+try:
+    from leann_backend_diskann import graph_partition
+except ImportError:
+    graph_partition = None
+
+needs_partitioner = pytest.mark.skipif(
+    graph_partition is None, reason="needs the real leann_backend_diskann package"
+)
+
+SECTOR = 4096
+
 
 @pytest.mark.skipif(
     os.environ.get("CI") == "true",
@@ -367,3 +385,185 @@ def test_diskann_vs_hnsw_performance():
             print(f"DiskANN search time: {diskann_search_time:.4f}s")
             print(f"HNSW search time: {hnsw_search_time:.4f}s")
             print(f"DiskANN is {speed_ratio:.2f}x faster than HNSW")
+
+
+def write_disk_index(path, n=500, dims=16, degree=8, seed=0):
+    """A kNN graph over points on a curve, stored in shuffled id order."""
+    rng = np.random.default_rng(seed)
+    t = np.sort(rng.random(n))
+    points = np.stack([np.cos(6 * t), np.sin(6 * t), t], axis=1)
+    points = points[rng.permutation(n)]
+    dist = ((points[:, None] - points[None]) ** 2).sum(-1)
+    np.fill_diagonal(dist, np.inf)
+    knn = np.argsort(dist, axis=1)[:, :degree]
+    coords = rng.standard_normal((n, dims)).astype(np.float32)
+
+    max_node_len = dims * 4 + 4 + degree * 4
+    nps = SECTOR // max_node_len
+    num_sectors = -(-n // nps)
+    meta = [n, dims, 0, max_node_len, nps, 0, 0, 0, 0]
+    data = bytearray(SECTOR * (1 + num_sectors))
+    data[: 8 + 8 * len(meta)] = struct.pack("<ii", len(meta), 1) + struct.pack(
+        f"<{len(meta)}Q", *meta
+    )
+    for i in range(n):
+        # Vary the degree so that padding after short lists is exercised
+        nbrs = knn[i][: degree - (i % 3)]
+        record = coords[i].tobytes() + struct.pack("<I", len(nbrs)) + nbrs.astype("<u4").tobytes()
+        at = SECTOR * (1 + i // nps) + (i % nps) * max_node_len
+        data[at : at + len(record)] = record
+    path.write_bytes(bytes(data))
+    return max_node_len, nps
+
+
+def record(data, node, max_node_len, nps):
+    at = SECTOR * (1 + node // nps) + (node % nps) * max_node_len
+    return data[at : at + max_node_len]
+
+
+@needs_partitioner
+def test_partition_places_every_node_once_and_relays_out_records(tmp_path):
+    prefix = tmp_path / "demo"
+    max_node_len, nps = write_disk_index(tmp_path / "demo_disk.index")
+
+    partitioner = graph_partition.GraphPartitioner()
+    disk_graph, partition_bin = partitioner.partition_graph(str(prefix), thread_nums=2)
+
+    capacity, layout, id2page = graph_partition.read_partition_file(partition_bin)
+    assert capacity == nps
+    assert sorted(np.concatenate(layout).tolist()) == list(range(500))
+    assert all(len(nodes) <= capacity for nodes in layout)
+    for page, nodes in enumerate(layout):
+        assert (id2page[nodes] == page).all()
+
+    original = (tmp_path / "demo_disk.index").read_bytes()
+    relaid = open(disk_graph, "rb").read()
+    assert relaid[:SECTOR] == original[:SECTOR]
+    assert len(relaid) == SECTOR * (1 + len(layout))
+    for page, nodes in enumerate(layout):
+        for slot, node in enumerate(nodes.tolist()):
+            at = SECTOR * (1 + page) + slot * max_node_len
+            assert relaid[at : at + max_node_len] == record(original, node, max_node_len, nps)
+
+    info = partitioner.get_partition_info(partition_bin)
+    assert info["nodes"] == 500 and info["partitions"] == len(layout)
+
+    metrics = partitioner.last_metrics
+    assert metrics["nodes"] == 500
+    assert metrics["partitioned"]["edge_locality"] > 2 * metrics["baseline"]["edge_locality"]
+    assert (
+        metrics["partitioned"]["sectors_per_expansion"]
+        < metrics["baseline"]["sectors_per_expansion"]
+    )
+
+
+@needs_partitioner
+def test_read_disk_graph_matches_records(tmp_path):
+    index_file = tmp_path / "demo_disk.index"
+    max_node_len, nps = write_disk_index(index_file, n=120, degree=5)
+    layout, indptr, indices = graph_partition.read_disk_graph(
+        str(index_file), num_threads=3, chunk_nodes=7
+    )
+    assert layout.max_degree == 5 and layout.nnodes_per_sector == nps
+    data = index_file.read_bytes()
+    for node in (0, 1, 2, 61, 119):
+        rec = record(data, node, max_node_len, nps)
+        (count,) = struct.unpack_from("<I", rec, 64)
+        expected = np.frombuffer(rec[68 : 68 + 4 * count], dtype="<u4")
+        np.testing.assert_array_equal(indices[indptr[node] : indptr[node + 1]], expected)
+
+
+@needs_partitioner
+def test_refinement_never_exceeds_capacity():
+    rng = np.random.default_rng(1)
+    n, capacity = 301, 7
+    degrees = rng.integers(0, 6, n)
+    indptr = np.concatenate(([0], np.cumsum(degrees)))
+    indices = rng.integers(0, n, int(indptr[-1]))
+    assignment = graph_partition.partition_nodes(indptr, indices, capacity, rounds=5)
+    assert np.bincount(assignment).max() <= capacity
+    assert len(np.unique(assignment)) == -(-n // capacity)
+
+
+@needs_partitioner
+def test_graph_size_picks_partition_path(tmp_path, monkeypatch, caplog):
+    write_disk_index(tmp_path / "demo_disk.index", n=120, degree=5)
+    used = []
+    monkeypatch.setattr(
+        graph_partition.GraphPartitioner,
+        "_partition_with_executables",
+        lambda self, *args: used.append("executables"),
+    )
+    monkeypatch.setattr(graph_partition.GraphPartitioner, "_ensure_executables", lambda self: None)
+
+    graph_partition.partition_graph(str(tmp_path / "demo"), thread_nums=1)
+    assert used == [] and (tmp_path / "demo_partition.bin").exists()
+
+    monkeypatch.setattr(graph_partition, "IN_PROCESS_MAX_NODES", 100)
+    graph_partition.partition_graph(str(tmp_path / "demo"), thread_nums=1)
+    assert used == ["executables"]
+    graph_partition.partition_graph(str(tmp_path / "demo"), use_executables=False, thread_nums=1)
+    assert used == ["executables"]
+
+    # Executables that cannot be built fall back to the in-process path
+    def unavailable(self):
+        raise RuntimeError("no compiler")
+
+    monkeypatch.setattr(graph_partition.GraphPartitioner, "_ensure_executables", unavailable)
+    (tmp_path / "demo_partition.bin").unlink()
+    with caplog.at_level(logging.WARNING, logger=graph_partition.__name__):
+        graph_partition.partition_graph(str(tmp_path / "demo"), thread_nums=1)
+    assert used == ["executables"] and (tmp_path / "demo_partition.bin").exists()
+    assert "partitioning in-process instead" in caplog.text
+
+
+@pytest.mark.skipif(
+    os.environ.get("CI") == "true",
+    reason="Skip DiskANN partition tests in CI - requires specific hardware and large memory",
+)
+def test_diskann_in_process_partition_build_and_search(monkeypatch):
+    """A recompute build partitions in-process and the partitioned index is searchable."""
+    from leann.api import LeannBuilder, LeannSearcher
+
+    from leann_backend_diskann import graph_partition
+
+    def no_executables(self, *args):
+        raise AssertionError("small graphs should not use the partition executables")
+
+    monkeypatch.setattr(
+        graph_partition.GraphPartitioner, "_partition_with_executables", no_executables
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index_path = str(Path(temp_dir) / "test_in_process.leann")
+        texts = [
+            f"Note {i} covers theme {i % 12} and the details of case {i // 12}." for i in range(300)
+        ]
+
+        builder = LeannBuilder(
+            backend_name="diskann",
+            embedding_model="facebook/contriever",
+            embedding_mode="sentence-transformers",
+            num_neighbors=32,
+            search_list_size=50,
+            is_recompute=True,
+        )
+        for text in texts:
+            builder.add_text(text)
+        builder.build_index(index_path)
+
+        index_prefix = Path(index_path).stem
+        partition_bin = Path(temp_dir) / f"{index_prefix}_partition.bin"
+        assert partition_bin.exists()
+        assert (Path(temp_dir) / f"{index_prefix}_disk_graph.index").exists()
+        _, layout, _ = graph_partition.read_partition_file(str(partition_bin))
+        assert sorted(np.concatenate(layout).tolist()) == list(range(len(texts)))
+
+        searcher = LeannSearcher(index_path)
+        try:
+            results = searcher.search("theme 5 details", top_k=5)
+        finally:
+            searcher.cleanup()
+        assert len(results) == 5
+        assert all(r.score != float("-inf") for r in results)
+        assert len({r.id for r in results}) == 5
@@ -0,0 +1,89 @@
+"""
+Tests that a DiskANN searcher loads its index once across embedding server restarts.
+
+These need the real ``leann_backend_diskann`` package. The compiled ``_diskannpy``
+extension is replaced by a fake that counts index loads.
+"""
+
+import json
+import types
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+diskann_backend = pytest.importorskip("leann_backend_diskann.diskann_backend")
+
+
+def fake_diskannpy(settable: bool):
+    loads = []
+
+    class StaticDiskFloatIndex:
+        def __init__(self, metric, prefix, threads, cache, mechanism, zmq_port, pq, partition):
+            loads.append(zmq_port)
+            self.zmq_port = zmq_port
+
+        def batch_search(self, query, n, top_k, *args):
+            return [[0] * top_k] * n, np.zeros((n, top_k), dtype=np.float32)
+
+    if settable:
+
+        def set_zmq_port(self, zmq_port):
+            self.zmq_port = zmq_port
+
+        StaticDiskFloatIndex.set_zmq_port = set_zmq_port
+
+    module = types.SimpleNamespace(
+        Metric=types.SimpleNamespace(INNER_PRODUCT=0, L2=1, COSINE=2),
+        StaticDiskFloatIndex=StaticDiskFloatIndex,
+    )
+    return module, loads
+
+
+def make_searcher(tmp_path, module):
+    meta = {"dimensions": 4, "embedding_model": "fake-model", "backend_kwargs": {}}
+    (tmp_path / "demo.leann.meta.json").write_text(json.dumps(meta))
+    with patch.dict("sys.modules", {"leann_backend_diskann._diskannpy": module}):
+        return diskann_backend.DiskannSearcher(str(tmp_path / "demo.leann"))
+
+
+def search_after_restart(searcher, server_ports):
+    """Search once per server start; ``server_ports`` maps a requested port to the bound one."""
+    requested = []
+
+    def start_server(port, **kwargs):
+        requested.append(port)
+        return True, server_ports(port)
+
+    searcher.embedding_server_manager.start_server = start_server
+    query = np.zeros((1, 4), dtype=np.float32)
+    for _ in range(3):
+        port = searcher._ensure_server_running("demo.leann.meta.json", 5557)
+        searcher.search(query, 2, recompute_embeddings=True, zmq_port=port)
+    return requested
+
+
+def test_settable_port_follows_restarted_server_without_reload(tmp_path):
+    module, loads = fake_diskannpy(settable=True)
+    searcher = make_searcher(tmp_path, module)
+    bound = iter([5557, 5558, 5559])
+    search_after_restart(searcher, lambda port: next(bound))
+
+    assert loads == [5557]
+    assert searcher.index_loads == 1
+    assert searcher._index.zmq_port == 5559
+
+
+def test_fixed_port_restarts_server_on_the_loaded_port(tmp_path):
+    module, loads = fake_diskannpy(settable=False)
+    searcher = make_searcher(tmp_path, module)
+    searcher._ensure_index_loaded(6000)
+
+    requested = search_after_restart(searcher, lambda port: port)
+    assert requested == [6000, 6000, 6000]
+    assert loads == [6000]
+    assert searcher.index_loads == 1
+
+    # A server that cannot get that port forces a reload
+    searcher._ensure_index_loaded(6001)
+    assert loads == [6000, 6001]
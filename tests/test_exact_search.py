@@ -0,0 +1,117 @@
+"""
+Tests for the exact brute-force path used by small indexes and small filtered subsets.
+"""
+
+import numpy as np
+import pytest
+from leann.api import LeannBuilder, LeannSearcher
+from leann.exact import ExactIndex, exact_paths
+
+TEXTS = [f"passage number {i}" for i in range(40)]
+
+
+@pytest.fixture
+def build(tmp_path, fake_backend):
+    backend = fake_backend("fake-exact")
+
+    def _build(metric="mips", **builder_kwargs):
+        index_path = str(tmp_path / f"{metric}.leann")
+        builder = LeannBuilder(
+            "fake-exact", embedding_model="fake", distance_metric=metric, **builder_kwargs
+        )
+        for i, text in enumerate(TEXTS):
+            builder.add_text(text, metadata={"n": i})
+        builder.build_index(index_path)
+        return index_path
+
+    # Records whether the graph path ran
+    _build.backend = backend
+    return _build
+
+
+@pytest.mark.parametrize("metric", ["mips", "cosine", "l2"])
+def test_small_index_is_searched_exactly(build, fake_embeddings, metric):
+    index_path = build(metric)
+    embeddings_file, _ = exact_paths(index_path)
+    assert np.load(embeddings_file).dtype == np.float16
+
+    searcher = LeannSearcher(index_path)
+    query = "passage number 7"
+    results = searcher.search(query, top_k=3)
+
+    emb = fake_embeddings(TEXTS)
+    q = fake_embeddings([query])[0]
+    if metric == "l2":
+        expected = np.argsort(((emb - q) ** 2).sum(1))[:3]
+    else:
+        if metric == "cosine":
+            emb = emb / np.linalg.norm(emb, axis=1, keepdims=True)
+            q = q / np.linalg.norm(q)
+        expected = np.argsort(-(emb @ q))[:3]
+    assert [r.id for r in results] == [str(i) for i in expected]
+    assert results[0].id == "7"
+    assert searcher.last_search_stats["path"] == "exact"
+    assert searcher.last_search_stats["passages_scored"] == 40
+    assert build.backend.searched == [] and build.backend.server_ports == []
+
+
+def test_threshold_routes_large_indexes_and_filtered_subsets(build):
+    searcher = LeannSearcher(build())
+
+    searcher.search("passage number 3", top_k=2, exact_threshold=10)
+    assert searcher.last_search_stats["path"] == "graph"
+    assert searcher.last_search_stats["exact_threshold"] == 10
+    assert len(build.backend.searched) == 1
+
+    results = searcher.search(
+        "passage number 3", top_k=3, exact_threshold=10, metadata_filters={"n": {"<": 5}}
+    )
+    assert searcher.last_search_stats["path"] == "exact"
+    assert searcher.last_search_stats["passages_scored"] == 5
+    assert results[0].id == "3"
+    assert all(r.metadata["n"] < 5 for r in results) and len(results) == 3
+
+    searcher.search("passage number 3", top_k=2, exact_threshold=0)
+    assert searcher.last_search_stats["path"] == "graph"
+
+
+def test_exact_embeddings_can_be_disabled(build):
+    index_path = build(exact_embeddings=False)
+    assert not exact_paths(index_path)[0].exists()
+    assert ExactIndex.open(index_path) is None
+
+
+def test_filter_scan_caches_metadata_and_skips_far_larger_indexes(build, monkeypatch):
+    searcher = LeannSearcher(build())
+    reads = []
+    get_passage = searcher.passage_manager.get_passage
+    monkeypatch.setattr(
+        searcher.passage_manager, "get_passage", lambda pid: reads.append(pid) or get_passage(pid)
+    )
+
+    # 40 passages is more than EXACT_FILTER_SCAN_FACTOR times a threshold of 2
+    searcher.search(
+        "passage number 3", top_k=2, exact_threshold=2, metadata_filters={"n": {"<": 2}}
+    )
+    assert searcher.last_search_stats["path"] == "graph"
+    assert reads.count("39") == 0
+
+    searcher.search(
+        "passage number 3", top_k=2, exact_threshold=5, metadata_filters={"n": {"<": 5}}
+    )
+    assert searcher.last_search_stats["path"] == "exact"
+    assert all("text" not in row for row in searcher._exact_index._filter_rows)
+    reads.clear()
+    searcher.search(
+        "passage number 3", top_k=2, exact_threshold=5, metadata_filters={"n": {"<": 3}}
+    )
+    assert reads.count("39") == 0
+
+    results = searcher.search(
+        "passage number 3",
+        top_k=2,
+        exact_threshold=5,
+        metadata_filters={"text": {"ends_with": "number 3"}},
+    )
+    assert searcher.last_search_stats["passages_scored"] == 1
+    assert [r.id for r in results] == ["3"]
@@ -0,0 +1,146 @@
+"""
+Tests for federated search over several indexes (``leann search --indexes``).
+"""
+
+import numpy as np
+import pytest
+from leann import mcp
+from leann.api import LeannBuilder, LeannSearcher, SearchResult
+from leann.cli import LeannCLI
+from leann.federated import (
+    FederatedSearcher,
+    comparable_scores,
+    federated_search,
+    merge_results,
+)
+from leann.searcher_pool import SearcherPool
+
+
+def fixed_search(self, query, top_k, **kwargs):
+    """Same two hits from every index, so merged graph results are predictable."""
+    type(self).searched.append(query)
+    return {"labels": [["1", "0"]], "distances": [[0.5, 0.25]]}
+
+
+@pytest.fixture
+def build(tmp_path, fake_backend):
+    backend = fake_backend("fake-federated", search=fixed_search)
+
+    def _build(name, texts, model="fake", metric="mips"):
+        index_path = str(tmp_path / f"{name}.leann")
+        builder = LeannBuilder("fake-federated", embedding_model=model, distance_metric=metric)
+        for text in texts:
+            builder.add_text(text)
+        builder.build_index(index_path)
+        return index_path
+
+    _build.backend = backend
+    return _build
+
+
+def test_exact_results_are_merged_across_indexes(build):
+    docs = build("docs", [f"passage number {i}" for i in range(20)])
+    notes = build("notes", [f"note about topic {i}" for i in range(20)])
+
+    with FederatedSearcher([docs, notes]) as federated:
+        results = federated.search("passage number 7", top_k=6)
+    assert build.backend.query_embeddings == 1  # embedded once for both indexes
+    assert build.backend.server_ports == []  # small indexes are searched exactly
+
+    assert results[0].id == "7" and results[0].metadata["index_name"] == docs
+    assert {r.metadata["index_name"] for r in results} <= {docs, notes}
+    scores = [r.score for r in results]
+    assert scores == sorted(scores, reverse=True)
+
+    expected = []
+    for path in (docs, notes):
+        expected += [(r.score, path, r.id) for r in LeannSearcher(path).search("passage number 7")]
+    expected.sort(key=lambda item: -item[0])
+    got = [(r.score, r.metadata["index_name"], r.id) for r in results]
+    assert [g[1:] for g in got] == [e[1:] for e in expected[:6]]
+    np.testing.assert_allclose([g[0] for g in got], [e[0] for e in expected[:6]], rtol=1e-5)
+
+
+def test_graph_search_shares_query_embedding_and_spreads_ports(build):
+    paths = [build(name, [f"{name} text {i}" for i in range(10)]) for name in ("a", "b", "c")]
+
+    with FederatedSearcher(paths) as federated:
+        results = federated.search("query", top_k=4, exact_threshold=0)
+    assert build.backend.query_embeddings == 1
+    assert len(build.backend.searched) == 3
+    assert all(np.array_equal(q, build.backend.searched[0]) for q in build.backend.searched)
+    # One embedding call plus one server check per index, each in its own port window
+    assert sorted(set(build.backend.server_ports)) == [5557, 5657, 5757]
+    assert [r.score for r in results] == [0.5, 0.5, 0.5, 0.25]
+    assert [r.metadata["index_name"] for r in results[:3]] == paths
+
+
+def test_pool_smaller_than_index_count_opens_each_index_once(build):
+    paths = [build(name, [f"{name} text {i}" for i in range(10)]) for name in ("a", "b", "c")]
+    opened = []
+
+    def factory(path):
+        opened.append(path)
+        return LeannSearcher(path)
+
+    pool = SearcherPool(max_size=1, resolver=lambda name: name, searcher_factory=factory)
+    results = federated_search(paths, "query", top_k=4, pool=pool, exact_threshold=0)
+    stats = pool.stats()
+    pool.close()
+    assert sorted(opened) == sorted(paths)
+    assert stats["evictions"] == 2
+    assert build.backend.query_embeddings == 1
+    assert len(results) == 4
+
+
+def test_scores_are_made_comparable():
+    ranking = [SearchResult(id=str(i), score=s, text="") for i, s in enumerate([0.2, 1.0, 4.0])]
+    assert comparable_scores(ranking, "l2") == [0.9, 0.5, -1.0]
+    assert comparable_scores(ranking, "mips") == [0.2, 1.0, 4.0]
+    assert comparable_scores(ranking, None, per_index=True) == [1.0, 0.7894736842105263, 0.0]
+
+    a = [SearchResult(id="a1", score=0.9, text=""), SearchResult(id="a2", score=0.5, text="")]
+    b = [SearchResult(id="b1", score=0.9, text=""), SearchResult(id="b2", score=0.7, text="")]
+    assert [r.id for r in merge_results({"a": a, "b": b}, 3)] == ["a1", "b1", "b2"]
+
+
+def test_mixed_models_and_metrics_are_normalized_per_index(build):
+    docs = build("docs", [f"passage number {i}" for i in range(20)])
+    other = build("other", [f"passage number {i}" for i in range(20)], model="other", metric="l2")
+
+    with FederatedSearcher([docs, other]) as federated:
+        results = federated.search("passage number 7", top_k=4)
+    assert build.backend.query_embeddings == 2
+    top = [r for r in results if r.score == 1.0]
+    assert {r.metadata["index_name"] for r in top} == {docs, other}
+    assert all(0.0 <= r.score <= 1.0 for r in results)
+
+
+def test_cli_and_mcp_search_several_indexes(build, capsys, monkeypatch):
+    docs = build("docs", [f"passage number {i}" for i in range(20)])
+    notes = build("notes", [f"note about topic {i}" for i in range(20)])
+
+    cli = LeannCLI()
+    args = cli.create_parser().parse_args(
+        ["search", "--indexes", f"{docs},{notes}", "passage number 7", "--top-k", "3"]
+    )
+    cli.search_federated(args)
+    out = capsys.readouterr().out
+    assert "Search results for 'passage number 7' (top 3)" in out
+    assert f"Index: {docs}" in out
+
+    pool = SearcherPool(resolver=lambda name: name, searcher_factory=LeannSearcher)
+    monkeypatch.setattr(mcp, "_searcher_pool", pool)
+    response = mcp.handle_request(
+        {
+            "id": 1,
+            "method": "tools/call",
+            "params": {
+                "name": "leann_search",
+                "arguments": {"index_names": [docs, notes], "query": "passage number 7"},
+            },
+        }
+    )
+    pool.close()
+    text = response["result"]["content"][0]["text"]
+    assert f"Index: {docs}" in text and "(top 5)" in text
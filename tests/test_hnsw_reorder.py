@@ -0,0 +1,149 @@
+"""
+Tests for locality-aware renumbering of compact HNSW graphs.
+
+Like the two-stage tests, these need the real ``leann_backend_hnsw`` package.
+"""
+
+import json
+
+import numpy as np
+import pytest
+from leann.api import PassageManager
+from leann.id_map import IdMap, load_passage_offsets, save_passage_offsets
+
+reorder = pytest.importorskip("leann_backend_hnsw.reorder")
+two_stage = pytest.importorskip("leann_backend_hnsw.two_stage")
+convert_to_csr = pytest.importorskip("leann_backend_hnsw.convert_to_csr")
+
+
+def write_shuffled_index(tmp_path, n=400, k=6):
+    """A kNN graph over points on a curve, with node ids in random (insertion) order."""
+    rng = np.random.default_rng(0)
+    t = np.sort(rng.random(n))
+    points = np.stack([np.cos(6 * t), np.sin(6 * t), t], axis=1).astype(np.float32)
+    points = points[rng.permutation(n)]
+    dist = ((points[:, None] - points[None]) ** 2).sum(-1)
+    np.fill_diagonal(dist, np.inf)
+    knn = np.argsort(dist, axis=1)[:, :k]
+
+    upper = [int(i) for i in rng.choice(n, 8, replace=False)]
+    levels = np.ones(n, dtype=np.int32)
+    levels[upper] = 2
+    level_ptr, node_offsets, neighbors = [], [], []
+    for i in range(n):
+        node_offsets.append(len(level_ptr))
+        lists = [knn[i].tolist()]
+        if levels[i] == 2:
+            lists.append([u for u in upper if u != i])
+        for nbrs in lists:
+            level_ptr.append(len(neighbors))
+            neighbors.extend(nbrs)
+        level_ptr.append(len(neighbors))
+    node_offsets.append(len(level_ptr))
+
+    index_file = tmp_path / "demo.index"
+    header = {
+        "index_fourcc": convert_to_csr.INDEX_HNSW_FLAT_FOURCC,
+        "d": 3,
+        "ntotal": n,
+        "dummy1": 0,
+        "dummy2": 0,
+        "is_trained": True,
+        "metric_type": 1,
+        "entry_point": upper[0],
+        "max_level": 1,
+        "efConstruction": 40,
+        "efSearch": 16,
+        "dummy_upper_beam": 1,
+    }
+    with open(index_file, "wb") as f:
+        convert_to_csr.write_compact_format(
+            f,
+            header,
+            np.array([0.5, 0.5]),
+            np.array([0, 2 * k, 3 * k], dtype=np.int32),
+            levels,
+            np.array(level_ptr, dtype=np.uint64),
+            np.array(node_offsets, dtype=np.uint64),
+            neighbors,
+            convert_to_csr.NULL_INDEX_FOURCC,
+            b"",
+        )
+
+    ids = [f"doc-{i}" for i in range(n)]
+    IdMap.from_ids(ids).save(tmp_path / "demo")
+    two_stage.CompactCodes.train(points, "sq8").save(index_file)
+    offsets = {}
+    with open(tmp_path / "demo.leann.passages.jsonl", "w", encoding="utf-8") as f:
+        for i, passage_id in enumerate(ids):
+            offsets[passage_id] = f.tell()
+            f.write(json.dumps({"id": passage_id, "text": f"text {i}"}) + "\n")
+    save_passage_offsets(tmp_path / "demo.leann.passages.idx", offsets)
+    return index_file, points
+
+
+def labelled_edges(index_file, id_map):
+    graph = two_stage.HNSWGraph(index_file)
+    return {
+        (level, id_map[node], id_map[int(nbr)])
+        for node in range(len(graph))
+        for level in range(int(graph.levels[node]))
+        for nbr in graph.neighbors(node, level)
+    }, id_map[graph.entry_point]
+
+
+@pytest.mark.parametrize("method", ["bfs", "rcm"])
+def test_reorder_keeps_graph_ids_codes_and_passages_consistent(tmp_path, method):
+    index_file, points = write_shuffled_index(tmp_path)
+    before_edges = labelled_edges(index_file, IdMap.load(tmp_path / "demo"))
+    before_codes = two_stage.CompactCodes.load(index_file, "sq8")
+    before_decoded = {f"doc-{i}": before_codes.decode(np.array([i]))[0] for i in range(400)}
+
+    stats = reorder.reorder_index(
+        index_file,
+        method,
+        id_map_prefix=tmp_path / "demo",
+        passages_file=tmp_path / "demo.leann.passages.jsonl",
+        offsets_file=tmp_path / "demo.leann.passages.idx",
+        compact_codes="sq8",
+    )
+
+    id_map = IdMap.load(tmp_path / "demo")
+    assert sorted(id_map) == sorted(before_decoded)
+    assert labelled_edges(index_file, id_map) == before_edges
+
+    codes = two_stage.CompactCodes.load(index_file, "sq8")
+    for label in (0, 57, 399):
+        np.testing.assert_array_equal(
+            codes.decode(np.array([label]))[0], before_decoded[id_map[label]]
+        )
+
+    # Passages follow the new node order and stay addressable by id
+    with open(tmp_path / "demo.leann.passages.jsonl", encoding="utf-8") as f:
+        assert [json.loads(line)["id"] for line in f] == list(id_map)
+    manager = PassageManager(
+        [
+            {
+                "type": "jsonl",
+                "path": str(tmp_path / "demo.leann.passages.jsonl"),
+                "index_path": str(tmp_path / "demo.leann.passages.idx"),
+            }
+        ]
+    )
+    assert manager.get_passage("doc-123")["text"] == "text 123"
+    assert len(load_passage_offsets(tmp_path / "demo.leann.passages.idx")) == 400
+
+    assert stats["after"]["median_edge_gap"] < stats["before"]["median_edge_gap"] / 4
+    assert stats["after"]["row_pages"] <= stats["before"]["row_pages"]
+
+
+def test_bfs_order_starts_at_entry_point_and_covers_unreachable_nodes():
+    # 0 -> 2 -> 1, node 3 is unreachable
+    start = np.array([0, 1, 1, 2])
+    end = np.array([1, 1, 2, 2])
+    neighbors = np.array([2, 1], dtype=np.int32)
+    order = reorder.locality_order(start, end, neighbors, entry_point=0)
+    assert order.tolist() == [0, 2, 1, 3]
+    assert sorted(reorder.locality_order(start, end, neighbors, 0, "rcm").tolist()) == [0, 1, 2, 3]
+    with pytest.raises(ValueError):
+        reorder.locality_order(start, end, neighbors, 0, "random")
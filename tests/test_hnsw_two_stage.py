@@ -0,0 +1,165 @@
+"""
+Tests for HNSW two-stage search: traversal on compact codes plus one batched rerank.
+
+These exercise the real ``leann_backend_hnsw`` package (not the test mock), so
+they are skipped when only the mock is importable.
+"""
+
+import numpy as np
+import pytest
+
+two_stage = pytest.importorskip("leann_backend_hnsw.two_stage")
+convert_to_csr = pytest.importorskip("leann_backend_hnsw.convert_to_csr")
+
+
+def write_compact_graph(path, data, k=8, upper=(0, 7, 19)):
+    """Write a two-level kNN graph in LEANN's compact (CSR) index format."""
+    n = len(data)
+    dist = ((data[:, None, :] - data[None, :, :]) ** 2).sum(-1)
+    np.fill_diagonal(dist, np.inf)
+    knn = np.argsort(dist, axis=1)[:, :k]
+    rng = np.random.default_rng(1)
+    levels = np.ones(n, dtype=np.int32)
+    levels[list(upper)] = 2
+
+    level_ptr, node_offsets, neighbors = [], [], []
+    for i in range(n):
+        node_offsets.append(len(level_ptr))
+        lists = [list(knn[i]) + list(rng.integers(0, n, 2))]
+        if levels[i] == 2:
+            lists.append([u for u in upper if u != i])
+        for nbrs in lists:
+            level_ptr.append(len(neighbors))
+            neighbors.extend(int(x) for x in nbrs)
+        level_ptr.append(len(neighbors))
+    node_offsets.append(len(level_ptr))
+
+    header = {
+        "index_fourcc": convert_to_csr.INDEX_HNSW_FLAT_FOURCC,
+        "d": data.shape[1],
+        "ntotal": n,
+        "dummy1": 0,
+        "dummy2": 0,
+        "is_trained": True,
+        "metric_type": 1,
+        "entry_point": upper[0],
+        "max_level": 1,
+        "efConstruction": 40,
+        "efSearch": 16,
+        "dummy_upper_beam": 1,
+    }
+    with open(path, "wb") as f:
+        convert_to_csr.write_compact_format(
+            f,
+            header,
+            np.array([0.5, 0.5]),
+            np.array([0, 10, 16], dtype=np.int32),
+            levels,
+            np.array(level_ptr, dtype=np.uint64),
+            np.array(node_offsets, dtype=np.uint64),
+            neighbors,
+            convert_to_csr.NULL_INDEX_FOURCC,
+            b"",
+        )
+
+
+@pytest.mark.parametrize("kind", ["sq8", "binary"])
+def test_codes_round_trip(tmp_path, kind):
+    data = np.random.default_rng(0).normal(size=(50, 16)).astype(np.float32)
+    codes = two_stage.CompactCodes.train(data, kind)
+    assert codes.codes.shape == (50, 16 if kind == "sq8" else 2)
+
+    index_file = tmp_path / "x.index"
+    codes.save(index_file)
+    loaded = two_stage.CompactCodes.load(index_file, kind)
+    np.testing.assert_array_equal(loaded.decode(np.arange(50)), codes.decode(np.arange(50)))
+    if kind == "sq8":
+        assert np.abs(loaded.decode(np.arange(50)) - data).max() < 0.05
+
+    loaded.append(data[:3])
+    assert len(loaded) == 53
+
+
+def test_graph_traversal_on_codes_finds_neighbors(tmp_path):
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(300, 16)).astype(np.float32)
+    index_file = tmp_path / "g.index"
+    write_compact_graph(index_file, data)
+
+    graph = two_stage.HNSWGraph(index_file)
+    assert len(graph) == 300 and graph.max_level == 1
+    assert len(graph.neighbors(5, 1)) == 0
+
+    codes = two_stage.CompactCodes.train(data, "sq8")
+    recalls = []
+    for query in rng.normal(size=(10, 16)).astype(np.float32):
+        stats = {}
+        ids, dists = two_stage.search_codes(graph, codes, query, ef=32, metric="l2", stats=stats)
+        assert len(ids) == 32 and np.all(np.diff(dists) >= 0)
+        assert stats["distances"] < 300
+        truth = np.argsort(((data - query) ** 2).sum(1))[:10]
+        recalls.append(len(set(truth) & set(ids.tolist())) / 10)
+    assert np.mean(recalls) >= 0.8
+
+
+def test_prefetch_search_matches_blocking_search(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    prefetch = pytest.importorskip("leann_backend_hnsw.prefetch")
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(300, 16)).astype(np.float32)
+    index_file = tmp_path / "g.index"
+    write_compact_graph(index_file, data)
+    graph = two_stage.HNSWGraph(index_file)
+    query = rng.normal(size=16).astype(np.float32)
+
+    def exact(ids):
+        return ((data[ids] - query) ** 2).sum(1)
+
+    blocking = {}
+    expected = two_stage.hnsw_search(graph, exact, 16, blocking)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        distances = prefetch.PrefetchingDistances(exact, exact, executor)
+        stats = {}
+        ids, dists = prefetch.search_with_prefetch(graph, distances, 16, depth=2, stats=stats)
+
+    np.testing.assert_array_equal(ids, expected[0])
+    np.testing.assert_allclose(dists, expected[1], rtol=1e-6)
+    assert stats["prefetch_hits"] > 0
+    assert stats["prefetch_wasted"] == stats["prefetched"] - stats["prefetch_hits"]
+    # Expansions whose neighbors were prefetched need no blocking round trip
+    assert stats["requests"] < blocking["hops"]
+
+
+def test_failed_prefetch_falls_back_to_blocking_fetch():
+    from concurrent.futures import ThreadPoolExecutor
+
+    prefetch = pytest.importorskip("leann_backend_hnsw.prefetch")
+
+    def broken(ids):
+        raise TimeoutError("server busy")
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        distances = prefetch.PrefetchingDistances(lambda ids: ids * 2.0, broken, executor)
+        distances.prefetch(np.array([1, 2, 3]))
+        np.testing.assert_array_equal(distances(np.array([2, 5])), [4.0, 10.0])
+        stats = distances.finish()
+    assert stats["requests"] == 1
+    assert stats["prefetch_wasted"] == 2
+
+
+def test_prefetch_search_warns_about_native_only_options(monkeypatch, caplog):
+    hnsw_backend = pytest.importorskip("leann_backend_hnsw.hnsw_backend")
+    searcher = object.__new__(hnsw_backend.HNSWSearcher)
+    searcher.distance_metric = "mips"
+    calls = []
+    monkeypatch.setattr(searcher, "_prefetch_search", lambda *args: calls.append(args) or {})
+    query = np.zeros((1, 4), dtype=np.float32)
+
+    searcher.search(query, 3, zmq_port=5557, prefetch_depth=2)
+    assert len(calls) == 1 and "ignoring" not in caplog.text
+
+    searcher.search(query, 3, zmq_port=5557, prefetch_depth=2, beam_width=4, batch_size=8)
+    assert len(calls) == 2
+    assert "Prefetch search does not support beam_width=4, batch_size=8" in caplog.text
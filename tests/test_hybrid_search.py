@@ -0,0 +1,123 @@
+"""
+Tests for hybrid keyword + vector retrieval and the rank fusion helpers.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+from leann.api import LeannSearcher, SearchResult
+from leann.hybrid import fuse_results, reciprocal_rank_fusion, weighted_score_fusion
+
+
+def ranking(ids, scores):
+    return [SearchResult(id=i, score=s, text=f"text {i}") for i, s in zip(ids, scores)]
+
+
+def test_rrf_rewards_agreement_between_rankings():
+    fused = reciprocal_rank_fusion([ranking("abc", [3, 2, 1]), ranking("bcd", [9, 8, 7])])
+    assert [r.id for r in fused] == ["b", "c", "a", "d"]
+    assert fused[0].score == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[0].text == "text b"
+
+
+def test_weighted_fusion_handles_distance_rankings():
+    # Lower-is-better distances (ascending) and higher-is-better BM25 (descending)
+    distances = ranking("xyz", [0.1, 0.5, 0.9])
+    bm25 = ranking("zyx", [12.0, 6.0, 0.0])
+    fused = weighted_score_fusion([distances, bm25], weights=[0.8, 0.2])
+    assert [r.id for r in fused] == ["x", "y", "z"]
+    assert fused[0].score == pytest.approx(0.8)
+    assert fused[1].score == pytest.approx(0.5)
+
+
+def test_fuse_results_alpha_extremes_and_validation():
+    vec, kw = ranking("ab", [1, 0]), ranking("ba", [1, 0])
+    assert [r.id for r in fuse_results(vec, kw, 2, "weighted", alpha=1.0)] == ["a", "b"]
+    assert [r.id for r in fuse_results(vec, kw, 1, "weighted", alpha=0.0)] == ["b"]
+    with pytest.raises(ValueError):
+        fuse_results(vec, kw, 2, alpha=1.5)
+    with pytest.raises(ValueError):
+        fuse_results(vec, kw, 2, method="max")
+
+
+PASSAGES = {
+    "0": "error handling with retries and backoff",
+    "1": "ConnectionResetError raised by the socket layer",
+    "2": "a gentle introduction to graph indexes",
+    "3": "retry policies for flaky network calls",
+}
+
+
+class FakeVectorBackend:
+    """Returns a fixed semantic ranking and records the thread it ran on."""
+
+    def __init__(self):
+        self.thread = None
+        self.top_k = None
+
+    def compute_query_embedding(self, query, **kwargs):
+        return np.zeros((1, 4), dtype=np.float32)
+
+    def search(self, query, top_k, **kwargs):
+        self.thread = threading.get_ident()
+        self.top_k = top_k
+        labels = ["3", "0", "2", "1"][:top_k]
+        return {"labels": [labels], "distances": [[0.9, 0.8, 0.3, 0.1][:top_k]]}
+
+
+@pytest.fixture
+def searcher(write_index):
+    backend = FakeVectorBackend()
+
+    index_path = write_index(
+        "hybrid", backend, [(pid, text, {"n": int(pid)}) for pid, text in PASSAGES.items()]
+    )
+    searcher = LeannSearcher(index_path)
+    searcher.fake_backend = backend
+    return searcher
+
+
+def test_hybrid_search_fuses_both_sides(searcher):
+    keyword_threads = []
+    original = searcher._keyword_search
+
+    def spy(*args, **kwargs):
+        keyword_threads.append(threading.get_ident())
+        return original(*args, **kwargs)
+
+    searcher._keyword_search = spy
+    results = searcher.search(
+        "ConnectionResetError retries",
+        top_k=2,
+        recompute_embeddings=False,
+        search_mode="hybrid",
+    )
+    # "0" is ranked well by both sides; "1" is lifted by its exact keyword hit
+    assert [r.id for r in results] == ["0", "1"]
+    assert searcher.fake_backend.top_k == 4
+    assert keyword_threads and keyword_threads[0] != searcher.fake_backend.thread
+
+
+def test_hybrid_search_keyword_heavy_alpha(searcher):
+    results = searcher.search(
+        "ConnectionResetError",
+        top_k=1,
+        recompute_embeddings=False,
+        search_mode="hybrid",
+        hybrid_fusion="weighted",
+        hybrid_alpha=0.2,
+    )
+    assert [r.id for r in results] == ["1"]
+
+
+def test_hybrid_search_applies_metadata_filters(searcher):
+    results = searcher.search(
+        "retry",
+        top_k=4,
+        recompute_embeddings=False,
+        search_mode="hybrid",
+        metadata_filters={"n": {">=": 2}},
+    )
+    assert {r.id for r in results} <= {"2", "3"}
+    assert results[0].id == "3"
@@ -0,0 +1,85 @@
+"""
+Tests for the compact label -> passage id map and the passage offset files.
+"""
+
+import json
+import pickle
+
+import numpy as np
+from leann.api import PassageManager
+from leann.id_map import (
+    IdMap,
+    SequentialOffsets,
+    id_map_prefix,
+    load_passage_offsets,
+    save_passage_offsets,
+)
+
+
+def test_sequential_ids_are_stored_as_identity(tmp_path):
+    prefix = id_map_prefix(tmp_path / "demo.leann")
+    assert prefix == tmp_path / "demo"
+
+    IdMap.from_ids([str(i) for i in range(5)]).save(prefix)
+    assert not (tmp_path / "demo.idmap.blob.npy").exists()
+
+    id_map = IdMap.load(prefix)
+    assert id_map.identity and len(id_map) == 5
+    assert id_map.lookup([4, 0, 7]) == ["4", "0", "7"]
+
+
+def test_arbitrary_ids_round_trip_through_mmap(tmp_path):
+    ids = ["doc-a", "ü-2", "", "0", "chunk/10"]
+    IdMap.from_ids(ids).save(tmp_path / "demo")
+
+    id_map = IdMap.load(tmp_path / "demo")
+    assert not id_map.identity
+    assert isinstance(id_map._blob, np.memmap)
+    assert list(id_map) == ids
+    assert id_map[1] == "ü-2" and id_map[-1] == "chunk/10"
+    # Labels outside the map (e.g. added after the map was written) fall back to str(label)
+    assert id_map.lookup(np.array([4, 9, 0])) == ["chunk/10", "9", "doc-a"]
+
+
+def test_legacy_ids_txt_is_still_read(tmp_path):
+    (tmp_path / "old.ids.txt").write_text("x\ny\n", encoding="utf-8")
+    assert list(IdMap.load(tmp_path / "old")) == ["x", "y"]
+    assert IdMap.load(tmp_path / "missing") is None
+
+
+def test_passage_offsets_use_npy_only_for_sequential_ids(tmp_path):
+    sequential = tmp_path / "seq.passages.idx"
+    save_passage_offsets(sequential, {"0": 0, "1": 17, "2": 40})
+    offsets = load_passage_offsets(sequential)
+    assert isinstance(offsets, SequentialOffsets)
+    assert offsets["1"] == 17 and len(offsets) == 3
+    assert "3" not in offsets and "01" not in offsets and 1 not in offsets
+    assert dict(offsets) == {"0": 0, "1": 17, "2": 40}
+
+    custom = tmp_path / "custom.passages.idx"
+    save_passage_offsets(custom, {"a": 0, "b": 9})
+    with open(custom, "rb") as f:
+        assert pickle.load(f) == {"a": 0, "b": 9}
+    assert load_passage_offsets(custom) == {"a": 0, "b": 9}
+
+
+def test_passage_manager_reads_both_offset_formats(tmp_path):
+    for name, ids in (("seq", ["0", "1"]), ("custom", ["a", "b"])):
+        offset_map = {}
+        with open(tmp_path / f"{name}.passages.jsonl", "w", encoding="utf-8") as f:
+            for passage_id in ids:
+                offset_map[passage_id] = f.tell()
+                f.write(json.dumps({"id": passage_id, "text": f"{name} {passage_id}"}) + "\n")
+        save_passage_offsets(tmp_path / f"{name}.passages.idx", offset_map)
+
+        manager = PassageManager(
+            [
+                {
+                    "type": "jsonl",
+                    "path": str(tmp_path / f"{name}.passages.jsonl"),
+                    "index_path": str(tmp_path / f"{name}.passages.idx"),
+                }
+            ]
+        )
+        assert len(manager) == 2
+        assert manager.get_passage(ids[1])["text"] == f"{name} {ids[1]}"
@@ -0,0 +1,93 @@
+"""
+Import-time budget for the CLI: `leann --help` and `leann list` must not pull in
+the embedding, LLM, document-loading or backend stacks.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from leann import registry
+
+# Cumulative `python -X importtime` microseconds allowed for leann.cli (about 0.15 s locally)
+IMPORT_BUDGET_US = 1_000_000
+HEAVY_MODULES = (
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "llama_index",
+    "tiktoken",
+    "leann_backend_hnsw",
+    "leann_backend_diskann",
+    "leann.chat",
+    "leann.embedding_compute",
+)
+
+
+def import_times(code: str, cwd) -> dict[str, int]:
+    """Cumulative import time in microseconds per module imported while running ``code``."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def heavy_imports(times: dict[str, int]) -> list[str]:
+    return sorted(
+        name for name in times if any(name == m or name.startswith(f"{m}.") for m in HEAVY_MODULES)
+    )
+
+
+def test_cli_import_stays_light_and_within_budget(tmp_path):
+    times = import_times("import leann.cli", tmp_path)
+    assert heavy_imports(times) == []
+    assert times["leann.cli"] < IMPORT_BUDGET_US, f"leann.cli took {times['leann.cli']} us"
+
+
+@pytest.mark.parametrize("argv", [["--help"], ["list"]])
+def test_cli_commands_do_not_load_heavy_stacks(tmp_path, argv):
+    code = (
+        "import sys\n"
+        "from leann.cli import main\n"
+        f"sys.argv = ['leann', *{argv!r}]\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+    )
+    assert heavy_imports(import_times(code, tmp_path)) == []
+
+
+def test_backends_are_imported_on_first_lookup(monkeypatch):
+    imported = []
+
+    class Factory:
+        pass
+
+    def fake_import(module_name):
+        imported.append(module_name)
+        registry.BACKEND_REGISTRY["lazy-test"] = Factory
+
+    monkeypatch.setattr(registry.importlib, "import_module", fake_import)
+    monkeypatch.setattr(registry, "discover_backend_modules", lambda: {"lazy-test": "lazy_pkg"})
+    try:
+        assert registry.get_backend("lazy-test") is Factory
+        assert registry.get_backend("lazy-test") is Factory
+        assert imported == ["lazy_pkg"]
+    finally:
+        registry.BACKEND_REGISTRY.pop("lazy-test", None)
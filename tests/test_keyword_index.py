@@ -0,0 +1,130 @@
+"""
+Tests for the keyword (BM25) index and the grep/keyword search paths of LeannSearcher.
+"""
+
+import json
+
+import numpy as np
+import pytest
+from leann.api import LeannSearcher
+from leann.keyword_index import (
+    KeywordIndex,
+    decode_varints,
+    encode_varints,
+    keyword_index_dir,
+    parse_query,
+)
+
+PASSAGES = [
+    ("a", "The quick brown fox jumps over the lazy dog", {"lang": "en", "n": 0}),
+    ("b", "quick quick fox", {"lang": "en", "n": 1}),
+    ("c", "Lazy dogs sleep; the dog is lazy. TODO: feed them", {"lang": "en", "n": 2}),
+    ("d", "def train_model(data): return fit(data)", {"lang": "py", "n": 3}),
+    ("e", "server_port=8080 and server port 9090", {"lang": "cfg", "n": 4}),
+]
+
+
+def test_varint_roundtrip():
+    values = np.array([0, 1, 127, 128, 300, 16383, 16384, 2**32 + 5], dtype=np.int64)
+    encoded, nbytes = encode_varints(values)
+    assert nbytes.tolist() == [1, 1, 1, 2, 2, 2, 3, 5]
+    assert decode_varints(encoded).tolist() == values.tolist()
+    assert decode_varints(encode_varints(np.array([], dtype=np.int64))[0]).tolist() == []
+
+
+def test_parse_query_extracts_phrases():
+    terms, phrases = parse_query('Memory "graph pruning" cost')
+    assert terms == ["memory", "graph", "pruning", "cost"]
+    assert phrases == [["graph", "pruning"]]
+
+
+@pytest.fixture
+def index(tmp_path):
+    return KeywordIndex.build(tmp_path / "x.keyword", [(pid, text) for pid, text, _ in PASSAGES])
+
+
+def ranked_ids(index, query, **kwargs):
+    docs, _ = index.search(query, **kwargs)
+    return [index.passage_ids[d] for d in docs]
+
+
+def test_bm25_prefers_higher_term_frequency(index):
+    assert ranked_ids(index, "quick") == ["b", "a"]
+    docs, scores = index.search("quick fox")
+    assert np.all(np.diff(scores) <= 0)
+    assert ranked_ids(index, "unknownword") == []
+
+
+def test_phrase_queries_require_consecutive_terms(index):
+    assert ranked_ids(index, '"lazy dog"') == ["a"]
+    assert set(ranked_ids(index, "lazy dog")) == {"a", "c"}
+    assert ranked_ids(index, "the dog is lazy", phrase=True) == ["c"]
+    assert ranked_ids(index, '"dog lazy"') == []
+
+
+def test_open_or_build_reuses_and_rebuilds_when_stale(tmp_path):
+    passages = tmp_path / "p.jsonl"
+    passages.write_text(json.dumps({"id": "1", "text": "alpha beta"}) + "\n")
+    first = KeywordIndex.open_or_build(str(tmp_path / "p"), [str(passages)])
+    assert ranked_ids(first, "alpha") == ["1"]
+    mtime = (keyword_index_dir(str(tmp_path / "p")) / "meta.json").stat().st_mtime_ns
+    again = KeywordIndex.open_or_build(str(tmp_path / "p"), [str(passages)])
+    assert (again.directory / "meta.json").stat().st_mtime_ns == mtime
+
+    with open(passages, "a") as f:
+        f.write(json.dumps({"id": "2", "text": "gamma alpha alpha"}) + "\n")
+    rebuilt = KeywordIndex.open_or_build(str(tmp_path / "p"), [str(passages)])
+    assert ranked_ids(rebuilt, "alpha") == ["2", "1"]
+
+
+@pytest.fixture
+def searcher(write_index):
+    return LeannSearcher(write_index("keyword", object(), PASSAGES))
+
+
+def test_keyword_search_mode(searcher):
+    results = searcher.search("lazy dog", top_k=5, search_mode="keyword")
+    assert [r.id for r in results][:2] == ["c", "a"]
+    assert results[0].metadata["n"] == 2
+    assert keyword_index_dir(searcher.index_path).exists()
+
+    filtered = searcher.search(
+        "lazy dog", top_k=5, search_mode="keyword", metadata_filters={"n": {"<": 2}}
+    )
+    assert [r.id for r in filtered] == ["a"]
+
+
+def test_grep_search_keeps_exact_match_semantics(searcher):
+    assert [r.id for r in searcher.search("def train_model", use_grep=True)] == ["d"]
+    assert [r.id for r in searcher.search("TODO:", use_grep=True)] == ["c"]
+    assert [r.id for r in searcher.search("server_port=", use_grep=True)] == ["e"]
+    assert searcher.search("lazy cat", use_grep=True) == []
+
+
+def test_grep_search_matches_inside_words(searcher):
+    assert [r.id for r in searcher.search("rain_mod", use_grep=True)] == ["d"]
+    assert sorted(r.id for r in searcher.search("azy do", use_grep=True)) == ["a", "c"]
+    assert [r.id for r in searcher.search("ick brown f", use_grep=True)] == ["a"]
+    assert [r.id for r in searcher.search("erver_port=80", use_grep=True)] == ["e"]
+    assert searcher.search("ick fox j", use_grep=True) == []
+
+
+def test_substring_search_expands_edge_tokens(index):
+    assert index.vocab.find("o", prefix=True).tolist() == [
+        i for i, term in enumerate(index.vocab) if term.startswith("o")
+    ]
+    docs, _ = index.substring_search("own fox jum")
+    assert [index.passage_ids[d] for d in docs] == ["a"]
+    docs, _ = index.substring_search("dog")
+    assert sorted(index.passage_ids[d] for d in docs) == ["a", "c"]
+    assert len(index.substring_search("fox dog")[0]) == 0
+
+
+def test_grep_search_punctuation_only_falls_back_to_scan(searcher):
+    assert [r.id for r in searcher.search("):", use_grep=True)] == ["d"]
+    assert [r.id for r in searcher.search("; ", use_grep=True)] == ["c"]
+
+
+def test_unknown_search_mode_is_rejected(searcher):
+    with pytest.raises(ValueError, match="search_mode"):
+        searcher.search("x", search_mode="fuzzy")
@@ -0,0 +1,116 @@
+"""
+Tests for the doc-contiguous MaxSim engine of the multi-vector PDF app.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+APP_DIR = Path(__file__).parent.parent / "apps" / "multimodal" / "vision-based-pdf-multi-vector"
+sys.path.insert(0, str(APP_DIR))
+
+from maxsim import MultiVectorStore  # noqa: E402
+
+
+def naive_maxsim(query, doc_tokens):
+    """sum_i max_j q_i . d_j, scoring documents without tokens as 0."""
+    if not len(doc_tokens):
+        return 0.0
+    return float((query @ np.asarray(doc_tokens, dtype=np.float32).T).max(axis=1).sum())
+
+
+def random_documents(num_docs=40, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    docs = [rng.normal(size=(int(rng.integers(0, 25)), dim)) for _ in range(num_docs)]
+    docs[3] = np.zeros((0, dim))  # a page without tokens
+    return docs, rng.normal(size=(6, dim)).astype(np.float32)
+
+
+@pytest.mark.parametrize("block_tokens,num_threads", [(7, 1), (64, 3), (1 << 14, 1)])
+def test_blocked_maxsim_matches_naive(block_tokens, num_threads):
+    docs, query = random_documents()
+    store = MultiVectorStore.from_documents(list(range(len(docs))), docs, dtype=np.float32)
+    expected = np.array([naive_maxsim(query, d) for d in docs], dtype=np.float32)
+
+    scores = store.maxsim(query, block_tokens=block_tokens, num_threads=num_threads)
+    np.testing.assert_allclose(scores, expected, rtol=1e-5, atol=1e-5)
+    # Scattered candidate subsets read each page as its own run
+    subset = np.array([30, 2, 3, 17, 18, 19, 5])
+    np.testing.assert_allclose(
+        store.maxsim(query, subset, block_tokens=block_tokens, num_threads=num_threads),
+        expected[subset],
+        rtol=1e-5,
+        atol=1e-5,
+    )
+
+    top = store.top_k(query, 5, block_tokens=block_tokens)
+    assert [doc_id for _, doc_id in top] == np.argsort(-expected, kind="stable")[:5].tolist()
+
+
+def test_fp16_store_stays_close_to_fp32():
+    docs, query = random_documents(seed=1)
+    store = MultiVectorStore.from_documents(list(range(len(docs))), docs)
+    assert store.tokens.dtype == np.float16
+    expected = [naive_maxsim(query, d) for d in docs]
+    np.testing.assert_allclose(store.maxsim(query), expected, rtol=1e-2, atol=1e-2)
+
+
+def test_from_token_rows_groups_rows_by_document():
+    rows = np.arange(12, dtype=np.float32).reshape(6, 2)
+    store = MultiVectorStore.from_token_rows(rows, np.array([5, 3, 5, 7, 3, 5]), np.float32)
+    # Documents keep the order of their first row
+    assert store.doc_ids.tolist() == [5, 3, 7]
+    assert store.offsets.tolist() == [0, 3, 5, 6]
+    assert store.tokens[:, 0].tolist() == [0, 4, 10, 2, 8, 6]
+
+    grouped = MultiVectorStore.from_token_rows(rows, np.array([9, 9, 2, 2, 2, 4]), np.float32)
+    np.testing.assert_array_equal(grouped.tokens, rows)  # already grouped: rows unchanged
+    assert grouped.doc_positions_of_rows(np.array([0, 1, 2, 4, 5])).tolist() == [0, 0, 1, 1, 2]
+
+
+def test_positions_of_drops_unknown_ids():
+    store = MultiVectorStore.from_documents(
+        [40, 10, 30], [np.ones((2, 4)), np.ones((1, 4)), np.ones((3, 4))]
+    )
+    assert store.positions_of(np.array([30, 99, 40, 10, -1])).tolist() == [2, 0, 1]
+    assert store.positions_of(np.array([], dtype=np.int64)).tolist() == []
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    docs, query = random_documents(seed=2)
+    store = MultiVectorStore.from_documents(list(range(100, 140)), docs)
+    store.save(tmp_path / "demo")
+    assert MultiVectorStore.exists(tmp_path / "demo")
+    loaded = MultiVectorStore.load(tmp_path / "demo")
+    assert isinstance(loaded.tokens, np.memmap)
+    assert loaded.top_k(query, 5) == store.top_k(query, 5)
+
+
+def test_legacy_embeddings_file_is_regrouped(tmp_path):
+    pytest.importorskip("PIL")
+    pytest.importorskip("tqdm")
+    leann_multi_vector = pytest.importorskip("leann_multi_vector")
+    docs, query = random_documents(num_docs=6, dim=8, seed=3)
+    # Indexes built before the token store: float32 rows in insertion order plus labels.json
+    row_doc_ids = [doc_id for doc_id, d in enumerate(docs) for _ in range(len(d))]
+    order = np.random.default_rng(0).permutation(len(row_doc_ids))
+    rows = np.concatenate([d for d in docs if len(d)]).astype(np.float32)[order]
+    labels = [{"doc_id": row_doc_ids[i], "filepath": ""} for i in order]
+    index_path = tmp_path / "legacy.leann"
+    np.save(tmp_path / "legacy.leann.emb.npy", rows)
+    (tmp_path / "legacy.leann.labels.json").write_text(json.dumps(labels))
+
+    index = leann_multi_vector.LeannMultiVector(str(index_path), dim=8)
+    store = index._load_store_if_needed()
+    assert store is not None and not index._store_rows_are_labels
+    # Regrouped rows are held in fp16 like a freshly built store
+    fp16_docs = [np.asarray(d, dtype=np.float16) for d in docs]
+    expected = {i: naive_maxsim(query, d) for i, d in enumerate(fp16_docs) if len(d)}
+    for score, doc_id in store.top_k(query, len(expected)):
+        assert score == pytest.approx(expected[doc_id], rel=1e-5, abs=1e-5)
+    # First-stage labels are rows of .emb.npy and resolve through labels.json
+    positions = index._candidate_positions([["0", "1"]])
+    assert sorted(store.doc_ids[positions]) == sorted({labels[0]["doc_id"], labels[1]["doc_id"]})
@@ -0,0 +1,110 @@
+"""
+Tests for centroid-pruned (PLAID-style) search in the multi-vector PDF app.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+APP_DIR = Path(__file__).parent.parent / "apps" / "multimodal" / "vision-based-pdf-multi-vector"
+sys.path.insert(0, str(APP_DIR))
+
+from maxsim import MultiVectorStore  # noqa: E402
+from plaid import CentroidIndex  # noqa: E402
+
+
+def clustered_store(num_docs=150, dim=10, topics=12, seed=0):
+    """Pages whose tokens are drawn around two of ``topics`` directions each."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(topics, dim))
+    docs = []
+    for _ in range(num_docs):
+        picked = rng.choice(topics, size=2, replace=False)
+        n = int(rng.integers(4, 20))
+        tokens = centers[rng.choice(picked, size=n)] + 0.3 * rng.normal(size=(n, dim))
+        docs.append(tokens / np.linalg.norm(tokens, axis=1, keepdims=True))
+    ids = list(range(1000, 1000 + num_docs))
+    return MultiVectorStore.from_documents(ids, docs, dtype=np.float32), docs
+
+
+def query_near(doc, seed):
+    rng = np.random.default_rng(seed)
+    query = doc[rng.choice(len(doc), size=6)] + 0.1 * rng.normal(size=(6, doc.shape[1]))
+    return query.astype(np.float32)
+
+
+@pytest.mark.parametrize("nbits", [2, 4])
+def test_residual_decompression_error_is_bounded(nbits):
+    store, _ = clustered_store()
+    index = CentroidIndex.build(store, num_centroids=16, nbits=nbits)
+    rows = np.arange(len(store.tokens))
+    tokens = np.asarray(store.tokens, dtype=np.float32)
+    residual = tokens - index.centroids[index.codes.astype(np.int64)]
+    error = np.abs(index.decompress(rows) - tokens)
+
+    # Residuals inside the interior buckets decode to a weight within the same bucket
+    inside = (residual > index.cutoffs[0]) & (residual <= index.cutoffs[-1])
+    assert inside.mean() > 0.4
+    assert error[inside].max() <= np.diff(index.cutoffs).max() + 1e-6
+    # Residual codes recover most of what the centroid alone misses
+    assert (error**2).mean() < 0.5 * (residual**2).mean()
+
+
+def test_ivf_candidates_cover_probed_centroids():
+    store, docs = clustered_store()
+    index = CentroidIndex.build(store, num_centroids=16)
+    doc_of_row = np.repeat(np.arange(len(store)), np.diff(store.offsets))
+    query = query_near(docs[7], seed=1)
+    query_scores = query @ index.centroids.T
+
+    for nprobe in (1, 3):
+        probed = np.argsort(-query_scores, axis=1)[:, :nprobe]
+        owning = np.isin(index.codes.astype(np.int64), probed)
+        expected = np.unique(doc_of_row[owning])
+        np.testing.assert_array_equal(index.candidates(query_scores, nprobe), expected)
+    assert len(index.candidates(query_scores, nprobe=16)) == len(store)
+
+
+def test_ivf_candidates_recall_exact_top_k():
+    store, docs = clustered_store()
+    index = CentroidIndex.build(store, num_centroids=16)
+    hits = total = 0
+    for seed, doc in enumerate(docs[:20]):
+        query = query_near(doc, seed)
+        exact = set(np.argsort(-store.maxsim(query))[:10].tolist())
+        candidates = set(index.candidates(query @ index.centroids.T, nprobe=2).tolist())
+        hits += len(exact & candidates)
+        total += len(exact)
+    assert hits / total >= 0.9
+
+
+def test_search_agrees_with_exact_maxsim():
+    store, docs = clustered_store()
+    index = CentroidIndex.build(store, num_centroids=16)
+    overlap = []
+    for seed, doc in enumerate(docs[:20]):
+        query = query_near(doc, seed)
+        exact = store.top_k(query, 5)
+        # Nothing pruned: the three stages reduce to exact MaxSim
+        assert index.search(store, query, 5, nprobe=16, ncandidates=4 * len(store)) == exact
+        pruned = index.search(store, query, 5, nprobe=4, ncandidates=40)
+        overlap.append(len({d for _, d in pruned} & {d for _, d in exact}) / 5)
+    assert np.mean(overlap) >= 0.9
+
+
+def test_save_and_load_roundtrip(tmp_path):
+    store, docs = clustered_store()
+    index = CentroidIndex.build(store, num_centroids=16, nbits=2)
+    index.save(tmp_path / "demo")
+    assert CentroidIndex.exists(tmp_path / "demo")
+    loaded = CentroidIndex.load(tmp_path / "demo")
+
+    for name in ("centroids", "codes", "residuals", "cutoffs", "weights", "ivf", "ivf_offsets"):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(index, name))
+    assert loaded.nbits == 2
+    query = query_near(docs[3], seed=3)
+    assert loaded.search(store, query, 5, ncandidates=40) == index.search(
+        store, query, 5, ncandidates=40
+    )
@@ -0,0 +1,282 @@
+"""
+Performance regression tier: hot paths timed against stored baselines.
+
+Deselected by default; run with ``pytest -m perf``. Each case builds a
+deterministic synthetic fixture, times a workload (best of several runs) and
+samples its peak RSS growth, then compares both to ``perf_baselines.json``.
+
+Timings are stored relative to a fixed calibration workload measured in the same
+session, so the baselines carry over between machines of different speed.
+
+- ``LEANN_PERF_TOLERANCE``: widen or narrow every band (e.g. ``2`` doubles it).
+- ``LEANN_PERF_UPDATE=1``: rewrite the baselines from this run instead of checking.
+- ``LEANN_PERF_REPORT=path``: also write this run's measurements as JSON.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import msgpack
+import numpy as np
+import psutil
+import pytest
+import zmq
+from leann.api import PassageManager
+from leann.id_map import save_passage_offsets
+from leann.metadata_filter import MetadataFilterEngine
+from leann.zmq_client import EmbeddingServerClient
+
+pytestmark = pytest.mark.perf
+
+BASELINES_FILE = Path(__file__).with_name("perf_baselines.json")
+# A workload may take this many times its baseline before the test fails
+TIME_TOLERANCE = 1.5
+# Peak RSS growth may exceed its baseline by this fraction plus RSS_SLACK_MB
+RSS_TOLERANCE = 0.25
+RSS_SLACK_MB = 16.0
+REPEATS = 7
+
+
+def _calibration_workload(matrix: np.ndarray) -> None:
+    table = {f"key-{i}": i for i in range(50_000)}
+    sum(table[f"key-{i}"] for i in range(0, 50_000, 3))
+    json.loads(json.dumps([{"id": i, "text": "x" * 32} for i in range(5_000)]))
+    matrix @ matrix
+
+
+class PerfRecorder:
+    """Measures workloads and checks them against the stored baselines."""
+
+    def __init__(self):
+        self.scale = float(os.getenv("LEANN_PERF_TOLERANCE", "1"))
+        self.update = os.getenv("LEANN_PERF_UPDATE") == "1"
+        self.baselines = json.loads(BASELINES_FILE.read_text()) if BASELINES_FILE.exists() else {}
+        self.results: dict[str, dict[str, float]] = {}
+        matrix = np.random.default_rng(0).random((256, 256))
+        self.calibration = self._best_seconds(lambda: _calibration_workload(matrix), REPEATS)
+
+    @staticmethod
+    def _best_seconds(fn, repeats: int) -> float:
+        fn()  # Warm caches, imports and lazily built structures
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        # The fastest run is the least disturbed by other load on the machine
+        return min(timings)
+
+    @staticmethod
+    def _peak_rss_growth_mb(fn) -> float:
+        process = psutil.Process()
+        start = peak = process.memory_info().rss
+        done = threading.Event()
+
+        def sample():
+            nonlocal peak
+            while not done.wait(0.001):
+                peak = max(peak, process.memory_info().rss)
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        try:
+            fn()
+        finally:
+            done.set()
+            sampler.join()
+        peak = max(peak, process.memory_info().rss)
+        return (peak - start) / (1024 * 1024)
+
+    def check(self, name: str, fn, repeats: int = REPEATS) -> None:
+        # Timed runs first, without the sampler thread competing for the GIL
+        relative_time = self._best_seconds(fn, repeats) / self.calibration
+        peak_rss_mb = self._peak_rss_growth_mb(fn)
+        self.results[name] = {"relative_time": relative_time, "peak_rss_mb": peak_rss_mb}
+        baseline = self.baselines.get(name)
+        if self.update or baseline is None:
+            return
+
+        time_limit = baseline["relative_time"] * TIME_TOLERANCE * self.scale
+        assert relative_time <= time_limit, (
+            f"{name}: {relative_time:.2f}x calibration, baseline {baseline['relative_time']:.2f}x "
+            f"(limit {time_limit:.2f}x)"
+        )
+        rss_limit = (baseline["peak_rss_mb"] * (1 + RSS_TOLERANCE) + RSS_SLACK_MB) * self.scale
+        assert peak_rss_mb <= rss_limit, (
+            f"{name}: peak RSS grew {peak_rss_mb:.1f} MB, baseline "
+            f"{baseline['peak_rss_mb']:.1f} MB (limit {rss_limit:.1f} MB)"
+        )
+
+    def finish(self) -> None:
+        if self.update and self.results:
+            merged = {**self.baselines, **self.results}
+            BASELINES_FILE.write_text(
+                json.dumps(
+                    {k: {m: round(v, 3) for m, v in merged[k].items()} for k in sorted(merged)},
+                    indent=2,
+                )
+                + "\n"
+            )
+        report = os.getenv("LEANN_PERF_REPORT")
+        if report:
+            Path(report).write_text(
+                json.dumps({"calibration_seconds": self.calibration, "results": self.results})
+            )
+
+
+@pytest.fixture(scope="module")
+def perf():
+    recorder = PerfRecorder()
+    yield recorder
+    recorder.finish()
+
+
+def mock_embeddings(n: int, dim: int = 768) -> np.ndarray:
+    """Stand-in for the embedding model: fixed random unit vectors."""
+    vectors = np.random.default_rng(7).normal(size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_passage_lookup(perf, tmp_path):
+    n = 20_000
+    offsets = {}
+    with open(tmp_path / "perf.leann.passages.jsonl", "w", encoding="utf-8") as f:
+        for i in range(n):
+            offsets[str(i)] = f.tell()
+            passage = {"id": str(i), "text": f"passage {i} " * 8, "metadata": {"n": i}}
+            f.write(json.dumps(passage) + "\n")
+    save_passage_offsets(tmp_path / "perf.leann.passages.idx", offsets)
+    sources = [
+        {
+            "type": "jsonl",
+            "path": "perf.leann.passages.jsonl",
+            "index_path": "perf.leann.passages.idx",
+        }
+    ]
+    ids = [str(i) for i in np.random.default_rng(1).integers(0, n, 5_000)]
+
+    def workload():
+        manager = PassageManager(sources, metadata_file_path=str(tmp_path / "perf.leann.meta.json"))
+        for passage_id in ids:
+            manager.get_passage(passage_id)
+
+    perf.check("passage_lookup", workload)
+
+
+def test_metadata_filter(perf):
+    rng = np.random.default_rng(2)
+    results = [
+        {
+            "id": str(i),
+            "metadata": {
+                "chapter": int(rng.integers(1, 50)),
+                "genre": ["fiction", "drama", "poetry", "essay"][i % 4],
+                "title": f"Book {i} of the series",
+                "published": bool(i % 3),
+            },
+        }
+        for i in range(20_000)
+    ]
+    filters = {
+        "chapter": {"<=": 25},
+        "genre": {"in": ["fiction", "drama"]},
+        "title": {"contains": "series"},
+        "published": {"is_true": True},
+    }
+    engine = MetadataFilterEngine()
+    assert engine.apply_filters(results, filters)
+    perf.check("metadata_filter", lambda: engine.apply_filters(results, filters))
+
+
+def test_convert_to_csr(perf, tmp_path):
+    convert_to_csr = pytest.importorskip("leann_backend_hnsw.convert_to_csr")
+    if not hasattr(convert_to_csr, "convert_hnsw_graph_to_csr"):
+        pytest.skip("needs the real leann_backend_hnsw package")
+
+    n = 20_000
+    rng = np.random.default_rng(3)
+    cum = np.array([0, 32, 48, 64], dtype=np.int32)
+    levels = np.minimum(rng.geometric(0.7, n), 3).astype(np.int32)
+    offsets = np.zeros(n + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum(cum[levels])
+    neighbors = rng.integers(0, n, int(offsets[-1])).astype(np.int32)
+    neighbors[rng.random(len(neighbors)) < 0.3] = -1
+    header = {
+        "index_fourcc": convert_to_csr.INDEX_HNSW_FLAT_FOURCC,
+        "d": 8,
+        "ntotal": n,
+        "dummy1": 0,
+        "dummy2": 0,
+        "is_trained": True,
+        "metric_type": 1,
+        "metric_arg": 0.0,
+        "entry_point": 0,
+        "max_level": 2,
+        "efConstruction": 40,
+        "efSearch": 16,
+        "dummy_upper_beam": 1,
+    }
+    source = tmp_path / "input.index"
+    with open(source, "wb") as f:
+        convert_to_csr._write_index_header(f, header, np.array([0.7, 0.2, 0.1]), cum, levels)
+        f.write(b"\x00")  # Not compact
+        convert_to_csr.write_numpy_vector(f, offsets, "Q")
+        convert_to_csr.write_numpy_vector(f, neighbors, "i")
+        convert_to_csr._write_scalar_params(f, header)
+        f.write(int.from_bytes(b"IxF2", "little").to_bytes(4, "little"))
+        f.write(rng.bytes(n * 32))
+
+    def workload():
+        assert convert_to_csr.convert_hnsw_graph_to_csr(
+            str(source), str(tmp_path / "output.index"), prune_embeddings=True
+        )
+
+    perf.check("convert_to_csr", workload, repeats=3)
+
+
+@pytest.fixture
+def mock_embedding_server():
+    """In-process REP server answering distance requests like the HNSW server, with a mock model."""
+    embeddings = mock_embeddings(10_000)
+    context = zmq.Context.instance()
+    socket = context.socket(zmq.REP)
+    port = socket.bind_to_random_port("tcp://127.0.0.1")
+    stop = threading.Event()
+
+    def serve():
+        poller = zmq.Poller()
+        poller.register(socket, zmq.POLLIN)
+        while not stop.is_set():
+            if not poller.poll(50):
+                continue
+            node_ids, query = msgpack.unpackb(socket.recv())
+            distances = embeddings[node_ids] @ np.asarray(query, dtype=np.float32)
+            socket.send(msgpack.packb([distances.tolist()]))
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield port
+    stop.set()
+    thread.join()
+    socket.close(0)
+
+
+def test_embedding_server_protocol(perf, mock_embedding_server):
+    client = EmbeddingServerClient(mock_embedding_server, timeout_ms=5000)
+    rng = np.random.default_rng(4)
+    requests = [
+        [rng.integers(0, 10_000, 64).tolist(), mock_embeddings(1)[0].tolist()] for _ in range(200)
+    ]
+
+    def workload():
+        for request in requests:
+            client.request(request)
+
+    try:
+        assert len(client.request(requests[0])[0]) == 64
+        perf.check("embedding_server_protocol", workload)
+    finally:
+        client.close()
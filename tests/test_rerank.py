@@ -0,0 +1,142 @@
+"""
+Tests for the cross-encoder rerank stage, using a fake CrossEncoder model.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from leann import rerank
+from leann.api import LeannSearcher, SearchResult
+from leann.rerank import DEFAULT_RERANK_MODEL, CrossEncoderReranker
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how many query words occur in the passage."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.batches.append([text for _, text in pairs])
+        return np.array(
+            [sum(w in text.split() for w in query.split()) for query, text in pairs],
+            dtype=np.float32,
+        )
+
+
+def test_pairs_are_batched_by_length():
+    model = FakeCrossEncoder()
+    reranker = CrossEncoderReranker(model=model, batch_size=2)
+    texts = ["a much longer passage here", "short", "mid size text", "tiny"]
+    reranker.score("passage", texts)
+    assert model.batches == [["tiny", "short"], ["mid size text", "a much longer passage here"]]
+
+
+def test_scores_are_cached_per_query_and_text():
+    model = FakeCrossEncoder()
+    reranker = CrossEncoderReranker(model=model)
+    first = reranker.score("q x", ["x y", "z"])
+    second = reranker.score("q x", ["z", "x y", "new x"])
+    assert first == [1.0, 0.0]
+    assert second == [0.0, 1.0, 1.0]
+    assert [len(b) for b in model.batches] == [2, 1]
+    assert (reranker.cache_hits, reranker.cache_misses) == (2, 3)
+    reranker.score("other", ["z"])
+    assert len(model.batches) == 3
+
+
+def test_cache_is_bounded():
+    reranker = CrossEncoderReranker(model=FakeCrossEncoder(), cache_size=2)
+    reranker.score("q", ["a", "b", "c"])
+    assert len(reranker._cache) == 2
+
+
+class BlockingCrossEncoder(FakeCrossEncoder):
+    """Holds every prediction until ``release`` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.active = 0
+        self.peak = 0
+
+    def predict(self, pairs, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.release.wait(5)
+        self.active -= 1
+        return super().predict(pairs, **kwargs)
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_inference_does_not_block_cache_hits(concurrent):
+    model = BlockingCrossEncoder()
+    reranker = CrossEncoderReranker(model=model, concurrent=concurrent)
+    model.release.set()
+    reranker.score("q", ["cached"])
+    model.release.clear()
+
+    with ThreadPoolExecutor(2) as pool:
+        slow = [pool.submit(reranker.score, "q", [f"new {i}"]) for i in range(2)]
+        time.sleep(0.2)
+        assert reranker.score("q", ["cached"]) == [0.0]
+        assert model.active == (2 if concurrent else 1)
+        model.release.set()
+        assert [f.result() for f in slow] == [[0.0], [0.0]]
+    assert model.peak == (2 if concurrent else 1)
+
+
+def test_rerank_reorders_and_rescores():
+    reranker = CrossEncoderReranker(model=FakeCrossEncoder())
+    results = [
+        SearchResult(id="1", score=0.9, text="unrelated words", metadata={"k": 1}),
+        SearchResult(id="2", score=0.5, text="graph index pruning", metadata={"k": 2}),
+        SearchResult(id="3", score=0.4, text="graph search", metadata={"k": 3}),
+    ]
+    reranked = reranker.rerank("graph pruning", results, top_k=2)
+    assert [r.id for r in reranked] == ["2", "3"]
+    assert reranked[0].score == 2.0
+    assert reranked[0].metadata == {"k": 2}
+    assert reranker.rerank("q", [], top_k=3) == []
+
+
+@pytest.fixture
+def searcher(write_index, monkeypatch):
+    texts = ["cats and dogs", "graph pruning in leann", "pruning trees", "graph theory"]
+
+    class Backend:
+        requested_top_k = None
+
+        def compute_query_embedding(self, query, **kwargs):
+            return np.zeros((1, 4), dtype=np.float32)
+
+        def search(self, query, top_k, **kwargs):
+            Backend.requested_top_k = top_k
+            labels = [str(i) for i in range(top_k)]
+            return {"labels": [labels], "distances": [[1.0 - i / 10 for i in range(top_k)]]}
+
+    index_path = write_index("rerank", Backend(), [(str(i), t, {}) for i, t in enumerate(texts)])
+    model = FakeCrossEncoder()
+    monkeypatch.setattr(
+        rerank, "_rerankers", {DEFAULT_RERANK_MODEL: CrossEncoderReranker(model=model)}
+    )
+    searcher = LeannSearcher(index_path)
+    searcher.backend_cls = Backend
+    searcher.model = model
+    return searcher
+
+
+def test_searcher_overfetches_then_reranks(searcher):
+    plain = searcher.search("graph pruning", top_k=1, recompute_embeddings=False)
+    assert [r.id for r in plain] == ["0"]
+
+    reranked = searcher.search("graph pruning", top_k=1, recompute_embeddings=False, rerank=True)
+    assert [r.id for r in reranked] == ["1"]
+    # top_k=1 over-fetches 4 candidates (the whole fake corpus) for the cross-encoder
+    assert searcher.backend_cls.requested_top_k == 4
+    assert sorted(searcher.model.batches[0]) == sorted(
+        ["cats and dogs", "graph pruning in leann", "pruning trees", "graph theory"]
+    )
@@ -0,0 +1,262 @@
+"""
+Tests for the `leann serve` HTTP search service, using fake searchers.
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from leann.api import SearchResult
+from leann.metrics import LatencyHistogram
+from leann.searcher_pool import SearcherPool
+from leann.service import SearchService
+
+
+class FakeSearcher:
+    def __init__(self, index_path, delay=0.0):
+        self.index_path = index_path
+        self.delay = delay
+        self.calls = []
+
+    def search(self, query, top_k=5, **kwargs):
+        import time
+
+        self.calls.append((query, top_k, kwargs))
+        time.sleep(self.delay)
+        return [
+            SearchResult(id=str(i), score=1.0 - i / 10, text=f"{query}-{i}", metadata={"n": i})
+            for i in range(top_k)
+        ]
+
+    def warmup(self):
+        self.warmed = True
+
+    def cleanup(self):
+        pass
+
+
+def make_service(delay=0.0, **kwargs):
+    created = {}
+
+    def factory(path):
+        created[path] = FakeSearcher(path, delay=delay)
+        return created[path]
+
+    def resolver(name):
+        return None if name == "missing" else f"/idx/{name}"
+
+    pool = SearcherPool(max_size=2, resolver=resolver, searcher_factory=factory)
+    service = SearchService(pool, **kwargs)
+    service.created = created
+    return service
+
+
+def call(service, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else b""
+    return asyncio.run(service.handle(method, path, data))
+
+
+def test_search_returns_json_results():
+    service = make_service()
+    status, payload = call(
+        service, "POST", "/search", {"index": "docs", "query": "hello", "top_k": 3}
+    )
+    assert status == 200
+    assert [r["text"] for r in payload["results"]] == ["hello-0", "hello-1", "hello-2"]
+    assert payload["results"][1]["metadata"] == {"n": 1}
+    assert "took_ms" in payload
+
+
+def test_batch_search_reuses_one_searcher():
+    service = make_service()
+    status, payload = call(
+        service, "POST", "/batch_search", {"index": "docs", "queries": ["a", "b"], "top_k": 1}
+    )
+    assert status == 200
+    assert [[r["text"] for r in batch] for batch in payload["results"]] == [["a-0"], ["b-0"]]
+    assert len(service.created) == 1
+
+
+def test_unknown_options_are_not_forwarded():
+    service = make_service()
+    call(service, "POST", "/search", {"index": "docs", "query": "q", "rm_rf": True})
+    searcher = service.created["/idx/docs"]
+    assert searcher.calls[0][2] == {}
+
+
+@pytest.mark.parametrize(
+    "method,path,body,expected",
+    [
+        ("POST", "/search", {"index": "docs"}, 400),
+        ("POST", "/search", {"index": "missing", "query": "q"}, 404),
+        ("GET", "/search", None, 405),
+        ("GET", "/nope", None, 404),
+        ("POST", "/batch_search", {"index": "docs", "queries": ["ok", ""]}, 400),
+    ],
+)
+def test_error_statuses(method, path, body, expected):
+    service = make_service()
+    status, payload = call(service, method, path, body)
+    assert status == expected
+    assert "error" in payload
+
+
+def test_stats_track_latency_and_pool():
+    service = make_service()
+    call(service, "POST", "/search", {"index": "docs", "query": "q"})
+    call(service, "POST", "/search", {"index": "docs", "query": "q"})
+    status, stats = call(service, "GET", "/stats")
+    assert status == 200
+    assert stats["latency"]["/search"]["count"] == 2
+    assert stats["pool"]["hits"] == 1
+    assert stats["status_counts"]["200"] == 2
+
+
+def test_unknown_paths_share_one_latency_bucket():
+    service = make_service()
+    for path in ("/nope", "/wp-admin/setup.php", "/search/../etc/passwd"):
+        call(service, "GET", path)
+    call(service, "POST", "/search", {"index": "docs", "query": "q"})
+    _, stats = call(service, "GET", "/stats")
+    assert stats["latency"]["other"]["count"] == 3
+    assert set(stats["latency"]) == {"other", "/search"}
+
+
+def test_overload_returns_503():
+    service = make_service(delay=0.2, max_concurrency=1, max_pending=1)
+
+    async def burst():
+        body = json.dumps({"index": "docs", "query": "q"}).encode()
+        return await asyncio.gather(*[service.handle("POST", "/search", body) for _ in range(4)])
+
+    statuses = sorted(status for status, _ in asyncio.run(burst()))
+    assert statuses.count(200) >= 2
+    assert 503 in statuses
+
+
+def test_http_roundtrip_with_keep_alive():
+    service = make_service()
+    result = {}
+
+    async def scenario():
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for query in ("first", "second"):
+            body = json.dumps({"index": "docs", "query": query, "top_k": 1}).encode()
+            writer.write(
+                b"POST /search HTTP/1.1\r\nHost: x\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            headers = {}
+            while (line := await reader.readline()) != b"\r\n":
+                k, _, v = line.decode().partition(":")
+                headers[k.lower()] = v.strip()
+            payload = json.loads(await reader.readexactly(int(headers["content-length"])))
+            result[query] = (status_line, payload)
+        writer.close()
+        server.close()
+        await server.wait_closed()
+
+    thread = threading.Thread(target=lambda: asyncio.run(scenario()))
+    thread.start()
+    thread.join(timeout=10)
+    assert result["first"][0].startswith(b"HTTP/1.1 200")
+    assert result["second"][1]["results"][0]["text"] == "second-0"
+    service.close()
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1e3"])
+def test_invalid_content_length_is_rejected(length):
+    service = make_service()
+    result = {}
+
+    async def scenario():
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"POST /search HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+        await writer.drain()
+        result["response"] = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+
+    thread = threading.Thread(target=lambda: asyncio.run(scenario()))
+    thread.start()
+    thread.join(timeout=10)
+    assert result["response"].startswith(b"HTTP/1.1 400")
+    assert b"Invalid Content-Length" in result["response"]
+    service.close()
+
+
+def test_llms_are_built_once_under_concurrency(monkeypatch):
+    built = []
+
+    def slow_get_llm(config):
+        built.append(config)
+        time.sleep(0.05)
+        return object()
+
+    monkeypatch.setattr("leann.chat.get_llm", slow_get_llm)
+    service = make_service()
+    threads = [
+        threading.Thread(target=service._get_llm, args=({"type": "simulated"},)) for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1
+    service.close()
+
+
+def test_ask_generates_outside_the_searcher_lease(monkeypatch):
+    service = make_service()
+    seen = {}
+
+    class FakeLLM:
+        def ask(self, prompt, **kwargs):
+            # Another request can take the same index while the answer is generated
+            def search():
+                with service.pool.acquire("docs") as searcher:
+                    seen["searcher"] = searcher
+
+            other = threading.Thread(target=search, daemon=True)
+            other.start()
+            other.join(timeout=5)
+            seen["searched_meanwhile"] = not other.is_alive()
+            seen["prompt"], seen["kwargs"] = prompt, kwargs
+            return "answer"
+
+    monkeypatch.setattr(service, "_get_llm", lambda config: FakeLLM())
+    status, payload = call(
+        service,
+        "POST",
+        "/ask",
+        {"index": "docs", "question": "why", "top_k": 2, "llm_kwargs": {"temperature": 0}},
+    )
+    assert status == 200 and payload["answer"] == "answer"
+    assert seen["searched_meanwhile"] and seen["searcher"] is service.created["/idx/docs"]
+    assert "why-1" in seen["prompt"] and "why-2" not in seen["prompt"]
+    assert seen["kwargs"] == {"temperature": 0}
+    service.close()
+
+
+def test_latency_histogram_quantiles():
+    hist = LatencyHistogram(buckets=(0.01, 0.1, 1.0))
+    for value in [0.005] * 90 + [0.05] * 9 + [5.0]:
+        hist.observe(value)
+    snap = hist.snapshot()
+    assert snap["count"] == 100
+    assert snap["p50"] == 0.01
+    assert snap["p95"] == 0.1
+    assert snap["p99"] == 0.1
+    assert hist.quantile(1.0) == 5.0
+    lines = hist.prometheus_lines("leann_latency_seconds", {"route": "/search"})
+    assert 'leann_latency_seconds_bucket{route="/search",le="+Inf"} 100' in lines
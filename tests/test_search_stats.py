@@ -0,0 +1,120 @@
+"""
+Tests for per-query SearchStats and the search tracer hook.
+"""
+
+import asyncio
+
+import pytest
+from leann.api import AsyncLeannSearcher, LeannBuilder, LeannSearcher
+from leann.tracing import SearchStats
+
+TEXTS = [f"passage number {i}" for i in range(20)]
+
+
+def counting_search(self, query, top_k, **kwargs):
+    """Reports traversal counters like the HNSW backend."""
+    labels = [str(i) for i in range(top_k)]
+    return {
+        "labels": [labels],
+        "distances": [[1.0 - i / 10 for i in range(top_k)]],
+        "stats": {"hops": 7, "zmq_requests": 3, "nodes_recomputed": 42, "cache_hits": 5},
+    }
+
+
+@pytest.fixture
+def searcher(tmp_path, fake_backend):
+    fake_backend("fake-stats", search=counting_search)
+    index_path = str(tmp_path / "stats.leann")
+    builder = LeannBuilder("fake-stats", embedding_model="fake")
+    for i, text in enumerate(TEXTS):
+        builder.add_text(text, metadata={"n": i})
+    builder.build_index(index_path)
+    spans = []
+    searcher = LeannSearcher(index_path, tracer=spans.append)
+    searcher.spans = spans
+    return searcher
+
+
+def test_graph_search_returns_stats(searcher):
+    results, stats = searcher.search(
+        "passage number 3",
+        top_k=6,
+        exact_threshold=0,
+        metadata_filters={"n": {"<": 4}},
+        return_stats=True,
+    )
+    assert isinstance(stats, SearchStats)
+    assert stats is searcher.last_stats
+    assert stats.path == "graph" and stats.mode == "vector"
+    # One round trip embeds the query, the backend reported the rest
+    assert stats.zmq_round_trips == 4
+    assert stats.nodes_visited == 7 and stats.nodes_recomputed == 42 and stats.cache_hits == 5
+    assert stats.passages_fetched == 6 and stats.filtered_out == 2 == 6 - len(results)
+    assert stats.filter_drop_rate == pytest.approx(2 / 6)
+    assert stats.total_time >= stats.server_time + stats.embedding_time + stats.search_time
+
+    as_dict = searcher.last_search_stats
+    assert as_dict["path"] == "graph" and as_dict["hops"] == 7
+    assert as_dict["filter_drop_rate"] == pytest.approx(2 / 6)
+
+
+def test_plain_search_still_returns_list(searcher):
+    results = searcher.search("passage number 3", top_k=2)
+    assert isinstance(results, list)
+    assert searcher.last_stats.path == "exact"
+    assert searcher.last_stats.passages_scored == len(TEXTS)
+    assert searcher.last_stats.zmq_round_trips is None
+
+
+def test_tracer_receives_nested_spans(searcher):
+    searcher.search("passage number 3", top_k=3, exact_threshold=0)
+    spans = {span.name: span for span in searcher.spans}
+    root = spans["leann.search"]
+    assert root.parent_span_id is None and len(root.trace_id) == 32
+    for name in ("leann.server_startup", "leann.embed_query", "leann.traversal"):
+        assert spans[name].parent_span_id == root.span_id
+        assert spans[name].trace_id == root.trace_id
+        assert root.start_time_unix_nano <= spans[name].start_time_unix_nano
+        assert spans[name].end_time_unix_nano <= root.end_time_unix_nano
+    assert root.attributes["leann.path"] == "graph"
+    assert root.attributes["leann.zmq_round_trips"] == 4
+    assert root.status == "OK"
+
+
+def test_failing_search_emits_error_span(searcher, monkeypatch):
+    def boom(*args, **kwargs):
+        raise RuntimeError("backend down")
+
+    monkeypatch.setattr(searcher.backend_impl, "search", boom)
+    with pytest.raises(RuntimeError):
+        searcher.search("passage number 3", exact_threshold=0)
+    statuses = {span.name: span.status for span in searcher.spans}
+    assert statuses["leann.traversal"] == "ERROR"
+    assert statuses["leann.search"] == "ERROR"
+
+
+def test_broken_tracer_does_not_fail_search(searcher):
+    def tracer(span):
+        raise ValueError("exporter offline")
+
+    searcher.tracer = tracer
+    assert len(searcher.search("passage number 3", top_k=2)) == 2
+
+
+def test_async_search_returns_stats(searcher):
+    async def run():
+        async with AsyncLeannSearcher(searcher=searcher) as async_searcher:
+            # No recompute: the fake backend has no embedding server to answer
+            return await async_searcher.search(
+                "passage number 3",
+                top_k=4,
+                exact_threshold=0,
+                recompute_embeddings=False,
+                return_stats=True,
+            )
+
+    results, stats = asyncio.run(run())
+    assert len(results) == 4
+    assert stats.path == "graph" and stats.nodes_visited == 7
+    assert stats.passages_fetched == 4 and stats.search_time > 0
+    assert stats.zmq_round_trips == 3
@@ -0,0 +1,178 @@
+"""
+Tests for the keep-warm searcher pool and its use by the MCP server.
+"""
+
+import asyncio
+import io
+import json
+import threading
+import time
+
+import pytest
+from leann import mcp
+from leann.api import SearchResult
+from leann.registry import resolve_index_path
+from leann.searcher_pool import SearcherPool
+
+
+class FakeSearcher:
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.cleaned_up = False
+        self.calls = 0
+
+    def search(self, query, top_k=5, **kwargs):
+        self.calls += 1
+        return [SearchResult(id="0", score=1.0, text=f"{query} in {self.index_path}")]
+
+    def cleanup(self):
+        self.cleaned_up = True
+
+
+@pytest.fixture
+def pool():
+    created = []
+
+    def factory(path):
+        searcher = FakeSearcher(path)
+        created.append(searcher)
+        return searcher
+
+    pool = SearcherPool(max_size=2, resolver=lambda name: f"/idx/{name}", searcher_factory=factory)
+    pool.created = created
+    yield pool
+    pool.close()
+
+
+def test_pool_reuses_open_searcher(pool):
+    with pool.acquire("a") as first:
+        pass
+    with pool.acquire("a") as second:
+        pass
+    assert first is second
+    assert len(pool.created) == 1
+    assert pool.stats()["hits"] == 1
+    assert pool.stats()["misses"] == 1
+
+
+def test_pool_evicts_least_recently_used(pool):
+    for name in ["a", "b", "a", "c"]:
+        with pool.acquire(name):
+            pass
+    assert pool.open_indexes() == ["a", "c"]
+    evicted = [s for s in pool.created if s.index_path == "/idx/b"]
+    assert evicted[0].cleaned_up
+    assert pool.stats()["evictions"] == 1
+
+
+def test_pool_unknown_index_raises():
+    pool = SearcherPool(resolver=lambda name: None, searcher_factory=FakeSearcher)
+    with pytest.raises(FileNotFoundError):
+        with pool.acquire("missing"):
+            pass
+    assert len(pool) == 0
+
+
+def test_pool_serializes_same_index_but_not_others(pool):
+    active = {"a": 0}
+    max_active = {"a": 0}
+    lock = threading.Lock()
+
+    def worker(name):
+        with pool.acquire(name):
+            with lock:
+                active.setdefault(name, 0)
+                active[name] += 1
+                max_active[name] = max(max_active.get(name, 0), active[name])
+            time.sleep(0.02)
+            with lock:
+                active[name] -= 1
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in ["a", "a", "a", "b"]]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max_active["a"] == 1
+    assert len([s for s in pool.created if s.index_path == "/idx/a"]) == 1
+
+
+def test_pool_close_cleans_up_everything(pool):
+    for name in ["a", "b"]:
+        with pool.acquire(name):
+            pass
+    pool.close()
+    assert len(pool) == 0
+    assert all(s.cleaned_up for s in pool.created)
+
+
+def test_resolve_index_path_prefers_cli_format(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    cli_dir = tmp_path / ".leann" / "indexes" / "docs"
+    cli_dir.mkdir(parents=True)
+    (cli_dir / "documents.leann.meta.json").write_text("{}")
+    app_dir = tmp_path / "apps_out" / "docs"
+    app_dir.mkdir(parents=True)
+    (app_dir / "notes.leann.meta.json").write_text("{}")
+
+    assert resolve_index_path("docs", project_dir=tmp_path) == str(cli_dir / "documents.leann")
+    assert resolve_index_path("notes", project_dir=tmp_path) == str(app_dir / "notes.leann")
+    assert resolve_index_path("nope", project_dir=tmp_path) is None
+    direct = str(app_dir / "notes.leann")
+    assert resolve_index_path(direct) == direct
+
+
+def test_mcp_search_uses_pool(pool, monkeypatch):
+    monkeypatch.setattr(mcp, "_searcher_pool", pool)
+    request = {
+        "jsonrpc": "2.0",
+        "id": 7,
+        "method": "tools/call",
+        "params": {"name": "leann_search", "arguments": {"index_name": "a", "query": "q"}},
+    }
+    for _ in range(3):
+        response = mcp.handle_request(request)
+    text = response["result"]["content"][0]["text"]
+    assert "Search results for 'q'" in text
+    assert "q in /idx/a" in text
+    assert len(pool.created) == 1
+    assert pool.created[0].calls == 3
+
+
+def test_mcp_search_reports_missing_index(monkeypatch):
+    pool = SearcherPool(resolver=lambda name: None, searcher_factory=FakeSearcher)
+    monkeypatch.setattr(mcp, "_searcher_pool", pool)
+    response = mcp.handle_request(
+        {
+            "id": 1,
+            "method": "tools/call",
+            "params": {"name": "leann_search", "arguments": {"index_name": "x", "query": "q"}},
+        }
+    )
+    assert "not found" in response["result"]["content"][0]["text"]
+
+
+def test_mcp_serve_answers_every_request(pool, monkeypatch):
+    monkeypatch.setattr(mcp, "_searcher_pool", pool)
+    lines = [
+        json.dumps(
+            {
+                "id": i,
+                "method": "tools/call",
+                "params": {
+                    "name": "leann_search",
+                    "arguments": {"index_name": "ab"[i % 2], "query": f"q{i}"},
+                },
+            }
+        )
+        for i in range(6)
+    ]
+    lines.append("not json")
+    stdin = io.StringIO("\n".join(lines) + "\n")
+    out = io.StringIO()
+
+    asyncio.run(mcp.serve(stdin, out, max_concurrency=3))
+
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert sorted(r["id"] for r in responses if r["id"] is not None) == list(range(6))
+    assert any("error" in r for r in responses)
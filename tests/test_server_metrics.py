@@ -0,0 +1,144 @@
+"""
+Tests for the embedding server counters, the __STATS__ message and `leann server-stats`.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from leann.cli import LeannCLI, format_server_stats
+from leann.embedding_server_manager import _get_available_port
+from leann.id_map import save_passage_offsets
+from leann.metrics import EmbeddingServerMetrics
+from leann.zmq_client import EmbeddingServerClient, fetch_server_stats
+
+HNSW_SERVER = (
+    Path(__file__).resolve().parents[1]
+    / "packages"
+    / "leann-backend-hnsw"
+    / "leann_backend_hnsw"
+    / "hnsw_embedding_server.py"
+)
+
+
+def test_metrics_snapshot_and_prometheus_text():
+    metrics = EmbeddingServerMetrics("hnsw", 5557, 'model "x"')
+    metrics.record_embedding(8, lookup_seconds=0.002, model_seconds=0.03)
+    metrics.record_request("distance", 0.04)
+    metrics.record_request("distance", 0.05)
+    metrics.record_request("text", 0.01)
+    metrics.count("fallback_responses")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == {"distance": 2, "text": 1}
+    assert snapshot["texts_embedded"] == 8 and snapshot["fallback_responses"] == 1
+    assert snapshot["request_latency"]["distance"]["count"] == 2
+    assert snapshot["batch_size"]["max"] == 8
+    json.dumps(snapshot)
+
+    text = metrics.prometheus_text()
+    labels = 'backend="hnsw",port="5557",model="model \\"x\\""'
+    assert f'leann_embedding_server_requests_total{{{labels},type="distance"}} 2' in text
+    assert f"leann_embedding_server_texts_embedded_total{{{labels}}} 8" in text
+    assert f"leann_embedding_server_model_seconds_count{{{labels}}} 1" in text
+    assert f'leann_embedding_server_batch_size_bucket{{{labels},le="8"}} 1' in text
+
+
+def test_metrics_file_is_throttled_and_per_port(tmp_path):
+    metrics = EmbeddingServerMetrics(
+        "diskann", 6001, "m", metrics_file=str(tmp_path / "leann-{port}.prom")
+    )
+    path = tmp_path / "leann-6001.prom"
+    metrics.record_request("embedding", 0.01)
+    metrics.write_prometheus()
+    assert 'type="embedding"} 1' in path.read_text()
+
+    metrics.record_request("embedding", 0.01)
+    metrics.write_prometheus()
+    assert 'type="embedding"} 1' in path.read_text()
+    metrics.write_prometheus(force=True)
+    assert 'type="embedding"} 2' in path.read_text()
+    assert [p.name for p in tmp_path.iterdir()] == ["leann-6001.prom"]
+
+
+def test_format_server_stats():
+    metrics = EmbeddingServerMetrics("hnsw", 5557, "facebook/contriever")
+    metrics.record_embedding(32, lookup_seconds=0.001, model_seconds=0.02)
+    metrics.record_request("distance", 0.025)
+    text = format_server_stats(5557, metrics.snapshot())
+    assert "Port 5557: hnsw embedding server" in text
+    assert "Requests: distance=1" in text
+    assert "request[distance]" in text and "Batch size: mean 32.0" in text
+
+
+@pytest.fixture
+def hnsw_server(tmp_path):
+    meta = {
+        "version": "1.0",
+        "backend_name": "hnsw",
+        "embedding_model": "unused",
+        "dimensions": 4,
+        "passage_sources": [
+            {
+                "type": "jsonl",
+                "path": "idx.leann.passages.jsonl",
+                "index_path": "idx.leann.passages.idx",
+            }
+        ],
+    }
+    (tmp_path / "idx.leann.meta.json").write_text(json.dumps(meta))
+    (tmp_path / "idx.leann.passages.jsonl").write_text('{"id": "0", "text": "hi"}\n')
+    save_passage_offsets(tmp_path / "idx.leann.passages.idx", {"0": 0})
+
+    port = _get_available_port(5800)
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            str(HNSW_SERVER),
+            "--zmq-port",
+            str(port),
+            "--passages-file",
+            str(tmp_path / "idx.leann.meta.json"),
+            "--metrics-file",
+            str(tmp_path / "metrics-{port}.prom"),
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.time() + 60
+        while fetch_server_stats(port, timeout_ms=500) is None:
+            if process.poll() is not None or time.time() > deadline:
+                pytest.skip("HNSW embedding server could not start here")
+            time.sleep(0.2)
+        yield port, tmp_path
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def test_hnsw_server_answers_stats(hnsw_server, capsys):
+    port, tmp_path = hnsw_server
+    client = EmbeddingServerClient(port, timeout_ms=5000)
+    # Unknown passages need no model: the server answers with sentinel distances
+    assert client.request([[7, 8], [0.1, 0.2, 0.3, 0.4]]) == [[1e9, 1e9]]
+    client.close()
+
+    stats = fetch_server_stats(port)
+    assert stats["backend"] == "hnsw" and stats["port"] == str(port)
+    assert stats["requests"]["distance"] == 1
+    assert stats["passages_missing"] == 2 and stats["fallback_responses"] == 1
+    assert stats["request_latency"]["distance"]["count"] == 1
+    assert (
+        "leann_embedding_server_requests_total" in (tmp_path / f"metrics-{port}.prom").read_text()
+    )
+
+    cli = LeannCLI()
+    cli.server_stats(cli.create_parser().parse_args(["server-stats", "--ports", str(port)]))
+    assert f"Port {port}: hnsw embedding server" in capsys.readouterr().out
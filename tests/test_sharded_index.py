@@ -0,0 +1,215 @@
+"""
+Tests for sharded index builds and shard fan-out search.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+from leann.api import LeannBuilder, LeannSearcher
+from leann.embedding_server_manager import _get_available_port
+from leann.id_map import IdMap, id_map_prefix
+from leann.sharding import shard_index_path, shard_of
+from leann.zmq_client import EmbeddingServerClient, fetch_server_stats
+
+TEXTS = [f"passage number {i}" for i in range(60)]
+HNSW_SERVER = (
+    Path(__file__).resolve().parents[1]
+    / "packages"
+    / "leann-backend-hnsw"
+    / "leann_backend_hnsw"
+    / "hnsw_embedding_server.py"
+)
+# The real HNSW embedding server, with the conftest fake_embeddings standing in for the model
+FAKE_MODEL_SERVER = f"""
+import runpy, zlib
+import numpy as np
+import leann.embedding_compute
+
+def fake_embeddings(chunks, *args, **kwargs):
+    rows = [np.random.default_rng(zlib.crc32(t.encode("utf-8"))).normal(size=8) for t in chunks]
+    return np.array(rows, dtype=np.float32)
+
+leann.embedding_compute.compute_embeddings = fake_embeddings
+runpy.run_path({str(HNSW_SERVER)!r}, run_name="__main__")
+"""
+
+
+class ServerProcessManager:
+    """Runs FAKE_MODEL_SERVER for one meta.json at a time, like EmbeddingServerManager."""
+
+    running: list["ServerProcessManager"] = []
+
+    def __init__(self):
+        self.process = None
+        self.passages_file = None
+        self.port = None
+
+    def start_server(self, passages_file, port):
+        if self.process is not None and self.passages_file == passages_file:
+            return self.port
+        self.stop_server()
+        port = _get_available_port(port)
+        self.process = subprocess.Popen(
+            [
+                *(sys.executable, "-c", FAKE_MODEL_SERVER),
+                *("--zmq-port", str(port), "--passages-file", passages_file),
+                *("--model-name", "fake"),
+            ],
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        ServerProcessManager.running.append(self)
+        deadline = time.time() + 60
+        while fetch_server_stats(port, timeout_ms=500) is None:
+            if self.process.poll() is not None or time.time() > deadline:
+                pytest.skip("HNSW embedding server could not start here")
+            time.sleep(0.1)
+        self.passages_file, self.port = passages_file, port
+        return port
+
+    def stop_server(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+            self.process = None
+
+
+def label_search(self, query, top_k, zmq_port=None, **kwargs):
+    """Recomputes like the HNSW backend: integer graph labels go to the embedding server."""
+    _, ids = type(self).built[self.index_path]
+    client = EmbeddingServerClient(zmq_port, timeout_ms=10000)
+    try:
+        (distances,) = client.request([list(range(len(ids))), query[0].tolist()])
+    finally:
+        client.close()
+    best = np.argsort(distances)[:top_k]
+    id_map = IdMap.load(id_map_prefix(self.index_path))
+    return {
+        "labels": [id_map.lookup(best)],
+        "distances": [[-distances[i] for i in best]],
+    }
+
+
+@pytest.fixture
+def build(tmp_path, fake_backend):
+    fake_backend("fake-shards")
+    fake_backend("fake-labels", search=label_search, server_manager_class=ServerProcessManager)
+
+    def _build(name, backend="fake-shards", **builder_kwargs):
+        index_path = str(tmp_path / f"{name}.leann")
+        builder = LeannBuilder(backend, embedding_model="fake", **builder_kwargs)
+        for i, text in enumerate(TEXTS):
+            builder.add_text(text, metadata={"n": i, "source": f"doc{i % 7}.txt"})
+        builder.build_index(index_path)
+        return index_path
+
+    yield _build
+    while ServerProcessManager.running:
+        ServerProcessManager.running.pop().stop_server()
+
+
+def test_sharded_build_records_layout(build, tmp_path):
+    index_path = build("docs", num_shards=3)
+    meta = json.loads(Path(f"{index_path}.meta.json").read_text())
+    layout = meta["shards"]
+    assert layout["strategy"] == "hash" and layout["count"] == 3
+    assert layout["indexes"] == [Path(shard_index_path(index_path, i)).name for i in range(3)]
+    assert sum(layout["passages"]) == len(TEXTS)
+    assert len(meta["passage_sources"]) == 3
+
+    expected = [0, 0, 0]
+    for i in range(len(TEXTS)):
+        expected[shard_of({"id": str(i)}, 3)] += 1
+    assert layout["passages"] == expected
+    # Shard metadata is not picked up as separate indexes by `leann list`
+    assert [p.name for p in tmp_path.glob("*.leann.meta.json")] == ["docs.leann.meta.json"]
+
+    searcher = LeannSearcher(index_path)
+    assert len(searcher.passage_manager) == len(TEXTS)
+    assert searcher.passage_manager.get_passage("42")["text"] == "passage number 42"
+
+
+def test_shard_by_source_keeps_documents_together(build):
+    index_path = build("docs", num_shards=4, shard_by="source")
+    meta = json.loads(Path(f"{index_path}.meta.json").read_text())
+    owner = {}
+    for name in meta["shards"]["indexes"]:
+        passages = Path(index_path).parent / f"{name}.passages.jsonl"
+        for line in passages.read_text().splitlines():
+            source = json.loads(line)["metadata"]["source"]
+            assert owner.setdefault(source, name) == name
+
+
+@pytest.mark.parametrize("exact_threshold", [None, 0])
+def test_sharded_search_matches_single_index(build, exact_threshold):
+    single = LeannSearcher(build("single"))
+    sharded = LeannSearcher(build("sharded", num_shards=4))
+    query = "passage number 17"
+
+    expected = single.search(query, top_k=5, exact_threshold=exact_threshold)
+    results = sharded.search(query, top_k=5, exact_threshold=exact_threshold)
+    assert [r.id for r in results] == [r.id for r in expected]
+    np.testing.assert_allclose([r.score for r in results], [r.score for r in expected], rtol=1e-3)
+    assert sharded.last_search_stats["path"] == "sharded"
+    assert len(sharded.last_search_stats["shards"]) == 4
+
+    filtered = sharded.search(
+        query, top_k=3, exact_threshold=exact_threshold, metadata_filters={"n": {"<": 10}}
+    )
+    assert filtered and all(r.metadata["n"] < 10 for r in filtered)
+
+
+def test_each_shard_recomputes_through_its_own_server(build):
+    sharded = LeannSearcher(build("sharded", num_shards=3))
+    sharded.search("passage number 3", top_k=3, exact_threshold=0)
+
+    # Graph labels are shard-local, so each server is started from its shard's meta.json
+    for shard in sharded._shards:
+        assert shard.backend_impl.embedding_server_manager.started == [shard.meta_path_str]
+
+
+def test_shard_servers_are_capped(build, fake_backend):
+    live, started, peaks = set(), set(), []
+
+    class LiveServerManager:
+        def start_server(self, passages_file, port=5557, **kwargs):
+            self.passages_file = passages_file
+            live.add(passages_file)
+            started.add(passages_file)
+            peaks.append(len(live))
+            return port
+
+        def stop_server(self):
+            live.discard(getattr(self, "passages_file", None))
+
+    fake_backend("fake-capped", server_manager_class=LiveServerManager)
+    expected = LeannSearcher(build("single")).search("passage number 17", top_k=5)
+    sharded = LeannSearcher(
+        build("sharded", backend="fake-capped", num_shards=5), max_shard_servers=2
+    )
+
+    for _ in range(2):
+        results = sharded.search("passage number 17", top_k=5, exact_threshold=0)
+        assert [r.id for r in results] == [r.id for r in expected]
+    assert max(peaks) == 2 and len(started) == 5
+    assert len(sharded.last_search_stats["shards"]) == 5
+    with pytest.raises(ValueError):
+        LeannSearcher(sharded.index_path, max_shard_servers=0)
+
+
+def test_sharded_labels_resolve_through_real_embedding_server(build):
+    expected = LeannSearcher(build("single")).search("passage number 17", top_k=5)
+    sharded = LeannSearcher(build("sharded", backend="fake-labels", num_shards=3))
+
+    results = sharded.search("passage number 17", top_k=5, exact_threshold=0)
+    assert [r.id for r in results] == [r.id for r in expected]
+    np.testing.assert_allclose([r.score for r in results], [r.score for r in expected], rtol=1e-3)
+    ports = {shard.backend_impl.embedding_server_manager.port for shard in sharded._shards}
+    assert len(ports) == 3
@@ -0,0 +1,170 @@
+"""
+Tests for the embedding server zygote and EmbeddingServerManager's use of it.
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import psutil
+import pytest
+from leann.cli import LeannCLI, format_bench_report
+from leann.embedding_server_manager import EmbeddingServerManager
+from leann.id_map import save_passage_offsets
+from leann.zmq_client import EmbeddingServerClient, fetch_server_stats
+from leann.zygote import (
+    gpu_visible,
+    spawn_server,
+    start_zygote,
+    stop_zygote,
+    zygote_status,
+    zygote_supported,
+)
+
+HNSW_PACKAGE = Path(__file__).resolve().parents[1] / "packages" / "leann-backend-hnsw"
+HNSW_SERVER_MODULE = "leann_backend_hnsw.hnsw_embedding_server"
+
+needs_fork = pytest.mark.skipif(not zygote_supported(), reason="zygote needs os.fork() on Linux")
+
+
+@pytest.fixture
+def index_meta(tmp_path):
+    meta = {
+        "version": "1.0",
+        "backend_name": "hnsw",
+        "embedding_model": "unused",
+        "dimensions": 4,
+        "passage_sources": [
+            {
+                "type": "jsonl",
+                "path": "idx.leann.passages.jsonl",
+                "index_path": "idx.leann.passages.idx",
+            }
+        ],
+    }
+    (tmp_path / "idx.leann.meta.json").write_text(json.dumps(meta))
+    (tmp_path / "idx.leann.passages.jsonl").write_text('{"id": "0", "text": "hi"}\n')
+    save_passage_offsets(tmp_path / "idx.leann.passages.idx", {"0": 0})
+    return tmp_path / "idx.leann.meta.json"
+
+
+@pytest.fixture
+def zygote(tmp_path, monkeypatch):
+    # The in-tree backend, not the lightweight stand-in importable from the repo root
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join([str(HNSW_PACKAGE), *sys.path]))
+    # Local models only use the zygote while no GPU is visible
+    monkeypatch.setenv("CUDA_VISIBLE_DEVICES", "")
+    monkeypatch.chdir(tmp_path)
+    socket_path = tmp_path / "zygote.ipc"
+    start_zygote(socket_path=socket_path, timeout=120)
+    try:
+        yield socket_path
+    finally:
+        stop_zygote(socket_path)
+
+
+@needs_fork
+def test_manager_forks_server_from_zygote(zygote, index_meta):
+    manager = EmbeddingServerManager(HNSW_SERVER_MODULE, zygote=zygote)
+    started, port = manager.start_server(
+        port=5900, model_name="unused", passages_file=str(index_meta)
+    )
+    if not started:
+        pytest.skip("HNSW embedding server could not start here")
+    process = manager.server_process
+    zygote_pid = zygote_status(zygote)["pid"]
+    assert psutil.Process(process.pid).ppid() == zygote_pid
+
+    client = EmbeddingServerClient(port, timeout_ms=5000)
+    # Unknown passages need no model: the server answers with sentinel distances
+    assert client.request([[7], [0.1, 0.2, 0.3, 0.4]]) == [[1e9]]
+    client.close()
+    assert fetch_server_stats(port)["requests"]["distance"] == 1
+
+    manager.stop_server()
+    assert process.poll() is not None and not psutil.pid_exists(process.pid)
+    assert zygote_status(zygote)["spawned"] == 1
+
+    assert stop_zygote(zygote)
+    deadline = time.time() + 10
+    while zygote.exists() and time.time() < deadline:
+        time.sleep(0.05)
+    assert not zygote.exists()
+
+
+@needs_fork
+def test_forked_child_exits_when_module_is_missing(zygote):
+    pid = spawn_server("leann_no_such_module", [], socket_path=zygote)
+    # The fork itself succeeds; the child exits because the module is missing
+    deadline = time.time() + 10
+    while psutil.pid_exists(pid) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not psutil.pid_exists(pid)
+
+
+def test_no_zygote_falls_back_to_subprocess(tmp_path, monkeypatch):
+    socket_path = tmp_path / "zygote.ipc"
+    assert spawn_server(HNSW_SERVER_MODULE, [], socket_path=socket_path) is None
+
+    # A socket left behind by a zygote that died is not waited on
+    socket_path.touch()
+    (tmp_path / "zygote.ipc.pid").write_text("999999999")
+    start = time.perf_counter()
+    assert spawn_server(HNSW_SERVER_MODULE, [], socket_path=socket_path) is None
+    assert time.perf_counter() - start < 0.5
+
+    command = [sys.executable, "-m", HNSW_SERVER_MODULE, "--zmq-port", "5900"]
+
+    def forked(zygote=None) -> bool:
+        manager = EmbeddingServerManager(HNSW_SERVER_MODULE, zygote=zygote)
+        return manager._launch_server_from_zygote(command, 5900)
+
+    assert not forked(socket_path)
+    assert not forked(False)
+    monkeypatch.setenv("LEANN_EMBEDDING_ZYGOTE", "0")
+    monkeypatch.setattr(
+        "leann.embedding_server_manager.spawn_server", lambda *a, **k: pytest.fail("asked zygote")
+    )
+    assert not forked()
+
+
+def test_gpu_servers_skip_zygote(monkeypatch):
+    assert not gpu_visible({"CUDA_VISIBLE_DEVICES": ""})
+    assert not gpu_visible({"CUDA_VISIBLE_DEVICES": "-1"})
+    monkeypatch.setattr("leann.embedding_server_manager.zygote_enabled", lambda: True)
+    monkeypatch.setattr("leann.embedding_server_manager.gpu_visible", lambda env: True)
+    asked = []
+    monkeypatch.setattr(
+        "leann.embedding_server_manager.spawn_server", lambda *a, **k: asked.append(a)
+    )
+    manager = EmbeddingServerManager(HNSW_SERVER_MODULE)
+    command = [sys.executable, "-m", HNSW_SERVER_MODULE, "--zmq-port", "5900"]
+
+    # A forked server would be CPU-only, so a local model that can use the GPU starts cold
+    assert not manager._launch_server_from_zygote(command, 5900)
+    assert asked == []
+    # API-backed embeddings do not care about the device
+    manager._launch_server_from_zygote(command, 5900, embedding_mode="openai")
+    assert len(asked) == 1
+
+
+def test_zygote_cli_and_startup_report():
+    parser = LeannCLI().create_parser()
+    args = parser.parse_args(["zygote", "start", "--models", "a", "b", "--socket", "/tmp/z"])
+    assert args.action == "start" and args.models == ["a", "b"] and args.socket == "/tmp/z"
+    assert parser.parse_args(["bench", "--startup-runs", "3"]).startup_runs == 3
+
+    report = {
+        "config": {"top_k": 10},
+        "results": [
+            {
+                "backend": "hnsw",
+                "build": {"seconds": 1.0, "docs_per_second": 10.0, "index_bytes": 1024},
+                "runs": [],
+                "startup": {"runs": 3, "cold_ms": {"p50": 4200.0}, "zygote_ms": {"p50": 25.0}},
+            }
+        ],
+    }
+    assert "cold p50 4200.0, zygote p50 25.0" in format_bench_report(report)